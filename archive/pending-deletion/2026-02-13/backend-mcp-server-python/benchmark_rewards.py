@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Reward Engine Benchmark
+
+Measures the per-activity cost of the gamification reward engine on a
+synthetic queue of activities: calculating rewards one at a time, one at a
+time with the rewards applied, and in bulk. Runs entirely in memory; no
+backend is needed.
+
+Usage:
+    python benchmark_rewards.py [--activities N] [--users N] [--repeat N] [--seed N]
+
+Options:
+    --activities N  Activities in the queue (default: 10000)
+    --users N       Users the activities are spread across (default: 100)
+    --repeat N      Runs per mode; the fastest is reported (default: 3)
+    --seed N        Random seed for the queue (default: 0)
+"""
+
+import sys
+import json
+import random
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the gamification reward engine")
+    parser.add_argument("--activities", type=int, default=10000, help="Activities in the queue")
+    parser.add_argument("--users", type=int, default=100, help="Users the activities are spread across")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the queue")
+    return parser.parse_args()
+
+def build_queue(models, count, users, seed):
+    """Random profiles and a queue of activities spread across them."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    profiles = {
+        f"user-{i}": models.GamificationProfile(userId=f"user-{i}", streaks={"activity": rng.randint(0, 10)})
+        for i in range(users)
+    }
+    activity_types = list(models.ActivityType)
+    activities = [
+        models.LogActivityInput(
+            userId=f"user-{rng.randrange(users)}",
+            activityType=rng.choice(activity_types),
+            value=rng.randint(1, 100),
+            duration=rng.choice([None, 5, 15, 30]),
+            timestamp=start + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+    return profiles, activities
+
+def best_of(repeat, run):
+    """Fastest of `repeat` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    # Make the server package importable when run from any directory
+    sys.path.insert(0, str(Path(__file__).parent))
+    from gamification_mcp_server import models
+    from gamification_mcp_server.services import rewards_service
+
+    profiles, activities = build_queue(models, args.activities, args.users, args.seed)
+
+    def fresh_profiles():
+        return {user_id: profile.copy(deep=True) for user_id, profile in profiles.items()}
+
+    def calculate():
+        for activity in activities:
+            rewards_service.calculate_rewards(profiles[activity.userId], activity.activityType,
+                                              activity.value, activity.duration, activity.timestamp)
+
+    def calculate_and_apply():
+        working = fresh_profiles()
+        for activity in activities:
+            profile = working[activity.userId]
+            rewards = rewards_service.calculate_rewards(profile, activity.activityType, activity.value,
+                                                        activity.duration, activity.timestamp)
+            rewards_service.apply_rewards(profile, rewards, activity.timestamp)
+
+    def bulk():
+        rewards_service.calculate_rewards_bulk(fresh_profiles(), activities)
+
+    copy_seconds = best_of(args.repeat, fresh_profiles)
+    modes = {
+        "calculate": best_of(args.repeat, calculate),
+        "calculateAndApply": best_of(args.repeat, calculate_and_apply) - copy_seconds,
+        "bulk": best_of(args.repeat, bulk) - copy_seconds
+    }
+
+    print(json.dumps({
+        "activities": args.activities,
+        "users": args.users,
+        "numpy": rewards_service.np is not None,
+        "microsecondsPerActivity": {
+            mode: round(seconds / max(1, args.activities) * 1e6, 2) for mode, seconds in modes.items()
+        },
+        "activitiesPerSecond": {
+            mode: round(args.activities / seconds) if seconds > 0 else None for mode, seconds in modes.items()
+        }
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
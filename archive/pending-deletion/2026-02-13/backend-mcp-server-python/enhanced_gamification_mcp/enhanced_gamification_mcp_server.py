@@ -12,14 +12,17 @@ This server demonstrates proper MCP optimization techniques including:
 
 import os
 import sys
+import re
 import json
+import time
 import uuid
 import logging
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Literal
 from dataclasses import dataclass
-from collections import defaultdict
+from contextlib import asynccontextmanager
+from collections import defaultdict, deque
 import sqlite3
 import numpy as np
 from sklearn.preprocessing import StandardScaler
@@ -48,6 +51,19 @@ logger = logging.getLogger("enhanced_gamification_mcp")
 BACKEND_API_URL = os.environ.get("BACKEND_API_URL", "http://localhost:5000/api")
 API_TOKEN = os.environ.get("API_TOKEN", "")
 
+# Backend resilience settings
+BACKEND_TIMEOUT = float(os.environ.get("BACKEND_TIMEOUT", "10"))
+BACKEND_MIN_TIMEOUT = float(os.environ.get("BACKEND_MIN_TIMEOUT", "1"))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", "30"))
+HEDGE_GET_REQUESTS = os.environ.get("HEDGE_GET_REQUESTS", "false").lower() == "true"
+
+# Admission control for the expensive analysis tools
+ADMISSION_MAX_CONCURRENT = int(os.environ.get("ADMISSION_MAX_CONCURRENT", "4"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "8"))
+ADMISSION_USER_RATE_PER_MINUTE = float(os.environ.get("ADMISSION_USER_RATE_PER_MINUTE", "6"))
+ADMISSION_USER_BURST = int(os.environ.get("ADMISSION_USER_BURST", "3"))
+
 # Configure Redis for caching (optional)
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379")
 
@@ -432,28 +448,251 @@ async def get_user_data_from_backend(user_id: str) -> Dict[str, Any]:
         logger.error(f"Error getting user data: {e}")
         return {}
 
+class BackendCircuit:
+    """
+    Circuit breaker and latency window for one backend endpoint.
+    
+    Opens after BREAKER_FAILURE_THRESHOLD consecutive failures, rejects calls
+    for BREAKER_RESET_TIMEOUT seconds, then lets a single probe through
+    (half-open) which either closes or re-opens it.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.latencies: deque = deque(maxlen=200)
+    
+    def allow_request(self) -> bool:
+        now = time.monotonic()
+        if self.state == "open" and now - self.opened_at >= BREAKER_RESET_TIMEOUT:
+            self.state = "half_open"
+            self.probe_started = None
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and (self.probe_started is None or now - self.probe_started >= BREAKER_RESET_TIMEOUT):
+            self.probe_started = now
+            return True
+        return False
+    
+    def retry_after(self) -> int:
+        return max(1, int(BREAKER_RESET_TIMEOUT - (time.monotonic() - self.opened_at) + 0.999))
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+    
+    def timeout(self) -> float:
+        """Request timeout: 3x the p99 latency, clamped to the configured range."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return BACKEND_TIMEOUT
+        return min(BACKEND_TIMEOUT, max(BACKEND_MIN_TIMEOUT, p99 * 3))
+    
+    def record_success(self, seconds: float):
+        self.latencies.append(seconds)
+        if self.state != "closed":
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+        self.probe_started = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= BREAKER_FAILURE_THRESHOLD:
+            if self.state != "open":
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.probe_started = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.failures,
+            "samples": len(self.latencies),
+            "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95Ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+backend_circuits: Dict[str, BackendCircuit] = {}
+
+def get_backend_circuit(method: str, url: str) -> BackendCircuit:
+    """Get the circuit for an endpoint, collapsing record ids so `/users/12` and `/users/34` share one."""
+    path = url.split("?")[0].split("://", 1)[-1]
+    key = f"{method} " + "/".join("{id}" if re.search(r"\d", segment) and i else segment
+                                  for i, segment in enumerate(path.split("/")))
+    if key not in backend_circuits:
+        backend_circuits[key] = BackendCircuit(key)
+    return backend_circuits[key]
+
+def send_backend_request(method: str, url: str, headers: Dict[str, str], data: Optional[Dict], timeout: float) -> Dict:
+    """Send a blocking request to the backend (run in a worker thread)."""
+    if method == "GET":
+        response = requests.get(url, headers=headers, params=data or {}, timeout=timeout)
+    elif method == "POST":
+        response = requests.post(url, headers=headers, json=data or {}, timeout=timeout)
+    else:
+        raise ValueError(f"Unsupported method: {method}")
+    
+    response.raise_for_status()
+    return response.json()
+
 async def make_api_request(method: str, path: str, data: Optional[Dict] = None) -> Dict:
-    """Make request to backend API"""
+    """Make request to backend API through the endpoint's circuit breaker"""
+    method = method.upper()
     url = f"{BACKEND_API_URL}/{path.lstrip('/')}" if not path.startswith('http') else path
     headers = {'Content-Type': 'application/json'}
     
     if API_TOKEN:
         headers['Authorization'] = f"Bearer {API_TOKEN}"
     
+    circuit = get_backend_circuit(method, url)
+    if not circuit.allow_request():
+        raise HTTPException(
+            status_code=503,
+            detail=f"Backend endpoint {circuit.name} is unavailable (circuit open)",
+            headers={"Retry-After": str(circuit.retry_after())}
+        )
+    
+    timeout = circuit.timeout()
+    started = time.monotonic()
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=data or {})
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data or {})
-        else:
-            raise ValueError(f"Unsupported method: {method}")
-        
-        response.raise_for_status()
-        return response.json()
+        attempts = {asyncio.ensure_future(asyncio.to_thread(send_backend_request, method, url, headers, data, timeout))}
+        hedge_after = circuit.percentile(95) if method == "GET" and HEDGE_GET_REQUESTS else None
+        if hedge_after is not None:
+            # Send a duplicate GET if the first one is slower than the endpoint's p95
+            done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+            if not done:
+                attempts.add(asyncio.ensure_future(asyncio.to_thread(send_backend_request, method, url, headers, data, timeout)))
+        
+        error = None
+        while attempts:
+            done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in attempts:
+                        other.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    circuit.record_success(time.monotonic() - started)
+                    return task.result()
+                error = task.exception()
+        raise error
     except Exception as e:
+        # Only connection errors, timeouts and 5xx responses count against the circuit
+        response = getattr(e, 'response', None)
+        if isinstance(e, requests.exceptions.RequestException) and (response is None or response.status_code >= 500):
+            circuit.record_failure()
+        else:
+            circuit.record_success(time.monotonic() - started)
         logger.error(f"API request error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class ToolAdmission:
+    """
+    Admission control for one expensive tool.
+    
+    Combines a global concurrency limit with a bounded wait queue and a
+    per-caller token bucket. Interactive callers are admitted before batch
+    callers (`X-Request-Priority: batch`), which may only fill half the queue.
+    Overload is shed immediately with a 429 and a Retry-After header.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.running = 0
+        self.waiters: Dict[str, deque] = {"interactive": deque(), "batch": deque()}
+        self.buckets: Dict[str, List[float]] = {}  # caller -> [tokens, last refill]
+        self.queue_waits: deque = deque(maxlen=200)
+        self.stats = {"admitted": 0, "rejectedRateLimit": 0, "rejectedQueueFull": 0}
+    
+    def shed(self, reason: str, detail: str, retry_after: float) -> HTTPException:
+        self.stats[reason] += 1
+        return HTTPException(status_code=429, detail=detail,
+                             headers={"Retry-After": str(max(1, int(retry_after + 0.999)))})
+    
+    def take_token(self, caller: str):
+        rate = ADMISSION_USER_RATE_PER_MINUTE / 60.0
+        now = time.monotonic()
+        if caller not in self.buckets and len(self.buckets) >= 10000:
+            # Forget callers whose buckets have refilled (idle)
+            self.buckets = {c: b for c, b in self.buckets.items()
+                            if b[0] + (now - b[1]) * rate < ADMISSION_USER_BURST}
+        bucket = self.buckets.setdefault(caller, [float(ADMISSION_USER_BURST), now])
+        bucket[0] = min(ADMISSION_USER_BURST, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            raise self.shed("rejectedRateLimit", f"Too many {self.name} requests for {caller}",
+                            (1 - bucket[0]) / rate)
+        bucket[0] -= 1
+    
+    def release(self):
+        # Hand the slot straight to the next waiter, interactive first
+        for queue in (self.waiters["interactive"], self.waiters["batch"]):
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.running -= 1
+    
+    @asynccontextmanager
+    async def admit(self, caller: str, priority: str = "interactive"):
+        priority = "batch" if priority == "batch" else "interactive"
+        started = time.monotonic()
+        if self.running >= ADMISSION_MAX_CONCURRENT:
+            # Checked before the caller's token is taken, so a shed request doesn't use one up
+            limit = ADMISSION_MAX_QUEUE if priority == "interactive" else ADMISSION_MAX_QUEUE // 2
+            if sum(len(q) for q in self.waiters.values()) >= limit:
+                typical_wait = sorted(self.queue_waits)[len(self.queue_waits) // 2] if self.queue_waits else 1.0
+                raise self.shed("rejectedQueueFull", f"{self.name} is at capacity, please retry later", typical_wait)
+            self.take_token(caller)
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters[priority].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                elif waiter in self.waiters[priority]:
+                    # Leave the queue so it isn't counted against later callers
+                    self.waiters[priority].remove(waiter)
+                raise
+        else:
+            self.take_token(caller)
+            self.running += 1
+        
+        self.queue_waits.append(time.monotonic() - started)
+        self.stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def metrics(self) -> Dict[str, Any]:
+        waits = sorted(self.queue_waits)
+        return {
+            **self.stats,
+            "running": self.running,
+            "queued": sum(len(q) for q in self.waiters.values()),
+            "maxConcurrent": ADMISSION_MAX_CONCURRENT,
+            "queueWaitP50Ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+            "queueWaitP95Ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else None
+        }
+
+tool_admission = {
+    name: ToolAdmission(name) for name in ("AnalyzeUserEngagement", "OptimizeRewardSystem")
+}
+
+def get_caller(request: Request, default: str) -> str:
+    """Identify the caller for rate limiting: X-User-Id header, else `default`."""
+    return request.headers.get("X-User-Id") or default
+
 def analyze_user_patterns(user_data: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze user behavior patterns"""
     patterns = {}
@@ -507,13 +746,20 @@ def calculate_social_engagement_score(user_data: Dict[str, Any]) -> float:
 # MCP Routes
 
 @app.post("/tools/AnalyzeUserEngagement", response_model=AnalyzeUserEngagementOutput)
-async def analyze_user_engagement(input_data: AnalyzeUserEngagementInput):
+async def analyze_user_engagement(input_data: AnalyzeUserEngagementInput, request: Request):
     """
     Analyze user engagement patterns and provide insights.
     
     This tool uses machine learning to analyze user behavior,
     identify engagement patterns, and provide personalized recommendations.
+    Subject to admission control; may be rejected with a 429.
     """
+    caller = get_caller(request, input_data.userId)
+    async with tool_admission["AnalyzeUserEngagement"].admit(caller, request.headers.get("X-Request-Priority")):
+        return await run_analyze_user_engagement(input_data)
+
+async def run_analyze_user_engagement(input_data: AnalyzeUserEngagementInput) -> AnalyzeUserEngagementOutput:
+    """Run the engagement analysis once admitted."""
     try:
         # Get user data
         user_data = await get_user_data_from_backend(input_data.userId)
@@ -705,13 +951,20 @@ async def predict_user_motivation(input_data: PredictUserMotivationInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tools/OptimizeRewardSystem", response_model=OptimizeRewardSystemOutput)
-async def optimize_reward_system(input_data: OptimizeRewardSystemInput):
+async def optimize_reward_system(input_data: OptimizeRewardSystemInput, request: Request):
     """
     Optimize the reward system based on user data and objectives.
     
     Analyzes patterns across multiple users to recommend improvements
     to the gamification and reward systems.
+    Subject to admission control; may be rejected with a 429.
     """
+    caller = get_caller(request, request.client.host if request.client else "anonymous")
+    async with tool_admission["OptimizeRewardSystem"].admit(caller, request.headers.get("X-Request-Priority")):
+        return await run_optimize_reward_system(input_data)
+
+async def run_optimize_reward_system(input_data: OptimizeRewardSystemInput) -> OptimizeRewardSystemOutput:
+    """Run the reward system optimization once admitted."""
     try:
         # Get user data for analysis
         users_data = []
@@ -1331,10 +1584,14 @@ async def health_check():
         except:
             redis_status = "unhealthy"
     
+    circuits = {key: circuit.snapshot() for key, circuit in sorted(backend_circuits.items())}
+    
     return {
-        "status": "healthy",
+        "status": "degraded" if any(c["state"] == "open" for c in circuits.values()) else "healthy",
         "database": db_status,
         "redis": redis_status,
+        "backendCircuits": circuits,
+        "admission": {name: admission.metrics() for name, admission in tool_admission.items()},
         "timestamp": datetime.now().isoformat()
     }
 
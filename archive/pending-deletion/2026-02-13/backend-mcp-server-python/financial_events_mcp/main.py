@@ -14,6 +14,10 @@ import asyncio
 import os
 import httpx
 import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
 from collections import defaultdict
 import random  # For generating recommendation scores
 
@@ -25,6 +29,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger("financial_events_mcp")
 
+# Idempotent sale processing: store file, replay window and stored responses kept
+IDEMPOTENCY_STORE_PATH = os.environ.get("IDEMPOTENCY_STORE_PATH") or str(Path(__file__).parent / "data" / "idempotency.sqlite3")
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
 # Create FastAPI app
 app = FastAPI(
     title="Financial Events MCP",
@@ -187,6 +196,127 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+class IdempotencyStore:
+    """
+    Bounded, persisted map of idempotency key -> stored response.
+    
+    Webhook handlers retry /api/process-sale on timeout; without this every
+    retry would count the sale again and re-trigger rewards. The first
+    successful response for a key is kept in a local SQLite file and
+    replayed for retries, and a retry arriving while the first call is
+    still running waits for it. Reusing a key for a different request is
+    rejected with 409.
+    """
+    
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, tuple] = {}
+        self._puts = 0
+        self._counts = {"hits": 0, "misses": 0, "inflightJoins": 0, "conflicts": 0}
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idempotency_created ON idempotency (created_at)")
+            self._conn = conn
+        return self._conn
+    
+    def _get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT fingerprint, response FROM idempotency WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+    
+    def _put(self, key: str, fingerprint: str, response: Any) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, json.dumps(response, default=str), now, now + self.ttl)
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM idempotency WHERE key IN ("
+                    "SELECT key FROM idempotency ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+    
+    def _check_fingerprint(self, key: str, stored: str, requested: str) -> None:
+        if stored != requested:
+            self._counts["conflicts"] += 1
+            raise HTTPException(
+                status_code=409,
+                detail=f"Idempotency key '{key}' was already used for a different request"
+            )
+    
+    async def run(self, key: str, payload: Any, call) -> Any:
+        """Run `call` at most once per key; retries get the stored response."""
+        canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+        fingerprint = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        
+        stored = self._get(key)
+        if stored is not None:
+            self._check_fingerprint(key, stored[0], fingerprint)
+            self._counts["hits"] += 1
+            logger.info(f"Replayed stored response for idempotency key {key}")
+            return stored[1]
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._check_fingerprint(key, inflight[0], fingerprint)
+            self._counts["inflightJoins"] += 1
+            return await asyncio.shield(inflight[1])
+        
+        self._counts["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            try:
+                self._put(key, fingerprint, result)
+            except Exception as e:
+                logger.error(f"Failed to store response for idempotency key {key}: {str(e)}")
+            return result
+        finally:
+            self._inflight.pop(key, None)
+    
+    def metrics(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                entries = self._connection().execute(
+                    "SELECT COUNT(*) FROM idempotency WHERE expires_at > ?", (time.time(),)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {**self._counts, "inflight": len(self._inflight), "entries": entries}
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_STORE_PATH, IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_ENTRIES)
+
 # Routes
 @app.get("/")
 def read_root():
@@ -201,146 +331,162 @@ def health_check():
         "timestamp": datetime.now().isoformat(),
         "version": "1.0.0",
         "connections": {k: len(v) for k, v in manager.active_connections.items()},
+        "idempotency": idempotency_store.metrics(),
         "service": "Financial Events MCP"
     }
 
 @app.post("/api/process-sale")
-async def process_sale(purchase: PurchaseEvent):
+async def process_sale(purchase: PurchaseEvent, request: Request):
     """
     Process a new sale/purchase event
     
     This endpoint receives purchase events from the Stripe webhook handler
     and processes them for real-time dashboard updates and analytics.
+    
+    Retries are safe: a sale is processed once per `Idempotency-Key`
+    header, or per cart when no key is sent, and retries get the first
+    response back.
     """
     logger.info(f"Received purchase event: {purchase.userId} - {purchase.totalSessionsAdded} sessions - ${purchase.totalAmount}")
     
+    key = request.headers.get("Idempotency-Key") or f"cart:{purchase.cartId}"
     try:
-        # Add to recent purchases list (limit to last 20)
-        purchase_dict = purchase.dict()
-        recent_purchases.append(purchase_dict)
-        if len(recent_purchases) > 20:
-            recent_purchases.pop(0)
-        
-        # Update basic stats
-        purchase_stats["total_revenue"] += purchase.totalAmount
-        purchase_stats["total_sessions"] += purchase.totalSessionsAdded
-        purchase_stats["client_count"].add(purchase.userId)
-        
-        # Update package counts
-        for package in purchase.packages:
-            purchase_stats["package_counts"][package] += 1
-        
-        # Update time-based revenue
-        hour_key = datetime.fromisoformat(purchase.timestamp).strftime("%Y-%m-%d %H:00")
-        day_key = datetime.fromisoformat(purchase.timestamp).strftime("%Y-%m-%d")
-        purchase_stats["hourly_revenue"][hour_key] += purchase.totalAmount
-        purchase_stats["daily_revenue"][day_key] += purchase.totalAmount
-        
-        # Process enhanced analytics
-        # Source breakdown
-        purchase_stats["purchase_sources"][purchase.purchaseSource] += 1
-        
-        # Client type distribution
-        purchase_stats["client_types"][purchase.clientType] += 1
-        
-        # New vs returning customers
-        if purchase.isFirstPurchase:
-            purchase_stats["new_vs_returning"]["new"] += 1
-        else:
-            purchase_stats["new_vs_returning"]["returning"] += 1
-        
-        # Region breakdown
-        if purchase.userDemographics and purchase.userDemographics.region:
-            purchase_stats["region_breakdown"][purchase.userDemographics.region] += purchase.totalAmount
-        
-        # Package type distribution
-        if purchase.packageDetails:
-            for pkg in purchase.packageDetails:
-                if pkg.type:
-                    purchase_stats["package_type_distribution"][pkg.type] += 1
+        # Retries may re-stamp the event, so the timestamp is not part of the fingerprint
+        return await idempotency_store.run(
+            f"process-sale:{key}",
+            purchase.dict(exclude={"timestamp"}),
+            lambda: record_sale(purchase)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing purchase: {str(e)}")
+        return {"success": False, "message": f"Error processing purchase: {str(e)}"}
+
+async def record_sale(purchase: PurchaseEvent) -> Dict[str, Any]:
+    """Update stats, notify dashboards and trigger integrations for one sale."""
+    # Add to recent purchases list (limit to last 20)
+    purchase_dict = purchase.dict()
+    recent_purchases.append(purchase_dict)
+    if len(recent_purchases) > 20:
+        recent_purchases.pop(0)
+    
+    # Update basic stats
+    purchase_stats["total_revenue"] += purchase.totalAmount
+    purchase_stats["total_sessions"] += purchase.totalSessionsAdded
+    purchase_stats["client_count"].add(purchase.userId)
+    
+    # Update package counts
+    for package in purchase.packages:
+        purchase_stats["package_counts"][package] += 1
+    
+    # Update time-based revenue
+    hour_key = datetime.fromisoformat(purchase.timestamp).strftime("%Y-%m-%d %H:00")
+    day_key = datetime.fromisoformat(purchase.timestamp).strftime("%Y-%m-%d")
+    purchase_stats["hourly_revenue"][hour_key] += purchase.totalAmount
+    purchase_stats["daily_revenue"][day_key] += purchase.totalAmount
+    
+    # Process enhanced analytics
+    # Source breakdown
+    purchase_stats["purchase_sources"][purchase.purchaseSource] += 1
+    
+    # Client type distribution
+    purchase_stats["client_types"][purchase.clientType] += 1
+    
+    # New vs returning customers
+    if purchase.isFirstPurchase:
+        purchase_stats["new_vs_returning"]["new"] += 1
+    else:
+        purchase_stats["new_vs_returning"]["returning"] += 1
+    
+    # Region breakdown
+    if purchase.userDemographics and purchase.userDemographics.region:
+        purchase_stats["region_breakdown"][purchase.userDemographics.region] += purchase.totalAmount
+    
+    # Package type distribution
+    if purchase.packageDetails:
+        for pkg in purchase.packageDetails:
+            if pkg.type:
+                purchase_stats["package_type_distribution"][pkg.type] += 1
+    
+    # Calculate average package value (rolling average)
+    # Formula: new_avg = old_avg + (new_value - old_avg) / new_count
+    current_count = len(recent_purchases)
+    if current_count > 1:
+        purchase_stats["average_package_value"] += (
+            (purchase.totalAmount - purchase_stats["average_package_value"]) / current_count
+        )
+    else:
+        purchase_stats["average_package_value"] = purchase.totalAmount
         
-        # Calculate average package value (rolling average)
-        # Formula: new_avg = old_avg + (new_value - old_avg) / new_count
-        current_count = len(recent_purchases)
-        if current_count > 1:
-            purchase_stats["average_package_value"] += (
-                (purchase.totalAmount - purchase_stats["average_package_value"]) / current_count
-            )
-        else:
-            purchase_stats["average_package_value"] = purchase.totalAmount
+    # Update popular packages (maintain sorted list of top packages by revenue)
+    # This would be more sophisticated in a real database implementation
+    # Simplified version for in-memory demonstration
+    package_revenue = {}
+    for purchase_record in recent_purchases:
+        for package_detail in purchase_record.get("packageDetails", []):
+            pkg_name = package_detail.get("name", "Unknown")
+            pkg_revenue = package_detail.get("price", 0) * package_detail.get("quantity", 1)
+            package_revenue[pkg_name] = package_revenue.get(pkg_name, 0) + pkg_revenue
             
-        # Update popular packages (maintain sorted list of top packages by revenue)
-        # This would be more sophisticated in a real database implementation
-        # Simplified version for in-memory demonstration
-        package_revenue = {}
-        for purchase_record in recent_purchases:
-            for package_detail in purchase_record.get("packageDetails", []):
-                pkg_name = package_detail.get("name", "Unknown")
-                pkg_revenue = package_detail.get("price", 0) * package_detail.get("quantity", 1)
-                package_revenue[pkg_name] = package_revenue.get(pkg_name, 0) + pkg_revenue
-                
-        purchase_stats["popular_packages"] = sorted(
-            [{"name": k, "revenue": v} for k, v in package_revenue.items()],
-            key=lambda x: x["revenue"],
-            reverse=True
-        )[:5]  # Top 5 packages by revenue
-        
-        # Create enhanced admin dashboard update with more detailed information
-        admin_update = {
-            "type": "purchase",
-            "data": {
-                "userId": purchase.userId,
-                "userName": purchase.userName,
-                "email": purchase.email,
-                "sessionsPurchased": purchase.totalSessionsAdded,
-                "packageNames": purchase.packages,
-                "amount": purchase.totalAmount,
-                "timestamp": purchase.timestamp,
-                "clientType": purchase.clientType,
-                "isFirstPurchase": purchase.isFirstPurchase,
-                "region": purchase.userDemographics.region if purchase.userDemographics else "unknown",
-                "packageDetails": [pkg.dict() for pkg in purchase.packageDetails] if purchase.packageDetails else []
-            }
+    purchase_stats["popular_packages"] = sorted(
+        [{"name": k, "revenue": v} for k, v in package_revenue.items()],
+        key=lambda x: x["revenue"],
+        reverse=True
+    )[:5]  # Top 5 packages by revenue
+    
+    # Create enhanced admin dashboard update with more detailed information
+    admin_update = {
+        "type": "purchase",
+        "data": {
+            "userId": purchase.userId,
+            "userName": purchase.userName,
+            "email": purchase.email,
+            "sessionsPurchased": purchase.totalSessionsAdded,
+            "packageNames": purchase.packages,
+            "amount": purchase.totalAmount,
+            "timestamp": purchase.timestamp,
+            "clientType": purchase.clientType,
+            "isFirstPurchase": purchase.isFirstPurchase,
+            "region": purchase.userDemographics.region if purchase.userDemographics else "unknown",
+            "packageDetails": [pkg.dict() for pkg in purchase.packageDetails] if purchase.packageDetails else []
         }
-        
-        # Broadcast update to admin dashboard
-        await manager.broadcast_to_admins(admin_update)
-        
-        # Also broadcast a stats update so dashboards show current analytics
-        await broadcast_stats_update()
-        
-        # Integrate with Gamification MCP to award points and achievements for purchase
+    }
+    
+    # Broadcast update to admin dashboard
+    await manager.broadcast_to_admins(admin_update)
+    
+    # Also broadcast a stats update so dashboards show current analytics
+    await broadcast_stats_update()
+    
+    # Integrate with Gamification MCP to award points and achievements for purchase
+    try:
+        await trigger_gamification_rewards(purchase)
+    except Exception as game_error:
+        logger.warning(f"Failed to trigger gamification rewards: {str(game_error)}")
+    
+    # Generate AI-powered client insights if orientation data is provided
+    if purchase.orientationData or purchase.isFirstPurchase:
         try:
-            await trigger_gamification_rewards(purchase)
-        except Exception as game_error:
-            logger.warning(f"Failed to trigger gamification rewards: {str(game_error)}")
-        
-        # Generate AI-powered client insights if orientation data is provided
-        if purchase.orientationData or purchase.isFirstPurchase:
-            try:
-                await generate_client_insights(purchase)
-            except Exception as insight_error:
-                logger.warning(f"Failed to generate client insights: {str(insight_error)}")
-        
-        # Suggest trainer matching if no trainer is assigned
-        if not purchase.assignedTrainerId and purchase.totalSessionsAdded > 0:
-            try:
-                await recommend_trainers(purchase)
-            except Exception as trainer_error:
-                logger.warning(f"Failed to generate trainer recommendations: {str(trainer_error)}")
-        
-        # Suggest initial session slots if sessions were purchased
-        if purchase.totalSessionsAdded > 0:
-            try:
-                await suggest_session_slots(purchase)
-            except Exception as session_error:
-                logger.warning(f"Failed to suggest session slots: {str(session_error)}")
-        
-        return {"success": True, "message": "Purchase processed successfully", "purchaseId": purchase.cartId}
+            await generate_client_insights(purchase)
+        except Exception as insight_error:
+            logger.warning(f"Failed to generate client insights: {str(insight_error)}")
     
-    except Exception as e:
-        logger.error(f"Error processing purchase: {str(e)}")
-        return {"success": False, "message": f"Error processing purchase: {str(e)}"}
+    # Suggest trainer matching if no trainer is assigned
+    if not purchase.assignedTrainerId and purchase.totalSessionsAdded > 0:
+        try:
+            await recommend_trainers(purchase)
+        except Exception as trainer_error:
+            logger.warning(f"Failed to generate trainer recommendations: {str(trainer_error)}")
+    
+    # Suggest initial session slots if sessions were purchased
+    if purchase.totalSessionsAdded > 0:
+        try:
+            await suggest_session_slots(purchase)
+        except Exception as session_error:
+            logger.warning(f"Failed to suggest session slots: {str(session_error)}")
+    
+    return {"success": True, "message": "Purchase processed successfully", "purchaseId": purchase.cartId}
 
 @app.get("/api/recent-purchases")
 def get_recent_purchases():
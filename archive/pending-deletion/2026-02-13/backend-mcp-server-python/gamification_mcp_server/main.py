@@ -47,7 +47,7 @@ else:
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Set up basic logging first
 logging.basicConfig(
@@ -123,12 +123,36 @@ async def startup_event():
     app.start_time = time.time()
     logger.info("Gamification MCP Server startup complete")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Record open rep/set batches, finish queued profile updates and flush changes that haven't been written yet."""
+    try:
+        from gamification_mcp_server.tools.ingest_tool import activity_batcher
+        from gamification_mcp_server.services.profile_service import profile_cache, user_actors
+    except ImportError as e:
+        logger.error(f"Could not flush pending activity batches and profile writes: {e}")
+        raise
+    await activity_batcher.close()
+    await user_actors.close()
+    await profile_cache.close()
+
 # Health check endpoint
 @app.get("/health", tags=["health"])
 async def health_check():
     """Check the health of the gamification server."""
+    try:
+        from gamification_mcp_server.utils.api_client import get_backend_health
+        backend = get_backend_health()
+    except ImportError:
+        backend = {"circuits": {}, "hedgedRequests": {}}
+    
+    # Open circuits mean some backend endpoints are currently failing fast
+    circuits_open = any(c["state"] == "open" for c in backend["circuits"].values())
+    
     return {
-        "status": "healthy",
+        "status": "degraded" if circuits_open else "healthy",
+        "backendCircuits": backend["circuits"],
+        "hedgedRequests": backend["hedgedRequests"],
         "version": "1.0.0",
         "environment": "Development" if not config.is_production() else "Production"
     }
@@ -140,15 +164,94 @@ async def get_metrics():
     import time
     from datetime import datetime
     
+    try:
+        from gamification_mcp_server.utils.idempotency import idempotency_store
+        idempotency_metrics = idempotency_store.metrics()
+    except ImportError:
+        idempotency_metrics = {}
+    try:
+        from gamification_mcp_server.services.profile_service import profile_cache, user_actors
+        profile_metrics = profile_cache.metrics()
+        actor_metrics = user_actors.metrics()
+    except ImportError:
+        profile_metrics = {}
+        actor_metrics = {}
+    try:
+        from gamification_mcp_server.tools.ingest_tool import activity_batcher
+        ingest_metrics = activity_batcher.metrics()
+    except ImportError:
+        ingest_metrics = {}
+    try:
+        from gamification_mcp_server.services.ledger_service import activity_ledger
+        ledger_metrics = activity_ledger.metrics()
+    except ImportError:
+        ledger_metrics = {}
+    catalog_metrics = {name: catalog.metrics() for name, catalog in _catalogs().items()}
+    try:
+        from gamification_mcp_server.services.leaderboard_service import leaderboards
+        leaderboard_metrics = leaderboards.metrics()
+    except ImportError:
+        leaderboard_metrics = {}
+    try:
+        from gamification_mcp_server.services.participation_service import participations
+        participation_metrics = participations.metrics()
+    except ImportError:
+        participation_metrics = {}
+    try:
+        from gamification_mcp_server.services.streak_service import streak_calendar
+        streak_metrics = streak_calendar.metrics()
+    except ImportError:
+        streak_metrics = {}
+    
     # Basic server metrics
     return {
         "server": "Gamification MCP Server",
         "timestamp": datetime.now().isoformat(),
         "uptime_seconds": time.time() - (getattr(app, 'start_time', time.time())),
+        "idempotency": idempotency_metrics,
+        "profileCache": profile_metrics,
+        "actors": actor_metrics,
+        "activityIngest": ingest_metrics,
+        "ledger": ledger_metrics,
+        "catalogs": catalog_metrics,
+        "leaderboards": leaderboard_metrics,
+        "challenges": participation_metrics,
+        "streaks": streak_metrics,
         "version": "1.0.0",
         "environment": "Development" if not config.is_production() else "Production"
     }
 
+def _catalogs() -> Dict[str, Any]:
+    """The server's catalogs by name, or none if the services aren't importable."""
+    try:
+        from gamification_mcp_server.services import CATALOGS
+    except ImportError as e:
+        logger.error(f"Catalogs unavailable: {e}")
+        return {}
+    return CATALOGS
+
+# Catalog endpoint
+@app.get("/catalogs/{name}", tags=["catalogs"])
+async def get_catalog(name: str, request: Request):
+    """
+    Get a catalog (board, achievements, challenges, kindness_quests) as stored.
+    
+    The response is pre-serialized and carries an ETag; send it back in
+    If-None-Match to get a 304 when the catalog hasn't changed.
+    """
+    catalog = _catalogs().get(name)
+    if catalog is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Catalog {name} not found"
+        )
+    
+    snapshot = catalog.snapshot()
+    headers = {"ETag": snapshot.etag}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(snapshot.document, media_type="application/json", headers=headers)
+
 # Mount routers
 app.include_router(metadata_router, tags=["metadata"])
 app.include_router(tools_router, prefix="/tools", tags=["tools"])
@@ -157,9 +260,11 @@ app.include_router(tools_router, prefix="/tools", tags=["tools"])
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
     """Handle HTTP exceptions with proper JSON response."""
+    # Keep headers such as Retry-After on 503s from open circuits
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -27,7 +27,9 @@ try:
         GameboardSpace,
         KindnessQuest,
         ActivityReward,
-        Challenge
+        Challenge,
+        LeaderboardEntry,
+        StreakHistory
     )
 
     from models.input_output import (
@@ -46,7 +48,17 @@ try:
         JoinChallengeInput,
         JoinChallengeOutput,
         GetKindnessQuestsInput,
-        GetKindnessQuestsOutput
+        GetKindnessQuestsOutput,
+        GetLeaderboardInput,
+        GetLeaderboardOutput,
+        GetStreakHistoryInput,
+        GetStreakHistoryOutput,
+        ToolCall,
+        ToolCallResult,
+        BatchToolsInput,
+        BatchToolsOutput,
+        ActivityEvent,
+        ActivityStreamResult
     )
 except ImportError as e:
     # If absolute imports fail, try relative imports as fallback
@@ -65,7 +77,9 @@ except ImportError as e:
             GameboardSpace,
             KindnessQuest,
             ActivityReward,
-            Challenge
+            Challenge,
+            LeaderboardEntry,
+            StreakHistory
         )
 
         from .input_output import (
@@ -84,7 +98,17 @@ except ImportError as e:
             JoinChallengeInput,
             JoinChallengeOutput,
             GetKindnessQuestsInput,
-            GetKindnessQuestsOutput
+            GetKindnessQuestsOutput,
+            GetLeaderboardInput,
+            GetLeaderboardOutput,
+            GetStreakHistoryInput,
+            GetStreakHistoryOutput,
+            ToolCall,
+            ToolCallResult,
+            BatchToolsInput,
+            BatchToolsOutput,
+            ActivityEvent,
+            ActivityStreamResult
         )
     except ImportError as e2:
         print(f"Error importing gamification models: {e} / {e2}")
@@ -104,6 +128,8 @@ except ImportError as e:
         class KindnessQuest(BaseModel): pass
         class ActivityReward(BaseModel): pass
         class Challenge(BaseModel): pass
+        class LeaderboardEntry(BaseModel): pass
+        class StreakHistory(BaseModel): pass
         class LogActivityInput(BaseModel): pass
         class LogActivityOutput(BaseModel): pass
         class GetGamificationProfileInput(BaseModel): pass
@@ -120,6 +146,16 @@ except ImportError as e:
         class JoinChallengeOutput(BaseModel): pass
         class GetKindnessQuestsInput(BaseModel): pass
         class GetKindnessQuestsOutput(BaseModel): pass
+        class GetLeaderboardInput(BaseModel): pass
+        class GetLeaderboardOutput(BaseModel): pass
+        class GetStreakHistoryInput(BaseModel): pass
+        class GetStreakHistoryOutput(BaseModel): pass
+        class ToolCall(BaseModel): pass
+        class ToolCallResult(BaseModel): pass
+        class BatchToolsInput(BaseModel): pass
+        class BatchToolsOutput(BaseModel): pass
+        class ActivityEvent(BaseModel): pass
+        class ActivityStreamResult(BaseModel): pass
 
 __all__ = [
     'ActivityType',
@@ -133,6 +169,8 @@ __all__ = [
     'KindnessQuest',
     'ActivityReward',
     'Challenge',
+    'LeaderboardEntry',
+    'StreakHistory',
     'LogActivityInput',
     'LogActivityOutput',
     'GetGamificationProfileInput',
@@ -148,5 +186,15 @@ __all__ = [
     'JoinChallengeInput',
     'JoinChallengeOutput',
     'GetKindnessQuestsInput',
-    'GetKindnessQuestsOutput'
+    'GetKindnessQuestsOutput',
+    'GetLeaderboardInput',
+    'GetLeaderboardOutput',
+    'GetStreakHistoryInput',
+    'GetStreakHistoryOutput',
+    'ToolCall',
+    'ToolCallResult',
+    'BatchToolsInput',
+    'BatchToolsOutput',
+    'ActivityEvent',
+    'ActivityStreamResult'
 ]
@@ -2,13 +2,21 @@
 Input and output models for MCP tools.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, List, Optional, Any
 
 from pydantic import BaseModel, Field, validator
 
-from .enums import ActivityType, AchievementCategory
-from .schemas import GamificationProfile, ActivityReward, Challenge, GameboardSpace, KindnessQuest
+from .enums import ActivityType, AchievementCategory, StreakType
+from .schemas import (
+    GamificationProfile,
+    ActivityReward,
+    Challenge,
+    GameboardSpace,
+    KindnessQuest,
+    LeaderboardEntry,
+    StreakHistory
+)
 
 # MCP Tool Input/Output Models
 
@@ -20,6 +28,7 @@ class LogActivityInput(BaseModel):
     value: int = 1  # For reps, sets, etc. Default is 1 for simple activities
     duration: Optional[int] = None  # In minutes if applicable
     metadata: Optional[Dict[str, Any]] = None
+    idempotencyKey: Optional[str] = None  # Retries with the same key return the first response
     
     @validator('timestamp', pre=True, always=True)
     def set_timestamp(cls, v):
@@ -31,6 +40,8 @@ class LogActivityOutput(BaseModel):
     success: bool
     profile: GamificationProfile
     rewards: ActivityReward
+    # Challenges the activity completed → the rewards for completing each
+    challengeRewards: Dict[str, ActivityReward] = Field(default_factory=dict)
     message: str
 
 class GetGamificationProfileInput(BaseModel):
@@ -88,6 +99,8 @@ class GetChallengesOutput(BaseModel):
     challenges: List[Challenge]
     participatingIn: List[str] = Field(default_factory=list)
     completedChallenges: List[str] = Field(default_factory=list)
+    # Challenge ID → the user's progress toward its target, for every challenge they joined
+    progress: Dict[str, int] = Field(default_factory=dict)
     message: str
 
 class JoinChallengeInput(BaseModel):
@@ -110,3 +123,79 @@ class GetKindnessQuestsOutput(BaseModel):
     """Output for getting available kindness quests."""
     quests: List[KindnessQuest]
     message: str
+
+class GetLeaderboardInput(BaseModel):
+    """Input for getting a leaderboard."""
+    board: str = "global"  # global, a category (strength, cardio, ...), weekly or challenge
+    week: Optional[str] = None  # ISO week of a weekly board, e.g. 2026-W42 (default: this week)
+    challengeId: Optional[str] = None  # Challenge of a challenge board
+    userId: Optional[str] = None  # Also return this user's entry and the entries around it
+    limit: int = Field(10, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    window: int = Field(2, ge=0, le=50)  # Entries either side of the user's
+
+class GetLeaderboardOutput(BaseModel):
+    """Output for getting a leaderboard."""
+    board: str
+    size: int
+    entries: List[LeaderboardEntry]
+    userEntry: Optional[LeaderboardEntry] = None
+    aroundUser: List[LeaderboardEntry] = Field(default_factory=list)
+    message: str
+
+class GetStreakHistoryInput(BaseModel):
+    """Input for getting a user's streak history."""
+    userId: str
+    streakType: Optional[StreakType] = None  # Default: every streak the user has
+    days: int = Field(30, ge=1, le=366)  # Days in the window
+    endDate: Optional[date] = None  # Last day of the window (default: today)
+
+class GetStreakHistoryOutput(BaseModel):
+    """Output for getting a user's streak history."""
+    userId: str
+    streaks: List[StreakHistory]
+    message: str
+
+class ToolCall(BaseModel):
+    """A single tool invocation within a batch."""
+    id: Optional[str] = None  # Caller-chosen id echoed back in the result
+    tool: str
+    input: Dict[str, Any] = Field(default_factory=dict)
+
+class ToolCallResult(BaseModel):
+    """Result of a single tool invocation within a batch."""
+    id: Optional[str] = None
+    tool: str
+    success: bool
+    statusCode: int
+    output: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchToolsInput(BaseModel):
+    """Input for running several tool invocations in one request."""
+    calls: List[ToolCall]
+
+class BatchToolsOutput(BaseModel):
+    """Output for running several tool invocations in one request."""
+    results: List[ToolCallResult]
+    message: str
+
+class ActivityEvent(BaseModel):
+    """A single rep or set event in a LogActivityStream request."""
+    id: Optional[str] = None  # Caller-chosen id echoed back with the batch's result
+    userId: str
+    activityType: ActivityType
+    value: int = 1
+
+class ActivityStreamResult(BaseModel):
+    """One line of a LogActivityStream response: a coalesced batch's rewards, or a rejected event."""
+    userId: Optional[str] = None
+    activityType: Optional[ActivityType] = None
+    value: int = 0  # Total value of the batch
+    events: int = 0  # Events coalesced into the batch, from every stream
+    eventIds: List[str] = Field(default_factory=list)  # This stream's events in the batch
+    line: Optional[int] = None  # Line number of a rejected event
+    success: bool
+    statusCode: int
+    output: Optional[LogActivityOutput] = None
+    error: Optional[str] = None
@@ -2,12 +2,12 @@
 Pydantic models for the gamification system.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, List, Optional, Any, Union
 
 from pydantic import BaseModel, Field
 
-from .enums import ActivityType, AchievementCategory, GameboardSpaceType
+from .enums import ActivityType, AchievementCategory, GameboardSpaceType, StreakType
 
 class GamificationProfile(BaseModel):
     """User's complete gamification profile data."""
@@ -101,6 +101,7 @@ class ActivityReward(BaseModel):
     communityXp: int = 0
     achievements: List[str] = Field(default_factory=list)
     streakUpdates: Dict[str, int] = Field(default_factory=dict)
+    counterUpdates: Dict[str, int] = Field(default_factory=dict)  # Activity counters to increment
     levelUps: Dict[str, int] = Field(default_factory=dict)
     boardMovement: int = 0
     
@@ -115,5 +116,25 @@ class Challenge(BaseModel):
     activityType: ActivityType
     rewardEt: int
     rewardXp: int
+    progressBy: str = "count"  # "count", "value" or "duration" (minutes)
+    durationDays: Optional[int] = None  # Rolling challenges: days each participant has from joining
     participants: List[str] = Field(default_factory=list)
     completedBy: List[str] = Field(default_factory=list)
+    participantCount: int = 0
+    completedCount: int = 0
+
+class LeaderboardEntry(BaseModel):
+    """A user's place on a leaderboard."""
+    rank: int  # 1-based
+    userId: str
+    score: int
+
+class StreakHistory(BaseModel):
+    """A user's streak of one type and the days it was extended."""
+    streakType: StreakType
+    currentStreak: int  # Consecutive days ending today, or yesterday
+    longestStreak: int
+    activeDays: int  # Days active in the window
+    days: int  # Days in the window
+    lastActiveDate: Optional[date] = None
+    activeDates: List[date] = Field(default_factory=list)  # Days active in the window
@@ -123,6 +123,41 @@ async def list_tools():
                         "count": {"type": "integer", "default": 3}
                     }
                 }
+            },
+            {
+                "name": "GetLeaderboard",
+                "description": "Get a page of a leaderboard and a user's rank.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "board": {"type": "string", "enum": [
+                            "global", "strength", "cardio", "flexibility", "balance",
+                            "core", "nutrition", "recovery", "community", "weekly", "challenge"
+                        ], "default": "global"},
+                        "week": {"type": "string", "nullable": True},
+                        "challengeId": {"type": "string", "nullable": True},
+                        "userId": {"type": "string", "nullable": True},
+                        "limit": {"type": "integer", "default": 10},
+                        "offset": {"type": "integer", "default": 0},
+                        "window": {"type": "integer", "default": 2}
+                    }
+                }
+            },
+            {
+                "name": "GetStreakHistory",
+                "description": "Get a user's current and longest streaks and their active days.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "userId": {"type": "string"},
+                        "streakType": {"type": "string", "enum": [
+                            "activity", "stretch", "foam_roll", "vitamin", "greens", "protein_goal"
+                        ], "nullable": True},
+                        "days": {"type": "integer", "default": 30},
+                        "endDate": {"type": "string", "format": "date", "nullable": True}
+                    },
+                    "required": ["userId"]
+                }
             }
         ]
     }
@@ -194,6 +229,34 @@ async def schema():
                     "operationId": "get_kindness_quests",
                     "tags": ["tools"]
                 }
+            },
+            "/tools/GetLeaderboard": {
+                "post": {
+                    "summary": "Get a page of a leaderboard and a user's rank",
+                    "operationId": "get_leaderboard",
+                    "tags": ["tools"]
+                }
+            },
+            "/tools/GetStreakHistory": {
+                "post": {
+                    "summary": "Get a user's streak history",
+                    "operationId": "get_streak_history",
+                    "tags": ["tools"]
+                }
+            },
+            "/tools/batch": {
+                "post": {
+                    "summary": "Run several tool invocations in one request",
+                    "operationId": "batch_tools",
+                    "tags": ["tools"]
+                }
+            },
+            "/tools/LogActivityStream": {
+                "post": {
+                    "summary": "Log an NDJSON stream of rep and set events with coalesced rewards",
+                    "operationId": "log_activity_stream",
+                    "tags": ["tools"]
+                }
             }
         }
     }
@@ -3,7 +3,9 @@
 import sys
 import os
 from pathlib import Path
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
 
 # Set up import paths BEFORE any imports
 current_dir = Path(__file__).parent.parent
@@ -29,7 +31,13 @@ try:
         JoinChallengeInput,
         JoinChallengeOutput,
         GetKindnessQuestsInput,
-        GetKindnessQuestsOutput
+        GetKindnessQuestsOutput,
+        GetLeaderboardInput,
+        GetLeaderboardOutput,
+        GetStreakHistoryInput,
+        GetStreakHistoryOutput,
+        BatchToolsInput,
+        BatchToolsOutput
     )
     from tools import (
         log_activity,
@@ -39,7 +47,11 @@ try:
         roll_dice_and_move,
         get_user_challenges,
         join_challenge,
-        get_available_kindness_quests
+        get_available_kindness_quests,
+        get_leaderboard,
+        get_streak_history,
+        run_tool_batch,
+        ingest_activity_stream
     )
     IMPORTS_AVAILABLE = True
     print("SUCCESS: Successfully imported gamification modules using absolute imports")
@@ -80,6 +92,18 @@ except ImportError as e:
         pass
     class GetKindnessQuestsOutput(BaseModel):
         pass
+    class GetLeaderboardInput(BaseModel):
+        pass
+    class GetLeaderboardOutput(BaseModel):
+        pass
+    class GetStreakHistoryInput(BaseModel):
+        pass
+    class GetStreakHistoryOutput(BaseModel):
+        pass
+    class BatchToolsInput(BaseModel):
+        pass
+    class BatchToolsOutput(BaseModel):
+        pass
     
     # Create placeholder functions
     async def log_activity(input_data):
@@ -98,13 +122,41 @@ except ImportError as e:
         return {"error": "Service not available - import failed"}
     async def get_available_kindness_quests(input_data):
         return {"error": "Service not available - import failed"}
+    async def get_leaderboard(input_data):
+        return {"error": "Service not available - import failed"}
+    async def get_streak_history(input_data):
+        return {"error": "Service not available - import failed"}
+    async def run_tool_batch(input_data, registry, write_tools):
+        return {"error": "Service not available - import failed"}
+    async def ingest_activity_stream(chunks):
+        yield '{"error": "Service not available - import failed"}\n'
     
     IMPORTS_AVAILABLE = False
 
 router = APIRouter()
 
+# Tools that can be invoked through /tools/batch: name -> (input model, handler)
+TOOL_REGISTRY = {
+    "LogActivity": (LogActivityInput, log_activity),
+    "GetGamificationProfile": (GetGamificationProfileInput, get_gamification_profile),
+    "GetAchievements": (GetAchievementsInput, get_user_achievements),
+    "GetBoardPosition": (GetBoardPositionInput, get_board_position),
+    "RollDice": (RollDiceInput, roll_dice_and_move),
+    "GetChallenges": (GetChallengesInput, get_user_challenges),
+    "JoinChallenge": (JoinChallengeInput, join_challenge),
+    "GetKindnessQuests": (GetKindnessQuestsInput, get_available_kindness_quests),
+    "GetLeaderboard": (GetLeaderboardInput, get_leaderboard),
+    "GetStreakHistory": (GetStreakHistoryInput, get_streak_history)
+}
+
+# Tools that change backend state; batched reads are never reordered around them
+WRITE_TOOLS = {"LogActivity", "RollDice", "JoinChallenge"}
+
 @router.post("/LogActivity", response_model=LogActivityOutput)
-async def log_activity_route(input_data: LogActivityInput):
+async def log_activity_route(
+    input_data: LogActivityInput,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Log an activity and calculate rewards.
     
@@ -117,11 +169,30 @@ async def log_activity_route(input_data: LogActivityInput):
     
     It calculates appropriate rewards, updates achievements, streaks,
     and progression across all gamification elements.
+    Send an `Idempotency-Key` header (or `idempotencyKey`) to make retries safe.
     """
     if not IMPORTS_AVAILABLE:
         return {"error": "Gamification service is currently unavailable"}
+    if idempotency_key and not input_data.idempotencyKey:
+        input_data.idempotencyKey = idempotency_key
     return await log_activity(input_data)
 
+@router.post("/LogActivityStream")
+async def log_activity_stream_route(request: Request):
+    """
+    Log a stream of rep and set events with coalesced rewards.
+    
+    The request body is NDJSON, one event per line:
+    `{"id": "...", "userId": "...", "activityType": "rep_completed", "value": 1}`.
+    A user's events of one type within `INGEST_WINDOW` seconds are rewarded
+    as a single LogActivity with their total value. The response is NDJSON
+    too: one result per batch as soon as it is recorded, plus one per
+    rejected line.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Gamification service is currently unavailable"}
+    return StreamingResponse(ingest_activity_stream(request.stream()), media_type="application/x-ndjson")
+
 @router.post("/GetGamificationProfile", response_model=GetGamificationProfileOutput)
 async def get_gamification_profile_route(input_data: GetGamificationProfileInput):
     """
@@ -215,6 +286,48 @@ async def get_kindness_quests_route(input_data: GetKindnessQuestsInput):
         return {"error": "Gamification service is currently unavailable"}
     return await get_available_kindness_quests(input_data)
 
+@router.post("/GetLeaderboard", response_model=GetLeaderboardOutput)
+async def get_leaderboard_route(input_data: GetLeaderboardInput):
+    """
+    Get a page of a leaderboard.
+    
+    Boards: `global` (total XP), a category (`strength`, `cardio`, ...; by
+    level), `weekly` (XP earned in an ISO week) and `challenge` (XP earned
+    in a challenge). With a userId, the user's rank and the entries around
+    it are returned too.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Gamification service is currently unavailable"}
+    return await get_leaderboard(input_data)
+
+@router.post("/GetStreakHistory", response_model=GetStreakHistoryOutput)
+async def get_streak_history_route(input_data: GetStreakHistoryInput):
+    """
+    Get a user's streak history.
+    
+    For one streak type (`activity`, `stretch`, `foam_roll`, `vitamin`,
+    `greens`, `protein_goal`) or every streak the user has: the current
+    and longest streak in days, and the days active in the last `days`.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Gamification service is currently unavailable"}
+    return await get_streak_history(input_data)
+
+@router.post("/batch", response_model=BatchToolsOutput)
+async def batch_tools_route(input_data: BatchToolsInput):
+    """
+    Run several tool invocations in one request.
+    
+    Independent read-only calls run concurrently and share a request-scoped
+    cache, so overlapping backend fetches (e.g. the `/client-progress/{id}`
+    lookup behind every profile read) happen once per batch.
+    Write tools run in submission order. Each call gets its own result with
+    a status code, so one failing call does not fail the whole batch.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Batch tool service is currently unavailable"}
+    return await run_tool_batch(input_data, TOOL_REGISTRY, WRITE_TOOLS)
+
 # Add health check for this module
 @router.get("/tools/health")
 async def tools_health():
@@ -230,6 +343,10 @@ async def tools_health():
             "roll_dice_and_move",
             "get_user_challenges",
             "join_challenge",
-            "get_available_kindness_quests"
+            "get_available_kindness_quests",
+            "get_leaderboard",
+            "get_streak_history",
+            "run_tool_batch",
+            "ingest_activity_stream"
         ]
     }
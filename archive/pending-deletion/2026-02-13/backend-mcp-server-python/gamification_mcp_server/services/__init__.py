@@ -2,24 +2,50 @@
 Services export.
 """
 
-from .profile_service import get_or_create_gamification_profile, save_gamification_profile
-from .rewards_service import calculate_activity_rewards, apply_rewards_to_profile
-from .board_service import get_board_spaces, get_space_by_position, roll_dice, get_space_rewards
-from .achievement_service import get_achievements
-from .challenge_service import get_challenges, get_challenge_by_id
-from .kindness_service import get_kindness_quests
+from .profile_service import get_or_create_gamification_profile, save_gamification_profile, profile_cache, user_actors
+from .rewards_service import (
+    calculate_rewards,
+    calculate_challenge_rewards,
+    calculate_activity_rewards,
+    calculate_rewards_bulk,
+    apply_rewards_to_profile
+)
+from .board_service import get_board_spaces, get_space_by_position, roll_dice, get_space_rewards, board_catalog
+from .achievement_service import get_achievements, get_achievement_engine, achievement_catalog
+from .challenge_service import get_challenges, get_challenge_by_id, get_challenges_for_activity, challenge_catalog
+from .participation_service import participations
+from .kindness_service import get_kindness_quests, kindness_quest_catalog
+from .leaderboard_service import leaderboards
+from .streak_service import streak_calendar
+
+# Catalogs by name, as served by /catalogs/{name}
+CATALOGS = {
+    catalog.name: catalog
+    for catalog in (board_catalog, achievement_catalog, challenge_catalog, kindness_quest_catalog)
+}
 
 __all__ = [
     'get_or_create_gamification_profile',
     'save_gamification_profile',
+    'profile_cache',
+    'user_actors',
+    'calculate_rewards',
+    'calculate_challenge_rewards',
     'calculate_activity_rewards',
+    'calculate_rewards_bulk',
     'apply_rewards_to_profile',
     'get_board_spaces',
     'get_space_by_position',
     'roll_dice',
     'get_space_rewards',
     'get_achievements',
+    'get_achievement_engine',
     'get_challenges',
     'get_challenge_by_id',
-    'get_kindness_quests'
+    'get_challenges_for_activity',
+    'participations',
+    'get_kindness_quests',
+    'leaderboards',
+    'streak_calendar',
+    'CATALOGS'
 ]
@@ -1,141 +1,170 @@
 """
 Service for managing achievements.
+
+Achievements are loaded from `catalogs/achievements.json` and unlock when
+a profile value reaches their `requiredValue`. The requirement is a
+profile field (`workoutsCompleted`), a key of a dict field
+(`streaks.activity`) or a derived value (`balancedLevels`, see
+`DERIVED_REQUIREMENTS`). The achievement engine indexes achievements by
+requirement, with their required values sorted, so a profile change only
+looks at the requirements whose inputs changed and finds every threshold
+the change crossed with two bisections, however many achievements there
+are and however far a value jumped. The engine is rebuilt whenever the
+catalog reloads.
 """
 
 import logging
-from typing import List, Optional
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
 
-from ..models import Achievement, AchievementCategory
+from ..models import Achievement, AchievementCategory, GamificationProfile
+from ..utils.catalog import Catalog
 
 logger = logging.getLogger("gamification_mcp_server.achievement_service")
 
+# Category level at which a category counts toward balancedLevels
+BALANCED_LEVEL = 5
+
+CATEGORY_LEVEL_FIELDS = (
+    "strengthLevel", "cardioLevel", "flexibilityLevel", "balanceLevel",
+    "coreLevel", "nutritionLevel", "recoveryLevel", "communityLevel"
+)
+
+# Requirements computed from several profile values: name → (input paths, value from a path reader)
+DERIVED_REQUIREMENTS: Dict[str, Tuple[Tuple[str, ...], Callable[[Callable[[str], int]], int]]] = {
+    "balancedLevels": (
+        CATEGORY_LEVEL_FIELDS,
+        lambda read: sum(1 for field in CATEGORY_LEVEL_FIELDS if read(field) >= BALANCED_LEVEL)
+    )
+}
+
 def get_achievements(category: Optional[AchievementCategory] = None) -> List[Achievement]:
     """
     Get all achievements, optionally filtered by category.
     
     Args:
         category: Optional category filter
-        
+    
     Returns:
         List of Achievement objects
     """
-    # This would normally be retrieved from a database
-    # For demonstration, we're defining a sample subset of achievements
-    all_achievements = [
-        Achievement(
-            id="workout_warrior_bronze",
-            name="Workout Warrior Bronze",
-            description="Complete 10 workouts",
-            category=AchievementCategory.FITNESS,
-            requirement="workoutsCompleted",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="workout_warrior_silver",
-            name="Workout Warrior Silver",
-            description="Complete 50 workouts",
-            category=AchievementCategory.FITNESS,
-            requirement="workoutsCompleted",
-            requiredValue=50,
-            rewardEt=50,
-            rewardXp=250
-        ),
-        Achievement(
-            id="workout_warrior_gold",
-            name="Workout Warrior Gold",
-            description="Complete 100 workouts",
-            category=AchievementCategory.FITNESS,
-            requirement="workoutsCompleted",
-            requiredValue=100,
-            rewardEt=100,
-            rewardXp=500
-        ),
-        Achievement(
-            id="flexibility_fan_bronze",
-            name="Flexibility Fan Bronze",
-            description="Complete 10 stretching sessions",
-            category=AchievementCategory.RECOVERY,
-            requirement="stretchesCompleted",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="recovery_ritualist_bronze",
-            name="Recovery Ritualist Bronze",
-            description="Complete 10 foam rolling sessions",
-            category=AchievementCategory.RECOVERY,
-            requirement="foamRollsCompleted",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="vitamin_virtuoso_bronze",
-            name="Vitamin Virtuoso Bronze",
-            description="Log vitamins 10 times",
-            category=AchievementCategory.NUTRITION,
-            requirement="vitaminsLogged",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="greens_guru_bronze",
-            name="Greens Guru Bronze",
-            description="Log greens 10 times",
-            category=AchievementCategory.NUTRITION,
-            requirement="greensLogged",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="protein_pro_bronze",
-            name="Protein Pro Bronze",
-            description="Hit your protein goal 10 times",
-            category=AchievementCategory.NUTRITION,
-            requirement="proteinGoalsHit",
-            requiredValue=10,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="community_champion_bronze",
-            name="Community Champion Bronze",
-            description="Complete 5 kindness quests",
-            category=AchievementCategory.COMMUNITY,
-            requirement="kindnessQuestsCompleted",
-            requiredValue=5,
-            rewardEt=20,
-            rewardXp=100
-        ),
-        Achievement(
-            id="streak_sensei_bronze",
-            name="Streak Sensei Bronze",
-            description="Maintain a 7-day activity streak",
-            category=AchievementCategory.HABIT,
-            requirement="streaks.activity",
-            requiredValue=7,
-            rewardEt=30,
-            rewardXp=150
-        ),
-        Achievement(
-            id="balanced_warrior_bronze",
-            name="Balanced Warrior Bronze",
-            description="Reach level 5 in three different categories",
-            category=AchievementCategory.HABIT,
-            requirement="balancedLevels",
-            requiredValue=3,
-            rewardEt=50,
-            rewardXp=200
-        )
-    ]
-    
-    # Filter by category if provided
+    index = achievement_catalog.snapshot().index
     if category:
-        return [a for a in all_achievements if a.category == category]
+        return list(index.by_category.get(category, ()))
+    
+    return list(achievement_catalog.items())
+
+def read_path(profile: GamificationProfile, path: str) -> int:
+    """Value of a profile field or of a key of a dict field (`streaks.activity`); 0 if unset."""
+    field, _, key = path.partition(".")
+    value = getattr(profile, field, None)
+    if key:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value or 0
+
+class AchievementEngine:
+    """Finds the achievements a profile change unlocks."""
+    
+    def __init__(self, achievements: Iterable[Achievement]):
+        # Requirement → (sorted required values, achievement IDs in the same order)
+        self._thresholds: Dict[str, Tuple[List[int], List[str]]] = {}
+        # Input path → derived requirements that read it
+        self._derived_inputs: Dict[str, List[str]] = {}
+        
+        grouped: Dict[str, List[Achievement]] = {}
+        for achievement in achievements:
+            if not self._valid_requirement(achievement.requirement):
+                logger.warning(f"Achievement {achievement.id} has unknown requirement "
+                               f"'{achievement.requirement}' and can't be unlocked")
+                continue
+            grouped.setdefault(achievement.requirement, []).append(achievement)
+        
+        for requirement, group in grouped.items():
+            group.sort(key=lambda a: a.requiredValue)
+            self._thresholds[requirement] = ([a.requiredValue for a in group], [a.id for a in group])
+            if requirement in DERIVED_REQUIREMENTS:
+                for path in DERIVED_REQUIREMENTS[requirement][0]:
+                    self._derived_inputs.setdefault(path, []).append(requirement)
     
-    return all_achievements
+    @staticmethod
+    def _valid_requirement(requirement: str) -> bool:
+        if requirement in DERIVED_REQUIREMENTS:
+            return True
+        field, _, key = requirement.partition(".")
+        model_field = GamificationProfile.__fields__.get(field)
+        if model_field is None:
+            return False
+        # A dotted requirement must name a key of a dict field
+        return not key or getattr(model_field.outer_type_, "__origin__", None) is dict
+    
+    def unlocked(self, profile: GamificationProfile, changes: Mapping[str, int]) -> List[str]:
+        """
+        Achievements a change to the profile unlocks.
+        
+        Only requirements that read a changed path are evaluated. An
+        achievement unlocks when its requirement goes from below its
+        required value to at or above it, including when several
+        thresholds are crossed at once; earned achievements are skipped.
+        
+        Args:
+            profile: Profile before the change (not modified)
+            changes: New values by path, e.g. `{"workoutsCompleted": 12, "streaks.activity": 7}`
+        
+        Returns:
+            IDs of the unlocked achievements
+        """
+        requirements: Dict[str, None] = {}
+        for path in changes:
+            if path in self._thresholds:
+                requirements[path] = None
+            for requirement in self._derived_inputs.get(path, ()):
+                requirements[requirement] = None
+        if not requirements:
+            return []
+        
+        def old(path: str) -> int:
+            return read_path(profile, path)
+        
+        def new(path: str) -> int:
+            return changes[path] if path in changes else read_path(profile, path)
+        
+        unlocked = []
+        for requirement in requirements:
+            derived = DERIVED_REQUIREMENTS.get(requirement)
+            if derived is not None:
+                before, after = derived[1](old), derived[1](new)
+            else:
+                before, after = old(requirement), new(requirement)
+            if after <= before:
+                continue
+            values, ids = self._thresholds[requirement]
+            for achievement_id in ids[bisect_right(values, before):bisect_right(values, after)]:
+                if achievement_id not in profile.achievements:
+                    unlocked.append(achievement_id)
+        return unlocked
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Indexed requirements and achievements."""
+        return {
+            "requirements": len(self._thresholds),
+            "achievements": sum(len(ids) for _, ids in self._thresholds.values())
+        }
+
+class _AchievementIndex(NamedTuple):
+    engine: AchievementEngine
+    by_category: Dict[AchievementCategory, Tuple[Achievement, ...]]
+
+def _index(achievements: Tuple[Achievement, ...]) -> _AchievementIndex:
+    by_category: Dict[AchievementCategory, List[Achievement]] = {}
+    for achievement in achievements:
+        by_category.setdefault(achievement.category, []).append(achievement)
+    return _AchievementIndex(
+        AchievementEngine(achievements),
+        {category: tuple(group) for category, group in by_category.items()}
+    )
+
+achievement_catalog = Catalog("achievements", "achievements.json", Achievement, index=_index)
+
+def get_achievement_engine() -> AchievementEngine:
+    """The engine for the current achievement catalog; rebuilt when the catalog reloads."""
+    return achievement_catalog.snapshot().index.engine
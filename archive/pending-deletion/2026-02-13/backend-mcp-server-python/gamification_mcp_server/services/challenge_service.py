@@ -1,15 +1,60 @@
 """
 Service for managing challenges.
+
+Challenges are loaded from `catalogs/challenges.json`. A challenge with
+`startDate`/`endDate` runs between them; one with `durationDays` instead
+is rolling: it is always open to join (its dates are today plus that many
+days, moved forward as the catalog is rebuilt hourly), and each
+participant has `durationDays` from the day they joined.
+
+A challenge's progress is the number of its activities logged
+(`progressBy: "count"`, the default), their summed value (`"value"`) or
+their summed duration in minutes (`"duration"`). The catalog is indexed by
+activity type, so an activity finds the challenges it counts toward
+without scanning them all.
 """
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from ..models import Challenge, ActivityType
+from ..models import ActivityType, Challenge
+from ..utils.catalog import Catalog
 
 logger = logging.getLogger("gamification_mcp_server.challenge_service")
 
+# Duration of a rolling challenge without durationDays
+DEFAULT_CHALLENGE_DAYS = 7
+
+# What an activity adds to a challenge's progress
+PROGRESS_COUNT = "count"
+PROGRESS_VALUE = "value"
+PROGRESS_DURATION = "duration"
+
+def _schedule(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Give a rolling challenge its dates, and check how its progress is measured."""
+    if item.get("progressBy", PROGRESS_COUNT) not in (PROGRESS_COUNT, PROGRESS_VALUE, PROGRESS_DURATION):
+        raise ValueError(f"Unknown progressBy '{item['progressBy']}' for challenge {item.get('id')}")
+    if "startDate" in item:
+        # Runs between its dates for everyone
+        item.pop("durationDays", None)
+        return item
+    days = item.setdefault("durationDays", DEFAULT_CHALLENGE_DAYS)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    item["startDate"] = start
+    item.setdefault("endDate", start + timedelta(days=days))
+    return item
+
+def _by_activity(challenges: Tuple[Challenge, ...]) -> Mapping[ActivityType, Tuple[Challenge, ...]]:
+    """Challenges by the activity type they count."""
+    index: Dict[ActivityType, List[Challenge]] = {}
+    for challenge in challenges:
+        index.setdefault(challenge.activityType, []).append(challenge)
+    return {activity_type: tuple(group) for activity_type, group in index.items()}
+
+challenge_catalog = Catalog("challenges", "challenges.json", Challenge, prepare=_schedule,
+                            index=_by_activity, max_age=3600.0)
+
 def get_challenges(active_only: bool = True) -> List[Challenge]:
     """
     Get all challenges, optionally filtered by active status.
@@ -20,64 +65,14 @@ def get_challenges(active_only: bool = True) -> List[Challenge]:
     Returns:
         List of Challenge objects
     """
-    # This would normally come from a database
-    # For demonstration, we're defining a sample set of challenges
-    current_date = datetime.now()
-    one_week_later = current_date + timedelta(days=7)
-    
-    all_challenges = [
-        Challenge(
-            id="total_wellness_week",
-            name="Total Wellness Week",
-            description="Complete daily targets for workouts, recovery, nutrition, and good deeds for 7 days.",
-            startDate=current_date,
-            endDate=one_week_later,
-            targetValue=7,
-            activityType=ActivityType.DAILY_LOGIN,
-            rewardEt=50,
-            rewardXp=200
-        ),
-        Challenge(
-            id="protein_power_up",
-            name="Protein Power-Up",
-            description="Hit your daily protein goal 5 days in a row.",
-            startDate=current_date,
-            endDate=one_week_later,
-            targetValue=5,
-            activityType=ActivityType.HIT_PROTEIN_GOAL,
-            rewardEt=30,
-            rewardXp=150
-        ),
-        Challenge(
-            id="mindful_movement",
-            name="Mindful Movement",
-            description="Accumulate 60 minutes of stretching or foam rolling.",
-            startDate=current_date,
-            endDate=one_week_later,
-            targetValue=60,
-            activityType=ActivityType.STRETCH,
-            rewardEt=40,
-            rewardXp=175
-        ),
-        Challenge(
-            id="community_kindness_blitz",
-            name="Community Kindness Blitz",
-            description="Complete 3 Kindness Quests within the week.",
-            startDate=current_date,
-            endDate=one_week_later,
-            targetValue=3,
-            activityType=ActivityType.KINDNESS_QUEST,
-            rewardEt=35,
-            rewardXp=180
-        )
-    ]
+    all_challenges = challenge_catalog.items()
     
     # Filter active challenges if requested
     if active_only:
         now = datetime.now()
         return [c for c in all_challenges if c.startDate <= now <= c.endDate]
     
-    return all_challenges
+    return list(all_challenges)
 
 def get_challenge_by_id(challenge_id: str) -> Optional[Challenge]:
     """
@@ -89,9 +84,34 @@ def get_challenge_by_id(challenge_id: str) -> Optional[Challenge]:
     Returns:
         Challenge if found, None otherwise
     """
-    challenges = get_challenges(active_only=False)
-    for challenge in challenges:
-        if challenge.id == challenge_id:
-            return challenge
+    return challenge_catalog.get(challenge_id)
+
+def get_challenges_for_activity(activity_type: ActivityType) -> Tuple[Challenge, ...]:
+    """
+    Get the challenges an activity type counts toward, active or not.
     
-    return None
+    Args:
+        activity_type: Activity type
+        
+    Returns:
+        Challenges counting that activity type
+    """
+    return challenge_catalog.snapshot().index.get(activity_type, ())
+
+def progress_amount(challenge: Challenge, value: int = 1, duration: Optional[int] = None) -> int:
+    """
+    What one activity adds to a challenge's progress.
+    
+    Args:
+        challenge: Challenge the activity counts toward
+        value: Activity value (e.g., reps, sets)
+        duration: Activity duration in minutes (if applicable)
+        
+    Returns:
+        Progress to add
+    """
+    if challenge.progressBy == PROGRESS_DURATION:
+        return duration or 0
+    if challenge.progressBy == PROGRESS_VALUE:
+        return value
+    return 1
@@ -0,0 +1,304 @@
+"""
+Service for leaderboards.
+
+Boards rank users by a score taken from their gamification profile:
+
+- `global`: total experience points
+- one per category (`strength`, `cardio`, ...): the category level
+- `weekly:<ISO week>` (e.g. `weekly:2026-W42`): XP earned that week
+- `challenge:<id>`: XP earned since joining the challenge, while it is active
+
+Boards are updated incrementally whenever a profile is loaded or saved, so
+they follow every reward without rescanning profiles. Ranks, top-N pages
+and windows around a user cost O(log n). Boards are kept in memory
+(`RankedSet`) or, with `LEADERBOARD_BACKEND=redis`, in Redis sorted sets
+shared by every server process; an update is then one pipelined round trip
+for its reads and one for its writes. Ties are broken by user ID on both
+backends.
+"""
+
+import re
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from ..models import GamificationProfile
+from ..utils import config
+from ..utils.ranking import RankedSet
+from .achievement_service import CATEGORY_LEVEL_FIELDS
+from .challenge_service import get_challenges, get_challenge_by_id
+
+logger = logging.getLogger("gamification_mcp_server.leaderboard_service")
+
+GLOBAL_BOARD = "global"
+WEEKLY_BOARD = "weekly"
+CHALLENGE_BOARD = "challenge"
+
+# Category board name → profile level field
+LEVEL_BOARDS = {field[:-len("Level")]: field for field in CATEGORY_LEVEL_FIELDS}
+
+_WEEK = re.compile(r"^\d{4}-W\d{2}$")
+
+# Store write: (operation, board, user ID, value); operations are "set", "incr" and "expire" (seconds)
+_Op = Tuple[str, str, Optional[str], float]
+
+def iso_week(at: datetime) -> str:
+    """ISO week of a date, as used in weekly board names."""
+    year, week, _ = at.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def weekly_board(at: datetime) -> str:
+    """Name of the weekly board for a date."""
+    return f"{WEEKLY_BOARD}:{iso_week(at)}"
+
+def challenge_board(challenge_id: str) -> str:
+    """Name of a challenge's board."""
+    return f"{CHALLENGE_BOARD}:{challenge_id}"
+
+class MemoryLeaderboardStore:
+    """Boards held in this process's memory."""
+    
+    backend = "memory"
+    
+    def __init__(self):
+        self._boards: Dict[str, RankedSet] = {}
+        # Board → time.time() after which it is dropped
+        self._deadlines: Dict[str, float] = {}
+    
+    def _board(self, name: str, create: bool = False) -> Optional[RankedSet]:
+        board = self._boards.get(name)
+        if board is None and create:
+            self._drop_expired()
+            board = self._boards[name] = RankedSet()
+        return board
+    
+    def _drop_expired(self) -> None:
+        now = time.time()
+        for name, deadline in list(self._deadlines.items()):
+            if deadline <= now:
+                self._boards.pop(name, None)
+                del self._deadlines[name]
+    
+    def read_scores(self, keys: Sequence[Tuple[str, str]]) -> List[Optional[float]]:
+        """Scores of (board, user ID) pairs; None where the user isn't ranked."""
+        scores = []
+        for name, user_id in keys:
+            board = self._boards.get(name)
+            scores.append(board.score(user_id) if board is not None else None)
+        return scores
+    
+    def write(self, ops: Sequence[_Op]) -> None:
+        """Apply writes in order."""
+        for op, name, user_id, value in ops:
+            if op == "expire":
+                self._deadlines[name] = time.time() + value
+            elif op == "incr":
+                self._board(name, create=True).increment(user_id, value)
+            else:
+                self._board(name, create=True).set(user_id, value)
+    
+    def rank(self, name: str, user_id: str) -> Optional[int]:
+        """A user's 0-based rank on a board."""
+        board = self._boards.get(name)
+        return board.rank(user_id) if board is not None else None
+    
+    def range(self, name: str, start: int, stop: int) -> List[Tuple[str, float]]:
+        """(user ID, score) pairs ranked `start` to `stop - 1`."""
+        board = self._boards.get(name)
+        return board.range(start, stop) if board is not None else []
+    
+    def size(self, name: str) -> int:
+        """Users on a board."""
+        board = self._boards.get(name)
+        return len(board) if board is not None else 0
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Board sizes."""
+        return {"boards": {name: len(board) for name, board in self._boards.items()}}
+
+class RedisLeaderboardStore:
+    """Boards kept in Redis sorted sets, shared by every server process."""
+    
+    backend = "redis"
+    
+    def __init__(self, client: Any, prefix: str = "leaderboard:"):
+        self._client = client
+        self._prefix = prefix
+    
+    # Scores are stored negated so ascending ZRANK/ZRANGE order breaks ties by user ID, as RankedSet does
+    
+    def read_scores(self, keys: Sequence[Tuple[str, str]]) -> List[Optional[float]]:
+        """Scores of (board, user ID) pairs; None where the user isn't ranked."""
+        pipe = self._client.pipeline(transaction=False)
+        for name, user_id in keys:
+            pipe.zscore(self._prefix + name, user_id)
+        return [None if score is None else -score for score in pipe.execute()]
+    
+    def write(self, ops: Sequence[_Op]) -> None:
+        """Apply writes in order, in one round trip."""
+        pipe = self._client.pipeline(transaction=False)
+        for op, name, user_id, value in ops:
+            key = self._prefix + name
+            if op == "expire":
+                pipe.expire(key, int(value))
+            elif op == "incr":
+                pipe.zincrby(key, -value, user_id)
+            else:
+                pipe.zadd(key, {user_id: -value})
+        pipe.execute()
+    
+    def rank(self, name: str, user_id: str) -> Optional[int]:
+        """A user's 0-based rank on a board."""
+        return self._client.zrank(self._prefix + name, user_id)
+    
+    def range(self, name: str, start: int, stop: int) -> List[Tuple[str, float]]:
+        """(user ID, score) pairs ranked `start` to `stop - 1`."""
+        start = max(start, 0)
+        if stop <= start:
+            return []
+        entries = self._client.zrange(self._prefix + name, start, stop - 1, withscores=True)
+        return [(user_id, -score) for user_id, score in entries]
+    
+    def size(self, name: str) -> int:
+        """Users on a board."""
+        return self._client.zcard(self._prefix + name)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Nothing beyond the service's counts; board sizes live in Redis."""
+        return {}
+
+def _entry(rank: int, user_id: str, score: float) -> Dict[str, Any]:
+    """A leaderboard entry with a 1-based rank."""
+    return {"rank": rank + 1, "userId": user_id, "score": int(score)}
+
+class LeaderboardService:
+    """Keeps the boards up to date from profiles and answers rank queries."""
+    
+    def __init__(self, store: Any, weeks_kept: int = 4):
+        """
+        Args:
+            store: MemoryLeaderboardStore or RedisLeaderboardStore
+            weeks_kept: Weeks a weekly board is kept after its last update
+        """
+        self.store = store
+        self.weekly_ttl = weeks_kept * 7 * 86400
+        self._counts = {"updates": 0, "errors": 0}
+    
+    def record_profile(self, profile: GamificationProfile) -> None:
+        """
+        Update every board from a loaded or saved profile.
+        
+        XP gained since the user's last update is added to the weekly board
+        and to the boards of active challenges they joined. Failures are
+        logged and never fail the caller's save.
+        """
+        try:
+            user_id = profile.userId
+            reads = [(GLOBAL_BOARD, user_id)]
+            reads.extend((challenge_board(challenge.id), user_id) for challenge in get_challenges(active_only=True))
+            previous, *joined = self.store.read_scores(reads)
+            
+            ops: List[_Op] = [("set", GLOBAL_BOARD, user_id, profile.experiencePoints)]
+            ops.extend(("set", board, user_id, getattr(profile, field)) for board, field in LEVEL_BOARDS.items())
+            
+            # A user's first update only places them; it isn't XP gained
+            gained = profile.experiencePoints - previous if previous is not None else 0
+            if gained > 0:
+                week = weekly_board(profile.updatedAt or datetime.now())
+                ops.append(("incr", week, user_id, gained))
+                ops.append(("expire", week, None, self.weekly_ttl))
+                ops.extend(("incr", board, user_id, gained)
+                           for (board, _), score in zip(reads[1:], joined) if score is not None)
+            
+            self.store.write(ops)
+            self._counts["updates"] += 1
+        except Exception as e:
+            self._counts["errors"] += 1
+            logger.warning(f"Failed to update leaderboards for {profile.userId}: {str(e)}")
+    
+    def join_challenge(self, challenge_id: str, user_id: str) -> None:
+        """Put a user on a challenge's board with no XP, keeping any XP they already have."""
+        try:
+            self.store.write([("incr", challenge_board(challenge_id), user_id, 0)])
+        except Exception as e:
+            self._counts["errors"] += 1
+            logger.warning(f"Failed to add {user_id} to the {challenge_id} leaderboard: {str(e)}")
+    
+    def board_name(self, board: str, week: Optional[str] = None, challenge_id: Optional[str] = None) -> str:
+        """
+        Resolve a requested board to its name.
+        
+        Args:
+            board: `global`, a category, `weekly` or `challenge`
+            week: ISO week of a weekly board (default: this week)
+            challenge_id: Challenge of a challenge board
+        
+        Raises:
+            ValueError: If there is no such board
+        """
+        if board == GLOBAL_BOARD or board in LEVEL_BOARDS:
+            return board
+        if board == WEEKLY_BOARD:
+            week = week or iso_week(datetime.now())
+            if not _WEEK.match(week):
+                raise ValueError(f"Invalid week {week}, expected e.g. 2026-W01")
+            return f"{WEEKLY_BOARD}:{week}"
+        if board == CHALLENGE_BOARD:
+            if not challenge_id or get_challenge_by_id(challenge_id) is None:
+                raise ValueError(f"Challenge {challenge_id} not found")
+            return challenge_board(challenge_id)
+        raise ValueError(f"Unknown leaderboard {board}")
+    
+    def size(self, name: str) -> int:
+        """Users on a board."""
+        return self.store.size(name)
+    
+    def top(self, name: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Entries ranked `offset + 1` to `offset + limit`."""
+        return [_entry(offset + i, user_id, score)
+                for i, (user_id, score) in enumerate(self.store.range(name, offset, offset + limit))]
+    
+    def rank(self, name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """A user's entry, or None if they aren't on the board."""
+        rank = self.store.rank(name, user_id)
+        if rank is None:
+            return None
+        score = self.store.read_scores([(name, user_id)])[0]
+        return _entry(rank, user_id, score) if score is not None else None
+    
+    def around(self, name: str, user_id: str, window: int = 2) -> List[Dict[str, Any]]:
+        """A user's entry and up to `window` entries either side of it."""
+        rank = self.store.rank(name, user_id)
+        if rank is None:
+            return []
+        start = max(rank - window, 0)
+        return [_entry(start + i, other, score)
+                for i, (other, score) in enumerate(self.store.range(name, start, rank + window + 1))]
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Backend, update and error counts, and board sizes for the memory backend."""
+        return {"backend": self.store.backend, **self._counts, **self.store.metrics()}
+
+def _create_store() -> Any:
+    """The configured leaderboard store, falling back to memory if Redis is unavailable."""
+    if config.get('LEADERBOARD_BACKEND') == 'redis':
+        if redis is None:
+            logger.warning("LEADERBOARD_BACKEND is redis but the redis package isn't installed; "
+                           "keeping leaderboards in memory")
+        else:
+            try:
+                client = redis.Redis.from_url(config.get('LEADERBOARD_REDIS_URL'), decode_responses=True,
+                                              socket_connect_timeout=2)
+                client.ping()
+                return RedisLeaderboardStore(client, config.get('LEADERBOARD_REDIS_PREFIX'))
+            except redis.RedisError as e:
+                logger.warning(f"Redis connection failed: {str(e)}. Keeping leaderboards in memory")
+    return MemoryLeaderboardStore()
+
+leaderboards = LeaderboardService(_create_store(), weeks_kept=config.get('LEADERBOARD_WEEKS_KEPT'))
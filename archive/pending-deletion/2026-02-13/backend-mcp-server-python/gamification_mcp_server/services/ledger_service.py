@@ -0,0 +1,359 @@
+"""
+Service for the append-only activity ledger.
+
+The profile behind `/client-progress` only holds current totals, so rewards
+can't be audited or a profile reconstructed after the fact. Every
+LogActivity, RollDice, JoinChallenge and challenge completion is also
+appended to a local ledger (SQLite) as an event holding the tool's input
+and the exact rewards it applied. A user's first event is preceded by a snapshot of their profile
+as it was, and every `LEDGER_SNAPSHOT_EVERY` events another snapshot is
+taken, so a profile is rebuilt from its latest snapshot plus the events
+after it. Events are applied with the same code as the live tools and the
+recorded timestamps, so a rebuild matches what was saved.
+
+`rebuild_all()` rebuilds every profile across a process pool; see
+`replay_ledger.py`.
+"""
+
+import json
+import time
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models import ActivityReward, GamificationProfile
+from ..utils import config
+from .rewards_service import apply_rewards
+
+logger = logging.getLogger("gamification_mcp_server.ledger_service")
+
+DEFAULT_LEDGER_PATH = Path(__file__).parent.parent / "data" / "ledger.sqlite3"
+
+EVENT_ACTIVITY = "activity"
+EVENT_DICE_ROLL = "dice_roll"
+EVENT_CHALLENGE_JOIN = "challenge_join"
+EVENT_CHALLENGE_COMPLETE = "challenge_complete"
+
+def apply_event(profile: GamificationProfile, event_type: str, payload: Dict[str, Any],
+                at: datetime) -> GamificationProfile:
+    """
+    Apply one ledger event to a profile, as the tool that recorded it did.
+    
+    Args:
+        profile: Profile to update in place
+        event_type: Event type
+        payload: Event payload
+        at: When the event happened
+    
+    Returns:
+        The updated profile
+    """
+    if event_type in (EVENT_ACTIVITY, EVENT_CHALLENGE_COMPLETE):
+        apply_rewards(profile, ActivityReward.parse_obj(payload["rewards"]), at)
+    elif event_type == EVENT_DICE_ROLL:
+        profile.energyTokens -= payload["energyTokensSpent"]
+        profile.boardPosition += payload["movement"]
+        apply_rewards(profile, ActivityReward.parse_obj(payload["rewards"]), at)
+    # Joining a challenge doesn't change the profile; it is kept for the audit trail
+    return profile
+
+class ActivityLedger:
+    """Append-only event log with per-user profile snapshots, backed by a local SQLite file."""
+    
+    def __init__(self, path: Optional[str] = None, snapshot_every: int = 100, enabled: bool = True):
+        """
+        Args:
+            path: SQLite file (default: data/ledger.sqlite3 in the server directory)
+            snapshot_every: Events per user between snapshots
+            enabled: Record events; a disabled ledger can still be read
+        """
+        self.path = Path(path) if path else DEFAULT_LEDGER_PATH
+        self.snapshot_every = snapshot_every
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # User ID -> events recorded since their latest snapshot
+        self._since_snapshot: Dict[str, int] = {}
+        self._counts = {"events": 0, "snapshots": 0, "failures": 0}
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            # WAL lets replays read while the server appends
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, type TEXT NOT NULL, "
+                "payload TEXT NOT NULL, at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS events_user ON events (user_id, seq)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "user_id TEXT NOT NULL, seq INTEGER NOT NULL, profile TEXT NOT NULL, "
+                "PRIMARY KEY (user_id, seq))"
+            )
+            self._conn = conn
+        return self._conn
+    
+    def _latest_snapshot_seq(self, conn: sqlite3.Connection, user_id: str) -> Optional[int]:
+        row = conn.execute("SELECT MAX(seq) FROM snapshots WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0]
+    
+    def _put_snapshot(self, conn: sqlite3.Connection, user_id: str, seq: int, profile: GamificationProfile) -> None:
+        conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", (user_id, seq, profile.json()))
+        self._since_snapshot[user_id] = 0
+        self._counts["snapshots"] += 1
+    
+    def has_baseline(self, user_id: str) -> bool:
+        """Check whether a user's events can be replayed (they have a snapshot)."""
+        if user_id in self._since_snapshot:
+            return True
+        with self._lock:
+            conn = self._connection()
+            latest = self._latest_snapshot_seq(conn, user_id)
+            if latest is None:
+                return False
+            self._since_snapshot[user_id] = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE user_id = ? AND seq > ?", (user_id, latest)
+            ).fetchone()[0]
+        return True
+    
+    def needs_baseline(self, user_id: str) -> bool:
+        """Check whether a user's next event must be recorded with their prior profile."""
+        return self.enabled and not self.has_baseline(user_id)
+    
+    def record(self, user_id: str, event_type: str, payload: Dict[str, Any], at: datetime,
+               after: GamificationProfile, before: Optional[GamificationProfile] = None) -> Optional[int]:
+        """
+        Append an event.
+        
+        Failures are logged rather than raised; the ledger never fails a tool.
+        
+        Args:
+            user_id: User the event belongs to
+            event_type: Event type
+            payload: JSON-compatible event payload, enough for `apply_event()`
+            at: When the event happened (the profile's new `updatedAt`)
+            after: Profile after the event
+            before: Profile before the event; required for a user without a snapshot
+        
+        Returns:
+            The event's sequence number, or None if it wasn't recorded
+        """
+        if not self.enabled:
+            return None
+        try:
+            baseline = self.has_baseline(user_id)
+            if not baseline and before is None:
+                raise ValueError("first event for the user was recorded without their prior profile")
+            with self._lock:
+                conn = self._connection()
+                conn.execute("BEGIN")
+                try:
+                    if not baseline:
+                        self._put_snapshot(conn, user_id, 0, before)
+                    seq = conn.execute(
+                        "INSERT INTO events (user_id, type, payload, at) VALUES (?, ?, ?, ?)",
+                        (user_id, event_type, json.dumps(payload, default=str), at.isoformat())
+                    ).lastrowid
+                    self._since_snapshot[user_id] += 1
+                    if self._since_snapshot[user_id] >= self.snapshot_every:
+                        self._put_snapshot(conn, user_id, seq, after)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    self._since_snapshot.pop(user_id, None)
+                    raise
+            self._counts["events"] += 1
+            return seq
+        except Exception as e:
+            self._counts["failures"] += 1
+            logger.error(f"Failed to record {event_type} event for user {user_id} in the ledger: {str(e)}")
+            return None
+    
+    def events(self, user_id: str, after_seq: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get a user's events in order.
+        
+        Args:
+            user_id: User ID
+            after_seq: Only events after this sequence number
+            limit: Maximum events returned
+        
+        Returns:
+            Events with `seq`, `type`, `payload` and `at`
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, type, payload, at FROM events WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (user_id, after_seq, -1 if limit is None else limit)
+            ).fetchall()
+        return [{"seq": seq, "type": event_type, "payload": json.loads(payload), "at": at}
+                for seq, event_type, payload, at in rows]
+    
+    def scan(self, event_type: str, chunk_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any], datetime]]:
+        """
+        Every user's events of one type, grouped by user and in order within each.
+        
+        Read in chunks, so the ledger is never loaded at once and appends
+        aren't blocked for long.
+        
+        Yields:
+            (user ID, payload, when it happened)
+        """
+        user_id, seq = "", 0
+        while True:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT user_id, seq, payload, at FROM events "
+                    "WHERE type = ? AND (user_id > ? OR (user_id = ? AND seq > ?)) "
+                    "ORDER BY user_id, seq LIMIT ?",
+                    (event_type, user_id, user_id, seq, chunk_size)
+                ).fetchall()
+            for user_id, seq, payload, at in rows:
+                yield user_id, json.loads(payload), datetime.fromisoformat(at)
+            if len(rows) < chunk_size:
+                return
+    
+    def rebuild(self, user_id: str, upto_seq: Optional[int] = None) -> Tuple[Optional[GamificationProfile], int]:
+        """
+        Rebuild a profile from its latest snapshot and the events after it.
+        
+        Args:
+            user_id: User ID
+            upto_seq: Rebuild as of this sequence number (default: latest)
+        
+        Returns:
+            (profile, events replayed); profile is None if the user has no snapshot
+        """
+        upto = -1 if upto_seq is None else upto_seq
+        with self._lock:
+            conn = self._connection()
+            snapshot = conn.execute(
+                "SELECT seq, profile FROM snapshots WHERE user_id = ? AND (? < 0 OR seq <= ?) "
+                "ORDER BY seq DESC LIMIT 1",
+                (user_id, upto, upto)
+            ).fetchone()
+            if snapshot is None:
+                return None, 0
+            rows = conn.execute(
+                "SELECT type, payload, at FROM events WHERE user_id = ? AND seq > ? AND (? < 0 OR seq <= ?) "
+                "ORDER BY seq",
+                (user_id, snapshot[0], upto, upto)
+            ).fetchall()
+        profile = GamificationProfile.parse_raw(snapshot[1])
+        for event_type, payload, at in rows:
+            apply_event(profile, event_type, json.loads(payload), datetime.fromisoformat(at))
+        return profile, len(rows)
+    
+    def users(self) -> List[str]:
+        """All users in the ledger."""
+        with self._lock:
+            rows = self._connection().execute("SELECT DISTINCT user_id FROM snapshots").fetchall()
+        return [row[0] for row in rows]
+    
+    def put_snapshots(self, snapshots: Iterable[Tuple[str, GamificationProfile]]) -> int:
+        """
+        Store rebuilt profiles as snapshots at each user's latest event.
+        
+        Returns:
+            Number of snapshots stored
+        """
+        stored = 0
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                for user_id, profile in snapshots:
+                    seq = conn.execute(
+                        "SELECT COALESCE(MAX(seq), 0) FROM events WHERE user_id = ?", (user_id,)
+                    ).fetchone()[0]
+                    self._put_snapshot(conn, user_id, seq, profile)
+                    stored += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return stored
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Recorded event, snapshot and failure counts."""
+        return {"enabled": self.enabled, **self._counts}
+
+activity_ledger = ActivityLedger(
+    config.get('LEDGER_PATH'),
+    snapshot_every=config.get('LEDGER_SNAPSHOT_EVERY'),
+    enabled=config.get('LEDGER_ENABLED')
+)
+
+def rebuild_chunk(path: str, user_ids: List[str]) -> List[Tuple[str, Optional[str], int, Optional[str]]]:
+    """
+    Rebuild one chunk of profiles; runs in a worker process.
+    
+    Returns:
+        (user ID, profile JSON, events replayed, error) for every user
+    """
+    ledger = ActivityLedger(path, enabled=False)
+    results = []
+    for user_id in user_ids:
+        try:
+            profile, replayed = ledger.rebuild(user_id)
+            results.append((user_id, profile.json() if profile else None, replayed, None))
+        except Exception as e:
+            results.append((user_id, None, 0, str(e)))
+    return results
+
+def rebuild_all(user_ids: Optional[List[str]] = None, ledger: ActivityLedger = None, workers: int = None,
+                chunk_size: int = None, snapshot: bool = False,
+                on_profile: Optional[Callable[[str, GamificationProfile], None]] = None) -> Dict[str, Any]:
+    """
+    Rebuild profiles from the ledger in parallel worker processes.
+    
+    Args:
+        user_ids: Users to rebuild (default: every user in the ledger)
+        ledger: Ledger to read (default: the shared ledger)
+        workers: Worker processes (default: REPLAY_WORKERS)
+        chunk_size: Users per worker task (default: REPLAY_CHUNK_SIZE)
+        snapshot: Store each rebuilt profile as a new snapshot
+        on_profile: Called with every rebuilt profile
+    
+    Returns:
+        Report with user, rebuilt, event and failure counts, failures (capped) and timing
+    """
+    ledger = ledger or activity_ledger
+    user_ids = ledger.users() if user_ids is None else user_ids
+    workers = workers or config.get('REPLAY_WORKERS')
+    chunk_size = chunk_size or config.get('REPLAY_CHUNK_SIZE')
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    report = {"users": len(user_ids), "rebuilt": 0, "eventsReplayed": 0, "failed": 0, "errors": [],
+              "elapsedSeconds": 0.0}
+    started = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(rebuild_chunk, str(ledger.path), chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            rebuilt = []
+            for user_id, profile_json, replayed, error in future.result():
+                if profile_json is None:
+                    report["failed"] += 1
+                    if len(report["errors"]) < 100:
+                        report["errors"].append({"userId": user_id, "error": error or "no snapshot"})
+                    continue
+                profile = GamificationProfile.parse_raw(profile_json)
+                rebuilt.append((user_id, profile))
+                report["eventsReplayed"] += replayed
+                if on_profile:
+                    on_profile(user_id, profile)
+            if snapshot:
+                ledger.put_snapshots(rebuilt)
+            report["rebuilt"] += len(rebuilt)
+    
+    report["elapsedSeconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Rebuilt {report['rebuilt']}/{report['users']} profiles from {report['eventsReplayed']} events "
+                f"in {report['elapsedSeconds']}s ({report['failed']} failed)")
+    return report
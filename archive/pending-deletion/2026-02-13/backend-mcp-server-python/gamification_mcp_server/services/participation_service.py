@@ -0,0 +1,261 @@
+"""
+Service for challenge participation and progress.
+
+Who joined which challenge, how far they have got toward its target and
+when they completed it are kept in a local SQLite file
+(`PARTICIPATION_PATH`) and loaded on first use into two in-memory indexes:
+participations by user and participants by challenge. A logged activity
+looks up the challenges its type counts toward (the challenge catalog's
+index) and updates only the user's participations in those, so it costs
+O(k) in the k challenges of that activity type, however many challenges
+and participants there are. A participation is completed when its
+progress reaches the challenge's target within its window: the
+challenge's dates, or for a rolling challenge `durationDays` from when
+the user joined. Once that window has ended the user can join again,
+which starts a new run from zero.
+Progress is worked out first (`plan_activity()`) and saved only after the
+caller has saved the `COMPLETE_CHALLENGE` rewards (`commit()`), so a
+completion is never recorded without its rewards.
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ..models import ActivityType, Challenge
+from ..utils import config
+from .challenge_service import get_challenges_for_activity, progress_amount
+
+logger = logging.getLogger("gamification_mcp_server.participation_service")
+
+DEFAULT_PARTICIPATION_PATH = Path(__file__).parent.parent / "data" / "participation.sqlite3"
+
+class Participation:
+    """A user's progress in one challenge."""
+    
+    __slots__ = ("challenge_id", "progress", "joined_at", "completed_at")
+    
+    def __init__(self, challenge_id: str, progress: int, joined_at: datetime,
+                 completed_at: Optional[datetime] = None):
+        self.challenge_id = challenge_id
+        self.progress = progress
+        self.joined_at = joined_at
+        self.completed_at = completed_at
+
+def participation_window(challenge: Challenge, participation: Participation) -> Tuple[datetime, datetime]:
+    """When activities count toward a participation: `durationDays` from joining for a rolling challenge, else the challenge's dates."""
+    if challenge.durationDays:
+        return participation.joined_at, participation.joined_at + timedelta(days=challenge.durationDays)
+    return challenge.startDate, challenge.endDate
+
+class ProgressUpdate(NamedTuple):
+    """A participation's progress after an activity."""
+    challenge: Challenge
+    progress: int
+    completes: bool
+
+class ParticipationStore:
+    """Challenge participations indexed by user and by challenge, backed by a local SQLite file."""
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file (default: data/participation.sqlite3 in the server directory)
+        """
+        self.path = Path(path) if path else DEFAULT_PARTICIPATION_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # User ID → challenge ID → participation
+        self._by_user: Optional[Dict[str, Dict[str, Participation]]] = None
+        # Challenge ID → user IDs that joined it, and those that completed it
+        self._by_challenge: Dict[str, Set[str]] = {}
+        self._completed: Dict[str, Set[str]] = {}
+        self._counts = {"joins": 0, "progressUpdates": 0, "completions": 0, "failures": 0}
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS participations ("
+                "user_id TEXT NOT NULL, challenge_id TEXT NOT NULL, progress INTEGER NOT NULL, "
+                "joined_at TEXT NOT NULL, completed_at TEXT, PRIMARY KEY (user_id, challenge_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS participations_challenge ON participations (challenge_id)")
+            self._conn = conn
+        return self._conn
+    
+    def _indexes(self) -> Dict[str, Dict[str, Participation]]:
+        """The by-user index, loading both indexes from the file first if needed."""
+        if self._by_user is None:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT user_id, challenge_id, progress, joined_at, completed_at FROM participations"
+                ).fetchall()
+            by_user: Dict[str, Dict[str, Participation]] = {}
+            for user_id, challenge_id, progress, joined_at, completed_at in rows:
+                participation = Participation(
+                    challenge_id, progress, datetime.fromisoformat(joined_at),
+                    datetime.fromisoformat(completed_at) if completed_at else None
+                )
+                by_user.setdefault(user_id, {})[challenge_id] = participation
+                self._by_challenge.setdefault(challenge_id, set()).add(user_id)
+                if participation.completed_at is not None:
+                    self._completed.setdefault(challenge_id, set()).add(user_id)
+            self._by_user = by_user
+        return self._by_user
+    
+    def get(self, user_id: str, challenge_id: str) -> Optional[Participation]:
+        """A user's participation in a challenge, or None if they haven't joined it."""
+        return self._indexes().get(user_id, {}).get(challenge_id)
+    
+    def for_user(self, user_id: str) -> List[Participation]:
+        """Every challenge a user joined, in the order they joined them."""
+        return sorted(self._indexes().get(user_id, {}).values(), key=lambda participation: participation.joined_at)
+    
+    def participant_count(self, challenge_id: str) -> int:
+        """Number of users that joined a challenge."""
+        self._indexes()
+        return len(self._by_challenge.get(challenge_id, ()))
+    
+    def completed_count(self, challenge_id: str) -> int:
+        """Number of users whose latest run of a challenge is completed."""
+        self._indexes()
+        return len(self._completed.get(challenge_id, ()))
+    
+    def join(self, user_id: str, challenge: Challenge, at: Optional[datetime] = None) -> bool:
+        """
+        Add a user to a challenge with no progress.
+        
+        A user whose previous run of the challenge has ended, completed or
+        not, starts a new one.
+        
+        Returns:
+            bool: Whether they joined now (False if their current run hasn't ended)
+        """
+        by_user = self._indexes()
+        at = at or datetime.now()
+        current = by_user.get(user_id, {}).get(challenge.id)
+        if current is not None and at <= participation_window(challenge, current)[1]:
+            return False
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO participations VALUES (?, ?, 0, ?, NULL)",
+                (user_id, challenge.id, at.isoformat())
+            )
+        by_user.setdefault(user_id, {})[challenge.id] = Participation(challenge.id, 0, at)
+        self._by_challenge.setdefault(challenge.id, set()).add(user_id)
+        self._completed.get(challenge.id, set()).discard(user_id)
+        self._counts["joins"] += 1
+        return True
+    
+    def plan_activity(self, user_id: str, activity_type: ActivityType, value: int = 1,
+                      duration: Optional[int] = None, at: Optional[datetime] = None) -> List[ProgressUpdate]:
+        """
+        Work out an activity's progress in the challenges it counts toward, without saving it.
+        
+        Only participations whose window contains `at` make progress.
+        
+        The caller saves the profile with the rewards of any challenge this
+        completes, then calls `commit()`, so a completion is only recorded
+        once its rewards are saved. A participation that reached its target
+        but wasn't committed is completed by the next activity instead.
+        
+        Failures are logged rather than raised; progress never fails the activity.
+        
+        Args:
+            user_id: User that logged the activity
+            activity_type: Type of activity
+            value: Activity value (e.g., reps, sets)
+            duration: Activity duration in minutes (if applicable)
+            at: When the activity happened (default: now)
+        
+        Returns:
+            The participations' new progress, and whether each completes its challenge
+        """
+        joined = self._indexes().get(user_id)
+        if not joined:
+            return []
+        at = at or datetime.now()
+        
+        try:
+            updates = []
+            for challenge in get_challenges_for_activity(activity_type):
+                participation = joined.get(challenge.id)
+                if participation is None or participation.completed_at is not None:
+                    continue
+                start, end = participation_window(challenge, participation)
+                if not start <= at <= end:
+                    continue
+                amount = progress_amount(challenge, value, duration)
+                if amount <= 0:
+                    continue
+                progress = participation.progress + amount
+                updates.append(ProgressUpdate(challenge, progress, progress >= challenge.targetValue))
+            return updates
+        except Exception as e:
+            self._counts["failures"] += 1
+            logger.error(f"Failed to work out challenge progress for user {user_id}: {str(e)}")
+            return []
+    
+    def commit(self, user_id: str, updates: List[ProgressUpdate], at: datetime) -> None:
+        """
+        Save progress from `plan_activity()`, completing the challenges it reached the target of.
+        
+        Failures are logged rather than raised: the rewards are already saved
+        by then, so the activity has succeeded.
+        
+        Args:
+            user_id: User that logged the activity
+            updates: Progress to save
+            at: When the activity happened; the completion time
+        """
+        if not updates:
+            return
+        joined = self._indexes().get(user_id, {})
+        try:
+            # Saved before the indexes change, so they never get ahead of the file
+            completed_at = at.isoformat()
+            with self._lock:
+                conn = self._connection()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        "UPDATE participations SET progress = ?, completed_at = ? WHERE user_id = ? AND challenge_id = ?",
+                        [(update.progress, completed_at if update.completes else None, user_id, update.challenge.id)
+                         for update in updates]
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            self._counts["failures"] += 1
+            logger.error(f"Failed to save challenge progress for user {user_id}: {str(e)}")
+            return
+        
+        for update in updates:
+            participation = joined.get(update.challenge.id)
+            if participation is None:
+                continue
+            participation.progress = update.progress
+            if update.completes:
+                participation.completed_at = at
+                self._completed.setdefault(update.challenge.id, set()).add(user_id)
+                self._counts["completions"] += 1
+        self._counts["progressUpdates"] += len(updates)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Participation counts, and join, update and completion counts since startup."""
+        by_user = self._indexes()
+        return {
+            "users": len(by_user),
+            "participations": sum(len(joined) for joined in by_user.values()),
+            **self._counts
+        }
+
+participations = ParticipationStore(config.get('PARTICIPATION_PATH'))
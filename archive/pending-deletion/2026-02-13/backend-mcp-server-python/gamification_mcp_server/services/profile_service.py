@@ -1,20 +1,422 @@
 """
 Service for managing gamification profiles.
+
+Profiles are cached in-process, so a reward application reads the profile
+from memory instead of GETting `/client-progress/{id}` each time. Saves
+are written behind: a save updates the cached profile and bumps its
+version, and a background flusher writes each changed profile at most once
+per `PROFILE_FLUSH_INTERVAL`, however many saves it coalesces. A profile
+with unflushed changes is never evicted or refreshed from the backend, so
+reads within a worker always see the latest saved state. Everything
+pending is flushed on shutdown.
+
+Callers that read, modify and save a profile do it as a job on
+`user_actors`, the user's queue, so concurrent calls for one user apply in
+order instead of overwriting each other's changes, while other users'
+calls carry on in parallel.
+
+Writes send only what changed since the profile was read or last written,
+as a PATCH: counters as increments, so concurrent writers don't overwrite
+each other's progress, and everything else as new values. A profile the
+backend hasn't seen yet, or one whose last write failed, is PUT in full.
 """
 
+import time
+import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from typing import Any, Dict, Optional
 from fastapi import HTTPException, status
 
 from ..models import GamificationProfile
-from ..utils import make_api_request
+from ..utils import make_api_request, config
+from ..utils.actors import ActorQueues
+from .leaderboard_service import leaderboards
 
 logger = logging.getLogger("gamification_mcp_server.profile_service")
 
+# Attempts made for each pending profile when flushing on shutdown
+_SHUTDOWN_FLUSH_ATTEMPTS = 3
+
+# Fields that only accumulate; a change is sent as an increment
+_COUNTER_FIELDS = (
+    "experiencePoints", "energyTokens",
+    "strengthExperiencePoints", "cardioExperiencePoints", "flexibilityExperiencePoints",
+    "balanceExperiencePoints", "coreExperiencePoints", "nutritionExperiencePoints",
+    "recoveryExperiencePoints", "communityExperiencePoints",
+    "workoutsCompleted", "stretchesCompleted", "foamRollsCompleted", "vitaminsLogged",
+    "greensLogged", "mealsLogged", "proteinGoalsHit", "kindnessQuestsCompleted",
+    "goodDeedsReported", "challengesCompleted", "totalSets", "totalReps"
+)
+
+# Maps whose changed keys are merged into the stored map
+_MERGE_FIELDS = ("streaks", "achievementDates")
+
+async def _fetch_profile(userId: str) -> Optional[GamificationProfile]:
+    """Get a user's profile from their client progress, or None if they have none."""
+    response = await make_api_request("GET", f"/client-progress/{userId}")
+    progress = response.get("progress", {})
+    if not progress:
+        return None
+    
+    # Map to GamificationProfile structure
+    return GamificationProfile(
+        userId=userId,
+        overallLevel=progress.get("overallLevel", 0),
+        experiencePoints=progress.get("experiencePoints", 0),
+        energyTokens=progress.get("energyTokens", 0),
+        strengthLevel=progress.get("strengthLevel", 0),
+        strengthExperiencePoints=progress.get("strengthExperiencePoints", 0),
+        cardioLevel=progress.get("cardioLevel", 0),
+        cardioExperiencePoints=progress.get("cardioExperiencePoints", 0),
+        flexibilityLevel=progress.get("flexibilityLevel", 0),
+        flexibilityExperiencePoints=progress.get("flexibilityExperiencePoints", 0),
+        balanceLevel=progress.get("balanceLevel", 0),
+        balanceExperiencePoints=progress.get("balanceExperiencePoints", 0),
+        coreLevel=progress.get("coreLevel", 0),
+        coreExperiencePoints=progress.get("coreExperiencePoints", 0),
+        nutritionLevel=progress.get("nutritionLevel", 0),
+        nutritionExperiencePoints=progress.get("nutritionExperiencePoints", 0),
+        recoveryLevel=progress.get("recoveryLevel", 0),
+        recoveryExperiencePoints=progress.get("recoveryExperiencePoints", 0),
+        communityLevel=progress.get("communityLevel", 0),
+        communityExperiencePoints=progress.get("communityExperiencePoints", 0),
+        streaks=progress.get("streaks", {}),
+        achievements=progress.get("achievements", []),
+        achievementDates=progress.get("achievementDates", {}),
+        boardPosition=progress.get("boardPosition", 0),
+        workoutsCompleted=progress.get("workoutsCompleted", 0),
+        stretchesCompleted=progress.get("stretchesCompleted", 0),
+        foamRollsCompleted=progress.get("foamRollsCompleted", 0),
+        vitaminsLogged=progress.get("vitaminsLogged", 0),
+        greensLogged=progress.get("greensLogged", 0),
+        mealsLogged=progress.get("mealsLogged", 0),
+        proteinGoalsHit=progress.get("proteinGoalsHit", 0),
+        kindnessQuestsCompleted=progress.get("kindnessQuestsCompleted", 0),
+        goodDeedsReported=progress.get("goodDeedsReported", 0),
+        challengesCompleted=progress.get("challengesCompleted", 0),
+        totalSets=progress.get("totalSets", 0),
+        totalReps=progress.get("totalReps", 0),
+        lastActivityDate=progress.get("lastActivityDate"),
+        createdAt=progress.get("createdAt"),
+        updatedAt=progress.get("updatedAt")
+    )
+
+def _progress_data(profile: GamificationProfile) -> Dict[str, Any]:
+    """Convert a profile to client progress format."""
+    return {
+        "userId": profile.userId,
+        "overallLevel": profile.overallLevel,
+        "experiencePoints": profile.experiencePoints,
+        "energyTokens": profile.energyTokens,
+        "strengthLevel": profile.strengthLevel,
+        "strengthExperiencePoints": profile.strengthExperiencePoints,
+        "cardioLevel": profile.cardioLevel,
+        "cardioExperiencePoints": profile.cardioExperiencePoints,
+        "flexibilityLevel": profile.flexibilityLevel,
+        "flexibilityExperiencePoints": profile.flexibilityExperiencePoints,
+        "balanceLevel": profile.balanceLevel,
+        "balanceExperiencePoints": profile.balanceExperiencePoints,
+        "coreLevel": profile.coreLevel,
+        "coreExperiencePoints": profile.coreExperiencePoints,
+        "nutritionLevel": profile.nutritionLevel,
+        "nutritionExperiencePoints": profile.nutritionExperiencePoints,
+        "recoveryLevel": profile.recoveryLevel,
+        "recoveryExperiencePoints": profile.recoveryExperiencePoints,
+        "communityLevel": profile.communityLevel,
+        "communityExperiencePoints": profile.communityExperiencePoints,
+        "streaks": profile.streaks,
+        "achievements": profile.achievements,
+        "achievementDates": profile.achievementDates,
+        "boardPosition": profile.boardPosition,
+        "workoutsCompleted": profile.workoutsCompleted,
+        "stretchesCompleted": profile.stretchesCompleted,
+        "foamRollsCompleted": profile.foamRollsCompleted,
+        "vitaminsLogged": profile.vitaminsLogged,
+        "greensLogged": profile.greensLogged,
+        "mealsLogged": profile.mealsLogged,
+        "proteinGoalsHit": profile.proteinGoalsHit,
+        "kindnessQuestsCompleted": profile.kindnessQuestsCompleted,
+        "goodDeedsReported": profile.goodDeedsReported,
+        "challengesCompleted": profile.challengesCompleted,
+        "totalSets": profile.totalSets,
+        "totalReps": profile.totalReps,
+        "lastActivityDate": profile.lastActivityDate.isoformat() if profile.lastActivityDate else None
+    }
+
+async def _put_profile(profile: GamificationProfile) -> bool:
+    """PUT a profile to the backend."""
+    response = await make_api_request(
+        "PUT", 
+        f"/client-progress/{profile.userId}", 
+        data=_progress_data(profile)
+    )
+    return response.get("success", False)
+
+def _profile_patch(base: GamificationProfile, profile: GamificationProfile) -> Dict[str, Any]:
+    """
+    Build the PATCH body that turns `base` into `profile`.
+    
+    Returns:
+        Dict with `increment`, `set`, `merge` and `addAchievements` entries for
+        whatever changed (empty if nothing did)
+    """
+    old, new = _progress_data(base), _progress_data(profile)
+    patch: Dict[str, Any] = {}
+    for field, value in new.items():
+        if value == old.get(field):
+            continue
+        if field in _COUNTER_FIELDS:
+            patch.setdefault("increment", {})[field] = value - old.get(field, 0)
+        elif field in _MERGE_FIELDS:
+            changed = {key: item for key, item in value.items() if old[field].get(key) != item}
+            if set(old[field]) - set(value):
+                # A key was removed; merging can't express that
+                patch.setdefault("set", {})[field] = value
+            elif changed:
+                patch.setdefault("merge", {})[field] = changed
+        elif field == "achievements" and set(old[field]) <= set(value):
+            patch["addAchievements"] = [item for item in value if item not in old[field]]
+        else:
+            patch.setdefault("set", {})[field] = value
+    return patch
+
+async def _write_profile(profile: GamificationProfile, base: Optional[GamificationProfile]) -> str:
+    """
+    Write a profile's changes since `base` to the backend.
+    
+    Args:
+        profile: Profile to write
+        base: Profile as the backend last had it, or None to PUT every field
+        
+    Returns:
+        How it was written: `patch`, `put` or `unchanged`
+    """
+    if base is None:
+        await _put_profile(profile)
+        return "put"
+    
+    patch = _profile_patch(base, profile)
+    if not patch:
+        return "unchanged"
+    try:
+        await make_api_request("PATCH", f"/client-progress/{profile.userId}", data=patch)
+        return "patch"
+    except Exception as e:
+        # Increments aren't safe to resend (the PATCH may have been applied
+        # before it failed), so fall back to absolute values
+        logger.warning(f"PATCH of gamification profile for user {profile.userId} failed, "
+                       f"writing every field instead: {getattr(e, 'detail', None) or e}")
+        await _put_profile(profile)
+        return "put"
+
+class _CachedProfile:
+    """A cached profile, its save/flush versions and the backend's copy."""
+    
+    __slots__ = ("profile", "base", "version", "flushed_version", "loaded_at")
+    
+    def __init__(self, profile: GamificationProfile, base: Optional[GamificationProfile] = None,
+                 version: int = 0, flushed_version: int = 0):
+        self.profile = profile
+        # Profile as last read from or written to the backend; writes send the difference
+        self.base = base
+        self.version = version
+        self.flushed_version = flushed_version
+        self.loaded_at = time.monotonic()
+    
+    @property
+    def dirty(self) -> bool:
+        return self.version > self.flushed_version
+
+class ProfileCache:
+    """
+    In-process profile cache with write-behind persistence.
+    
+    Clean profiles are refreshed from the backend after `ttl` seconds and
+    evicted least recently used first; dirty ones stay until flushed.
+    """
+    
+    def __init__(self, ttl: float = 60.0, max_users: int = 10000, flush_interval: float = 2.0,
+                 flush_concurrency: int = 8):
+        """
+        Args:
+            ttl: Seconds a clean profile is served before it is re-read
+            max_users: Clean profiles kept
+            flush_interval: Seconds between flushes; 0 writes every save through immediately
+            flush_concurrency: Profiles written at once by a flush
+        """
+        self.ttl = ttl
+        self.max_users = max_users
+        self.flush_interval = flush_interval
+        self.flush_concurrency = flush_concurrency
+        self._entries: "OrderedDict[str, _CachedProfile]" = OrderedDict()
+        self._flusher: Optional[asyncio.Task] = None
+        self._counts = {"hits": 0, "misses": 0, "saves": 0, "flushes": 0, "flushFailures": 0,
+                        "patches": 0, "fullWrites": 0}
+    
+    @property
+    def write_behind(self) -> bool:
+        return self.flush_interval > 0
+    
+    def get(self, user_id: str) -> Optional[GamificationProfile]:
+        """Get a copy of a cached profile, or None if it is missing or stale."""
+        entry = self._entries.get(user_id)
+        if entry is None or (not entry.dirty and time.monotonic() - entry.loaded_at > self.ttl):
+            self._counts["misses"] += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._counts["hits"] += 1
+        return entry.profile.copy(deep=True)
+    
+    def put(self, profile: GamificationProfile) -> None:
+        """Cache a profile read from the backend, unless newer changes are pending."""
+        entry = self._entries.get(profile.userId)
+        if entry is not None and entry.dirty:
+            return
+        cached = profile.copy(deep=True)
+        self._entries[profile.userId] = _CachedProfile(cached, base=cached)
+        self._entries.move_to_end(profile.userId)
+        self._evict()
+    
+    def save(self, profile: GamificationProfile) -> int:
+        """
+        Record a changed profile to be flushed.
+        
+        Returns:
+            The profile's new version
+        """
+        entry = self._entries.get(profile.userId)
+        if entry is None:
+            entry = self._entries[profile.userId] = _CachedProfile(profile.copy(deep=True))
+        else:
+            entry.profile = profile.copy(deep=True)
+        entry.version += 1
+        entry.loaded_at = time.monotonic()
+        self._entries.move_to_end(profile.userId)
+        self._counts["saves"] += 1
+        self._ensure_flusher()
+        return entry.version
+    
+    def _evict(self) -> None:
+        excess = len(self._entries) - self.max_users
+        if excess <= 0:
+            return
+        for user_id in [user_id for user_id, entry in self._entries.items() if not entry.dirty][:excess]:
+            del self._entries[user_id]
+    
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not any(entry.dirty for entry in self._entries.values()):
+                # Nothing pending; the next save starts a new flusher
+                return
+    
+    async def _flush_user(self, user_id: str, semaphore: asyncio.Semaphore) -> bool:
+        entry = self._entries.get(user_id)
+        if entry is None or not entry.dirty:
+            return True
+        # Snapshot the version being written; saves made meanwhile stay pending
+        version = entry.version
+        snapshot = entry.profile
+        async with semaphore:
+            try:
+                await self._write(snapshot, entry.base)
+            except Exception as e:
+                # Whether any of it reached the backend is unknown; rewrite every field
+                entry.base = None
+                self._counts["flushFailures"] += 1
+                logger.warning(f"Failed to flush gamification profile for user {user_id}: {getattr(e, 'detail', None) or e}")
+                return False
+        entry.base = snapshot
+        entry.flushed_version = max(entry.flushed_version, version)
+        self._counts["flushes"] += 1
+        return True
+    
+    async def _write(self, profile: GamificationProfile, base: Optional[GamificationProfile]) -> None:
+        written = await _write_profile(profile, base)
+        if written == "patch":
+            self._counts["patches"] += 1
+        elif written == "put":
+            self._counts["fullWrites"] += 1
+    
+    async def write_through(self, profile: GamificationProfile) -> None:
+        """Write a changed profile to the backend now and cache it."""
+        entry = self._entries.get(profile.userId)
+        try:
+            await self._write(profile, entry.base if entry is not None else None)
+        except Exception:
+            # The backend's copy is unknown; read it again next time
+            self._entries.pop(profile.userId, None)
+            raise
+        self.put(profile)
+    
+    async def flush(self) -> int:
+        """
+        Write every profile with pending changes once.
+        
+        Returns:
+            Number of profiles that are still pending after a failed write
+        """
+        pending = [user_id for user_id, entry in self._entries.items() if entry.dirty]
+        if not pending:
+            return 0
+        semaphore = asyncio.Semaphore(self.flush_concurrency)
+        results = await asyncio.gather(*(self._flush_user(user_id, semaphore) for user_id in pending))
+        self._evict()
+        return results.count(False)
+    
+    async def close(self) -> None:
+        """Stop the flusher and flush everything pending (on shutdown)."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        for attempt in range(1, _SHUTDOWN_FLUSH_ATTEMPTS + 1):
+            failed = await self.flush()
+            if not failed:
+                return
+            if attempt < _SHUTDOWN_FLUSH_ATTEMPTS:
+                await asyncio.sleep(attempt)
+        logger.error(f"{failed} gamification profiles could not be flushed on shutdown")
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Hit, save and flush counts, and cached and pending profiles."""
+        return {
+            **self._counts,
+            "writeBehind": self.write_behind,
+            "cached": len(self._entries),
+            "pending": sum(1 for entry in self._entries.values() if entry.dirty)
+        }
+
+profile_cache = ProfileCache(
+    ttl=config.get('PROFILE_CACHE_TTL'),
+    max_users=config.get('PROFILE_CACHE_MAX_USERS'),
+    flush_interval=config.get('PROFILE_FLUSH_INTERVAL'),
+    flush_concurrency=config.get('PROFILE_FLUSH_CONCURRENCY')
+)
+
+# Per-user queues for read-modify-save jobs on a profile
+user_actors = ActorQueues(
+    shards=config.get('ACTOR_SHARDS'),
+    max_depth=config.get('ACTOR_MAX_QUEUE_DEPTH')
+)
+
 async def get_or_create_gamification_profile(userId: str) -> GamificationProfile:
     """
     Get or create a gamification profile for a user.
     
+    Cached profiles are served from memory; the returned profile is a copy,
+    so changes only take effect once it is saved.
+    
     Args:
         userId: User ID
         
@@ -22,53 +424,16 @@ async def get_or_create_gamification_profile(userId: str) -> GamificationProfile
         GamificationProfile
     """
     try:
-        # Try to get existing profile from client progress
-        response = await make_api_request("GET", f"/client-progress/{userId}")
-        progress = response.get("progress", {})
+        cached = profile_cache.get(userId)
+        if cached is not None:
+            return cached
         
-        if progress:
-            # Map to GamificationProfile structure
-            return GamificationProfile(
-                userId=userId,
-                overallLevel=progress.get("overallLevel", 0),
-                experiencePoints=progress.get("experiencePoints", 0),
-                energyTokens=progress.get("energyTokens", 0),
-                strengthLevel=progress.get("strengthLevel", 0),
-                strengthExperiencePoints=progress.get("strengthExperiencePoints", 0),
-                cardioLevel=progress.get("cardioLevel", 0),
-                cardioExperiencePoints=progress.get("cardioExperiencePoints", 0),
-                flexibilityLevel=progress.get("flexibilityLevel", 0),
-                flexibilityExperiencePoints=progress.get("flexibilityExperiencePoints", 0),
-                balanceLevel=progress.get("balanceLevel", 0),
-                balanceExperiencePoints=progress.get("balanceExperiencePoints", 0),
-                coreLevel=progress.get("coreLevel", 0),
-                coreExperiencePoints=progress.get("coreExperiencePoints", 0),
-                nutritionLevel=progress.get("nutritionLevel", 0),
-                nutritionExperiencePoints=progress.get("nutritionExperiencePoints", 0),
-                recoveryLevel=progress.get("recoveryLevel", 0),
-                recoveryExperiencePoints=progress.get("recoveryExperiencePoints", 0),
-                communityLevel=progress.get("communityLevel", 0),
-                communityExperiencePoints=progress.get("communityExperiencePoints", 0),
-                streaks=progress.get("streaks", {}),
-                achievements=progress.get("achievements", []),
-                achievementDates=progress.get("achievementDates", {}),
-                boardPosition=progress.get("boardPosition", 0),
-                workoutsCompleted=progress.get("workoutsCompleted", 0),
-                stretchesCompleted=progress.get("stretchesCompleted", 0),
-                foamRollsCompleted=progress.get("foamRollsCompleted", 0),
-                vitaminsLogged=progress.get("vitaminsLogged", 0),
-                greensLogged=progress.get("greensLogged", 0),
-                mealsLogged=progress.get("mealsLogged", 0),
-                proteinGoalsHit=progress.get("proteinGoalsHit", 0),
-                kindnessQuestsCompleted=progress.get("kindnessQuestsCompleted", 0),
-                goodDeedsReported=progress.get("goodDeedsReported", 0),
-                challengesCompleted=progress.get("challengesCompleted", 0),
-                totalSets=progress.get("totalSets", 0),
-                totalReps=progress.get("totalReps", 0),
-                lastActivityDate=progress.get("lastActivityDate"),
-                createdAt=progress.get("createdAt"),
-                updatedAt=progress.get("updatedAt")
-            )
+        # Try to get existing profile from client progress
+        profile = await _fetch_profile(userId)
+        if profile is not None:
+            profile_cache.put(profile)
+            leaderboards.record_profile(profile)
+            return profile
         
         # Create new profile
         logger.info(f"Creating new gamification profile for user {userId}")
@@ -108,6 +473,10 @@ async def save_gamification_profile(profile: GamificationProfile) -> bool:
     """
     Save a gamification profile to the backend.
     
+    With write-behind enabled (`PROFILE_FLUSH_INTERVAL` > 0) the profile is
+    cached and written by the next flush; otherwise it is written immediately.
+    The leaderboards are updated from the saved profile either way.
+    
     Args:
         profile: GamificationProfile to save
         
@@ -115,55 +484,14 @@ async def save_gamification_profile(profile: GamificationProfile) -> bool:
         bool: Success status
     """
     try:
-        # Convert to client progress format
-        client_progress_data = {
-            "userId": profile.userId,
-            "overallLevel": profile.overallLevel,
-            "experiencePoints": profile.experiencePoints,
-            "energyTokens": profile.energyTokens,
-            "strengthLevel": profile.strengthLevel,
-            "strengthExperiencePoints": profile.strengthExperiencePoints,
-            "cardioLevel": profile.cardioLevel,
-            "cardioExperiencePoints": profile.cardioExperiencePoints,
-            "flexibilityLevel": profile.flexibilityLevel,
-            "flexibilityExperiencePoints": profile.flexibilityExperiencePoints,
-            "balanceLevel": profile.balanceLevel,
-            "balanceExperiencePoints": profile.balanceExperiencePoints,
-            "coreLevel": profile.coreLevel,
-            "coreExperiencePoints": profile.coreExperiencePoints,
-            "nutritionLevel": profile.nutritionLevel,
-            "nutritionExperiencePoints": profile.nutritionExperiencePoints,
-            "recoveryLevel": profile.recoveryLevel,
-            "recoveryExperiencePoints": profile.recoveryExperiencePoints,
-            "communityLevel": profile.communityLevel,
-            "communityExperiencePoints": profile.communityExperiencePoints,
-            "streaks": profile.streaks,
-            "achievements": profile.achievements,
-            "achievementDates": profile.achievementDates,
-            "boardPosition": profile.boardPosition,
-            "workoutsCompleted": profile.workoutsCompleted,
-            "stretchesCompleted": profile.stretchesCompleted,
-            "foamRollsCompleted": profile.foamRollsCompleted,
-            "vitaminsLogged": profile.vitaminsLogged,
-            "greensLogged": profile.greensLogged,
-            "mealsLogged": profile.mealsLogged,
-            "proteinGoalsHit": profile.proteinGoalsHit,
-            "kindnessQuestsCompleted": profile.kindnessQuestsCompleted,
-            "goodDeedsReported": profile.goodDeedsReported,
-            "challengesCompleted": profile.challengesCompleted,
-            "totalSets": profile.totalSets,
-            "totalReps": profile.totalReps,
-            "lastActivityDate": profile.lastActivityDate.isoformat() if profile.lastActivityDate else None
-        }
+        leaderboards.record_profile(profile)
+        if profile_cache.write_behind:
+            profile_cache.save(profile)
+            return True
         
         # Update client progress via API
-        response = await make_api_request(
-            "PUT", 
-            f"/client-progress/{profile.userId}", 
-            data=client_progress_data
-        )
-        
-        return response.get("success", False)
+        await profile_cache.write_through(profile)
+        return True
     
     except Exception as e:
         logger.error(f"Error saving gamification profile: {str(e)}")
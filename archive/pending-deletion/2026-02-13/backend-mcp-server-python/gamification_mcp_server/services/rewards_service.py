@@ -1,25 +1,347 @@
 """
 Service for calculating and applying rewards.
+
+How each activity type is rewarded is declared once in `ACTIVITY_RULES`:
+base Energy Tokens and XP, how they scale, the categories the XP is split
+across, and the counter and streak the activity advances. The table is
+compiled at import into flat lookups (per activity type, the reward, XP
+and level fields of its categories), so calculating rewards is a handful
+of lookups rather than if/elif chains. Achievements are unlocked by the
+achievement engine from the values the activity changes. `calculate_rewards_bulk()` evaluates a whole queue of activities
+at once, scaling base rewards column-wise (vectorized with numpy when it is
+installed).
+
+Streak lengths normally come from the streak calendar (see
+`streak_service`), which counts calendar days; without it they are
+estimated from the profile's `lastActivityDate`.
 """
 
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from ..models import (
-    ActivityType, 
-    GamificationProfile, 
-    ActivityReward
+    ActivityType,
+    Challenge,
+    GamificationProfile,
+    ActivityReward,
+    LogActivityInput
 )
 from .profile_service import get_or_create_gamification_profile
+from .achievement_service import get_achievement_engine
 
 logger = logging.getLogger("gamification_mcp_server.rewards_service")
 
+# How base rewards scale: not at all, by duration, or by value (reps, sets)
+SCALE_NONE = None
+SCALE_DURATION = "duration"
+SCALE_VALUE = "value"
+
+# Duration-scaled rewards pay the base per 5 minutes, up to 5 times the base
+DURATION_UNIT = 5
+DURATION_CAP = 5
+
+CATEGORIES = ("strength", "cardio", "flexibility", "balance", "core", "nutrition", "recovery", "community")
+
+# Activity streak length → ET/XP bonus for activities that count toward it (first match wins)
+STREAK_BONUSES = ((7, 0.25), (3, 0.1))
+
+# Without the streak calendar, activities within this many hours continue the activity streak
+STREAK_GRACE_HOURS = 48
+
+# XP needed for the next level: base + per_level * current level
+OVERALL_LEVEL_CURVE = (100, 25)
+CATEGORY_LEVEL_CURVE = (50, 15)
+
+class ActivityRule(NamedTuple):
+    """How an activity type is rewarded."""
+    et: float
+    xp: float
+    categories: Tuple[str, ...] = ()
+    scaling: Optional[str] = SCALE_NONE
+    # Profile counter the activity increments
+    counter: Optional[str] = None
+    # Type-specific streak the activity extends
+    streak: Optional[str] = None
+    # Counts toward the activity streak and earns its bonus
+    activity_streak: bool = False
+
+ACTIVITY_RULES: Dict[ActivityType, ActivityRule] = {
+    ActivityType.WORKOUT: ActivityRule(
+        5, 50, ("strength", "cardio", "core"), counter="workoutsCompleted", activity_streak=True
+    ),
+    ActivityType.STRETCH: ActivityRule(
+        8, 30, ("flexibility", "recovery"), SCALE_DURATION, counter="stretchesCompleted",
+        streak="stretch", activity_streak=True
+    ),
+    ActivityType.FOAM_ROLL: ActivityRule(
+        8, 30, ("recovery",), SCALE_DURATION, counter="foamRollsCompleted",
+        streak="foam_roll", activity_streak=True
+    ),
+    ActivityType.LOG_VITAMIN: ActivityRule(10, 20, ("nutrition",), counter="vitaminsLogged", streak="vitamin"),
+    ActivityType.LOG_GREENS: ActivityRule(10, 20, ("nutrition",), counter="greensLogged", streak="greens"),
+    ActivityType.LOG_MEAL: ActivityRule(5, 10, ("nutrition",)),
+    ActivityType.HIT_PROTEIN_GOAL: ActivityRule(
+        8, 40, ("nutrition",), counter="proteinGoalsHit", streak="protein_goal"
+    ),
+    ActivityType.POST_WORKOUT_NUTRITION: ActivityRule(8, 30, ("nutrition",)),
+    ActivityType.KINDNESS_QUEST: ActivityRule(15, 40, ("community",), counter="kindnessQuestsCompleted"),
+    ActivityType.DAILY_GOOD_DEED: ActivityRule(5, 20, ("community",)),
+    ActivityType.SHARE_EXPERIENCE: ActivityRule(3, 10, ("community",)),
+    ActivityType.DAILY_LOGIN: ActivityRule(2, 5),
+    ActivityType.COMPLETE_CHALLENGE: ActivityRule(20, 100),
+    ActivityType.SET_COMPLETED: ActivityRule(1, 3, scaling=SCALE_VALUE),
+    ActivityType.REP_COMPLETED: ActivityRule(0.1, 0.5, scaling=SCALE_VALUE)
+}
+
+# Category → (reward field, profile XP field, profile level field)
+CATEGORY_FIELDS: Dict[str, Tuple[str, str, str]] = {
+    category: (f"{category}Xp", f"{category}ExperiencePoints", f"{category}Level")
+    for category in CATEGORIES
+}
+
+_SCALING_CODES = {SCALE_NONE: 0, SCALE_DURATION: 1, SCALE_VALUE: 2}
+
+class _CompiledRule(NamedTuple):
+    index: int
+    et: float
+    xp: float
+    scaling: int
+    # (category, reward field, profile XP field, profile level field)
+    category_fields: Tuple[Tuple[str, str, str, str], ...]
+    counter: Optional[str]
+    streak: Optional[str]
+    streak_path: Optional[str]
+    activity_streak: bool
+
+def compile_rules(rules: Mapping[ActivityType, ActivityRule]) -> Dict[ActivityType, _CompiledRule]:
+    """
+    Compile a rule table into lookups, validating it.
+    
+    Raises:
+        ValueError: If a rule names an unknown category, scaling or profile counter
+    """
+    compiled = {}
+    for index, (activity_type, rule) in enumerate(rules.items(), start=1):
+        unknown = [category for category in rule.categories if category not in CATEGORY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown categories {unknown} in reward rule for {activity_type.value}")
+        if rule.scaling not in _SCALING_CODES:
+            raise ValueError(f"Unknown scaling '{rule.scaling}' in reward rule for {activity_type.value}")
+        if rule.counter is not None and rule.counter not in GamificationProfile.__fields__:
+            raise ValueError(f"Unknown profile counter '{rule.counter}' in reward rule for {activity_type.value}")
+        compiled[activity_type] = _CompiledRule(
+            index=index,
+            et=rule.et,
+            xp=rule.xp,
+            scaling=_SCALING_CODES[rule.scaling],
+            category_fields=tuple((category, *CATEGORY_FIELDS[category])
+                                  for category in CATEGORIES if category in rule.categories),
+            counter=rule.counter,
+            streak=rule.streak,
+            streak_path=f"streaks.{rule.streak}" if rule.streak else None,
+            activity_streak=rule.activity_streak
+        )
+    return compiled
+
+# Activity types without a rule earn nothing
+_NO_RULE = _CompiledRule(0, 0, 0, 0, (), None, None, None, False)
+
+_RULES = compile_rules(ACTIVITY_RULES)
+
+# Every streak an activity can extend: the activity streak and the type-specific ones
+ACTIVITY_STREAK = "activity"
+STREAK_TYPES = (ACTIVITY_STREAK,) + tuple(sorted({rule.streak for rule in _RULES.values() if rule.streak}))
+
+def streak_types(activityType: ActivityType) -> Tuple[str, ...]:
+    """Streaks an activity type extends."""
+    rule = _RULES.get(activityType, _NO_RULE)
+    types = (ACTIVITY_STREAK,) if rule.activity_streak else ()
+    return types + ((rule.streak,) if rule.streak else ())
+
+# Values of the reward fields an activity doesn't set (the collections are always set)
+_REWARD_DEFAULTS = {
+    name: field.default for name, field in ActivityReward.__fields__.items() if field.default_factory is None
+}
+
+# Base rewards and scaling by rule index, for bulk evaluation
+_RULE_COLUMNS = [_NO_RULE] + sorted(_RULES.values(), key=lambda rule: rule.index)
+if np is not None:
+    _BASE_ET = np.array([rule.et for rule in _RULE_COLUMNS], dtype=np.float64)
+    _BASE_XP = np.array([rule.xp for rule in _RULE_COLUMNS], dtype=np.float64)
+    _SCALING = np.array([rule.scaling for rule in _RULE_COLUMNS], dtype=np.int64)
+
+def _scaled(rule: _CompiledRule, value: int, duration: Optional[int]) -> Tuple[float, float]:
+    """Base ET and XP scaled by duration or value, before the streak bonus."""
+    if rule.scaling == 1 and duration:
+        return (min(rule.et * (duration / DURATION_UNIT), rule.et * DURATION_CAP),
+                min(rule.xp * (duration / DURATION_UNIT), rule.xp * DURATION_CAP))
+    if rule.scaling == 2:
+        return rule.et * value, rule.xp * value
+    return rule.et, rule.xp
+
+def _scaled_columns(rules: List[_CompiledRule], activities: Sequence[LogActivityInput]) -> Tuple[List[float], List[float]]:
+    """_scaled() for every activity at once."""
+    if np is None or not activities:
+        scaled = [_scaled(rule, activity.value, activity.duration) for rule, activity in zip(rules, activities)]
+        return [et for et, _ in scaled], [xp for _, xp in scaled]
+    
+    count = len(activities)
+    index = np.fromiter((rule.index for rule in rules), dtype=np.int64, count=count)
+    values = np.fromiter((activity.value for activity in activities), dtype=np.float64, count=count)
+    durations = np.fromiter((activity.duration or 0 for activity in activities), dtype=np.float64, count=count)
+    scaling = _SCALING[index]
+    by_duration = (scaling == 1) & (durations != 0)
+    by_value = scaling == 2
+    
+    columns = []
+    for base in (_BASE_ET[index], _BASE_XP[index]):
+        scaled = np.where(by_duration, np.minimum(base * (durations / DURATION_UNIT), base * DURATION_CAP), base)
+        columns.append(np.where(by_value, base * values, scaled).tolist())
+    return columns[0], columns[1]
+
+def _streak_bonus(activity_streak: int) -> float:
+    for length, bonus in STREAK_BONUSES:
+        if activity_streak >= length:
+            return 1.0 + bonus
+    return 1.0
+
+def _evaluate(rule: _CompiledRule, profile: GamificationProfile, et: float, xp: float,
+              at: datetime, streak_lengths: Optional[Mapping[str, int]] = None) -> Dict[str, Any]:
+    """
+    Rewards for one activity with scaled base ET and XP, against the profile's current state.
+    
+    Returns the reward's field values rather than an `ActivityReward`:
+    validating the model would cost more than evaluating the rules.
+    """
+    streaks = profile.streaks
+    if streak_lengths is not None and ACTIVITY_STREAK in streak_lengths:
+        activity_streak = streak_lengths[ACTIVITY_STREAK]
+    else:
+        activity_streak = streaks.get(ACTIVITY_STREAK, 0)
+    bonus = _streak_bonus(activity_streak) if rule.activity_streak else 1.0
+    et_reward = round(et * bonus)
+    xp_reward = round(xp * bonus)
+    
+    fields = dict(_REWARD_DEFAULTS, energyTokens=et_reward, experiencePoints=xp_reward)
+    level_ups = {}
+    # New values by profile path, for the achievement engine
+    changes = {
+        "energyTokens": profile.energyTokens + et_reward,
+        "experiencePoints": profile.experiencePoints + xp_reward
+    }
+    
+    # Overall level
+    base, per_level = OVERALL_LEVEL_CURVE
+    if profile.experiencePoints + xp_reward >= base + profile.overallLevel * per_level:
+        level_ups["overall"] = changes["overallLevel"] = profile.overallLevel + 1
+    
+    # Category XP, split evenly, and category levels
+    if rule.category_fields:
+        share = round(xp_reward / len(rule.category_fields))
+        base, per_level = CATEGORY_LEVEL_CURVE
+        for category, reward_field, xp_field, level_field in rule.category_fields:
+            fields[reward_field] = share
+            if share > 0:
+                level = getattr(profile, level_field)
+                if getattr(profile, xp_field) + share >= base + level * per_level:
+                    level_ups[category] = changes[level_field] = level + 1
+    
+    # Counter
+    counters = {}
+    if rule.counter is not None:
+        counters[rule.counter] = 1
+        changes[rule.counter] = getattr(profile, rule.counter) + 1
+    
+    # Streaks
+    streak_updates = {}
+    if streak_lengths is not None:
+        # Calendar days, including this activity's
+        if rule.activity_streak:
+            streak_updates[ACTIVITY_STREAK] = changes["streaks.activity"] = streak_lengths[ACTIVITY_STREAK]
+        if rule.streak is not None:
+            streak_updates[rule.streak] = changes[rule.streak_path] = streak_lengths[rule.streak]
+    else:
+        if rule.activity_streak:
+            last = profile.lastActivityDate
+            if last is not None and (at - last).total_seconds() / 3600 < STREAK_GRACE_HOURS:
+                streak_updates[ACTIVITY_STREAK] = streaks.get(ACTIVITY_STREAK, 0) + 1
+            else:
+                streak_updates[ACTIVITY_STREAK] = 1
+            changes["streaks.activity"] = streak_updates[ACTIVITY_STREAK]
+        if rule.streak is not None:
+            streak_updates[rule.streak] = changes[rule.streak_path] = streaks.get(rule.streak, 0) + 1
+    
+    # Board movement is not calculated here, but would be handled by the roll dice function
+    fields["achievements"] = get_achievement_engine().unlocked(profile, changes)
+    fields["streakUpdates"] = streak_updates
+    fields["levelUps"] = level_ups
+    fields["counterUpdates"] = counters
+    return fields
+
+def calculate_rewards(
+    profile: GamificationProfile,
+    activityType: ActivityType,
+    value: int = 1,
+    duration: Optional[int] = None,
+    at: Optional[datetime] = None,
+    streaks: Optional[Mapping[str, int]] = None
+) -> ActivityReward:
+    """
+    Calculate rewards for an activity against a profile.
+    
+    Args:
+        profile: User's gamification profile (not modified)
+        activityType: Type of activity
+        value: Activity value (e.g., reps, sets)
+        duration: Activity duration in minutes (if applicable)
+        at: When the activity happened, for streaks (default: now)
+        streaks: Lengths in days of the activity's `streak_types()`, including
+            this activity, from the streak calendar (default: estimated from the profile)
+    
+    Returns:
+        ActivityReward: Calculated rewards
+    """
+    rule = _RULES.get(activityType, _NO_RULE)
+    et, xp = _scaled(rule, value, duration)
+    # Every field is computed with the right type, so validation is skipped
+    return ActivityReward.construct(**_evaluate(rule, profile, et, xp, at or datetime.now(), streaks))
+
+def calculate_challenge_rewards(
+    profile: GamificationProfile,
+    challenge: Challenge,
+    at: Optional[datetime] = None
+) -> ActivityReward:
+    """
+    Calculate rewards for completing a challenge against a profile.
+    
+    The `COMPLETE_CHALLENGE` rule's rewards plus the challenge's own
+    Energy Tokens and XP, evaluated together so level-ups and achievements
+    account for all of it.
+    
+    Args:
+        profile: User's gamification profile (not modified)
+        challenge: Completed challenge
+        at: When it was completed (default: now)
+    
+    Returns:
+        ActivityReward: Calculated rewards
+    """
+    rule = _RULES.get(ActivityType.COMPLETE_CHALLENGE, _NO_RULE)
+    et = rule.et + challenge.rewardEt
+    xp = rule.xp + challenge.rewardXp
+    return ActivityReward.construct(**_evaluate(rule, profile, et, xp, at or datetime.now()))
+
 async def calculate_activity_rewards(
-    userId: str, 
-    activityType: ActivityType, 
-    value: int = 1, 
-    duration: Optional[int] = None, 
+    userId: str,
+    activityType: ActivityType,
+    value: int = 1,
+    duration: Optional[int] = None,
     metadata: Optional[Dict[str, Any]] = None
 ) -> ActivityReward:
     """
@@ -31,236 +353,46 @@ async def calculate_activity_rewards(
         value: Activity value (e.g., reps, sets)
         duration: Activity duration in minutes (if applicable)
         metadata: Additional activity metadata
-        
+    
     Returns:
         ActivityReward: Calculated rewards
     """
-    # Initialize reward object
-    rewards = ActivityReward()
-    
     # Get user profile for level-based calculations
     profile = await get_or_create_gamification_profile(userId)
+    return calculate_rewards(profile, activityType, value, duration)
+
+def calculate_rewards_bulk(
+    profiles: Mapping[str, GamificationProfile],
+    activities: Sequence[LogActivityInput]
+) -> List[Dict[str, Any]]:
+    """
+    Calculate and apply rewards for a queue of activities at once.
     
-    # Base reward values (these could be moved to config/database later)
-    reward_config = {
-        ActivityType.WORKOUT: {"et": 5, "xp": 50, "categories": ["strength", "cardio", "core"]},
-        ActivityType.STRETCH: {"et": 8, "xp": 30, "categories": ["flexibility", "recovery"]},
-        ActivityType.FOAM_ROLL: {"et": 8, "xp": 30, "categories": ["recovery"]},
-        ActivityType.LOG_VITAMIN: {"et": 10, "xp": 20, "categories": ["nutrition"]},
-        ActivityType.LOG_GREENS: {"et": 10, "xp": 20, "categories": ["nutrition"]},
-        ActivityType.LOG_MEAL: {"et": 5, "xp": 10, "categories": ["nutrition"]},
-        ActivityType.HIT_PROTEIN_GOAL: {"et": 8, "xp": 40, "categories": ["nutrition"]},
-        ActivityType.POST_WORKOUT_NUTRITION: {"et": 8, "xp": 30, "categories": ["nutrition"]},
-        ActivityType.KINDNESS_QUEST: {"et": 15, "xp": 40, "categories": ["community"]},
-        ActivityType.DAILY_GOOD_DEED: {"et": 5, "xp": 20, "categories": ["community"]},
-        ActivityType.SHARE_EXPERIENCE: {"et": 3, "xp": 10, "categories": ["community"]},
-        ActivityType.DAILY_LOGIN: {"et": 2, "xp": 5, "categories": []},
-        ActivityType.COMPLETE_CHALLENGE: {"et": 20, "xp": 100, "categories": []},
-        ActivityType.SET_COMPLETED: {"et": 1, "xp": 3, "categories": []},
-        ActivityType.REP_COMPLETED: {"et": 0.1, "xp": 0.5, "categories": []}
-    }
-    
-    # Get base rewards for this activity type
-    base_reward = reward_config.get(activityType, {"et": 0, "xp": 0, "categories": []})
-    
-    # Calculate Energy Tokens (ET)
-    et_reward = base_reward["et"]
-    
-    # Scale rewards by value/duration if applicable
-    if activityType in [ActivityType.STRETCH, ActivityType.FOAM_ROLL] and duration:
-        # Scale by minutes but cap at reasonable amount
-        et_reward = min(base_reward["et"] * (duration / 5), base_reward["et"] * 5)
-    elif activityType in [ActivityType.SET_COMPLETED, ActivityType.REP_COMPLETED]:
-        # Scale directly by value (e.g., number of reps)
-        et_reward = base_reward["et"] * value
-    
-    # Apply bonuses based on streaks and other factors
-    streak_bonus = 1.0  # Base multiplier
-    
-    # Check for streak bonuses
-    if activityType in [ActivityType.WORKOUT, ActivityType.STRETCH, ActivityType.FOAM_ROLL]:
-        activity_streak = profile.streaks.get("activity", 0)
-        if activity_streak >= 7:
-            streak_bonus += 0.25  # +25% for 7+ day streak
-        elif activity_streak >= 3:
-            streak_bonus += 0.1   # +10% for 3+ day streak
-    
-    # Apply multipliers
-    et_reward = round(et_reward * streak_bonus)
-    
-    # Calculate Experience Points (XP)
-    xp_reward = base_reward["xp"]
-    
-    # Scale XP similarly to ET
-    if activityType in [ActivityType.STRETCH, ActivityType.FOAM_ROLL] and duration:
-        xp_reward = min(base_reward["xp"] * (duration / 5), base_reward["xp"] * 5)
-    elif activityType in [ActivityType.SET_COMPLETED, ActivityType.REP_COMPLETED]:
-        xp_reward = base_reward["xp"] * value
-    
-    # Apply XP bonus
-    xp_reward = round(xp_reward * streak_bonus)
-    
-    # Assign the base rewards
-    rewards.energyTokens = et_reward
-    rewards.experiencePoints = xp_reward
-    
-    # Distribute category-specific XP
-    for category in base_reward["categories"]:
-        category_xp = round(xp_reward / len(base_reward["categories"]))
-        
-        if category == "strength":
-            rewards.strengthXp = category_xp
-        elif category == "cardio":
-            rewards.cardioXp = category_xp
-        elif category == "flexibility":
-            rewards.flexibilityXp = category_xp
-        elif category == "balance":
-            rewards.balanceXp = category_xp
-        elif category == "core":
-            rewards.coreXp = category_xp
-        elif category == "nutrition":
-            rewards.nutritionXp = category_xp
-        elif category == "recovery":
-            rewards.recoveryXp = category_xp
-        elif category == "community":
-            rewards.communityXp = category_xp
-    
-    # Check for achievements (simplified example)
-    # This would actually be a much more complex database lookup and check
-    if activityType == ActivityType.WORKOUT:
-        profile.workoutsCompleted += 1
-        if profile.workoutsCompleted == 10:
-            rewards.achievements.append("workout_warrior_bronze")
-        elif profile.workoutsCompleted == 50:
-            rewards.achievements.append("workout_warrior_silver")
-        elif profile.workoutsCompleted == 100:
-            rewards.achievements.append("workout_warrior_gold")
-    elif activityType == ActivityType.STRETCH:
-        profile.stretchesCompleted += 1
-        if profile.stretchesCompleted == 10:
-            rewards.achievements.append("flexibility_fan_bronze")
-    elif activityType == ActivityType.FOAM_ROLL:
-        profile.foamRollsCompleted += 1
-        if profile.foamRollsCompleted == 10:
-            rewards.achievements.append("recovery_ritualist_bronze")
-    elif activityType == ActivityType.LOG_VITAMIN:
-        profile.vitaminsLogged += 1
-        if profile.vitaminsLogged == 10:
-            rewards.achievements.append("vitamin_virtuoso_bronze")
-    elif activityType == ActivityType.LOG_GREENS:
-        profile.greensLogged += 1
-        if profile.greensLogged == 10:
-            rewards.achievements.append("greens_guru_bronze")
-    elif activityType == ActivityType.HIT_PROTEIN_GOAL:
-        profile.proteinGoalsHit += 1
-        if profile.proteinGoalsHit == 10:
-            rewards.achievements.append("protein_pro_bronze")
-    elif activityType == ActivityType.KINDNESS_QUEST:
-        profile.kindnessQuestsCompleted += 1
-        if profile.kindnessQuestsCompleted == 5:
-            rewards.achievements.append("community_champion_bronze")
-    
-    # Update streaks
-    streak_updates = {}
-    
-    # Activity streak (any workout, stretch, foam roll)
-    if activityType in [ActivityType.WORKOUT, ActivityType.STRETCH, ActivityType.FOAM_ROLL]:
-        # Check if it's been less than 48 hours since last activity
-        # This gives a 1-day grace period for streaks
-        if profile.lastActivityDate:
-            hours_since_last = (datetime.now() - profile.lastActivityDate).total_seconds() / 3600
-            if hours_since_last < 48:
-                streak_updates["activity"] = profile.streaks.get("activity", 0) + 1
-            else:
-                streak_updates["activity"] = 1  # Reset streak to 1
-        else:
-            streak_updates["activity"] = 1  # First activity
-    
-    # Specific activity type streaks
-    if activityType == ActivityType.STRETCH:
-        streak_updates["stretch"] = profile.streaks.get("stretch", 0) + 1
-    elif activityType == ActivityType.FOAM_ROLL:
-        streak_updates["foam_roll"] = profile.streaks.get("foam_roll", 0) + 1
-    elif activityType == ActivityType.LOG_VITAMIN:
-        streak_updates["vitamin"] = profile.streaks.get("vitamin", 0) + 1
-    elif activityType == ActivityType.LOG_GREENS:
-        streak_updates["greens"] = profile.streaks.get("greens", 0) + 1
-    elif activityType == ActivityType.HIT_PROTEIN_GOAL:
-        streak_updates["protein_goal"] = profile.streaks.get("protein_goal", 0) + 1
-    
-    rewards.streakUpdates = streak_updates
-    
-    # Calculate level ups based on XP gains
-    level_ups = {}
-    
-    # Overall level
-    total_xp = profile.experiencePoints + rewards.experiencePoints
-    xp_needed_overall = 100 + (profile.overallLevel * 25)
-    if total_xp >= xp_needed_overall:
-        level_ups["overall"] = profile.overallLevel + 1
-    
-    # Category levels
-    # Strength
-    if rewards.strengthXp > 0:
-        total_strength_xp = profile.strengthExperiencePoints + rewards.strengthXp
-        xp_needed_strength = 50 + (profile.strengthLevel * 15)
-        if total_strength_xp >= xp_needed_strength:
-            level_ups["strength"] = profile.strengthLevel + 1
-    
-    # Cardio
-    if rewards.cardioXp > 0:
-        total_cardio_xp = profile.cardioExperiencePoints + rewards.cardioXp
-        xp_needed_cardio = 50 + (profile.cardioLevel * 15)
-        if total_cardio_xp >= xp_needed_cardio:
-            level_ups["cardio"] = profile.cardioLevel + 1
-    
-    # Flexibility
-    if rewards.flexibilityXp > 0:
-        total_flexibility_xp = profile.flexibilityExperiencePoints + rewards.flexibilityXp
-        xp_needed_flexibility = 50 + (profile.flexibilityLevel * 15)
-        if total_flexibility_xp >= xp_needed_flexibility:
-            level_ups["flexibility"] = profile.flexibilityLevel + 1
-    
-    # Balance
-    if rewards.balanceXp > 0:
-        total_balance_xp = profile.balanceExperiencePoints + rewards.balanceXp
-        xp_needed_balance = 50 + (profile.balanceLevel * 15)
-        if total_balance_xp >= xp_needed_balance:
-            level_ups["balance"] = profile.balanceLevel + 1
-    
-    # Core
-    if rewards.coreXp > 0:
-        total_core_xp = profile.coreExperiencePoints + rewards.coreXp
-        xp_needed_core = 50 + (profile.coreLevel * 15)
-        if total_core_xp >= xp_needed_core:
-            level_ups["core"] = profile.coreLevel + 1
-    
-    # Nutrition
-    if rewards.nutritionXp > 0:
-        total_nutrition_xp = profile.nutritionExperiencePoints + rewards.nutritionXp
-        xp_needed_nutrition = 50 + (profile.nutritionLevel * 15)
-        if total_nutrition_xp >= xp_needed_nutrition:
-            level_ups["nutrition"] = profile.nutritionLevel + 1
-    
-    # Recovery
-    if rewards.recoveryXp > 0:
-        total_recovery_xp = profile.recoveryExperiencePoints + rewards.recoveryXp
-        xp_needed_recovery = 50 + (profile.recoveryLevel * 15)
-        if total_recovery_xp >= xp_needed_recovery:
-            level_ups["recovery"] = profile.recoveryLevel + 1
-    
-    # Community
-    if rewards.communityXp > 0:
-        total_community_xp = profile.communityExperiencePoints + rewards.communityXp
-        xp_needed_community = 50 + (profile.communityLevel * 15)
-        if total_community_xp >= xp_needed_community:
-            level_ups["community"] = profile.communityLevel + 1
-    
-    rewards.levelUps = level_ups
+    Base rewards are scaled for the whole queue in one columnar pass; the
+    streak bonus, levels, counters and streaks are then evaluated in order,
+    applying each activity's rewards to its user's profile before the next,
+    so the results match calling calculate_rewards() and apply_rewards()
+    for every activity in turn. Rewards are returned as field values (as
+    from `ActivityReward.dict()`), which is what the activity ledger stores.
     
-    # Board movement is not calculated here, but would be handled by the roll dice function
+    Args:
+        profiles: Profiles by user ID, for every user in the queue (updated in place)
+        activities: Activities in the order they happened; each is dated by its timestamp
     
-    return rewards
+    Returns:
+        Reward field values for every activity, in order
+    """
+    rules = [_RULES.get(activity.activityType, _NO_RULE) for activity in activities]
+    et_column, xp_column = _scaled_columns(rules, activities)
+    
+    results = []
+    for rule, activity, et, xp in zip(rules, activities, et_column, xp_column):
+        profile = profiles[activity.userId]
+        at = activity.timestamp or datetime.now()
+        rewards = _evaluate(rule, profile, et, xp, at)
+        _apply(profile, rewards, at)
+        results.append(rewards)
+    return results
 
 async def apply_rewards_to_profile(profile: GamificationProfile, rewards: ActivityReward) -> GamificationProfile:
     """
@@ -269,69 +401,72 @@ async def apply_rewards_to_profile(profile: GamificationProfile, rewards: Activi
     Args:
         profile: User's gamification profile
         rewards: Rewards to apply
-        
+    
+    Returns:
+        Updated GamificationProfile
+    """
+    return apply_rewards(profile, rewards)
+
+def apply_rewards(profile: GamificationProfile, rewards: ActivityReward,
+                  at: Optional[datetime] = None) -> GamificationProfile:
+    """
+    Apply rewards to a gamification profile as of a given time.
+    
+    Deterministic for a given `at`, so the activity ledger can replay it.
+    
+    Args:
+        profile: User's gamification profile (updated in place)
+        rewards: Rewards to apply
+        at: When the rewards were earned (default: now)
+    
     Returns:
         Updated GamificationProfile
     """
+    return _apply(profile, dict(rewards), at or datetime.now())
+
+def _apply(profile: GamificationProfile, rewards: Mapping[str, Any], at: datetime) -> GamificationProfile:
+    """apply_rewards() for reward field values."""
     # Update Energy Tokens and Experience Points
-    profile.energyTokens += rewards.energyTokens
-    profile.experiencePoints += rewards.experiencePoints
+    profile.energyTokens += rewards["energyTokens"]
+    profile.experiencePoints += rewards["experiencePoints"]
     
     # Update category-specific XP
-    profile.strengthExperiencePoints += rewards.strengthXp
-    profile.cardioExperiencePoints += rewards.cardioXp
-    profile.flexibilityExperiencePoints += rewards.flexibilityXp
-    profile.balanceExperiencePoints += rewards.balanceXp
-    profile.coreExperiencePoints += rewards.coreXp
-    profile.nutritionExperiencePoints += rewards.nutritionXp
-    profile.recoveryExperiencePoints += rewards.recoveryXp
-    profile.communityExperiencePoints += rewards.communityXp
+    for reward_field, xp_field, _ in CATEGORY_FIELDS.values():
+        gained = rewards[reward_field]
+        if gained:
+            setattr(profile, xp_field, getattr(profile, xp_field) + gained)
+    
+    # Update activity counters
+    for counter, amount in rewards["counterUpdates"].items():
+        setattr(profile, counter, getattr(profile, counter) + amount)
     
     # Apply streak updates
-    for streak_type, value in rewards.streakUpdates.items():
+    for streak_type, value in rewards["streakUpdates"].items():
         profile.streaks[streak_type] = value
     
     # Apply level ups
-    for level_type, new_level in rewards.levelUps.items():
+    for level_type, new_level in rewards["levelUps"].items():
         if level_type == "overall":
             profile.overallLevel = new_level
-        elif level_type == "strength":
-            profile.strengthLevel = new_level
-            profile.strengthExperiencePoints = 0  # Reset XP after level up
-        elif level_type == "cardio":
-            profile.cardioLevel = new_level
-            profile.cardioExperiencePoints = 0
-        elif level_type == "flexibility":
-            profile.flexibilityLevel = new_level
-            profile.flexibilityExperiencePoints = 0
-        elif level_type == "balance":
-            profile.balanceLevel = new_level
-            profile.balanceExperiencePoints = 0
-        elif level_type == "core":
-            profile.coreLevel = new_level
-            profile.coreExperiencePoints = 0
-        elif level_type == "nutrition":
-            profile.nutritionLevel = new_level
-            profile.nutritionExperiencePoints = 0
-        elif level_type == "recovery":
-            profile.recoveryLevel = new_level
-            profile.recoveryExperiencePoints = 0
-        elif level_type == "community":
-            profile.communityLevel = new_level
-            profile.communityExperiencePoints = 0
+            continue
+        fields = CATEGORY_FIELDS.get(level_type)
+        if fields is not None:
+            _, xp_field, level_field = fields
+            setattr(profile, level_field, new_level)
+            setattr(profile, xp_field, 0)  # Reset XP after level up
     
     # Add achievements
-    for achievement in rewards.achievements:
+    for achievement in rewards["achievements"]:
         if achievement not in profile.achievements:
             profile.achievements.append(achievement)
-            profile.achievementDates[achievement] = datetime.now().isoformat()
+            profile.achievementDates[achievement] = at.isoformat()
     
     # Update board position if needed
-    if rewards.boardMovement > 0:
-        profile.boardPosition += rewards.boardMovement
+    if rewards["boardMovement"] > 0:
+        profile.boardPosition += rewards["boardMovement"]
     
     # Update lastActivityDate
-    profile.lastActivityDate = datetime.now()
-    profile.updatedAt = datetime.now()
+    profile.lastActivityDate = at
+    profile.updatedAt = at
     
     return profile
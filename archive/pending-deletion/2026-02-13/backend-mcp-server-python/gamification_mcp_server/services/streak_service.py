@@ -0,0 +1,271 @@
+"""
+Service for the streak calendar.
+
+Streaks used to be counted from the profile alone: the activity streak
+continued if the last activity was within 48 hours, and a type-specific
+streak (`stretch`, `vitamin`, ...) grew with every log, however many on
+one day. The calendar keeps, per user and streak type, a `DayBitmap` of
+the days it was extended, in a local SQLite file (`STREAK_PATH`). A
+streak is the run of consecutive days ending today (or yesterday, until
+today is over), so it grows once per day, and the current and longest
+streak and the active days in a window are bit operations on the bitmap.
+
+A bitmap is written when a new day is marked, so at most once per day
+per user and streak type. Users' calendars are cached, up to
+`STREAK_CACHE_MAX_USERS`. `backfill()` builds the calendars of users whose
+activities predate it from the activity ledger; see `replay_ledger.py`.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import ActivityType
+from ..utils import config
+from ..utils.day_bitmap import DayBitmap
+from .rewards_service import STREAK_TYPES, streak_types
+from .ledger_service import activity_ledger, ActivityLedger, EVENT_ACTIVITY
+
+logger = logging.getLogger("gamification_mcp_server.streak_service")
+
+DEFAULT_STREAK_PATH = Path(__file__).parent.parent / "data" / "streaks.sqlite3"
+
+# Users whose calendars are written together during a backfill
+_BACKFILL_BATCH = 1000
+
+class StreakCalendar:
+    """Per-user, per-streak-type day bitmaps, backed by a local SQLite file."""
+    
+    def __init__(self, path: Optional[str] = None, max_users: int = 10000):
+        """
+        Args:
+            path: SQLite file (default: data/streaks.sqlite3 in the server directory)
+            max_users: Users whose calendars are kept in memory
+        """
+        self.path = Path(path) if path else DEFAULT_STREAK_PATH
+        self.max_users = max_users
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # User ID → streak type → bitmap, least recently used first
+        self._users: "OrderedDict[str, Dict[str, DayBitmap]]" = OrderedDict()
+        self._counts = {"hits": 0, "misses": 0, "daysMarked": 0, "failures": 0}
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS streak_days ("
+                "user_id TEXT NOT NULL, streak_type TEXT NOT NULL, origin INTEGER NOT NULL, "
+                "bits BLOB NOT NULL, PRIMARY KEY (user_id, streak_type))"
+            )
+            self._conn = conn
+        return self._conn
+    
+    def _read(self, conn: sqlite3.Connection, user_id: str) -> Dict[str, DayBitmap]:
+        rows = conn.execute(
+            "SELECT streak_type, origin, bits FROM streak_days WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        return {streak_type: DayBitmap.from_bytes(origin, bits) for streak_type, origin, bits in rows}
+    
+    def _write(self, conn: sqlite3.Connection, rows: Iterable[Tuple[str, str, DayBitmap]]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO streak_days VALUES (?, ?, ?, ?)",
+            [(user_id, streak_type, bitmap.origin, bitmap.to_bytes()) for user_id, streak_type, bitmap in rows]
+        )
+    
+    def _calendar(self, user_id: str) -> Dict[str, DayBitmap]:
+        """A user's bitmaps by streak type, loading them if they aren't cached."""
+        calendar = self._users.get(user_id)
+        if calendar is not None:
+            self._users.move_to_end(user_id)
+            self._counts["hits"] += 1
+            return calendar
+        self._counts["misses"] += 1
+        with self._lock:
+            calendar = self._read(self._connection(), user_id)
+        self._users[user_id] = calendar
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return calendar
+    
+    def record(self, user_id: str, types: Sequence[str], at: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Mark a day on some of a user's streaks.
+        
+        A new day is added to the calendar as stored, not as cached, so
+        days backfilled by another process are kept.
+        
+        Args:
+            user_id: User ID
+            types: Streak types to extend
+            at: When (default: now)
+        
+        Returns:
+            The streaks' lengths in days, including this one
+        
+        Raises:
+            sqlite3.Error: If a new day couldn't be saved; the stored calendar is unchanged
+        """
+        day = (at or datetime.now()).date()
+        calendar = self._calendar(user_id)
+        unmarked = [streak_type for streak_type in types if day not in calendar.get(streak_type, DayBitmap())]
+        
+        if unmarked:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    calendar = self._read(conn, user_id)
+                    rows = []
+                    for streak_type in unmarked:
+                        bitmap = calendar.setdefault(streak_type, DayBitmap())
+                        bitmap.add(day)
+                        rows.append((user_id, streak_type, bitmap))
+                    self._write(conn, rows)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    self._counts["failures"] += 1
+                    raise
+            if user_id in self._users:
+                self._users[user_id] = calendar
+            self._counts["daysMarked"] += len(unmarked)
+        return {streak_type: calendar[streak_type].current_run(day) for streak_type in types}
+    
+    def record_activity(self, user_id: str, activity_type: ActivityType,
+                        at: Optional[datetime] = None) -> Optional[Dict[str, int]]:
+        """
+        Mark the streaks an activity extends, for `calculate_rewards()`.
+        
+        Failures are logged rather than raised, and the rewards fall back
+        to the profile's streaks.
+        
+        Returns:
+            The activity's streak lengths, or None if it extends no streak or the calendar failed
+        """
+        types = streak_types(activity_type)
+        if not types:
+            return None
+        try:
+            return self.record(user_id, types, at)
+        except Exception as e:
+            logger.error(f"Failed to record streak days for user {user_id}: {str(e)}")
+            return None
+    
+    def types(self, user_id: str) -> List[str]:
+        """Streak types a user has extended, in `STREAK_TYPES` order."""
+        calendar = self._calendar(user_id)
+        return [streak_type for streak_type in STREAK_TYPES if calendar.get(streak_type)]
+    
+    def history(self, user_id: str, streak_type: str, days: int = 30,
+                end: Optional[date] = None) -> Dict[str, Any]:
+        """
+        A user's streak and its days over a window.
+        
+        Args:
+            user_id: User ID
+            streak_type: One of `STREAK_TYPES`
+            days: Days in the window
+            end: Last day of the window (default: today)
+        
+        Returns:
+            Current and longest streak, active days in the window, the last
+            active day and the active days in the window
+        
+        Raises:
+            ValueError: If the streak type is unknown
+        """
+        if streak_type not in STREAK_TYPES:
+            raise ValueError(f"Unknown streak type {streak_type}")
+        end = end or date.today()
+        start = end - timedelta(days=days - 1)
+        bitmap = self._calendar(user_id).get(streak_type) or DayBitmap()
+        return {
+            "streakType": streak_type,
+            "currentStreak": bitmap.current_run(end),
+            "longestStreak": bitmap.longest_run(),
+            "activeDays": bitmap.count(start, end),
+            "days": days,
+            "lastActiveDate": bitmap.last_day(),
+            "activeDates": bitmap.days(start, end)
+        }
+    
+    def backfill(self, ledger: Optional[ActivityLedger] = None, user_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Mark the days of every activity in the activity ledger.
+        
+        Days are added to the calendars already stored, so a backfill can
+        be repeated, or run alongside the server. Events are read grouped
+        by user, and calendars are written a batch of users at a time.
+        
+        Args:
+            ledger: Ledger to read (default: the server's)
+            user_ids: Only backfill these users (default: everyone in the ledger)
+        
+        Returns:
+            Report with users and events read, and days newly marked
+        """
+        ledger = ledger or activity_ledger
+        only = set(user_ids) if user_ids is not None else None
+        report = {"users": 0, "events": 0, "daysMarked": 0}
+        # User ID → streak type → days from the ledger, for the current batch
+        pending: Dict[str, Dict[str, DayBitmap]] = {}
+        
+        for user_id, payload, at in ledger.scan(EVENT_ACTIVITY):
+            if only is not None and user_id not in only:
+                continue
+            types = streak_types(ActivityType(payload["input"]["activityType"]))
+            if not types:
+                continue
+            if user_id not in pending:
+                if len(pending) >= _BACKFILL_BATCH:
+                    report["daysMarked"] += self._merge(pending)
+                    pending = {}
+                pending[user_id] = {}
+                report["users"] += 1
+            for streak_type in types:
+                pending[user_id].setdefault(streak_type, DayBitmap()).add(at.date())
+            report["events"] += 1
+        report["daysMarked"] += self._merge(pending)
+        
+        logger.info(f"Backfilled streaks of {report['users']} users from {report['events']} ledger events "
+                    f"({report['daysMarked']} days marked)")
+        return report
+    
+    def _merge(self, backfilled: Dict[str, Dict[str, DayBitmap]]) -> int:
+        """Add backfilled days to the stored calendars in one transaction; returns days newly marked."""
+        marked = 0
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = []
+                for user_id, calendar in backfilled.items():
+                    stored = self._read(conn, user_id)
+                    for streak_type, bitmap in calendar.items():
+                        merged = stored.get(streak_type) or DayBitmap()
+                        before = len(merged)
+                        if merged.merge(bitmap):
+                            marked += len(merged) - before
+                            rows.append((user_id, streak_type, merged))
+                self._write(conn, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        # Cached calendars are stale now
+        for user_id in backfilled:
+            self._users.pop(user_id, None)
+        return marked
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Cached users, cache hits and misses, and days marked."""
+        return {"cachedUsers": len(self._users), **self._counts}
+
+streak_calendar = StreakCalendar(config.get('STREAK_PATH'), max_users=config.get('STREAK_CACHE_MAX_USERS'))
@@ -11,14 +11,22 @@ from pathlib import Path
 current_dir = Path(__file__).parent.parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
+if str(current_dir.parent) not in sys.path:
+    sys.path.insert(0, str(current_dir.parent))
 
+# Import the tools by their package path so they (and the services they use)
+# are the same module instances main.py flushes and reports on
 try:
-    from tools.activity_tool import log_activity
-    from tools.profile_tool import get_gamification_profile
-    from tools.achievement_tool import get_user_achievements
-    from tools.board_tool import get_board_position, roll_dice_and_move
-    from tools.challenge_tool import get_user_challenges, join_challenge
-    from tools.kindness_tool import get_available_kindness_quests
+    from gamification_mcp_server.tools.activity_tool import log_activity
+    from gamification_mcp_server.tools.profile_tool import get_gamification_profile
+    from gamification_mcp_server.tools.achievement_tool import get_user_achievements
+    from gamification_mcp_server.tools.board_tool import get_board_position, roll_dice_and_move
+    from gamification_mcp_server.tools.challenge_tool import get_user_challenges, join_challenge
+    from gamification_mcp_server.tools.kindness_tool import get_available_kindness_quests
+    from gamification_mcp_server.tools.leaderboard_tool import get_leaderboard
+    from gamification_mcp_server.tools.streak_tool import get_streak_history
+    from gamification_mcp_server.tools.batch_tool import run_tool_batch
+    from gamification_mcp_server.tools.ingest_tool import ingest_activity_stream
 except ImportError as e:
     # If absolute imports fail, try relative imports as fallback
     try:
@@ -28,6 +36,10 @@ except ImportError as e:
         from .board_tool import get_board_position, roll_dice_and_move
         from .challenge_tool import get_user_challenges, join_challenge
         from .kindness_tool import get_available_kindness_quests
+        from .leaderboard_tool import get_leaderboard
+        from .streak_tool import get_streak_history
+        from .batch_tool import run_tool_batch
+        from .ingest_tool import ingest_activity_stream
     except ImportError as e2:
         print(f"Error importing gamification tools: {e} / {e2}")
         # Create placeholder functions if imports fail
@@ -47,6 +59,14 @@ except ImportError as e:
             return {"error": "Join challenge tool not available"}
         async def get_available_kindness_quests(input_data):
             return {"error": "Kindness quests tool not available"}
+        async def get_leaderboard(input_data):
+            return {"error": "Leaderboard tool not available"}
+        async def get_streak_history(input_data):
+            return {"error": "Streak history tool not available"}
+        async def run_tool_batch(input_data, registry, write_tools):
+            return {"error": "Batch tool not available"}
+        async def ingest_activity_stream(chunks):
+            yield '{"error": "Activity stream tool not available"}\n'
 
 __all__ = [
     'log_activity',
@@ -56,5 +76,9 @@ __all__ = [
     'roll_dice_and_move',
     'get_user_challenges',
     'join_challenge',
-    'get_available_kindness_quests'
+    'get_available_kindness_quests',
+    'get_leaderboard',
+    'get_streak_history',
+    'run_tool_batch',
+    'ingest_activity_stream'
 ]
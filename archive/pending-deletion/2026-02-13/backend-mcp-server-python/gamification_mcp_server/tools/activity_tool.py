@@ -3,18 +3,28 @@ MCP Tool for logging activities.
 """
 
 import logging
+from typing import Dict, Tuple
 from fastapi import HTTPException, status
 
 from ..models import (
+    ActivityReward,
+    GamificationProfile,
     LogActivityInput,
     LogActivityOutput
 )
 from ..services import (
     get_or_create_gamification_profile,
-    calculate_activity_rewards,
+    calculate_rewards,
+    calculate_challenge_rewards,
     apply_rewards_to_profile,
-    save_gamification_profile
+    save_gamification_profile,
+    get_challenge_by_id,
+    participations,
+    streak_calendar,
+    user_actors
 )
+from ..services.ledger_service import activity_ledger, EVENT_ACTIVITY, EVENT_CHALLENGE_COMPLETE
+from ..utils import idempotency_store
 
 logger = logging.getLogger("gamification_mcp_server.tools.activity_tool")
 
@@ -30,65 +40,155 @@ async def log_activity(input_data: LogActivityInput) -> LogActivityOutput:
     - Rep and set tracking
     
     It calculates appropriate rewards, updates achievements, streaks,
-    and progression across all gamification elements.
+    and progression across all gamification elements, and advances the
+    user's progress in the challenges they joined, awarding any challenge
+    the activity completes.
+
+    Retries are safe: a retry with the same `idempotencyKey` returns the
+    first call's rewards without awarding them again. Calls without a key
+    are never deduplicated, so each identical set or meal logged counts.
     """
     try:
-        # Get user profile
-        profile = await get_or_create_gamification_profile(input_data.userId)
-        
-        # Calculate rewards
-        rewards = await calculate_activity_rewards(
-            input_data.userId,
-            input_data.activityType,
-            input_data.value,
-            input_data.duration,
-            input_data.metadata
+        # An unset timestamp defaults to now, so it is left out of the fingerprint
+        return await idempotency_store.run(
+            "LogActivity",
+            input_data.dict(exclude={"idempotencyKey"}, exclude_unset=True),
+            lambda: record_activity(input_data),
+            key=input_data.idempotencyKey,
+            model=LogActivityOutput
         )
-        
-        # Apply rewards to profile
-        updated_profile = await apply_rewards_to_profile(profile, rewards)
-        
-        # Save updated profile
-        await save_gamification_profile(updated_profile)
-        
-        # Build success message
-        message_parts = []
-        
-        # Add basic rewards
-        if rewards.energyTokens > 0:
-            message_parts.append(f"+{rewards.energyTokens} Energy Tokens")
-        if rewards.experiencePoints > 0:
-            message_parts.append(f"+{rewards.experiencePoints} XP")
-        
-        # Add level ups
-        for level_type, level in rewards.levelUps.items():
-            message_parts.append(f"{level_type.title()} Level Up to {level}!")
-        
-        # Add achievements
-        for achievement in rewards.achievements:
-            message_parts.append(f"Achievement Unlocked: {achievement.replace('_', ' ').title()}")
-        
-        # Add streak updates
-        for streak_type, value in rewards.streakUpdates.items():
-            if value >= 5:  # Only mention significant streaks
-                message_parts.append(f"{streak_type.title()} Streak: {value} days")
-        
-        # Combine into message
-        if message_parts:
-            message = "Activity logged! " + " • ".join(message_parts)
-        else:
-            message = "Activity logged successfully."
-        
-        return LogActivityOutput(
-            success=True,
-            profile=updated_profile,
-            rewards=rewards,
-            message=message
-        )
-        
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
     except Exception as e:
         logger.error(f"Error in LogActivity: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to log activity: {str(e)}"
         )
+
+async def record_activity(input_data: LogActivityInput) -> LogActivityOutput:
+    """Calculate the activity's rewards and apply them to the profile, without idempotency."""
+    # Queue behind the user's earlier updates so concurrent activities don't lose rewards
+    updated_profile, rewards, challenge_rewards = await user_actors.run(
+        input_data.userId, lambda: _apply_activity(input_data)
+    )
+    
+    # Build success message
+    message_parts = []
+    
+    # Add basic rewards
+    if rewards.energyTokens > 0:
+        message_parts.append(f"+{rewards.energyTokens} Energy Tokens")
+    if rewards.experiencePoints > 0:
+        message_parts.append(f"+{rewards.experiencePoints} XP")
+    
+    # Add level ups
+    for level_type, level in rewards.levelUps.items():
+        message_parts.append(f"{level_type.title()} Level Up to {level}!")
+    
+    # Add achievements
+    for achievement in rewards.achievements:
+        message_parts.append(f"Achievement Unlocked: {achievement.replace('_', ' ').title()}")
+    
+    # Add streak updates
+    for streak_type, value in rewards.streakUpdates.items():
+        if value >= 5:  # Only mention significant streaks
+            message_parts.append(f"{streak_type.title()} Streak: {value} days")
+    
+    # Add completed challenges
+    for challenge_id, completion in challenge_rewards.items():
+        challenge = get_challenge_by_id(challenge_id)
+        name = challenge.name if challenge else challenge_id
+        message_parts.append(f"Challenge Complete: {name} (+{completion.energyTokens} Energy Tokens, "
+                             f"+{completion.experiencePoints} XP)")
+    
+    # Combine into message
+    if message_parts:
+        message = "Activity logged! " + " • ".join(message_parts)
+    else:
+        message = "Activity logged successfully."
+    
+    return LogActivityOutput(
+        success=True,
+        profile=updated_profile,
+        rewards=rewards,
+        challengeRewards=challenge_rewards,
+        message=message
+    )
+
+async def _apply_activity(
+    input_data: LogActivityInput
+) -> Tuple[GamificationProfile, ActivityReward, Dict[str, ActivityReward]]:
+    """
+    Read the profile, apply the activity's rewards and those of any
+    challenges it completes, and save it; runs on the user's actor queue.
+    
+    Challenge progress is saved after the profile, so if the save fails no
+    rewards or progress are recorded and a retry starts over. Streak days
+    are marked before, but marking a day twice changes nothing.
+    """
+    # Get user profile
+    profile = await get_or_create_gamification_profile(input_data.userId)
+    before = profile.copy(deep=True) if activity_ledger.needs_baseline(input_data.userId) else None
+    
+    # Mark today on the activity's streaks; they grow once per calendar day
+    streaks = streak_calendar.record_activity(input_data.userId, input_data.activityType)
+    
+    # Calculate rewards
+    rewards = calculate_rewards(
+        profile,
+        input_data.activityType,
+        input_data.value,
+        input_data.duration,
+        streaks=streaks
+    )
+    
+    # Apply rewards to profile
+    updated_profile = await apply_rewards_to_profile(profile, rewards)
+    activity_at = updated_profile.updatedAt
+    events = [(
+        EVENT_ACTIVITY,
+        {"input": input_data.dict(exclude={"idempotencyKey"}), "rewards": rewards.dict()},
+        updated_profile
+    )]
+    
+    # Award the challenges the activity completes; each is recorded as its own event
+    progress = participations.plan_activity(
+        input_data.userId,
+        input_data.activityType,
+        input_data.value,
+        input_data.duration,
+        activity_at
+    )
+    challenge_rewards = {}
+    for update in progress:
+        if not update.completes:
+            continue
+        completion = calculate_challenge_rewards(updated_profile, update.challenge, updated_profile.updatedAt)
+        # A copy, so each event keeps the profile as it was after it
+        updated_profile = await apply_rewards_to_profile(updated_profile.copy(deep=True), completion)
+        events.append((
+            EVENT_CHALLENGE_COMPLETE,
+            {"challengeId": update.challenge.id, "rewards": completion.dict()},
+            updated_profile
+        ))
+        challenge_rewards[update.challenge.id] = completion
+    
+    # Save the activity's and the challenges' rewards together
+    await save_gamification_profile(updated_profile)
+    
+    # Record the activity and the exact rewards applied
+    for event_type, payload, after in events:
+        activity_ledger.record(
+            input_data.userId,
+            event_type,
+            payload,
+            after.updatedAt,
+            after,
+            before if event_type == EVENT_ACTIVITY else None
+        )
+    
+    # Only now that their rewards are saved are the completions recorded
+    participations.commit(input_data.userId, progress, activity_at)
+    return updated_profile, rewards, challenge_rewards
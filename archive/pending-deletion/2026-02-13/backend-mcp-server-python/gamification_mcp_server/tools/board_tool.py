@@ -17,8 +17,10 @@ from ..services import (
     roll_dice,
     get_space_rewards,
     apply_rewards_to_profile,
-    save_gamification_profile
+    save_gamification_profile,
+    user_actors
 )
+from ..services.ledger_service import activity_ledger, EVENT_DICE_ROLL
 
 logger = logging.getLogger("gamification_mcp_server.tools.board_tool")
 
@@ -61,40 +63,65 @@ async def roll_dice_and_move(input_data: RollDiceInput) -> RollDiceOutput:
     - Processing the space landed on (rewards, challenges, etc.)
     """
     try:
-        # Get profile
-        profile = await get_or_create_gamification_profile(input_data.userId)
-        
-        # Check if user has enough ET
-        if profile.energyTokens < input_data.energyTokensToSpend:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Not enough Energy Tokens. Have {profile.energyTokens}, need {input_data.energyTokensToSpend}"
+        async def roll():
+            """Spend the tokens, move and apply the space's rewards; runs on the user's actor queue."""
+            # Get profile
+            profile = await get_or_create_gamification_profile(input_data.userId)
+            before = profile.copy(deep=True) if activity_ledger.needs_baseline(input_data.userId) else None
+            
+            # Check if user has enough ET
+            if profile.energyTokens < input_data.energyTokensToSpend:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Not enough Energy Tokens. Have {profile.energyTokens}, need {input_data.energyTokensToSpend}"
+                )
+            
+            # Save old position
+            old_position = profile.boardPosition
+            
+            # Roll dice and get movement
+            movement, dice_value = roll_dice(input_data.energyTokensToSpend)
+            
+            # Deduct ET cost
+            profile.energyTokens -= input_data.energyTokensToSpend
+            
+            # Update position
+            profile.boardPosition += movement
+            
+            # Calculate new position (loop around if past the end)
+            new_position = profile.boardPosition
+            current_space = get_space_by_position(new_position)
+            
+            # Process space rewards
+            rewards = get_space_rewards(current_space)
+            
+            # Apply space rewards to profile
+            updated_profile = await apply_rewards_to_profile(profile, rewards)
+            
+            # Save updated profile
+            await save_gamification_profile(updated_profile)
+            
+            # Record the roll and the exact rewards applied
+            activity_ledger.record(
+                input_data.userId,
+                EVENT_DICE_ROLL,
+                {
+                    "energyTokensSpent": input_data.energyTokensToSpend,
+                    "diceValue": dice_value,
+                    "movement": movement,
+                    "spaceId": current_space.id,
+                    "rewards": rewards.dict()
+                },
+                updated_profile.updatedAt,
+                updated_profile,
+                before
             )
+            return old_position, new_position, dice_value, movement, current_space, rewards, updated_profile
         
-        # Save old position
-        old_position = profile.boardPosition
-        
-        # Roll dice and get movement
-        movement, dice_value = roll_dice(input_data.energyTokensToSpend)
-        
-        # Deduct ET cost
-        profile.energyTokens -= input_data.energyTokensToSpend
-        
-        # Update position
-        profile.boardPosition += movement
-        
-        # Calculate new position (loop around if past the end)
-        new_position = profile.boardPosition
-        current_space = get_space_by_position(new_position)
-        
-        # Process space rewards
-        rewards = get_space_rewards(current_space)
-        
-        # Apply space rewards to profile
-        updated_profile = await apply_rewards_to_profile(profile, rewards)
-        
-        # Save updated profile
-        await save_gamification_profile(updated_profile)
+        # Queue behind the user's earlier updates so concurrent rolls don't lose updates
+        old_position, new_position, dice_value, movement, current_space, rewards, updated_profile = (
+            await user_actors.run(input_data.userId, roll)
+        )
         
         # Build response message
         message = (
@@ -3,9 +3,11 @@ MCP Tools for challenge-related operations.
 """
 
 import logging
+from datetime import datetime
 from fastapi import HTTPException, status
 
 from ..models import (
+    Challenge,
     GetChallengesInput,
     GetChallengesOutput,
     JoinChallengeInput,
@@ -14,8 +16,12 @@ from ..models import (
 from ..services import (
     get_or_create_gamification_profile,
     get_challenges,
-    get_challenge_by_id
+    get_challenge_by_id,
+    leaderboards,
+    participations,
+    user_actors
 )
+from ..services.ledger_service import activity_ledger, EVENT_CHALLENGE_JOIN
 
 logger = logging.getLogger("gamification_mcp_server.tools.challenge_tool")
 
@@ -34,21 +40,21 @@ async def get_user_challenges(input_data: GetChallengesInput) -> GetChallengesOu
         # Get user's participation status if userId provided
         participating_in = []
         completed_challenges = []
+        progress = {}
         
         if input_data.userId:
-            # This would normally be retrieved from the database
-            # For demonstration, we'll return example data for a specific user
-            if input_data.userId == "example-user":
-                participating_in = ["protein_power_up", "mindful_movement"]
-                completed_challenges = ["community_kindness_blitz"]
-            else:
-                # For real implementation, query the database
-                pass
+            for participation in participations.for_user(input_data.userId):
+                if participation.completed_at is not None:
+                    completed_challenges.append(participation.challenge_id)
+                else:
+                    participating_in.append(participation.challenge_id)
+                progress[participation.challenge_id] = participation.progress
             
         return GetChallengesOutput(
             challenges=challenges,
             participatingIn=participating_in,
             completedChallenges=completed_challenges,
+            progress=progress,
             message=f"Found {len(challenges)} active challenges."
         )
         
@@ -63,13 +69,13 @@ async def join_challenge(input_data: JoinChallengeInput) -> JoinChallengeOutput:
     """
     Join a challenge.
     
-    This tool allows a user to join a specific challenge, adding them
-    to the participants list and setting up progress tracking.
+    This tool allows a user to join a specific challenge and sets up
+    progress tracking. Activities of the challenge's type logged afterwards
+    count toward its target. Once the user's run has ended (for a rolling
+    challenge, `durationDays` after joining), joining again starts a new one.
+    The returned challenge carries participant and completion counts.
     """
     try:
-        # Get user profile
-        profile = await get_or_create_gamification_profile(input_data.userId)
-        
         # Get the challenge
         challenge = get_challenge_by_id(input_data.challengeId)
         
@@ -79,11 +85,15 @@ async def join_challenge(input_data: JoinChallengeInput) -> JoinChallengeOutput:
                 detail=f"Challenge with ID {input_data.challengeId} not found"
             )
         
-        # Add user to participants (this would normally update a database)
-        if input_data.userId not in challenge.participants:
-            challenge.participants.append(input_data.userId)
+        # Queued with the user's activities, so none is counted before the join is recorded
+        await user_actors.run(input_data.userId, lambda: _join(input_data.userId, challenge))
         
-        # In a real implementation, save the updated challenge to the database
+        # Catalog challenges are shared, so fill in the counts on a copy; the
+        # participant lists themselves would grow with every user that joins
+        challenge = challenge.copy(update={
+            "participantCount": participations.participant_count(challenge.id),
+            "completedCount": participations.completed_count(challenge.id)
+        })
         
         return JoinChallengeOutput(
             success=True,
@@ -100,3 +110,20 @@ async def join_challenge(input_data: JoinChallengeInput) -> JoinChallengeOutput:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to join challenge: {str(e)}"
         )
+
+async def _join(user_id: str, challenge: Challenge) -> None:
+    """Record a user joining a challenge, unless their current run hasn't ended; runs on the user's actor queue."""
+    profile = await get_or_create_gamification_profile(user_id)
+    if not participations.join(user_id, challenge):
+        return
+    leaderboards.join_challenge(challenge.id, user_id)
+    
+    # Joining doesn't change the profile, so it is its own baseline
+    activity_ledger.record(
+        user_id,
+        EVENT_CHALLENGE_JOIN,
+        {"challengeId": challenge.id},
+        datetime.now(),
+        profile,
+        profile
+    )
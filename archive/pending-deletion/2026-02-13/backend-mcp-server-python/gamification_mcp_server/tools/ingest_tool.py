@@ -0,0 +1,238 @@
+"""
+MCP tool for high-rate rep and set ingestion.
+
+Rep and set events are meant to be logged as they happen, which through
+LogActivity means one reward calculation and one profile write per rep.
+LogActivityStream takes a stream of events instead and coalesces each
+user's events of one type that arrive within `INGEST_WINDOW` seconds into
+one LogActivity with their total value, so a 100-rep set is one reward
+calculation and one profile save. Every stream with events in a batch gets
+the batch's consolidated result.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from ..models import (
+    ActivityType,
+    ActivityEvent,
+    ActivityStreamResult,
+    LogActivityInput
+)
+from ..utils import config
+from .activity_tool import record_activity
+
+logger = logging.getLogger("gamification_mcp_server.tools.ingest_tool")
+
+# Activity types whose events can be streamed and coalesced
+STREAMABLE_ACTIVITIES = (ActivityType.SET_COMPLETED, ActivityType.REP_COMPLETED)
+
+class _PendingBatch:
+    """Events of one user and activity type waiting for their window to close."""
+    
+    __slots__ = ("value", "events", "future", "timer")
+    
+    def __init__(self, future: asyncio.Future):
+        self.value = 0
+        self.events = 0
+        self.future = future
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class ActivityBatcher:
+    """Coalesces rep and set events per user and activity type over a short window."""
+    
+    def __init__(self, window: float = 0.5, max_events: int = 1000):
+        """
+        Args:
+            window: Seconds a batch stays open after its first event
+            max_events: Events after which a batch is recorded without waiting for the window
+        """
+        self.window = window
+        self.max_events = max_events
+        self._pending: Dict[Tuple[str, ActivityType], _PendingBatch] = {}
+        self._flushing: set = set()
+        self._counts = {"events": 0, "batches": 0, "failedBatches": 0}
+    
+    def submit(self, event: ActivityEvent) -> asyncio.Future:
+        """
+        Add an event to its user's open batch.
+        
+        Returns:
+            Future resolving to the batch's (total value, event count, LogActivityOutput)
+        """
+        loop = asyncio.get_running_loop()
+        key = (event.userId, event.activityType)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(loop.create_future())
+            batch.timer = loop.call_later(self.window, self._close_batch, key)
+        batch.value += event.value
+        batch.events += 1
+        self._counts["events"] += 1
+        future = batch.future
+        if batch.events >= self.max_events:
+            self._close_batch(key)
+        return future
+    
+    def _close_batch(self, key: Tuple[str, ActivityType]) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._record(key, batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+    
+    async def _record(self, key: Tuple[str, ActivityType], batch: _PendingBatch) -> None:
+        user_id, activity_type = key
+        try:
+            output = await record_activity(LogActivityInput(
+                userId=user_id,
+                activityType=activity_type,
+                value=batch.value,
+                metadata={"coalescedEvents": batch.events}
+            ))
+        except Exception as e:
+            self._counts["failedBatches"] += 1
+            logger.error(f"Failed to record {batch.events} {activity_type.value} events for user {user_id}: "
+                         f"{getattr(e, 'detail', None) or e}")
+            batch.future.set_exception(e)
+            # Nobody may be waiting on the future; don't log it as unretrieved
+            batch.future.exception()
+            return
+        self._counts["batches"] += 1
+        batch.future.set_result((batch.value, batch.events, output))
+    
+    async def close(self) -> None:
+        """Record every open batch now and wait for them (on shutdown)."""
+        for key in list(self._pending):
+            self._close_batch(key)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Event and batch counts, and open batches."""
+        return {**self._counts, "openBatches": len(self._pending)}
+
+activity_batcher = ActivityBatcher(
+    window=config.get('INGEST_WINDOW'),
+    max_events=config.get('INGEST_MAX_EVENTS')
+)
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace")
+
+def _rejected(line: int, error: str, event: Optional[ActivityEvent] = None) -> ActivityStreamResult:
+    return ActivityStreamResult(
+        userId=event.userId if event else None,
+        activityType=event.activityType if event else None,
+        eventIds=[event.id] if event and event.id else [],
+        line=line,
+        success=False,
+        statusCode=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        error=error
+    )
+
+async def _batch_result(event: ActivityEvent, future: asyncio.Future, event_ids: List[str]) -> ActivityStreamResult:
+    """Wait for a batch and describe its outcome for one stream."""
+    try:
+        value, events, output = await asyncio.shield(future)
+    except HTTPException as e:
+        status_code, error = e.status_code, e.detail
+    except Exception as e:
+        status_code, error = status.HTTP_500_INTERNAL_SERVER_ERROR, f"Failed to log activity: {str(e)}"
+    else:
+        return ActivityStreamResult(
+            userId=event.userId,
+            activityType=event.activityType,
+            value=value,
+            events=events,
+            eventIds=event_ids,
+            success=True,
+            statusCode=status.HTTP_200_OK,
+            output=output
+        )
+    return ActivityStreamResult(
+        userId=event.userId,
+        activityType=event.activityType,
+        eventIds=event_ids,
+        success=False,
+        statusCode=status_code,
+        error=error
+    )
+
+async def ingest_activity_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Coalesce a stream of rep and set events into batched reward applications.
+    
+    Reads NDJSON `ActivityEvent`s and yields NDJSON `ActivityStreamResult`s:
+    one per batch this stream's events joined, as soon as it is recorded,
+    and one per rejected line. Events aren't idempotent; a retried stream
+    awards its events again.
+    
+    Args:
+        chunks: Request body
+    
+    Yields:
+        Response lines
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    
+    async def report(event: ActivityEvent, future: asyncio.Future, event_ids: List[str]) -> None:
+        results.put_nowait(await _batch_result(event, future, event_ids))
+    
+    async def read() -> None:
+        # This stream's event ids per batch it has events in
+        batches: Dict[asyncio.Future, List[str]] = {}
+        reports = []
+        number = 0
+        async for line in _lines(chunks):
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                event = ActivityEvent.parse_obj(json.loads(line))
+            except (ValueError, ValidationError) as e:
+                results.put_nowait(_rejected(number, f"Invalid event: {str(e)}"))
+                continue
+            if event.activityType not in STREAMABLE_ACTIVITIES:
+                streamable = ", ".join(activity.value for activity in STREAMABLE_ACTIVITIES)
+                results.put_nowait(_rejected(number, f"Only {streamable} events can be streamed; use LogActivity", event))
+                continue
+            if event.value < 1:
+                results.put_nowait(_rejected(number, "value must be at least 1", event))
+                continue
+            future = activity_batcher.submit(event)
+            event_ids = batches.get(future)
+            if event_ids is None:
+                event_ids = batches[future] = []
+                reports.append(asyncio.ensure_future(report(event, future, event_ids)))
+            if event.id:
+                event_ids.append(event.id)
+        await asyncio.gather(*reports)
+    
+    reader = asyncio.ensure_future(read())
+    reader.add_done_callback(lambda _: results.put_nowait(None))
+    try:
+        while True:
+            result = await results.get()
+            if result is None:
+                break
+            yield result.json() + "\n"
+        # Surface a failure reading the request body
+        reader.result()
+    finally:
+        reader.cancel()
@@ -0,0 +1,61 @@
+"""
+MCP Tool for leaderboards.
+"""
+
+import logging
+from fastapi import HTTPException, status
+
+from ..models import (
+    GetLeaderboardInput,
+    GetLeaderboardOutput
+)
+from ..services import leaderboards
+
+logger = logging.getLogger("gamification_mcp_server.tools.leaderboard_tool")
+
+async def get_leaderboard(input_data: GetLeaderboardInput) -> GetLeaderboardOutput:
+    """
+    Get a page of a leaderboard.
+
+    This tool returns the top entries of the global XP board, a category
+    level board, a weekly XP board or a challenge board. If a userId is
+    provided, it also returns the user's rank and the entries around it.
+    """
+    try:
+        name = leaderboards.board_name(input_data.board, input_data.week, input_data.challengeId)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    try:
+        entries = leaderboards.top(name, input_data.limit, input_data.offset)
+        user_entry = None
+        around_user = []
+        if input_data.userId:
+            user_entry = leaderboards.rank(name, input_data.userId)
+            around_user = leaderboards.around(name, input_data.userId, input_data.window)
+
+        if user_entry:
+            message = f"{input_data.userId} is ranked #{user_entry['rank']} on the {name} leaderboard."
+        elif input_data.userId:
+            message = f"{input_data.userId} isn't on the {name} leaderboard yet."
+        else:
+            message = f"Found {len(entries)} entries on the {name} leaderboard."
+
+        return GetLeaderboardOutput(
+            board=name,
+            size=leaderboards.size(name),
+            entries=entries,
+            userEntry=user_entry,
+            aroundUser=around_user,
+            message=message
+        )
+
+    except Exception as e:
+        logger.error(f"Error in GetLeaderboard: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get leaderboard: {str(e)}"
+        )
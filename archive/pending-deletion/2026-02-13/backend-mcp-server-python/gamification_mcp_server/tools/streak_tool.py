@@ -0,0 +1,53 @@
+"""
+MCP Tool for streak history.
+"""
+
+import logging
+from fastapi import HTTPException, status
+
+from ..models import (
+    GetStreakHistoryInput,
+    GetStreakHistoryOutput
+)
+from ..services import streak_calendar
+
+logger = logging.getLogger("gamification_mcp_server.tools.streak_tool")
+
+async def get_streak_history(input_data: GetStreakHistoryInput) -> GetStreakHistoryOutput:
+    """
+    Get a user's streak history.
+
+    This tool returns, for one streak type or every streak the user has,
+    the current and longest streak in days, how many of the last `days`
+    days the user was active, and which days those were.
+    """
+    try:
+        if input_data.streakType is not None:
+            types = [input_data.streakType.value]
+        else:
+            types = streak_calendar.types(input_data.userId)
+
+        streaks = [
+            streak_calendar.history(input_data.userId, streak_type, input_data.days, input_data.endDate)
+            for streak_type in types
+        ]
+
+        if not streaks:
+            message = f"{input_data.userId} has no streaks yet."
+        else:
+            best = max(streaks, key=lambda streak: streak["currentStreak"])
+            message = (f"Found {len(streaks)} streaks; the longest current one is "
+                       f"{best['streakType']} at {best['currentStreak']} days.")
+
+        return GetStreakHistoryOutput(
+            userId=input_data.userId,
+            streaks=streaks,
+            message=message
+        )
+
+    except Exception as e:
+        logger.error(f"Error in GetStreakHistory: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get streak history: {str(e)}"
+        )
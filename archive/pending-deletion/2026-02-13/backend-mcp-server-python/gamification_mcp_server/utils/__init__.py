@@ -2,13 +2,18 @@
 Utility modules export.
 """
 
-from .api_client import make_api_request
+from .api_client import make_api_request, request_scope, invalidate_request_scope, get_backend_health
 from .config import config
 from .database import database, Repository
+from .idempotency import idempotency_store
 
 __all__ = [
     'make_api_request',
+    'request_scope',
+    'invalidate_request_scope',
+    'get_backend_health',
     'config',
     'database',
-    'Repository'
+    'Repository',
+    'idempotency_store'
 ]
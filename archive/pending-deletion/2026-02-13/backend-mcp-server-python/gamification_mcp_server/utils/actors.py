@@ -0,0 +1,166 @@
+"""
+Per-key actor queues.
+
+Work submitted for a key (a user ID) runs one job at a time, in the order
+it was submitted, in that key's own task; work for different keys runs
+concurrently. Each key gets a mailbox when it has work and loses it when
+the mailbox drains, so idle users cost nothing.
+
+Keys are sharded by a stable hash (CRC-32, the same in every process) and
+each shard keeps its own mailboxes and counts, so there is no table or
+lock that every call goes through and a hot shard shows up in the
+metrics. `shard_for()` is also how a deployment running several server
+processes should route users, so each user is always handled by the same
+process.
+
+A job runs to completion even if the caller stops waiting for it (e.g.
+the client disconnected), so a reward application is never cut off
+between reading and saving the profile.
+"""
+
+import time
+import zlib
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Set, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+# Job, its result, and when it was queued
+_Job = Tuple[Callable[[], Awaitable[Any]], "asyncio.Future[Any]", float]
+
+def shard_for(key: str, shards: int) -> int:
+    """Shard of a key; stable across processes and restarts."""
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+class _Shard:
+    """One shard's mailboxes and counts."""
+    
+    def __init__(self):
+        self.mailboxes: Dict[str, Deque[_Job]] = {}
+        # Running drain tasks; the loop only keeps weak references to them
+        self.drains: Set["asyncio.Task[None]"] = set()
+        self.queued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.peak_depth = 0
+
+class ActorQueues:
+    """Sequential per-key job queues, sharded by key hash."""
+    
+    def __init__(self, shards: int = 16, max_depth: int = 1000):
+        """
+        Args:
+            shards: Number of shards keys are spread across
+            max_depth: Jobs a key may have waiting before new ones are refused; 0 is unlimited
+        """
+        self.shards = max(1, shards)
+        self.max_depth = max_depth
+        self._shards = [_Shard() for _ in range(self.shards)]
+    
+    def depth(self, key: str) -> int:
+        """Jobs waiting for a key, not counting the one running."""
+        mailbox = self._shards[shard_for(key, self.shards)].mailboxes.get(key)
+        return len(mailbox) if mailbox is not None else 0
+    
+    async def run(self, key: str, job: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a job after the key's earlier jobs and return its result.
+        
+        Args:
+            key: Key the job is serialized on
+            job: Coroutine function to run
+        
+        Raises:
+            HTTPException: 429 if the key already has `max_depth` jobs waiting
+        """
+        shard = self._shards[shard_for(key, self.shards)]
+        mailbox = shard.mailboxes.get(key)
+        if mailbox is not None and self.max_depth and len(mailbox) >= self.max_depth:
+            shard.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many pending updates for {key}; retry shortly"
+            )
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if mailbox is None:
+            mailbox = shard.mailboxes[key] = deque()
+            # The mailbox exists exactly as long as its drain task runs
+            drain = loop.create_task(self._drain(shard, key, mailbox))
+            shard.drains.add(drain)
+            drain.add_done_callback(shard.drains.discard)
+        mailbox.append((job, future, time.monotonic()))
+        shard.queued += 1
+        shard.peak_depth = max(shard.peak_depth, len(mailbox))
+        
+        # Shielded: a caller that stops waiting doesn't cancel a job that may have started
+        return await asyncio.shield(future)
+    
+    async def _drain(self, shard: _Shard, key: str, mailbox: Deque[_Job]) -> None:
+        future = None
+        try:
+            while mailbox:
+                job, future, queued_at = mailbox.popleft()
+                shard.queued -= 1
+                shard.wait_seconds += time.monotonic() - queued_at
+                try:
+                    result = await job()
+                except Exception as e:
+                    shard.failed += 1
+                    future.set_exception(e)
+                    # Mark it retrieved in case the caller is gone
+                    future.exception()
+                else:
+                    future.set_result(result)
+                shard.processed += 1
+        finally:
+            # No await between the last check and here, so no job can be left behind
+            del shard.mailboxes[key]
+            # Jobs are only left over if the drain itself was cancelled (shutdown): release their callers
+            waiting = [future] if future is not None else []
+            waiting.extend(pending for _, pending, _ in mailbox)
+            for pending in waiting:
+                if not pending.done():
+                    pending.cancel()
+            shard.queued -= len(mailbox)
+    
+    async def close(self) -> None:
+        """Wait for every queued job to finish (on shutdown)."""
+        while True:
+            drains = [drain for shard in self._shards for drain in shard.drains]
+            if not drains:
+                return
+            await asyncio.gather(*drains, return_exceptions=True)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depths, job counts and average wait, in total and per shard."""
+        shards: List[Dict[str, Any]] = [
+            {
+                "actors": len(shard.mailboxes),
+                "queued": shard.queued,
+                "maxDepth": max((len(mailbox) for mailbox in shard.mailboxes.values()), default=0),
+                "peakDepth": shard.peak_depth,
+                "processed": shard.processed
+            }
+            for shard in self._shards
+        ]
+        processed = sum(shard.processed for shard in self._shards)
+        wait_seconds = sum(shard.wait_seconds for shard in self._shards)
+        return {
+            "shards": self.shards,
+            "actors": sum(entry["actors"] for entry in shards),
+            "queued": sum(entry["queued"] for entry in shards),
+            "maxDepth": max(entry["maxDepth"] for entry in shards),
+            "peakDepth": max(entry["peakDepth"] for entry in shards),
+            "processed": processed,
+            "failed": sum(shard.failed for shard in self._shards),
+            "rejected": sum(shard.rejected for shard in self._shards),
+            "averageWaitMs": round(wait_seconds / processed * 1000, 3) if processed else 0.0,
+            "perShard": shards
+        }
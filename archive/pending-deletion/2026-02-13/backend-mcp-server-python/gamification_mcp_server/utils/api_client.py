@@ -2,23 +2,109 @@
 API client for making requests to the backend API.
 """
 
+import copy
+import json
+import time
+import asyncio
 import logging
 import requests
-from typing import Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, status
 from .config import config
+from .resilience import BreakerRegistry, CircuitBreaker, endpoint_key, adaptive_timeout, hedge_delay
 
 logger = logging.getLogger("gamification_mcp_server.api_client")
 
+# Per-endpoint circuit breakers and latency windows for backend calls
+backend_breakers = BreakerRegistry(
+    failure_threshold=config.get('BREAKER_FAILURE_THRESHOLD'),
+    reset_timeout=config.get('BREAKER_RESET_TIMEOUT')
+)
+
+# Hedged GETs sent / won, exported through get_backend_health()
+_hedge_stats = {"sent": 0, "won": 0}
+
+# Request-scoped cache of in-flight/completed GET requests.
+# Only populated inside a `request_scope()` block (e.g. a /tools/batch call).
+_request_cache: ContextVar[Optional[Dict[Any, asyncio.Future]]] = ContextVar("request_cache", default=None)
+
+@contextmanager
+def request_scope():
+    """
+    Share backend GET responses between all API calls made inside this block.
+    
+    Identical GET requests issued while the scope is active (including from
+    concurrently running tasks) are sent to the backend only once.
+    """
+    token = _request_cache.set({})
+    try:
+        yield
+    finally:
+        _request_cache.reset(token)
+
+def invalidate_request_scope() -> None:
+    """
+    Drop all cached responses of the active request scope.
+    
+    Called after a write so later reads in the same scope see fresh data.
+    """
+    cache = _request_cache.get()
+    if cache is not None:
+        cache.clear()
+
+def get_backend_health() -> Dict[str, Any]:
+    """
+    Get circuit breaker states and hedging counters for the health endpoint.
+    
+    Returns:
+        Dict with per-endpoint breaker snapshots and hedge counts
+    """
+    return {
+        "circuits": backend_breakers.states(),
+        "hedgedRequests": dict(_hedge_stats)
+    }
+
+def _send_request(method: str, url: str, headers: Dict[str, str], data: Optional[Dict], timeout: Optional[float] = None):
+    """
+    Send a blocking HTTP request to the backend.
+    
+    Args:
+        method: HTTP method (GET, POST, PUT, PATCH, DELETE)
+        url: Full request URL
+        headers: Request headers
+        data: Query params (GET) or JSON body (POST/PUT/PATCH/DELETE)
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Response data as dict
+    """
+    if method == "GET":
+        response = requests.get(url, headers=headers, params=data or {}, timeout=timeout)
+    elif method == "POST":
+        response = requests.post(url, headers=headers, json=data or {}, timeout=timeout)
+    elif method == "PUT":
+        response = requests.put(url, headers=headers, json=data or {}, timeout=timeout)
+    elif method == "PATCH":
+        response = requests.patch(url, headers=headers, json=data or {}, timeout=timeout)
+    elif method == "DELETE":
+        response = requests.delete(url, headers=headers, json=data or {}, timeout=timeout)
+    else:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    
+    response.raise_for_status()
+    return response.json()
+
 async def make_api_request(method: str, path: str, data: Optional[Dict] = None, token: Optional[str] = None):
     """
     Make a request to the backend API.
     
     Args:
-        method: HTTP method (GET, POST, PUT, DELETE)
+        method: HTTP method (GET, POST, PUT, PATCH, DELETE)
         path: API path (without base URL)
-        data: Request data (for POST/PUT)
+        data: Request data (for POST/PUT/PATCH)
         token: Authentication token
         
     Returns:
@@ -28,7 +114,9 @@ async def make_api_request(method: str, path: str, data: Optional[Dict] = None,
     backend_api_url = config.get_backend_api_url()
     api_token = config.get_api_token()
     
+    method = method.upper()
     url = f"{backend_api_url}/{path.lstrip('/')}"
+    breaker = backend_breakers.get(endpoint_key(method, path))
     headers = {
         'Content-Type': 'application/json'
     }
@@ -36,21 +124,116 @@ async def make_api_request(method: str, path: str, data: Optional[Dict] = None,
     if token or api_token:
         headers['Authorization'] = f"Bearer {token or api_token}"
     
+    # Reuse an identical GET from the active request scope, if any
+    cache = _request_cache.get()
+    if cache is not None and method == "GET":
+        cache_key = (url, headers.get('Authorization'), json.dumps(data or {}, sort_keys=True, default=str))
+        future = cache.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(_make_api_request(breaker, method, url, headers, data))
+            cache[cache_key] = future
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            # Don't pin failures in the cache; a later call may retry
+            if cache.get(cache_key) is future:
+                del cache[cache_key]
+            raise
+        return copy.deepcopy(result)
+    
+    return await _make_api_request(breaker, method, url, headers, data)
+
+def _discard_result(task: asyncio.Future) -> None:
+    """Retrieve the outcome of an abandoned hedge so its error isn't logged as unhandled."""
+    if not task.cancelled():
+        task.exception()
+
+async def _hedged_get(url: str, headers: Dict[str, str], data: Optional[Dict], timeout: float, delay: Optional[float]):
+    """
+    Send a GET, plus a duplicate if the first is slower than `delay`.
+    
+    Args:
+        url: Full request URL
+        headers: Request headers
+        data: Query params
+        timeout: Per-request timeout in seconds
+        delay: Seconds to wait before hedging (None disables hedging)
+        
+    Returns:
+        Response data of whichever request succeeds first
+    """
+    primary = asyncio.ensure_future(asyncio.to_thread(_send_request, "GET", url, headers, data, timeout))
+    if delay is None:
+        return await primary
+    
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    
+    _hedge_stats["sent"] += 1
+    hedge = asyncio.ensure_future(asyncio.to_thread(_send_request, "GET", url, headers, data, timeout))
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                if task is hedge:
+                    _hedge_stats["won"] += 1
+                # Worker threads can't be interrupted; let the loser finish quietly
+                for other in pending:
+                    other.add_done_callback(_discard_result)
+                return task.result()
+            error = task.exception()
+    raise error
+
+def _is_backend_failure(error: requests.exceptions.RequestException) -> bool:
+    """
+    Check whether an error indicates an unhealthy backend.
+    
+    Connection errors, timeouts and 5xx responses count against the circuit
+    breaker; 4xx responses are the caller's problem and do not.
+    """
+    response = getattr(error, 'response', None)
+    return response is None or response.status_code >= 500
+
+async def _make_api_request(breaker: CircuitBreaker, method: str, url: str, headers: Dict[str, str], data: Optional[Dict] = None):
+    """
+    Send a request through the endpoint's circuit breaker and translate errors to HTTP exceptions.
+    
+    Args:
+        breaker: Circuit breaker for the endpoint
+        method: HTTP method (upper case)
+        url: Full request URL
+        headers: Request headers
+        data: Request data
+        
+    Returns:
+        Response data as dict
+    """
+    if not breaker.allow_request():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Backend endpoint {breaker.name} is unavailable (circuit open)",
+            headers={"Retry-After": str(breaker.retry_after())}
+        )
+    
+    timeout = adaptive_timeout(breaker, config.get('BACKEND_MIN_TIMEOUT'), config.get('BACKEND_TIMEOUT'))
+    started = time.monotonic()
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=data or {})
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data or {})
-        elif method.upper() == "PUT":
-            response = requests.put(url, headers=headers, json=data or {})
-        elif method.upper() == "DELETE":
-            response = requests.delete(url, headers=headers, json=data or {})
+        # `requests` is blocking; run it in a worker thread so concurrent
+        # tool calls don't serialize on the event loop
+        if method == "GET" and config.get('HEDGE_GET_REQUESTS'):
+            result = await _hedged_get(url, headers, data, timeout, hedge_delay(breaker))
         else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
-        
-        response.raise_for_status()
-        return response.json()
+            result = await asyncio.to_thread(_send_request, method, url, headers, data, timeout)
+        breaker.record_success(time.monotonic() - started)
+        return result
     except requests.exceptions.RequestException as e:
+        if _is_backend_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.monotonic() - started)
         logger.error(f"API request error: {str(e)}")
         if hasattr(e, 'response') and e.response is not None:
             try:
@@ -0,0 +1,191 @@
+"""
+Read-only catalogs loaded from versioned data files.
+
+The board, achievements, challenges and kindness quests are static data
+that used to be rebuilt as Pydantic objects on every call and scanned
+linearly for lookups. A `Catalog` loads its JSON file once into an
+immutable snapshot: the items as a tuple, an index by ID, each item
+pre-serialized to JSON (so the whole catalog can be served without
+serializing it again), and an optional derived index built from the items,
+such as the achievement engine.
+
+Files look like `{"version": 3, "items": [...]}`. Catalogs notice when
+their file changes (checked at most every `CATALOG_RELOAD_INTERVAL`
+seconds, on access) and swap in a new snapshot without a restart. A file
+that fails to load or validate is logged and the previous snapshot is
+kept; readers never see a partly loaded catalog.
+
+Items are shared between callers and must not be modified; copy an item
+before changing it.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from .config import config
+
+logger = logging.getLogger("gamification_mcp_server.catalog")
+
+DEFAULT_CATALOG_DIR = Path(__file__).parent.parent / "catalogs"
+
+class CatalogSnapshot(NamedTuple):
+    """One loaded version of a catalog."""
+    version: Any
+    items: Tuple[BaseModel, ...]
+    by_id: Mapping[Any, BaseModel]
+    # Item ID → the item as JSON
+    fragments: Mapping[Any, str]
+    # The whole catalog as a JSON document, and its ETag
+    document: str
+    etag: str
+    # Built from the items by the catalog's `index` function
+    index: Any
+    loaded_at: float
+
+class Catalog:
+    """A versioned, immutable collection of models loaded from a JSON file."""
+    
+    def __init__(self, name: str, filename: str, model: Type[BaseModel], key: str = "id",
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 index: Optional[Callable[[Tuple[BaseModel, ...]], Any]] = None,
+                 max_age: Optional[float] = None, directory: Optional[str] = None,
+                 reload_interval: Optional[float] = None):
+        """
+        Args:
+            name: Catalog name, used in logs, metrics and /catalogs/{name}
+            filename: Data file in the catalog directory
+            model: Model each item is validated as
+            key: Item field the catalog is indexed by
+            prepare: Called with each raw item before validation; returns the item to validate
+            index: Builds a derived index from the loaded items
+            max_age: Seconds after which the snapshot is rebuilt even if the file didn't change
+            directory: Catalog directory (default: CATALOG_DIR, or catalogs/ in the server directory)
+            reload_interval: Seconds between file change checks; 0 disables hot reload
+                (default: CATALOG_RELOAD_INTERVAL)
+        """
+        self.name = name
+        self.path = Path(directory or config.get('CATALOG_DIR') or DEFAULT_CATALOG_DIR) / filename
+        self.model = model
+        self.key = key
+        self.prepare = prepare
+        self.index = index
+        self.max_age = max_age
+        self.reload_interval = (config.get('CATALOG_RELOAD_INTERVAL')
+                                if reload_interval is None else reload_interval)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._file_state: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._counts = {"loads": 0, "failedLoads": 0}
+    
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        The current snapshot, loading the file first if it is new or changed.
+        
+        Raises:
+            OSError, ValueError: If the catalog has never loaded successfully
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self._load(initial=True)
+        now = time.monotonic()
+        if self.max_age is not None and time.time() - snapshot.loaded_at >= self.max_age:
+            return self._load()
+        if self.reload_interval > 0 and now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            if self._read_file_state() != self._file_state:
+                return self._load()
+        return snapshot
+    
+    def items(self) -> Tuple[BaseModel, ...]:
+        """All items, in file order."""
+        return self.snapshot().items
+    
+    def get(self, item_id: Any) -> Optional[BaseModel]:
+        """An item by ID, or None."""
+        return self.snapshot().by_id.get(item_id)
+    
+    def _read_file_state(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _load(self, initial: bool = False) -> CatalogSnapshot:
+        with self._lock:
+            # Another thread may have loaded it while this one waited
+            if initial and self._snapshot is not None:
+                return self._snapshot
+            file_state = self._read_file_state()
+            try:
+                snapshot = self._build(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self._counts["failedLoads"] += 1
+                # Don't retry until the file changes again
+                self._file_state = file_state
+                if self._snapshot is None:
+                    raise
+                logger.error(f"Failed to reload {self.name} catalog from {self.path}, "
+                             f"keeping version {self._snapshot.version}: {str(e)}")
+                return self._snapshot
+            
+            if self._snapshot is not None and snapshot.etag != self._snapshot.etag:
+                logger.info(f"Reloaded {self.name} catalog: version {snapshot.version}, {len(snapshot.items)} items")
+            self._file_state = file_state
+            self._snapshot = snapshot
+            self._counts["loads"] += 1
+            return snapshot
+    
+    def _build(self, text: str) -> CatalogSnapshot:
+        document = json.loads(text)
+        if not isinstance(document, dict) or not isinstance(document.get("items"), list):
+            raise ValueError("catalog file must be an object with an 'items' list")
+        version = document.get("version")
+        
+        items = []
+        by_id = {}
+        fragments = {}
+        for raw in document["items"]:
+            if self.prepare is not None:
+                raw = self.prepare(dict(raw))
+            item = self.model.parse_obj(raw)
+            item_id = getattr(item, self.key)
+            if item_id in by_id:
+                raise ValueError(f"duplicate {self.key} {item_id!r}")
+            items.append(item)
+            by_id[item_id] = item
+            fragments[item_id] = item.json()
+        items = tuple(items)
+        
+        body = (f'{{"name": {json.dumps(self.name)}, "version": {json.dumps(version)}, '
+                f'"items": [{", ".join(fragments.values())}]}}')
+        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+        return CatalogSnapshot(
+            version=version,
+            items=items,
+            by_id=MappingProxyType(by_id),
+            fragments=MappingProxyType(fragments),
+            document=body,
+            etag=f'"{self.name}-{version}-{digest}"',
+            index=self.index(items) if self.index is not None else None,
+            loaded_at=time.time()
+        )
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Loaded version, item count and load counts."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "items": len(snapshot.items) if snapshot else 0,
+            "loadedAt": snapshot.loaded_at if snapshot else None,
+            **self._counts
+        }
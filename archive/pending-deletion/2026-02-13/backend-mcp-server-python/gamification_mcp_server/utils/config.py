@@ -35,7 +35,38 @@ class Config:
         'DB_PORT': '5432',
         'DB_NAME': 'gamification',
         'DB_USER': '',
-        'DB_PASSWORD': ''
+        'DB_PASSWORD': '',
+        'BATCH_MAX_CALLS': '20',
+        'BACKEND_TIMEOUT': '10',
+        'BACKEND_MIN_TIMEOUT': '1',
+        'BREAKER_FAILURE_THRESHOLD': '5',
+        'BREAKER_RESET_TIMEOUT': '30',
+        'HEDGE_GET_REQUESTS': 'false',
+        'IDEMPOTENCY_STORE_PATH': '',
+        'IDEMPOTENCY_TTL': '86400',
+        'IDEMPOTENCY_MAX_ENTRIES': '10000',
+        'PROFILE_CACHE_TTL': '60',
+        'PROFILE_CACHE_MAX_USERS': '10000',
+        'PROFILE_FLUSH_INTERVAL': '2',
+        'PROFILE_FLUSH_CONCURRENCY': '8',
+        'INGEST_WINDOW': '0.5',
+        'INGEST_MAX_EVENTS': '1000',
+        'LEDGER_ENABLED': 'true',
+        'LEDGER_PATH': '',
+        'LEDGER_SNAPSHOT_EVERY': '100',
+        'PARTICIPATION_PATH': '',
+        'REPLAY_WORKERS': '4',
+        'REPLAY_CHUNK_SIZE': '500',
+        'CATALOG_DIR': '',
+        'CATALOG_RELOAD_INTERVAL': '2.0',
+        'LEADERBOARD_BACKEND': 'memory',
+        'LEADERBOARD_REDIS_URL': 'redis://localhost:6379/0',
+        'LEADERBOARD_REDIS_PREFIX': 'leaderboard:',
+        'LEADERBOARD_WEEKS_KEPT': '4',
+        'ACTOR_SHARDS': '16',
+        'ACTOR_MAX_QUEUE_DEPTH': '1000',
+        'STREAK_PATH': '',
+        'STREAK_CACHE_MAX_USERS': '10000'
     }
     
     # Singleton instance
@@ -60,6 +91,29 @@ class Config:
         self._config['PORT'] = int(self._config['PORT'])
         self._config['DEBUG'] = self._config['DEBUG'].lower() == 'true'
         self._config['DB_PORT'] = int(self._config['DB_PORT'])
+        self._config['BATCH_MAX_CALLS'] = int(self._config['BATCH_MAX_CALLS'])
+        self._config['BACKEND_TIMEOUT'] = float(self._config['BACKEND_TIMEOUT'])
+        self._config['BACKEND_MIN_TIMEOUT'] = float(self._config['BACKEND_MIN_TIMEOUT'])
+        self._config['BREAKER_FAILURE_THRESHOLD'] = int(self._config['BREAKER_FAILURE_THRESHOLD'])
+        self._config['BREAKER_RESET_TIMEOUT'] = float(self._config['BREAKER_RESET_TIMEOUT'])
+        self._config['HEDGE_GET_REQUESTS'] = self._config['HEDGE_GET_REQUESTS'].lower() == 'true'
+        self._config['IDEMPOTENCY_TTL'] = float(self._config['IDEMPOTENCY_TTL'])
+        self._config['IDEMPOTENCY_MAX_ENTRIES'] = int(self._config['IDEMPOTENCY_MAX_ENTRIES'])
+        self._config['PROFILE_CACHE_TTL'] = float(self._config['PROFILE_CACHE_TTL'])
+        self._config['PROFILE_CACHE_MAX_USERS'] = int(self._config['PROFILE_CACHE_MAX_USERS'])
+        self._config['PROFILE_FLUSH_INTERVAL'] = float(self._config['PROFILE_FLUSH_INTERVAL'])
+        self._config['PROFILE_FLUSH_CONCURRENCY'] = int(self._config['PROFILE_FLUSH_CONCURRENCY'])
+        self._config['INGEST_WINDOW'] = float(self._config['INGEST_WINDOW'])
+        self._config['INGEST_MAX_EVENTS'] = int(self._config['INGEST_MAX_EVENTS'])
+        self._config['LEDGER_ENABLED'] = self._config['LEDGER_ENABLED'].lower() == 'true'
+        self._config['LEDGER_SNAPSHOT_EVERY'] = int(self._config['LEDGER_SNAPSHOT_EVERY'])
+        self._config['REPLAY_WORKERS'] = int(self._config['REPLAY_WORKERS'])
+        self._config['REPLAY_CHUNK_SIZE'] = int(self._config['REPLAY_CHUNK_SIZE'])
+        self._config['CATALOG_RELOAD_INTERVAL'] = float(self._config['CATALOG_RELOAD_INTERVAL'])
+        self._config['LEADERBOARD_WEEKS_KEPT'] = int(self._config['LEADERBOARD_WEEKS_KEPT'])
+        self._config['ACTOR_SHARDS'] = int(self._config['ACTOR_SHARDS'])
+        self._config['ACTOR_MAX_QUEUE_DEPTH'] = int(self._config['ACTOR_MAX_QUEUE_DEPTH'])
+        self._config['STREAK_CACHE_MAX_USERS'] = int(self._config['STREAK_CACHE_MAX_USERS'])
         
         # Log the configuration (excluding sensitive data)
         self._log_config()
@@ -0,0 +1,149 @@
+"""
+Calendar bitmap for streaks.
+
+A `DayBitmap` records the days something happened as one bit per day,
+from its first day onward, held in a Python int. A year of history is 46
+bytes, and streak questions are whole-word bit operations rather than
+walks over dates: the current run is a mask and a bit scan for the last
+missed day, "active N of the last M days" is a shift, a mask and a
+popcount, and the longest run takes one shift-and-AND per day of it.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional
+
+# int.bit_count() is Python 3.10+
+if hasattr(int, "bit_count"):
+    def _popcount(bits: int) -> int:
+        return bits.bit_count()
+else:
+    def _popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+class DayBitmap:
+    """Days on which something happened, one bit per day."""
+
+    __slots__ = ("origin", "bits")
+
+    def __init__(self, origin: int = 0, bits: int = 0):
+        """
+        Args:
+            origin: Ordinal (`date.toordinal()`) of the day bit 0 stands for
+            bits: Bit i is set if something happened on day `origin + i`
+        """
+        self.origin = origin
+        self.bits = bits
+
+    @classmethod
+    def from_bytes(cls, origin: int, data: bytes) -> "DayBitmap":
+        """A bitmap as stored by `to_bytes()`."""
+        return cls(origin, int.from_bytes(data, "little"))
+
+    def to_bytes(self) -> bytes:
+        """The bits, little-endian, in as few bytes as they need."""
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __len__(self) -> int:
+        """Marked days."""
+        return _popcount(self.bits)
+
+    def __contains__(self, day: date) -> bool:
+        i = day.toordinal() - self.origin
+        return i >= 0 and (self.bits >> i) & 1 == 1
+
+    def add(self, day: date) -> bool:
+        """
+        Mark a day.
+
+        Returns:
+            bool: Whether the day wasn't marked yet
+        """
+        ordinal = day.toordinal()
+        if not self.bits:
+            self.origin = ordinal
+        elif ordinal < self.origin:
+            # Rebase on the earlier day
+            self.bits <<= self.origin - ordinal
+            self.origin = ordinal
+        bit = 1 << (ordinal - self.origin)
+        if self.bits & bit:
+            return False
+        self.bits |= bit
+        return True
+
+    def merge(self, other: "DayBitmap") -> bool:
+        """
+        Mark every day marked in another bitmap.
+
+        Returns:
+            bool: Whether any day wasn't marked yet
+        """
+        if not other.bits:
+            return False
+        if not self.bits:
+            self.origin, self.bits = other.origin, other.bits
+            return True
+        origin = min(self.origin, other.origin)
+        bits = (self.bits << (self.origin - origin)) | (other.bits << (other.origin - origin))
+        changed = bits != self.bits << (self.origin - origin)
+        self.origin, self.bits = origin, bits
+        return changed
+
+    def last_day(self) -> Optional[date]:
+        """The latest marked day."""
+        if not self.bits:
+            return None
+        return date.fromordinal(self.origin + self.bits.bit_length() - 1)
+
+    def current_run(self, on: date) -> int:
+        """
+        Consecutive marked days ending on a day.
+
+        A run that ended the day before still counts: it isn't broken
+        until a whole day passes unmarked.
+        """
+        i = on.toordinal() - self.origin
+        if i >= 0 and not (self.bits >> i) & 1:
+            i -= 1
+        if i < 0 or not (self.bits >> i) & 1:
+            return 0
+        # Latest unmarked day at or before i
+        gaps = ~self.bits & ((1 << (i + 1)) - 1)
+        return i + 1 if not gaps else i - (gaps.bit_length() - 1)
+
+    def longest_run(self) -> int:
+        """Most consecutive marked days."""
+        bits = self.bits
+        longest = 0
+        # Each pass shortens every run by one day
+        while bits:
+            bits &= bits >> 1
+            longest += 1
+        return longest
+
+    def _window(self, start: date, end: date) -> int:
+        """Bits for `start` to `end` inclusive, with `start` at bit 0."""
+        first = start.toordinal() - self.origin
+        last = end.toordinal() - self.origin
+        if last < 0 or last < first:
+            return 0
+        if first < 0:
+            return (self.bits & ((1 << (last + 1)) - 1)) << -first
+        return (self.bits >> first) & ((1 << (last - first + 1)) - 1)
+
+    def count(self, start: date, end: date) -> int:
+        """Marked days from `start` to `end` inclusive."""
+        return _popcount(self._window(start, end))
+
+    def days(self, start: date, end: date) -> List[date]:
+        """Marked days from `start` to `end` inclusive, in order."""
+        window = self._window(start, end)
+        marked = []
+        while window:
+            low = window & -window
+            marked.append(start + timedelta(days=low.bit_length() - 1))
+            window ^= low
+        return marked
@@ -0,0 +1,183 @@
+"""
+Order-statistics set for leaderboards.
+
+A `RankedSet` keeps members ordered by score, highest first, with ties
+broken by member, and finds a member's rank or the member at a rank in
+O(log n). Entries are kept in sorted buckets of at most `2 * load` keys,
+and a Fenwick tree over the bucket sizes converts between a position in a
+bucket and a rank. An update is a binary search plus a shift within one
+bounded bucket, so a million members (about a thousand buckets) cost no
+more per operation than a thousand, and each member takes one tuple and
+one dict entry.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+# (negated score, member): ascending key order is descending score order
+_Key = Tuple[float, str]
+
+class RankedSet:
+    """Members ordered by score (highest first) with O(log n) rank queries."""
+
+    def __init__(self, load: int = 1000):
+        """
+        Args:
+            load: Bucket size; buckets are split when they reach twice this
+        """
+        self._load = load
+        self._scores: Dict[str, float] = {}
+        self._buckets: List[List[_Key]] = []
+        # Largest key in each bucket
+        self._maxes: List[_Key] = []
+        # Fenwick tree over bucket sizes (1-based); rebuilt when buckets are split or dropped
+        self._tree: List[int] = []
+        self._tree_valid = False
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._scores
+
+    def score(self, member: str) -> Optional[float]:
+        """A member's score, or None if it isn't ranked."""
+        return self._scores.get(member)
+
+    def set(self, member: str, score: float) -> bool:
+        """
+        Set a member's score, adding the member if needed.
+
+        Returns:
+            bool: Whether the score changed
+        """
+        old = self._scores.get(member)
+        if old == score and old is not None:
+            return False
+        if old is not None:
+            self._discard((-old, member))
+        self._insert((-score, member))
+        self._scores[member] = score
+        return True
+
+    def increment(self, member: str, amount: float) -> float:
+        """Add to a member's score (starting from 0) and return the new score."""
+        score = self._scores.get(member, 0) + amount
+        self.set(member, score)
+        return score
+
+    def remove(self, member: str) -> bool:
+        """Remove a member; returns whether it was ranked."""
+        old = self._scores.pop(member, None)
+        if old is None:
+            return False
+        self._discard((-old, member))
+        return True
+
+    def rank(self, member: str) -> Optional[int]:
+        """A member's 0-based rank, or None if it isn't ranked."""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = (-score, member)
+        i = bisect_left(self._maxes, key)
+        return self._prefix(i) + bisect_left(self._buckets[i], key)
+
+    def range(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        """(member, score) pairs ranked `start` to `stop - 1`."""
+        start = max(start, 0)
+        stop = min(stop, len(self._scores))
+        if start >= stop:
+            return []
+
+        i, j = self._locate(start)
+        entries = []
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._buckets[i][j:j + remaining]
+            entries.extend((member, -negated) for negated, member in chunk)
+            remaining -= len(chunk)
+            i, j = i + 1, 0
+        return entries
+
+    def _insert(self, key: _Key) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._tree_valid = False
+            return
+
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            # Past the last bucket's largest key: append to it
+            i -= 1
+            self._buckets[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._buckets[i], key)
+        self._grow(i, 1)
+
+        bucket = self._buckets[i]
+        if len(bucket) >= 2 * self._load:
+            half = len(bucket) // 2
+            self._buckets[i:i + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[i:i + 1] = [bucket[half - 1], bucket[-1]]
+            self._tree_valid = False
+
+    def _discard(self, key: _Key) -> None:
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._grow(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._tree_valid = False
+
+    def _build_tree(self) -> None:
+        size = len(self._buckets)
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for k in range(1, size + 1):
+            parent = k + (k & -k)
+            if parent <= size:
+                tree[parent] += tree[k]
+        self._tree = tree
+        self._tree_valid = True
+
+    def _grow(self, i: int, delta: int) -> None:
+        # An invalid tree is rebuilt from the bucket sizes before it is next read
+        if not self._tree_valid:
+            return
+        k = i + 1
+        size = len(self._tree) - 1
+        while k <= size:
+            self._tree[k] += delta
+            k += k & -k
+
+    def _prefix(self, i: int) -> int:
+        """Members in the buckets before bucket i."""
+        if not self._tree_valid:
+            self._build_tree()
+        total = 0
+        k = i
+        while k > 0:
+            total += self._tree[k]
+            k -= k & -k
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """(bucket, position in bucket) of the member at a 0-based rank."""
+        if not self._tree_valid:
+            self._build_tree()
+        size = len(self._tree) - 1
+        pos = 0
+        step = 1 << size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= size and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
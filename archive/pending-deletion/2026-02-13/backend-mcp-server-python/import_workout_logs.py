@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Workout Log Importer
+
+Imports a client's historical workout log (CSV or JSONL, one set per row)
+into the backend through the Workout MCP Server's import pipeline. The file
+is read line by line, so memory use does not grow with the file size.
+
+Usage:
+    python import_workout_logs.py FILE --user USER_ID [--format csv|jsonl] [--dry-run]
+
+Options:
+    --user USER_ID    User to import the sessions for
+    --format FORMAT   csv or jsonl (default: from the file extension)
+    --dry-run         Validate rows and match exercises without writing
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("workout_log_importer")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Import a workout log into the backend")
+    parser.add_argument("file", type=Path, help="CSV or JSONL workout log")
+    parser.add_argument("--user", required=True, help="User to import the sessions for")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from the file extension)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing")
+    return parser.parse_args()
+
+def log_progress(report):
+    """Log progress after every written batch."""
+    logger.info(
+        f"{report['rowsRead']} rows read, {report['rowsImported']} imported, "
+        f"{report['errorCount']} errors ({report['rowsPerSecond']} rows/s)"
+    )
+
+async def run(args):
+    """Run the import and print the final report."""
+    from workout_mcp_server.services.import_service import aiter_lines
+    from workout_mcp_server.tools.import_tool import run_import
+
+    fmt = args.format or ("jsonl" if args.file.suffix.lower() in (".jsonl", ".ndjson") else "csv")
+    with open(args.file, newline="", encoding="utf-8-sig") as handle:
+        result = await run_import(args.user, aiter_lines(handle), fmt, args.dry_run, progress=log_progress)
+    print(json.dumps(result.dict(), indent=2))
+    return result
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+    if not args.file.exists():
+        logger.error(f"File not found: {args.file}")
+        sys.exit(1)
+
+    # Make the server package importable when run from any directory
+    sys.path.insert(0, str(Path(__file__).parent))
+
+    try:
+        result = asyncio.run(run(args))
+    except Exception as e:
+        logger.error(f"Import failed: {getattr(e, 'detail', None) or e}")
+        sys.exit(1)
+    sys.exit(1 if result.errorCount else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Recommendation Precompute Job
+
+Precomputes every active user's default exercise recommendations and a
+suggested next session, and stores them where GetWorkoutRecommendations
+reads them. Meant to run nightly, e.g. from cron:
+
+    0 3 * * * cd /path/to/backend-mcp-server-python && python precompute_recommendations.py
+
+Usage:
+    python precompute_recommendations.py [--users ID ...] [--users-file FILE] [--workers N] [--chunk-size N]
+
+Options:
+    --users ID ...     Precompute these users instead of all active clients
+    --users-file FILE  Read user IDs from a file, one per line
+    --workers N        Worker processes (default: PRECOMPUTE_WORKERS)
+    --chunk-size N     Users per worker task (default: PRECOMPUTE_CHUNK_SIZE)
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("recommendation_precompute")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Precompute exercise recommendations for active users")
+    parser.add_argument("--users", nargs="+", help="User IDs to precompute (default: all active clients)")
+    parser.add_argument("--users-file", type=Path, help="File with one user ID per line")
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, help="Users per worker task")
+    return parser.parse_args()
+
+async def fetch_active_users():
+    """Get the IDs of all active clients from the backend."""
+    from workout_mcp_server.utils import make_api_request
+
+    response = await make_api_request("GET", "/sessions/users/clients")
+    clients = response if isinstance(response, list) else response.get("clients", [])
+    return [str(client["id"]) for client in clients if client.get("id") is not None and client.get("isActive", True)]
+
+def log_progress(report):
+    """Log progress after every chunk."""
+    logger.info(f"{report['stored']} users stored, {report['failed']} failed ({report['elapsedSeconds']}s)")
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    # Make the server package importable when run from any directory
+    sys.path.insert(0, str(Path(__file__).parent))
+    from workout_mcp_server.services.precompute_service import run_precompute
+
+    try:
+        if args.users_file:
+            users = [line.strip() for line in args.users_file.read_text().splitlines() if line.strip()]
+        elif args.users:
+            users = args.users
+        else:
+            users = asyncio.run(fetch_active_users())
+        logger.info(f"Precomputing recommendations for {len(users)} users")
+        report = run_precompute(users, workers=args.workers, chunk_size=args.chunk_size, progress=log_progress)
+    except Exception as e:
+        logger.error(f"Precompute failed: {getattr(e, 'detail', None) or e}")
+        sys.exit(1)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
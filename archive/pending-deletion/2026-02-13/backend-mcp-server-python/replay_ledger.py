@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Activity Ledger Replay
+
+Rebuilds gamification profiles from the activity ledger (snapshot + the
+events after it) and prints them or a user's event history. Use it to
+audit rewards, or to restore profiles after the backend's copy was lost.
+With --backfill-streaks it instead marks the day of every logged activity
+on the users' streak calendars.
+
+Usage:
+    python replay_ledger.py [--users ID ...] [--workers N] [--chunk-size N] [--snapshot] [--output FILE]
+    python replay_ledger.py --history ID [--upto SEQ]
+    python replay_ledger.py --backfill-streaks [--users ID ...]
+
+Options:
+    --users ID ...     Rebuild these users instead of everyone in the ledger
+    --workers N        Worker processes (default: REPLAY_WORKERS)
+    --chunk-size N     Users per worker task (default: REPLAY_CHUNK_SIZE)
+    --snapshot         Store every rebuilt profile as a new snapshot
+    --output FILE      Write rebuilt profiles to FILE, one JSON object per line
+    --history ID       Print a user's events and their profile as of --upto
+    --upto SEQ         Rebuild the --history profile as of this event (default: latest)
+    --backfill-streaks Build streak calendars from the ledger's activities
+"""
+
+import sys
+import json
+import argparse
+import logging
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("ledger_replay")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Rebuild gamification profiles from the activity ledger")
+    parser.add_argument("--users", nargs="+", help="User IDs to rebuild (default: everyone in the ledger)")
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, help="Users per worker task")
+    parser.add_argument("--snapshot", action="store_true", help="Store rebuilt profiles as snapshots")
+    parser.add_argument("--output", type=Path, help="File to write rebuilt profiles to (JSON lines)")
+    parser.add_argument("--history", metavar="ID", help="Print a user's events and rebuilt profile")
+    parser.add_argument("--upto", type=int, help="Rebuild --history as of this event sequence number")
+    parser.add_argument("--backfill-streaks", action="store_true",
+                        help="Build streak calendars from the ledger's activities")
+    return parser.parse_args()
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    # Make the server package importable when run from any directory
+    sys.path.insert(0, str(Path(__file__).parent))
+    from gamification_mcp_server.services.ledger_service import activity_ledger, rebuild_all
+
+    if args.history:
+        events = [event for event in activity_ledger.events(args.history)
+                  if args.upto is None or event["seq"] <= args.upto]
+        profile, replayed = activity_ledger.rebuild(args.history, args.upto)
+        print(json.dumps({
+            "userId": args.history,
+            "events": events,
+            "eventsReplayed": replayed,
+            "profile": json.loads(profile.json()) if profile else None
+        }, indent=2, default=str))
+        sys.exit(0 if profile else 1)
+
+    if args.backfill_streaks:
+        from gamification_mcp_server.services.streak_service import streak_calendar
+        try:
+            report = streak_calendar.backfill(activity_ledger, args.users)
+        except Exception as e:
+            logger.error(f"Streak backfill failed: {e}")
+            sys.exit(1)
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        report = rebuild_all(
+            args.users,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            snapshot=args.snapshot,
+            on_profile=(lambda user_id, profile: output.write(profile.json() + "\n")) if output else None
+        )
+    except Exception as e:
+        logger.error(f"Replay failed: {e}")
+        sys.exit(1)
+    finally:
+        if output:
+            output.close()
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -143,9 +143,11 @@ except ImportError as e:
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions with proper JSON response."""
+    # Keep headers such as Retry-After on 429s from admission control
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -182,6 +184,22 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error connecting to MongoDB: {str(e)}")
         logger.warning("Running with limited functionality due to database connection failure")
+    
+    # Invalidate caches on database change notifications
+    try:
+        from workout_mcp_server.services.invalidation_service import change_feed
+        if change_feed.start():
+            logger.info(f"Change feed started ({change_feed.source})")
+    except ImportError as e:
+        logger.error(f"Change feed unavailable, caches expire by TTL only: {e}")
+    
+    # Build the exercise substitution graph over the whole catalog
+    try:
+        from workout_mcp_server.services.substitution_service import catalog_refresh
+        if catalog_refresh.start():
+            logger.info("Substitution graph rebuild scheduled")
+    except ImportError as e:
+        logger.error(f"Substitution graph unavailable: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -193,6 +211,18 @@ async def shutdown_event():
         logger.info("Resources cleaned up")
     except ImportError:
         logger.info("No MongoDB connection to close")
+    
+    try:
+        from workout_mcp_server.services.invalidation_service import change_feed
+        await change_feed.stop()
+    except ImportError:
+        pass
+    
+    try:
+        from workout_mcp_server.services.substitution_service import catalog_refresh
+        await catalog_refresh.stop()
+    except ImportError:
+        pass
 
 # Health check endpoint
 @app.get("/health", tags=["health"])
@@ -200,9 +230,20 @@ async def health_check():
     """Check the health of the server and its dependencies."""
     mongo_status = "connected" if is_connected() else "disconnected"
     
+    try:
+        from workout_mcp_server.utils.api_client import get_backend_health
+        backend = get_backend_health()
+    except ImportError:
+        backend = {"circuits": {}, "hedgedRequests": {}}
+    
+    # Open circuits mean some backend endpoints are currently failing fast
+    circuits_open = any(c["state"] == "open" for c in backend["circuits"].values())
+    
     return {
-        "status": "healthy",
+        "status": "degraded" if circuits_open else "healthy",
         "mongodb": mongo_status,
+        "backendCircuits": backend["circuits"],
+        "hedgedRequests": backend["hedgedRequests"],
         "version": "1.0.0",
         "environment": "Development" if config.get("DEBUG", False) else "Production",
         "server": "Workout MCP Server"
@@ -215,12 +256,47 @@ async def get_metrics():
     import time
     from datetime import datetime
     
+    try:
+        from workout_mcp_server.utils.admission import admission
+        admission_metrics = admission.metrics()
+    except ImportError:
+        admission_metrics = {}
+    
+    try:
+        from workout_mcp_server.utils.idempotency import idempotency_store
+        idempotency_metrics = idempotency_store.metrics()
+    except ImportError:
+        idempotency_metrics = {}
+    
+    try:
+        from workout_mcp_server.services.invalidation_service import change_feed
+        change_feed_metrics = change_feed.metrics()
+    except ImportError:
+        change_feed_metrics = {}
+    
+    try:
+        from workout_mcp_server.services.substitution_service import catalog_refresh
+        substitution_metrics = catalog_refresh.metrics()
+    except ImportError:
+        substitution_metrics = {}
+    
+    try:
+        from workout_mcp_server.utils.postgresql import get_database_metrics
+        database_metrics = get_database_metrics()
+    except ImportError:
+        database_metrics = {}
+    
     # Basic server metrics
     return {
         "server": "Workout MCP Server",
         "timestamp": datetime.now().isoformat(),
         "uptime_seconds": time.time() - (getattr(app, 'start_time', time.time())),
         "mongodb_connected": mongodb_connected,
+        "admission": admission_metrics,
+        "idempotency": idempotency_metrics,
+        "changeFeed": change_feed_metrics,
+        "substitutions": substitution_metrics,
+        "database": database_metrics,
         "version": "1.0.0",
         "environment": "Development" if config.get("DEBUG", False) else "Production"
     }
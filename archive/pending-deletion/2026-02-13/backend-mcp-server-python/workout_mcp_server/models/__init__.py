@@ -38,7 +38,22 @@ try:
         LogWorkoutSessionInput,
         LogWorkoutSessionOutput,
         GenerateWorkoutPlanInput,
-        GenerateWorkoutPlanOutput
+        GenerateWorkoutPlanOutput,
+        ExpandWorkoutPlanInput,
+        ExpandWorkoutPlanOutput,
+        ToolCall,
+        ToolCallResult,
+        BatchToolsInput,
+        BatchToolsOutput,
+        GetExerciseAlternatesInput,
+        GetExerciseAlternatesOutput,
+        GetTrainingLoadInput,
+        GetTrainingLoadOutput,
+        ImportWorkoutLogInput,
+        ImportWorkoutLogOutput,
+        ExportClientHistoryInput,
+        GetTrainerRosterSummaryInput,
+        GetTrainerRosterSummaryOutput
     )
 except ImportError as e:
     # If absolute imports fail, try relative imports as fallback
@@ -68,7 +83,22 @@ except ImportError as e:
             LogWorkoutSessionInput,
             LogWorkoutSessionOutput,
             GenerateWorkoutPlanInput,
-            GenerateWorkoutPlanOutput
+            GenerateWorkoutPlanOutput,
+            ExpandWorkoutPlanInput,
+            ExpandWorkoutPlanOutput,
+            ToolCall,
+            ToolCallResult,
+            BatchToolsInput,
+            BatchToolsOutput,
+            GetExerciseAlternatesInput,
+            GetExerciseAlternatesOutput,
+            GetTrainingLoadInput,
+            GetTrainingLoadOutput,
+            ImportWorkoutLogInput,
+            ImportWorkoutLogOutput,
+            ExportClientHistoryInput,
+            GetTrainerRosterSummaryInput,
+            GetTrainerRosterSummaryOutput
         )
     except ImportError as e2:
         print(f"Error importing workout models: {e} / {e2}")
@@ -97,6 +127,21 @@ except ImportError as e:
         class LogWorkoutSessionOutput(BaseModel): pass
         class GenerateWorkoutPlanInput(BaseModel): pass
         class GenerateWorkoutPlanOutput(BaseModel): pass
+        class ExpandWorkoutPlanInput(BaseModel): pass
+        class ExpandWorkoutPlanOutput(BaseModel): pass
+        class ToolCall(BaseModel): pass
+        class ToolCallResult(BaseModel): pass
+        class BatchToolsInput(BaseModel): pass
+        class BatchToolsOutput(BaseModel): pass
+        class GetExerciseAlternatesInput(BaseModel): pass
+        class GetExerciseAlternatesOutput(BaseModel): pass
+        class GetTrainingLoadInput(BaseModel): pass
+        class GetTrainingLoadOutput(BaseModel): pass
+        class ImportWorkoutLogInput(BaseModel): pass
+        class ImportWorkoutLogOutput(BaseModel): pass
+        class ExportClientHistoryInput(BaseModel): pass
+        class GetTrainerRosterSummaryInput(BaseModel): pass
+        class GetTrainerRosterSummaryOutput(BaseModel): pass
 
 __all__ = [
     # Schema models
@@ -123,5 +168,20 @@ __all__ = [
     'LogWorkoutSessionInput',
     'LogWorkoutSessionOutput',
     'GenerateWorkoutPlanInput',
-    'GenerateWorkoutPlanOutput'
+    'GenerateWorkoutPlanOutput',
+    'ExpandWorkoutPlanInput',
+    'ExpandWorkoutPlanOutput',
+    'ToolCall',
+    'ToolCallResult',
+    'BatchToolsInput',
+    'BatchToolsOutput',
+    'GetExerciseAlternatesInput',
+    'GetExerciseAlternatesOutput',
+    'GetTrainingLoadInput',
+    'GetTrainingLoadOutput',
+    'ImportWorkoutLogInput',
+    'ImportWorkoutLogOutput',
+    'ExportClientHistoryInput',
+    'GetTrainerRosterSummaryInput',
+    'GetTrainerRosterSummaryOutput'
 ]
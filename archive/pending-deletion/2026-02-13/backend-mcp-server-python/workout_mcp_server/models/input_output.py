@@ -30,6 +30,7 @@ class GetWorkoutRecommendationsInput(BaseModel):
 class GetWorkoutRecommendationsOutput(BaseModel):
     """Output for workout recommendations tool."""
     exercises: List[Exercise]
+    suggestedSession: Optional[Dict[str, Any]] = None  # Next session built from the recommendations
     message: str
 
 class GetClientProgressInput(BaseModel):
@@ -50,6 +51,8 @@ class GetWorkoutStatisticsInput(BaseModel):
     includeMuscleGroupBreakdown: Optional[bool] = True
     includeWeekdayBreakdown: Optional[bool] = True
     includeIntensityTrends: Optional[bool] = True
+    maxPoints: Optional[int] = None  # Downsample intensityTrends to at most this many points
+    downsampleMethod: Optional[str] = "lttb"  # "lttb" or "bucket"
 
 class GetWorkoutStatisticsOutput(BaseModel):
     """Output for workout statistics tool."""
@@ -59,6 +62,7 @@ class GetWorkoutStatisticsOutput(BaseModel):
 class LogWorkoutSessionInput(BaseModel):
     """Input for logging a workout session."""
     session: WorkoutSession
+    idempotencyKey: Optional[str] = None  # Retries with the same key return the first response
 
 class LogWorkoutSessionOutput(BaseModel):
     """Output for logging a workout session."""
@@ -77,10 +81,134 @@ class GenerateWorkoutPlanInput(BaseModel):
     daysPerWeek: int = 3
     focusAreas: Optional[List[str]] = None
     difficulty: Optional[str] = "intermediate"
-    optPhase: Optional[str] = None
+    optPhase: Optional[str] = None  # Starting OPT phase
     equipment: Optional[List[str]] = None
+    expandWeeks: Optional[int] = None  # Weeks to build days for (default: PLAN_MAX_EXPANDED_WEEKS)
 
 class GenerateWorkoutPlanOutput(BaseModel):
     """Output for generating a workout plan."""
     plan: WorkoutPlan
+    schedule: Optional[List[Dict[str, Any]]] = None  # Phase and deload of every week
+    totalWeeks: Optional[int] = None
+    expandedWeeks: Optional[int] = None
+    message: str
+
+class ExpandWorkoutPlanInput(BaseModel):
+    """Input for building the days of more weeks of a generated plan."""
+    trainerId: str
+    planId: str
+    weeks: Optional[int] = None  # Weeks to add after the last built one (default: PLAN_MAX_EXPANDED_WEEKS)
+
+class ExpandWorkoutPlanOutput(BaseModel):
+    """Output for expanding a workout plan."""
+    plan: WorkoutPlan
+    totalWeeks: int
+    expandedWeeks: int  # Weeks with days built, including the ones just added
+    message: str
+
+class GetExerciseAlternatesInput(BaseModel):
+    """Input for exercise alternates tool."""
+    exerciseId: str
+    equipment: Optional[List[str]] = None  # Available equipment; None means unrestricted
+    excludeExercises: Optional[List[str]] = Field(default_factory=list)
+    limit: Optional[int] = 5
+
+class GetExerciseAlternatesOutput(BaseModel):
+    """Output for exercise alternates tool."""
+    exerciseId: str
+    alternates: List[Dict[str, Any]]
+    message: str
+
+class GetTrainingLoadInput(BaseModel):
+    """Input for training load tool."""
+    userId: str
+    asOf: Optional[str] = None  # ISO date to report loads at (default: today)
+    weeks: Optional[int] = 8  # Weeks of volume and e1RM trend to return
+    exerciseIds: Optional[List[str]] = None  # Limit e1RM trends to these exercises
+    refresh: Optional[bool] = False  # Rebuild from the full session history
+    maxPoints: Optional[int] = None  # Downsample weeklyTonnage and each e1RM trend to at most this many points
+    downsampleMethod: Optional[str] = "lttb"  # "lttb" or "bucket"
+
+class GetTrainingLoadOutput(BaseModel):
+    """Output for training load tool."""
+    userId: str
+    asOf: str
+    acuteLoad: float
+    chronicLoad: float
+    acuteChronicRatio: Optional[float] = None
+    riskZone: Optional[str] = None
+    weeklyTonnage: List[Dict[str, Any]]
+    muscleVolume: List[Dict[str, Any]]
+    e1rmTrends: Dict[str, List[Dict[str, Any]]]
+    totalSets: int
+    message: str
+
+class ImportWorkoutLogInput(BaseModel):
+    """Input for workout log import tool."""
+    userId: str
+    content: str  # CSV (with header) or JSONL, one set per row
+    format: Optional[str] = "csv"  # "csv" or "jsonl"
+    dryRun: Optional[bool] = False  # Validate and match exercises without writing
+
+class ImportWorkoutLogOutput(BaseModel):
+    """Output for workout log import tool."""
+    userId: str
+    dryRun: bool
+    rowsRead: int
+    rowsImported: int
+    sessionsWritten: int
+    errorCount: int
+    errors: List[Dict[str, Any]]  # {row, error}; capped at IMPORT_MAX_ERRORS
+    unmatchedExercises: List[str]
+    elapsedSeconds: float
+    rowsPerSecond: float
+    message: str
+
+class ToolCall(BaseModel):
+    """A single tool invocation within a batch."""
+    id: Optional[str] = None  # Caller-chosen id echoed back in the result
+    tool: str
+    input: Dict[str, Any] = Field(default_factory=dict)
+
+class ToolCallResult(BaseModel):
+    """Result of a single tool invocation within a batch."""
+    id: Optional[str] = None
+    tool: str
+    success: bool
+    statusCode: int
+    output: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchToolsInput(BaseModel):
+    """Input for running several tool invocations in one request."""
+    calls: List[ToolCall]
+
+class BatchToolsOutput(BaseModel):
+    """Output for running several tool invocations in one request."""
+    results: List[ToolCallResult]
+    message: str
+
+class GetTrainerRosterSummaryInput(BaseModel):
+    """Input for trainer roster summary tool."""
+    trainerId: str
+    clientIds: Optional[List[str]] = None  # Summarize these clients instead of the trainer's assigned roster
+    weeks: Optional[int] = 4  # Window for weekly volume and adherence
+    targetSessionsPerWeek: Optional[int] = 3  # Sessions per week that count as full adherence
+    refresh: Optional[bool] = False  # Ignore cached summaries
+
+class GetTrainerRosterSummaryOutput(BaseModel):
+    """Output for trainer roster summary tool."""
+    trainerId: str
+    weeks: int
+    clients: List[Dict[str, Any]]  # One summary per client, least recently active first
+    clientCount: int
+    refreshedClients: int
+    failedClients: int
     message: str
+
+class ExportClientHistoryInput(BaseModel):
+    """Input for client history export tool."""
+    userId: str
+    format: Optional[str] = "csv"  # "csv", "ndjson" or "parquet"
+    startDate: Optional[str] = None  # ISO date, inclusive
+    endDate: Optional[str] = None  # ISO date, inclusive
@@ -144,6 +144,7 @@ class WorkoutPlanDayExercise(BaseModel):
 class WorkoutPlanDay(BaseModel):
     """Day within a workout plan."""
     dayNumber: int
+    weekNumber: Optional[int] = None
     name: str
     focus: Optional[str] = None
     dayType: str = "training"
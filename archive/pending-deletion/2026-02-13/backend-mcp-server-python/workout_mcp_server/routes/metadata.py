@@ -15,7 +15,13 @@ try:
         GetClientProgressInput, GetClientProgressOutput,
         GetWorkoutStatisticsInput, GetWorkoutStatisticsOutput,
         LogWorkoutSessionInput, LogWorkoutSessionOutput,
-        GenerateWorkoutPlanInput, GenerateWorkoutPlanOutput
+        GenerateWorkoutPlanInput, GenerateWorkoutPlanOutput,
+        GetExerciseAlternatesInput, GetExerciseAlternatesOutput,
+        GetTrainingLoadInput, GetTrainingLoadOutput,
+        ImportWorkoutLogInput, ImportWorkoutLogOutput,
+        ExportClientHistoryInput,
+        GetTrainerRosterSummaryInput, GetTrainerRosterSummaryOutput,
+        ExpandWorkoutPlanInput, ExpandWorkoutPlanOutput
     )
     MODELS_AVAILABLE = True
 except ImportError as e:
@@ -32,7 +38,13 @@ except ImportError as e:
             GetClientProgressInput, GetClientProgressOutput,
             GetWorkoutStatisticsInput, GetWorkoutStatisticsOutput,
             LogWorkoutSessionInput, LogWorkoutSessionOutput,
-            GenerateWorkoutPlanInput, GenerateWorkoutPlanOutput
+            GenerateWorkoutPlanInput, GenerateWorkoutPlanOutput,
+            GetExerciseAlternatesInput, GetExerciseAlternatesOutput,
+            GetTrainingLoadInput, GetTrainingLoadOutput,
+            ImportWorkoutLogInput, ImportWorkoutLogOutput,
+            ExportClientHistoryInput,
+            GetTrainerRosterSummaryInput, GetTrainerRosterSummaryOutput,
+            ExpandWorkoutPlanInput, ExpandWorkoutPlanOutput
         )
         MODELS_AVAILABLE = True
     except ImportError as e2:
@@ -93,6 +105,42 @@ async def list_tools():
                 "description": "Generate a personalized workout plan for a client.",
                 "input_schema": GenerateWorkoutPlanInput.schema(),
                 "output_schema": GenerateWorkoutPlanOutput.schema()
+            },
+            {
+                "name": "GetExerciseAlternates",
+                "description": "Get ranked substitute exercises for an exercise.",
+                "input_schema": GetExerciseAlternatesInput.schema(),
+                "output_schema": GetExerciseAlternatesOutput.schema()
+            },
+            {
+                "name": "GetTrainingLoad",
+                "description": "Get acute:chronic workload ratio, muscle-group volume and e1RM trends for a user",
+                "input_schema": GetTrainingLoadInput.schema(),
+                "output_schema": GetTrainingLoadOutput.schema()
+            },
+            {
+                "name": "ImportWorkoutLog",
+                "description": "Import a CSV or JSONL workout log (one set per row) as workout sessions",
+                "input_schema": ImportWorkoutLogInput.schema(),
+                "output_schema": ImportWorkoutLogOutput.schema()
+            },
+            {
+                "name": "ExportClientHistory",
+                "description": "Stream a client's workout history (one set per row) as CSV, NDJSON or Parquet",
+                "input_schema": ExportClientHistoryInput.schema(),
+                "output_schema": {"type": "string", "format": "binary"}
+            },
+            {
+                "name": "GetTrainerRosterSummary",
+                "description": "Summarize last workout, streak, weekly volume and adherence for every client on a trainer's roster",
+                "input_schema": GetTrainerRosterSummaryInput.schema(),
+                "output_schema": GetTrainerRosterSummaryOutput.schema()
+            },
+            {
+                "name": "ExpandWorkoutPlan",
+                "description": "Build the workout days of more weeks of a generated plan",
+                "input_schema": ExpandWorkoutPlanInput.schema(),
+                "output_schema": ExpandWorkoutPlanOutput.schema()
             }
         ]
     }
@@ -3,7 +3,8 @@
 import sys
 import os
 from pathlib import Path
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Header, Request
 
 # Set up import paths BEFORE any imports
 current_dir = Path(__file__).parent.parent
@@ -23,14 +24,35 @@ try:
         LogWorkoutSessionInput,
         LogWorkoutSessionOutput,
         GenerateWorkoutPlanInput,
-        GenerateWorkoutPlanOutput
+        GenerateWorkoutPlanOutput,
+        GetExerciseAlternatesInput,
+        GetExerciseAlternatesOutput,
+        GetTrainingLoadInput,
+        GetTrainingLoadOutput,
+        ImportWorkoutLogInput,
+        ImportWorkoutLogOutput,
+        ExportClientHistoryInput,
+        GetTrainerRosterSummaryInput,
+        GetTrainerRosterSummaryOutput,
+        ExpandWorkoutPlanInput,
+        ExpandWorkoutPlanOutput,
+        BatchToolsInput,
+        BatchToolsOutput
     )
     from tools import (
         get_workout_recommendations,
         get_client_progress,
         get_workout_statistics,
         log_workout_session,
-        generate_workout_plan
+        generate_workout_plan,
+        get_exercise_alternates,
+        get_training_load,
+        import_workout_log,
+        import_workout_log_upload,
+        export_client_history,
+        get_trainer_roster_summary,
+        expand_workout_plan,
+        run_tool_batch
     )
     IMPORTS_AVAILABLE = True
     print("SUCCESS: Successfully imported workout modules using absolute imports")
@@ -59,6 +81,32 @@ except ImportError as e:
         pass
     class GenerateWorkoutPlanOutput(BaseModel):
         pass
+    class GetExerciseAlternatesInput(BaseModel):
+        pass
+    class GetExerciseAlternatesOutput(BaseModel):
+        pass
+    class GetTrainingLoadInput(BaseModel):
+        pass
+    class GetTrainingLoadOutput(BaseModel):
+        pass
+    class ImportWorkoutLogInput(BaseModel):
+        pass
+    class ImportWorkoutLogOutput(BaseModel):
+        pass
+    class ExportClientHistoryInput(BaseModel):
+        pass
+    class GetTrainerRosterSummaryInput(BaseModel):
+        pass
+    class GetTrainerRosterSummaryOutput(BaseModel):
+        pass
+    class ExpandWorkoutPlanInput(BaseModel):
+        pass
+    class ExpandWorkoutPlanOutput(BaseModel):
+        pass
+    class BatchToolsInput(BaseModel):
+        pass
+    class BatchToolsOutput(BaseModel):
+        pass
     
     # Create placeholder functions
     async def get_workout_recommendations(input_data):
@@ -71,11 +119,44 @@ except ImportError as e:
         return {"error": "Service not available - import failed"}
     async def generate_workout_plan(input_data):
         return {"error": "Service not available - import failed"}
+    async def get_exercise_alternates(input_data):
+        return {"error": "Service not available - import failed"}
+    async def get_training_load(input_data):
+        return {"error": "Service not available - import failed"}
+    async def import_workout_log(input_data):
+        return {"error": "Service not available - import failed"}
+    async def import_workout_log_upload(chunks, user_id, fmt="csv", dry_run=False):
+        return {"error": "Service not available - import failed"}
+    async def export_client_history(input_data):
+        return {"error": "Service not available - import failed"}
+    async def get_trainer_roster_summary(input_data):
+        return {"error": "Service not available - import failed"}
+    async def expand_workout_plan(input_data):
+        return {"error": "Service not available - import failed"}
+    async def run_tool_batch(input_data, registry, write_tools):
+        return {"error": "Service not available - import failed"}
     
     IMPORTS_AVAILABLE = False
 
 router = APIRouter()
 
+# Tools that can be invoked through /tools/batch: name -> (input model, handler)
+TOOL_REGISTRY = {
+    "GetWorkoutRecommendations": (GetWorkoutRecommendationsInput, get_workout_recommendations),
+    "GetClientProgress": (GetClientProgressInput, get_client_progress),
+    "GetWorkoutStatistics": (GetWorkoutStatisticsInput, get_workout_statistics),
+    "LogWorkoutSession": (LogWorkoutSessionInput, log_workout_session),
+    "GenerateWorkoutPlan": (GenerateWorkoutPlanInput, generate_workout_plan),
+    "GetExerciseAlternates": (GetExerciseAlternatesInput, get_exercise_alternates),
+    "GetTrainingLoad": (GetTrainingLoadInput, get_training_load),
+    "ImportWorkoutLog": (ImportWorkoutLogInput, import_workout_log),
+    "GetTrainerRosterSummary": (GetTrainerRosterSummaryInput, get_trainer_roster_summary),
+    "ExpandWorkoutPlan": (ExpandWorkoutPlanInput, expand_workout_plan)
+}
+
+# Tools that change backend state; batched reads are never reordered around them
+WRITE_TOOLS = {"LogWorkoutSession", "GenerateWorkoutPlan", "ExpandWorkoutPlan", "ImportWorkoutLog"}
+
 @router.post("/GetWorkoutRecommendations", response_model=GetWorkoutRecommendationsOutput)
 async def workout_recommendations_route(input_data: GetWorkoutRecommendationsInput):
     """
@@ -121,7 +202,10 @@ async def workout_statistics_route(input_data: GetWorkoutStatisticsInput):
     return await get_workout_statistics(input_data)
 
 @router.post("/LogWorkoutSession", response_model=LogWorkoutSessionOutput)
-async def log_workout_session_route(input_data: LogWorkoutSessionInput):
+async def log_workout_session_route(
+    input_data: LogWorkoutSessionInput,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Log a workout session for a user.
     
@@ -133,9 +217,12 @@ async def log_workout_session_route(input_data: LogWorkoutSessionInput):
     - Update exercises and sets with performance data
     
     The tool handles progress tracking and gamification updates automatically.
+    Send an `Idempotency-Key` header (or `idempotencyKey`) to make retries safe.
     """
     if not IMPORTS_AVAILABLE:
         return {"error": "Workout logging service is currently unavailable"}
+    if idempotency_key and not input_data.idempotencyKey:
+        input_data.idempotencyKey = idempotency_key
     return await log_workout_session(input_data)
 
 @router.post("/GenerateWorkoutPlan", response_model=GenerateWorkoutPlanOutput)
@@ -154,6 +241,105 @@ async def generate_workout_plan_route(input_data: GenerateWorkoutPlanInput):
         return {"error": "Workout plan generation service is currently unavailable"}
     return await generate_workout_plan(input_data)
 
+@router.post("/GetExerciseAlternates", response_model=GetExerciseAlternatesOutput)
+async def get_exercise_alternates_route(input_data: GetExerciseAlternatesInput):
+    """
+    Get ranked substitute exercises for an exercise.
+    
+    Alternates come from a precomputed nearest-neighbour graph over the
+    exercise catalog (shared muscles, movement pattern, equipment and
+    difficulty), optionally restricted to the equipment available.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Exercise alternates service is currently unavailable"}
+    return await get_exercise_alternates(input_data)
+
+@router.post("/GetTrainingLoad", response_model=GetTrainingLoadOutput)
+async def get_training_load_route(input_data: GetTrainingLoadInput):
+    """
+    Get training-load metrics for a user.
+    
+    Returns the acute:chronic workload ratio, weekly tonnage and muscle-group
+    volume, and e1RM trends. Metrics are kept in memory and updated as sessions
+    are logged, so only the first call for a user reads their history.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Training load service is currently unavailable"}
+    return await get_training_load(input_data)
+
+@router.post("/ImportWorkoutLog", response_model=ImportWorkoutLogOutput)
+async def import_workout_log_route(input_data: ImportWorkoutLogInput):
+    """
+    Import a CSV or JSONL workout log for a user.
+    
+    Rows are grouped into sessions, exercise names are matched to the catalog
+    and sessions are written in batches. Returns throughput and per-row errors.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Workout log import service is currently unavailable"}
+    return await import_workout_log(input_data)
+
+@router.post("/ImportWorkoutLog/upload", response_model=ImportWorkoutLogOutput)
+async def import_workout_log_upload_route(request: Request, userId: str, format: str = "csv", dryRun: bool = False):
+    """
+    Import a workout log sent as the raw request body.
+    
+    The body is parsed while it streams in, so large exports can be uploaded
+    without being held in memory. Takes the same options as ImportWorkoutLog
+    as query parameters.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Workout log import service is currently unavailable"}
+    return await import_workout_log_upload(request.stream(), userId, format, dryRun)
+
+@router.post("/ExportClientHistory")
+async def export_client_history_route(input_data: ExportClientHistoryInput):
+    """
+    Export a client's workout history.
+    
+    Streams one row per set as CSV, NDJSON or Parquet in a chunked
+    response. Not available through /tools/batch, whose results are JSON.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Client history export service is currently unavailable"}
+    return await export_client_history(input_data)
+
+@router.post("/GetTrainerRosterSummary", response_model=GetTrainerRosterSummaryOutput)
+async def get_trainer_roster_summary_route(input_data: GetTrainerRosterSummaryInput):
+    """
+    Get a compact summary of every client on a trainer's roster.
+    
+    Clients are fetched concurrently and cached per trainer, so a dashboard
+    needs one call instead of two per client.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Trainer roster service is currently unavailable"}
+    return await get_trainer_roster_summary(input_data)
+
+@router.post("/ExpandWorkoutPlan", response_model=ExpandWorkoutPlanOutput)
+async def expand_workout_plan_route(input_data: ExpandWorkoutPlanInput):
+    """
+    Build the workout days of more weeks of a plan made by GenerateWorkoutPlan.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Workout plan service is currently unavailable"}
+    return await expand_workout_plan(input_data)
+
+@router.post("/tools/batch", response_model=BatchToolsOutput)
+async def batch_tools_route(input_data: BatchToolsInput):
+    """
+    Run several tool invocations in one request.
+    
+    Independent read-only calls run concurrently and share a request-scoped
+    cache, so overlapping backend fetches (e.g. the client progress used by
+    GetClientProgress and GenerateWorkoutPlan) happen once per batch.
+    Write tools run in submission order. Each call gets its own result with
+    a status code, so one failing call does not fail the whole batch.
+    """
+    if not IMPORTS_AVAILABLE:
+        return {"error": "Batch tool service is currently unavailable"}
+    return await run_tool_batch(input_data, TOOL_REGISTRY, WRITE_TOOLS)
+
 # Add health check for this module
 @router.get("/tools/health")
 async def tools_health():
@@ -166,6 +352,13 @@ async def tools_health():
             "get_client_progress", 
             "get_workout_statistics",
             "log_workout_session",
-            "generate_workout_plan"
+            "generate_workout_plan",
+            "get_exercise_alternates",
+            "get_training_load",
+            "import_workout_log",
+            "export_client_history",
+            "get_trainer_roster_summary",
+            "expand_workout_plan",
+            "run_tool_batch"
         ]
     }
@@ -0,0 +1,241 @@
+"""
+Service for exporting a client's workout history.
+
+The history is exported as one row per set, carrying its session and
+exercise columns (sessions without sets get one row with empty set
+columns). Rows are encoded chunk by chunk as CSV, NDJSON or Parquet, so an
+export can be streamed without holding the whole history in memory. The
+CSV header uses names the workout log importer understands, so an export
+can be imported again as-is.
+"""
+
+import io
+import csv
+import json
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger("workout_mcp_server.export_service")
+
+CSV = "csv"
+NDJSON = "ndjson"
+PARQUET = "parquet"
+FORMATS = (CSV, NDJSON, PARQUET)
+
+MEDIA_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+    PARQUET: "application/vnd.apache.parquet"
+}
+
+# Export columns and their Parquet types
+COLUMNS = (
+    ("sessionId", "string"),
+    ("date", "timestamp"),
+    ("workout", "string"),
+    ("status", "string"),
+    ("exerciseId", "string"),
+    ("exercise", "string"),
+    ("orderInWorkout", "int"),
+    ("setNumber", "int"),
+    ("setType", "string"),
+    ("reps", "int"),
+    ("weight", "float"),
+    ("rpe", "float"),
+    ("duration", "int"),
+    ("distance", "float"),
+    ("notes", "string"),
+    ("setCompletedAt", "timestamp")
+)
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+# SQL producing COLUMNS straight from the backend tables, ordered so rows
+# of a session are adjacent
+HISTORY_QUERY = """
+    SELECT ws.id AS "sessionId",
+           COALESCE(ws."completedAt", ws."startedAt", ws.date) AS "date",
+           ws.title AS "workout",
+           ws.status AS "status",
+           we."exerciseId" AS "exerciseId",
+           e.name AS "exercise",
+           we."orderInWorkout" AS "orderInWorkout",
+           s."setNumber" AS "setNumber",
+           s."setType" AS "setType",
+           s."repsCompleted" AS "reps",
+           s."weightUsed" AS "weight",
+           s.rpe AS "rpe",
+           s.duration AS "duration",
+           s.distance AS "distance",
+           s.notes AS "notes",
+           s."completedAt" AS "setCompletedAt"
+    FROM workout_sessions ws
+    LEFT JOIN workout_exercises we ON we."workoutSessionId" = ws.id
+    LEFT JOIN "Exercises" e ON e.id = we."exerciseId"
+    LEFT JOIN sets s ON s."workoutExerciseId" = we.id
+    WHERE ws."userId" = :user_id
+      AND (CAST(:start_date AS timestamp) IS NULL OR COALESCE(ws."completedAt", ws."startedAt", ws.date) >= CAST(:start_date AS timestamp))
+      AND (CAST(:end_date AS timestamp) IS NULL OR COALESCE(ws."completedAt", ws."startedAt", ws.date) <= CAST(:end_date AS timestamp))
+    ORDER BY 2, ws.id, we."orderInWorkout", s."setNumber"
+"""
+
+def flatten_session(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a backend session (with exercises and sets) into export rows.
+
+    Args:
+        session: Session data as returned by the backend
+
+    Returns:
+        One row per set
+    """
+    base = {
+        "sessionId": session.get("id"),
+        "date": session.get("completedAt") or session.get("startedAt") or session.get("date"),
+        "workout": session.get("title"),
+        "status": session.get("status")
+    }
+    rows = []
+    for workout_exercise in session.get("exercises") or []:
+        exercise = {
+            **base,
+            "exerciseId": workout_exercise.get("exerciseId"),
+            "exercise": (workout_exercise.get("exercise") or {}).get("name"),
+            "orderInWorkout": workout_exercise.get("orderInWorkout")
+        }
+        sets = workout_exercise.get("sets") or []
+        for set_data in sets:
+            rows.append({
+                **exercise,
+                "setNumber": set_data.get("setNumber"),
+                "setType": set_data.get("setType"),
+                "reps": set_data.get("repsCompleted"),
+                "weight": set_data.get("weightUsed"),
+                "rpe": set_data.get("rpe"),
+                "duration": set_data.get("duration"),
+                "distance": set_data.get("distance"),
+                "notes": set_data.get("notes"),
+                "setCompletedAt": set_data.get("completedAt")
+            })
+        if not sets:
+            rows.append(exercise)
+    if not rows:
+        rows.append(base)
+    return rows
+
+def _timestamp(value: Any) -> Any:
+    """Parse an ISO timestamp into a naive UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _text(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+class CsvEncoder:
+    """Encodes row chunks as CSV with a header row."""
+
+    def __init__(self):
+        self._header_written = False
+
+    def encode(self, rows: Iterable[Dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written:
+            writer.writerow(COLUMN_NAMES)
+            self._header_written = True
+        for row in rows:
+            writer.writerow(["" if row.get(name) is None else _text(row.get(name)) for name in COLUMN_NAMES])
+        return buffer.getvalue().encode("utf-8")
+
+    def close(self) -> bytes:
+        # An empty export still gets its header
+        return self.encode([]) if not self._header_written else b""
+
+class NdjsonEncoder:
+    """Encodes row chunks as newline-delimited JSON objects."""
+
+    def encode(self, rows: Iterable[Dict[str, Any]]) -> bytes:
+        return "".join(
+            json.dumps({name: _text(row.get(name)) for name in COLUMN_NAMES}) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    def close(self) -> bytes:
+        return b""
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out as they are written."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+class ParquetEncoder:
+    """Encodes each row chunk as one Parquet row group."""
+
+    def __init__(self):
+        if pa is None:
+            raise RuntimeError("Parquet export requires pyarrow")
+        types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "timestamp": pa.timestamp("ms")}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+        self._timestamps = [name for name, kind in COLUMNS if kind == "timestamp"]
+        self._strings = [name for name, kind in COLUMNS if kind == "string"]
+        self._sink = _DrainableSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="snappy")
+
+    def _column(self, rows: List[Dict[str, Any]], name: str) -> List[Any]:
+        values = [row.get(name) for row in rows]
+        if name in self._timestamps:
+            return [_timestamp(v) for v in values]
+        if name in self._strings:
+            return [None if v is None else str(v) for v in values]
+        return values
+
+    def encode(self, rows: Iterable[Dict[str, Any]]) -> bytes:
+        rows = list(rows)
+        if rows:
+            table = pa.table({name: self._column(rows, name) for name in COLUMN_NAMES}, schema=self.schema)
+            self._writer.write_table(table)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+def get_encoder(fmt: str):
+    """
+    Create an encoder for an export format.
+
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If the format needs a library that isn't installed
+    """
+    if fmt == CSV:
+        return CsvEncoder()
+    if fmt == NDJSON:
+        return NdjsonEncoder()
+    if fmt == PARQUET:
+        return ParquetEncoder()
+    raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
@@ -0,0 +1,440 @@
+"""
+Service for bulk importing historical workout logs.
+
+Logs are CSV (one set per row, with a header) or JSONL (one set object per
+line). Rows are parsed as they arrive and grouped into sessions by date and
+workout name; a session is finished as soon as a row for another session
+shows up, so files must list each session's rows together (as spreadsheet
+and app exports do). Finished sessions are validated and written in
+batches, so memory use depends on the batch size, not the file size.
+
+Exercise names are resolved to catalog ids by `ExerciseMatcher`, which
+caches every name it has resolved (or failed to resolve) across imports.
+"""
+
+import csv
+import json
+import re
+import time
+import asyncio
+import codecs
+import difflib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from ..models.schemas import WorkoutSession
+
+logger = logging.getLogger("workout_mcp_server.import_service")
+
+CSV = "csv"
+JSONL = "jsonl"
+FORMATS = (CSV, JSONL)
+
+# Column aliases, keyed by the column name lower-cased with everything but
+# letters and digits removed
+_COLUMNS = {
+    "date": "date", "workoutdate": "date", "day": "date", "performedat": "date", "completedat": "date",
+    "session": "title", "workout": "title", "workoutname": "title", "title": "title", "sessiontitle": "title",
+    "exercise": "exercise", "exercisename": "exercise", "movement": "exercise", "name": "exercise",
+    "exerciseid": "exerciseId",
+    "set": "setNumber", "setnumber": "setNumber", "setno": "setNumber",
+    "settype": "setType", "type": "setType",
+    "reps": "reps", "repetitions": "reps", "repscompleted": "reps",
+    "weight": "weight", "weightkg": "weight", "weightlbs": "weight", "weightlb": "weight", "load": "weight",
+    "weightused": "weight",
+    "rpe": "rpe",
+    "duration": "duration", "durationseconds": "duration", "seconds": "duration", "time": "duration",
+    "distance": "distance",
+    "notes": "notes", "note": "notes", "comment": "notes"
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def _column(name: str) -> Optional[str]:
+    return _COLUMNS.get(_NON_ALNUM.sub("", str(name).lower()))
+
+def normalize_exercise_name(name: str) -> str:
+    """Normalize an exercise name so word order, case and punctuation don't matter."""
+    return " ".join(sorted(_NON_ALNUM.sub(" ", name.lower()).split()))
+
+async def iter_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks (e.g. an HTTP request body) into text lines.
+
+    Only the current partial line is buffered.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def aiter_lines(lines: Iterable[str]) -> AsyncIterator[str]:
+    """Adapt a synchronous line iterable (an open file, a list) to the importer."""
+    for line in lines:
+        yield line
+
+async def iter_rows(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse CSV or JSONL lines into rows with canonical keys.
+
+    Unknown columns are dropped. A row that can't be parsed is yielded with
+    an "_error" key so the importer can report it.
+
+    Yields:
+        (row number, row) tuples; row numbers count data rows from 1
+    """
+    row_number = 0
+    if fmt == JSONL:
+        async for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            row_number += 1
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                yield row_number, {"_error": f"Invalid JSON: {e}"}
+                continue
+            row = {}
+            for key, value in data.items():
+                column = _column(key)
+                if column and value not in (None, ""):
+                    row[column] = value
+            yield row_number, row
+        return
+
+    # CSV: a record may span lines inside a quoted field, so lines are
+    # collected until the quotes balance
+    header: Optional[List[Optional[str]]] = None
+    record: List[str] = []
+    quotes = 0
+    async for line in lines:
+        record.append(line.rstrip("\r\n"))
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [_column(name) for name in values]
+            if "date" not in header or not ({"exercise", "exerciseId"} & set(header)):
+                raise ValueError("CSV header needs a date column and an exercise or exercise id column")
+            continue
+        row_number += 1
+        yield row_number, {
+            column: value.strip()
+            for column, value in zip(header, values)
+            if column and value.strip()
+        }
+    if record:
+        row_number += 1
+        yield row_number, {"_error": "Unterminated quoted field"}
+
+def _parse_date(value: Any) -> datetime:
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(text[:10], fmt)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError(f"Unrecognized date '{text}'")
+
+def _number(row: Dict[str, Any], key: str, cast: Callable = float) -> Optional[Any]:
+    value = row.get(key)
+    if value is None:
+        return None
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got '{value}'")
+
+class ExerciseMatcher:
+    """
+    Resolves free-text exercise names to catalog ids.
+
+    Names are compared after normalize_exercise_name(). A name missing from
+    the index is searched in the catalog once; results are added to the
+    index and the best close match (difflib ratio >= cutoff) is used. Both
+    hits and misses are cached.
+    """
+
+    def __init__(self, cutoff: float = 0.8, max_names: int = 20000):
+        self.cutoff = cutoff
+        self.max_names = max_names
+        self._index: Dict[str, str] = {}  # normalized catalog name -> id
+        self._resolved: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._stats = {"hits": 0, "searches": 0, "unmatched": 0}
+
+    def add_exercises(self, exercises: Iterable[Dict[str, Any]]) -> None:
+        """Add catalog exercises to the index."""
+        for exercise in exercises:
+            if exercise.get("id") is not None and exercise.get("name"):
+                self._index[normalize_exercise_name(exercise["name"])] = str(exercise["id"])
+
+    def _remember(self, key: str, exercise_id: Optional[str]) -> Optional[str]:
+        self._resolved[key] = exercise_id
+        if len(self._resolved) > self.max_names:
+            self._resolved.popitem(last=False)
+        if exercise_id is None:
+            self._stats["unmatched"] += 1
+        return exercise_id
+
+    def _closest(self, key: str) -> Optional[str]:
+        if key in self._index:
+            return self._index[key]
+        matches = difflib.get_close_matches(key, self._index.keys(), n=1, cutoff=self.cutoff)
+        return self._index[matches[0]] if matches else None
+
+    async def match(self, name: str, search: Callable[[str], Awaitable[List[Dict[str, Any]]]]) -> Optional[str]:
+        """
+        Resolve an exercise name.
+
+        Args:
+            name: Exercise name as written in the log
+            search: Catalog search returning exercise dicts for a query
+
+        Returns:
+            Exercise id, or None if nothing is close enough
+        """
+        key = normalize_exercise_name(name)
+        if key in self._resolved:
+            self._stats["hits"] += 1
+            self._resolved.move_to_end(key)
+            return self._resolved[key]
+
+        exercise_id = self._closest(key)
+        if exercise_id is None and key:
+            self._stats["searches"] += 1
+            # Search the full name, then its longest word for reordered names
+            for query in (name.strip(), max(key.split(), key=len)):
+                if len(query) < 2:
+                    continue
+                self.add_exercises(await search(query))
+                exercise_id = self._closest(key)
+                if exercise_id is not None:
+                    break
+        return self._remember(key, exercise_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get cache counters."""
+        return {**self._stats, "indexedNames": len(self._index), "cachedNames": len(self._resolved)}
+
+exercise_matcher = ExerciseMatcher()
+
+class ImportReport:
+    """Counters and per-row errors of one import run."""
+
+    def __init__(self, max_errors: int = 100):
+        self.max_errors = max_errors
+        self.started = time.monotonic()
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.sessions_written = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.unmatched: "OrderedDict[str, None]" = OrderedDict()
+
+    def error(self, rows: Iterable[int], message: str) -> None:
+        """Record an error against one or more source rows."""
+        for row in rows:
+            self.error_count += 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Summarize the run."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "rowsRead": self.rows_read,
+            "rowsImported": self.rows_imported,
+            "sessionsWritten": self.sessions_written,
+            "errorCount": self.error_count,
+            "errors": self.errors,
+            "unmatchedExercises": list(self.unmatched)[:self.max_errors],
+            "elapsedSeconds": round(elapsed, 3),
+            "rowsPerSecond": round(self.rows_read / elapsed, 1)
+        }
+
+class _PendingSession:
+    """A session being assembled from consecutive rows."""
+
+    def __init__(self, user_id: str, day: datetime, title: Optional[str]):
+        self.user_id = user_id
+        self.day = day
+        self.title = title or f"Imported workout {day.date().isoformat()}"
+        self.exercises: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.rows: List[int] = []
+
+    def add_set(self, row_number: int, exercise_id: str, set_data: Dict[str, Any]) -> None:
+        sets = self.exercises.setdefault(exercise_id, [])
+        set_data.setdefault("setNumber", len(sets) + 1)
+        sets.append(set_data)
+        self.rows.append(row_number)
+
+    def as_session(self) -> Dict[str, Any]:
+        timestamp = self.day.isoformat()
+        return {
+            "userId": self.user_id,
+            "title": self.title,
+            "status": "completed",
+            "startedAt": timestamp,
+            "completedAt": timestamp,
+            "exercises": [
+                {"exerciseId": exercise_id, "orderInWorkout": order, "sets": sets}
+                for order, (exercise_id, sets) in enumerate(self.exercises.items(), start=1)
+            ]
+        }
+
+class WorkoutLogImporter:
+    """Streams log rows into sessions and writes them in batches."""
+
+    def __init__(self, user_id: str,
+                 search: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+                 write: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 batch_size: int = 50, concurrency: int = 4, max_errors: int = 100,
+                 dry_run: bool = False, matcher: Optional[ExerciseMatcher] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the importer.
+
+        Args:
+            user_id: User the sessions are imported for
+            search: Catalog search used to resolve exercise names
+            write: Writes one validated session (raises on failure)
+            batch_size: Sessions validated and written together
+            concurrency: Writes in flight at once within a batch
+            max_errors: Per-row errors kept in the report (all are counted)
+            dry_run: Validate only, write nothing
+            matcher: Exercise matcher (default: the shared cached matcher)
+            progress: Called with the report after every batch
+        """
+        self.user_id = user_id
+        self.search = search
+        self.write = write
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.dry_run = dry_run
+        self.matcher = matcher or exercise_matcher
+        self.progress = progress
+        self.report = ImportReport(max_errors)
+        self._batch: List[_PendingSession] = []
+
+    async def _row_to_set(self, row: Dict[str, Any]) -> Tuple[datetime, Optional[str], str, Dict[str, Any]]:
+        if "_error" in row:
+            raise ValueError(row["_error"])
+        if "date" not in row:
+            raise ValueError("Missing date")
+        day = _parse_date(row["date"])
+
+        exercise_id = row.get("exerciseId")
+        if exercise_id is None:
+            name = str(row.get("exercise") or "").strip()
+            if not name:
+                raise ValueError("Missing exercise")
+            exercise_id = await self.matcher.match(name, self.search)
+            if exercise_id is None:
+                self.report.unmatched[name] = None
+                raise ValueError(f"No catalog exercise matches '{name}'")
+
+        set_data = {
+            "setType": str(row.get("setType") or "working").lower(),
+            "repsCompleted": _number(row, "reps", int),
+            "weightUsed": _number(row, "weight"),
+            "rpe": _number(row, "rpe"),
+            "duration": _number(row, "duration", int),
+            "distance": _number(row, "distance"),
+            "notes": row.get("notes"),
+            "completedAt": day.isoformat()
+        }
+        set_number = _number(row, "setNumber", int)
+        if set_number is not None:
+            set_data["setNumber"] = set_number
+        if set_data["repsCompleted"] is None and set_data["duration"] is None and set_data["distance"] is None:
+            raise ValueError("Row has no reps, duration or distance")
+        return day, row.get("title"), str(exercise_id), {k: v for k, v in set_data.items() if v is not None}
+
+    async def _write_one(self, session: _PendingSession, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                await self.write(session.as_session())
+            except Exception as e:
+                self.report.error(session.rows, f"Write failed: {getattr(e, 'detail', None) or e}")
+                return
+        self.report.sessions_written += 1
+        self.report.rows_imported += len(session.rows)
+
+    async def _flush(self) -> None:
+        batch, self._batch = self._batch, []
+        valid = []
+        for session in batch:
+            try:
+                WorkoutSession(**session.as_session())
+            except ValidationError as e:
+                self.report.error(session.rows, f"Invalid session: {e.errors()[0]['msg']}")
+                continue
+            valid.append(session)
+
+        if self.dry_run:
+            for session in valid:
+                self.report.rows_imported += len(session.rows)
+        elif valid:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._write_one(session, semaphore) for session in valid))
+
+        if self.progress is not None:
+            self.progress(self.report.as_dict())
+
+    async def _finish(self, session: Optional[_PendingSession]) -> None:
+        if session is None or not session.rows:
+            return
+        self._batch.append(session)
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def run(self, rows: AsyncIterator[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Import all rows.
+
+        Returns:
+            The import report (see ImportReport.as_dict)
+        """
+        current: Optional[_PendingSession] = None
+        current_key = None
+        async for row_number, row in rows:
+            self.report.rows_read += 1
+            try:
+                day, title, exercise_id, set_data = await self._row_to_set(row)
+            except ValueError as e:
+                self.report.error([row_number], str(e))
+                continue
+
+            key = (day, title)
+            if key != current_key:
+                await self._finish(current)
+                current = _PendingSession(self.user_id, day, title)
+                current_key = key
+            current.add_set(row_number, exercise_id, set_data)
+
+        await self._finish(current)
+        if self._batch:
+            await self._flush()
+        return self.report.as_dict()
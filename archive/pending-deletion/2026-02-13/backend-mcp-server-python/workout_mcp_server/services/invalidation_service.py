@@ -0,0 +1,300 @@
+"""
+Service for change-notification driven cache invalidation.
+
+Without it, the server's caches only learn about changes made through this
+server, and anything else (the web app, admin edits, other servers) is only
+picked up when an entry expires, so TTLs have to stay short. The change
+feed subscribes to row changes on the tables those caches are built from
+and drops exactly the affected entries:
+
+- `workout_sessions`: the user's training load, roster summaries and
+  precomputed recommendations
+- `Exercises`: the exercise's entry in the substitution graph; a deleted
+  exercise also drops all precomputed recommendations
+- `client_progress`: the user's roster summaries
+
+Cached database query results that read the changed table are dropped too.
+
+Changes arrive as JSON events `{"table", "op", "id", "userId"}` from one of
+two sources:
+
+- `postgres`: LISTEN on `CHANGE_FEED_CHANNEL`, fed by the triggers in
+  `sql/change_notifications.sql`
+- `file`: new lines appended to `CHANGE_FEED_FILE`, one event per line;
+  a local stand-in for development and tests (see `publish_change()`)
+
+While the feed is connected, roster summaries and the exercise catalog read
+are kept for `CHANGE_FEED_CACHE_TTL` instead of `ROSTER_CACHE_TTL` and
+`EXERCISE_QUERY_CACHE_TTL`. Events can be missed while it is disconnected,
+so in-memory caches are flushed whenever the feed connects or drops.
+"""
+
+import json
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..utils.config import config
+from .precompute_service import materialized_store
+from .roster_service import roster_cache
+from .substitution_service import substitution_graph
+from .training_load_service import training_load_store
+
+try:
+    from ..utils import postgresql
+except ImportError:
+    # psycopg2/SQLAlchemy not installed: only the file source is available
+    postgresql = None
+
+logger = logging.getLogger("workout_mcp_server.invalidation_service")
+
+DEFAULT_FEED_FILE = Path(__file__).parent.parent / "data" / "changes.ndjson"
+
+TABLE_SESSIONS = "workout_sessions"
+TABLE_EXERCISES = "Exercises"
+TABLE_CLIENT_PROGRESS = "client_progress"
+
+# Seconds during which changes to a row this server just wrote are its own echo
+_ECHO_WINDOW = 30.0
+_MAX_RECONNECT_DELAY = 60.0
+
+def publish_change(table: str, op: str, record_id: Any = None, user_id: Any = None,
+                   path: Optional[str] = None) -> None:
+    """
+    Append a change event to the file source.
+
+    Args:
+        table: Changed table, e.g. `workout_sessions`
+        op: `INSERT`, `UPDATE` or `DELETE`
+        record_id: Changed row's ID
+        user_id: User the row belongs to, if any
+        path: Feed file (default: CHANGE_FEED_FILE)
+    """
+    feed_file = Path(path or config.get('CHANGE_FEED_FILE') or DEFAULT_FEED_FILE)
+    feed_file.parent.mkdir(parents=True, exist_ok=True)
+    event = {
+        "table": table,
+        "op": op,
+        "id": None if record_id is None else str(record_id),
+        "userId": None if user_id is None else str(user_id)
+    }
+    with open(feed_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+
+class ChangeFeed:
+    """Subscribes to change events and invalidates the affected cache entries."""
+
+    def __init__(self, source: str = "", channel: str = "mcp_cache_invalidation",
+                 path: Optional[str] = None, poll_interval: float = 1.0, cache_ttl: float = 3600.0):
+        """
+        Args:
+            source: `postgres`, `file`, or empty to disable the feed
+            channel: PostgreSQL notification channel
+            path: File source path (default: data/changes.ndjson in the server directory)
+            poll_interval: Seconds between checks for new events
+            cache_ttl: Roster summary and exercise catalog TTL while the feed is connected
+        """
+        self.source = (source or "").lower()
+        self.channel = channel
+        self.path = Path(path) if path else DEFAULT_FEED_FILE
+        self.poll_interval = poll_interval
+        self.cache_ttl = cache_ttl
+        self.connected = False
+        self._base_roster_ttl = roster_cache.ttl
+        self._base_exercise_ttl = postgresql.exercise_cache_ttl if postgresql is not None else None
+        self._task: Optional[asyncio.Task] = None
+        self._local_writes: Dict[Tuple[str, str], float] = {}
+        self._counts = {"events": 0, "invalidations": 0, "echoes": 0, "invalidEvents": 0, "reconnects": 0}
+        self._last_event_at: Optional[float] = None
+
+    def note_local_write(self, table: str, record_id: Any) -> None:
+        """
+        Record that this server just wrote a row and already updated its caches.
+
+        The row's change events within the next few seconds are this write's
+        echo and don't drop the training load state it just updated.
+        """
+        if record_id is None:
+            return
+        now = time.monotonic()
+        if len(self._local_writes) > 1000:
+            self._local_writes = {k: t for k, t in self._local_writes.items() if t > now}
+        self._local_writes[(table, str(record_id))] = now + _ECHO_WINDOW
+
+    def _is_echo(self, table: str, record_id: Optional[str]) -> bool:
+        expires = self._local_writes.get((table, str(record_id)))
+        return expires is not None and expires > time.monotonic()
+
+    def apply(self, event: Dict[str, Any]) -> List[str]:
+        """
+        Invalidate the cache entries affected by one change event.
+
+        Args:
+            event: Change event with `table`, `op`, `id` and `userId`
+
+        Returns:
+            Descriptions of what was invalidated
+        """
+        table = event.get("table")
+        op = str(event.get("op") or "").upper()
+        record_id = event.get("id")
+        user_id = event.get("userId")
+        invalidated = []
+
+        if table == TABLE_SESSIONS and user_id:
+            if self._is_echo(table, record_id):
+                self._counts["echoes"] += 1
+            else:
+                training_load_store.invalidate(str(user_id))
+                invalidated.append(f"trainingLoad:{user_id}")
+            roster_cache.invalidate_client(str(user_id))
+            materialized_store.invalidate_user(str(user_id))
+            invalidated += [f"roster:{user_id}", f"recommendations:{user_id}"]
+        elif table == TABLE_EXERCISES and record_id:
+            substitution_graph.remove(str(record_id))
+            invalidated.append(f"alternates:{record_id}")
+            if op == "DELETE":
+                materialized_store.clear()
+                invalidated.append("recommendations:*")
+        elif table == TABLE_CLIENT_PROGRESS and user_id:
+            roster_cache.invalidate_client(str(user_id))
+            invalidated.append(f"roster:{user_id}")
+
+        if postgresql is not None and table and postgresql.invalidate_tables(table):
+            invalidated.append(f"queries:{table}")
+
+        self._counts["invalidations"] += len(invalidated)
+        return invalidated
+
+    def _handle(self, payload: str) -> None:
+        self._counts["events"] += 1
+        self._last_event_at = time.time()
+        try:
+            event = json.loads(payload)
+            if not isinstance(event, dict):
+                raise ValueError("event is not an object")
+        except ValueError as e:
+            self._counts["invalidEvents"] += 1
+            logger.warning(f"Ignoring invalid change event {payload[:200]!r}: {str(e)}")
+            return
+        try:
+            invalidated = self.apply(event)
+        except Exception as e:
+            logger.error(f"Failed to apply change event {event}: {str(e)}")
+            return
+        if invalidated:
+            logger.debug(f"Change to {event.get('table')} {event.get('id')} invalidated {', '.join(invalidated)}")
+
+    def _set_connected(self, connected: bool) -> None:
+        """Switch TTLs and flush in-memory caches, since events may have been missed."""
+        if connected == self.connected:
+            return
+        self.connected = connected
+        roster_cache.clear()
+        training_load_store.clear()
+        roster_cache.ttl = max(self._base_roster_ttl, self.cache_ttl) if connected else self._base_roster_ttl
+        if postgresql is not None:
+            postgresql.invalidate_tables(TABLE_EXERCISES)
+            postgresql.exercise_cache_ttl = (
+                max(self._base_exercise_ttl, self.cache_ttl) if connected else self._base_exercise_ttl
+            )
+        if connected:
+            logger.info(f"Change feed connected ({self.source}); roster summaries kept for {roster_cache.ttl}s")
+        else:
+            logger.warning("Change feed disconnected; caches flushed and TTLs shortened")
+
+    async def _postgres_payloads(self) -> AsyncIterator[List[str]]:
+        if postgresql is None:
+            raise RuntimeError("psycopg2 is not installed")
+        conn = await asyncio.to_thread(postgresql.open_listener, [self.channel])
+        try:
+            self._set_connected(True)
+            while True:
+                notifications = await asyncio.to_thread(postgresql.wait_for_notifications, conn, self.poll_interval)
+                yield [payload for _, payload in notifications]
+        finally:
+            await asyncio.to_thread(conn.close)
+
+    async def _file_payloads(self) -> AsyncIterator[List[str]]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        # Only events published from now on are applied
+        offset = self.path.stat().st_size
+        self._set_connected(True)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            size = self.path.stat().st_size
+            if size < offset:
+                # Truncated or replaced: start over from the beginning
+                offset = 0
+            if size == offset:
+                continue
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # A partially written last line is picked up on the next poll
+            complete = data.rfind(b"\n") + 1
+            offset += complete
+            yield [line for line in data[:complete].decode("utf-8").splitlines() if line.strip()]
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            payloads = self._postgres_payloads() if self.source == "postgres" else self._file_payloads()
+            try:
+                async for batch in payloads:
+                    delay = 1.0
+                    for payload in batch:
+                        self._handle(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed error, reconnecting in {delay:.0f}s: {str(e)}")
+            finally:
+                # Closes the listener connection
+                await payloads.aclose()
+            self._set_connected(False)
+            self._counts["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+
+    def start(self) -> bool:
+        """Start listening in the background; False if the feed is disabled."""
+        if self.source not in ("postgres", "file"):
+            if self.source:
+                logger.warning(f"Unknown CHANGE_FEED source '{self.source}'; change feed disabled")
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._set_connected(False)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Source, connection state and event counts."""
+        return {
+            "source": self.source or None,
+            "connected": self.connected,
+            "rosterCacheTtl": roster_cache.ttl,
+            "lastEventAt": self._last_event_at,
+            **self._counts
+        }
+
+change_feed = ChangeFeed(
+    config.get('CHANGE_FEED'),
+    channel=config.get('CHANGE_FEED_CHANNEL'),
+    path=config.get('CHANGE_FEED_FILE'),
+    poll_interval=config.get('CHANGE_FEED_POLL_INTERVAL'),
+    cache_ttl=config.get('CHANGE_FEED_CACHE_TTL')
+)
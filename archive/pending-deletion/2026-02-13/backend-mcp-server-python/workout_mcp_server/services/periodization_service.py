@@ -0,0 +1,325 @@
+"""
+Service for periodized multi-week workout plans.
+
+A plan is split into mesocycles of MESOCYCLE_WEEKS weeks. Each mesocycle is
+spent in one OPT phase, progressively overloads for its loading weeks and
+ends with a deload week. Phases advance along a goal-specific progression.
+
+Day templates (split, exercise slots and base prescription) depend only on
+(goal, daysPerWeek, difficulty, equipment, phase), so they are memoized and
+shared between plans. Weeks are expanded from the templates on demand.
+"""
+
+import math
+import logging
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("workout_mcp_server.periodization_service")
+
+# OPT phases, as stored on WorkoutPlanDay.optPhase
+STABILIZATION_ENDURANCE = "stabilization_endurance"
+STRENGTH_ENDURANCE = "strength_endurance"
+HYPERTROPHY = "hypertrophy"
+MAXIMAL_STRENGTH = "maximal_strength"
+POWER = "power"
+
+# Phase order for each goal; after the last phase the plan cycles back to
+# the second (stabilization is only needed once)
+GOAL_PROGRESSIONS = {
+    "strength": (STABILIZATION_ENDURANCE, STRENGTH_ENDURANCE, MAXIMAL_STRENGTH, POWER),
+    "hypertrophy": (STABILIZATION_ENDURANCE, STRENGTH_ENDURANCE, HYPERTROPHY),
+    "endurance": (STABILIZATION_ENDURANCE, STRENGTH_ENDURANCE),
+    "general": (STABILIZATION_ENDURANCE, STRENGTH_ENDURANCE, HYPERTROPHY)
+}
+
+# Weeks per mesocycle; the last week of a full mesocycle is a deload
+MESOCYCLE_WEEKS = 4
+
+class Prescription(NamedTuple):
+    """Base set/rep prescription for a phase."""
+    sets: int
+    reps: str
+    rest: int  # seconds
+    tempo: str
+    intensity: float  # % 1RM for loaded exercises
+
+PHASE_PRESCRIPTIONS = {
+    STABILIZATION_ENDURANCE: Prescription(2, "12-20", 45, "4/2/1", 60.0),
+    STRENGTH_ENDURANCE: Prescription(3, "8-12", 60, "2/0/2", 70.0),
+    HYPERTROPHY: Prescription(4, "6-12", 60, "2/0/2", 75.0),
+    MAXIMAL_STRENGTH: Prescription(5, "1-5", 180, "x/x/x", 85.0),
+    POWER: Prescription(4, "1-10", 120, "x/x/x", 80.0)
+}
+
+# Split used for each training frequency
+SPLITS = {
+    3: ("full_body", "full_body", "full_body"),
+    4: ("upper_body", "lower_body", "upper_body", "lower_body"),
+    5: ("push", "pull", "legs", "push", "pull"),
+    6: ("push", "pull", "legs", "push", "pull", "legs")
+}
+
+# Exercise categories (and how many of each) filled for each day focus
+FOCUS_SLOTS = {
+    "full_body": (("strength", 3), ("cardio", 3), ("core", 3)),
+    "upper_body": (("chest", 2), ("back", 2), ("shoulders", 2), ("arms", 2)),
+    "lower_body": (("legs", 2), ("glutes", 2), ("calves", 2)),
+    "push": (("chest", 2), ("shoulders", 2), ("triceps", 2)),
+    "pull": (("back", 2), ("biceps", 2), ("traps", 2)),
+    "legs": (("legs", 3), ("glutes", 3), ("calves", 3))
+}
+
+# Equipment that allows percentage-of-1RM loading
+LOADABLE_EQUIPMENT = frozenset({"barbell", "dumbbell", "dumbbells", "kettlebell", "machine", "cable", "smith_machine"})
+
+class DayTemplate(NamedTuple):
+    """Immutable structure of one training day, shared across plans."""
+    focus: str
+    slots: Tuple[Tuple[str, int], ...]
+    max_exercises: int
+    prescription: Prescription
+    use_load: bool
+
+def phase_progression(goal: Optional[str], start_phase: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Get the phase order for a goal.
+    
+    Args:
+        goal: Plan goal
+        start_phase: Optional phase to start from
+        
+    Returns:
+        Tuple of phases; a start phase outside the goal's progression is
+        used on its own for the whole plan
+    """
+    progression = GOAL_PROGRESSIONS.get(goal or "general", GOAL_PROGRESSIONS["general"])
+    if start_phase is None:
+        return progression
+    if start_phase not in progression:
+        return (start_phase,)
+    return progression[progression.index(start_phase):]
+
+@lru_cache(maxsize=512)
+def get_day_templates(goal: str, days_per_week: int, difficulty: str,
+                      equipment: FrozenSet[str], phase: str) -> Tuple[DayTemplate, ...]:
+    """
+    Get the day templates for one week of a phase.
+    
+    Memoized: plans with the same goal, frequency, difficulty, equipment and
+    phase share the same templates.
+    
+    Args:
+        goal: Plan goal
+        days_per_week: Training days per week
+        difficulty: beginner, intermediate or advanced
+        equipment: Available equipment (empty means unrestricted)
+        phase: OPT phase
+        
+    Returns:
+        One DayTemplate per training day
+    """
+    base = PHASE_PRESCRIPTIONS.get(phase, PHASE_PRESCRIPTIONS[STRENGTH_ENDURANCE])
+    set_adjustment = {"beginner": -1, "advanced": 1}.get(difficulty, 0)
+    prescription = base._replace(sets=max(1, base.sets + set_adjustment))
+    use_load = not equipment or bool(equipment & LOADABLE_EQUIPMENT)
+    max_exercises = 6 if difficulty == "beginner" else 8
+    
+    split = SPLITS.get(days_per_week, ("full_body",) * days_per_week)
+    return tuple(
+        DayTemplate(
+            focus=focus,
+            slots=FOCUS_SLOTS[focus] if focus == "full_body" else FOCUS_SLOTS[focus] + (("core", 2),),
+            max_exercises=max_exercises,
+            prescription=prescription,
+            use_load=use_load
+        )
+        for focus in split
+    )
+
+class WeekInfo(NamedTuple):
+    """Position of a week within the plan."""
+    weekNumber: int
+    startDate: str
+    optPhase: str
+    mesocycle: int
+    weekInMesocycle: int
+    deload: bool
+
+class PeriodizedPlan:
+    """
+    A periodized plan over a date range, expanded one week at a time.
+    
+    The schedule (phase and deload of every week) is cheap to compute;
+    workout days are only built for the weeks that are iterated.
+    """
+    
+    def __init__(self, goal: Optional[str], days_per_week: int, difficulty: Optional[str],
+                 equipment: Optional[List[str]], start_date: str, end_date: str,
+                 exercises: List[Dict[str, Any]], start_phase: Optional[str] = None,
+                 substitute: Optional[Callable[[str, List[str]], Optional[str]]] = None):
+        """
+        Initialize the plan.
+        
+        Args:
+            goal: Plan goal
+            days_per_week: Training days per week
+            difficulty: beginner, intermediate or advanced
+            equipment: Available equipment
+            start_date: First day of the plan (YYYY-MM-DD)
+            end_date: Last day of the plan (YYYY-MM-DD)
+            exercises: Candidate exercises (dicts with `id` and `category`)
+            start_phase: Optional OPT phase to start in
+            substitute: Optional callback (exerciseId, excluded ids) returning
+                an alternate exercise ID for each planned exercise
+        """
+        self.goal = goal or "general"
+        self.days_per_week = days_per_week
+        self.difficulty = difficulty or "intermediate"
+        self.equipment = frozenset(e.lower() for e in equipment or [])
+        self.start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        self.total_weeks = max(1, math.ceil((end - self.start).days / 7))
+        self.phases = phase_progression(goal, start_phase)
+        self.substitute = substitute
+        
+        self._exercises_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for exercise in exercises:
+            self._exercises_by_category.setdefault(exercise.get("category", "other"), []).append(exercise)
+        # Exercises (and their alternates) picked for each (phase, day index),
+        # reused by every week of the phase
+        self._day_exercises: Dict[Tuple[str, int], List[Tuple[Dict[str, Any], Optional[str]]]] = {}
+    
+    def week_info(self, week_number: int) -> WeekInfo:
+        """
+        Get the phase and deload status of a week.
+        
+        Args:
+            week_number: 1-based week number
+            
+        Returns:
+            WeekInfo for the week
+        """
+        mesocycle = (week_number - 1) // MESOCYCLE_WEEKS
+        week_in_mesocycle = (week_number - 1) % MESOCYCLE_WEEKS + 1
+        if mesocycle < len(self.phases):
+            phase = self.phases[mesocycle]
+        else:
+            # Cycle through the progression again, skipping the initial phase
+            repeat = self.phases[1:] or self.phases
+            phase = repeat[(mesocycle - len(self.phases)) % len(repeat)]
+        # Only full mesocycles end in a deload
+        mesocycle_end = (mesocycle + 1) * MESOCYCLE_WEEKS
+        deload = week_in_mesocycle == MESOCYCLE_WEEKS and mesocycle_end <= self.total_weeks
+        return WeekInfo(
+            weekNumber=week_number,
+            startDate=(self.start + timedelta(weeks=week_number - 1)).strftime("%Y-%m-%d"),
+            optPhase=phase,
+            mesocycle=mesocycle + 1,
+            weekInMesocycle=week_in_mesocycle,
+            deload=deload
+        )
+    
+    def schedule(self) -> List[Dict[str, Any]]:
+        """Get the phase and deload status of every week without building days."""
+        return [self.week_info(week)._asdict() for week in range(1, self.total_weeks + 1)]
+    
+    def _select_exercises(self, phase: str, day_index: int,
+                          template: DayTemplate) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        key = (phase, day_index)
+        if key not in self._day_exercises:
+            selected, seen = [], set()
+            for category, count in template.slots:
+                for exercise in self._exercises_by_category.get(category, [])[:count]:
+                    if exercise["id"] not in seen:
+                        seen.add(exercise["id"])
+                        selected.append(exercise)
+            selected = selected[:template.max_exercises]
+            # Alternates never duplicate another exercise of the same day
+            day_ids = [str(exercise["id"]) for exercise in selected]
+            self._day_exercises[key] = [
+                (exercise, self.substitute(str(exercise["id"]), day_ids) if self.substitute else None)
+                for exercise in selected
+            ]
+        return self._day_exercises[key]
+    
+    def _prescribe(self, exercise: Dict[str, Any], template: DayTemplate, info: WeekInfo) -> Dict[str, Any]:
+        if exercise.get("category") == "cardio":
+            return {"setScheme": "1x15-30", "repGoal": "15-30 min", "restPeriod": 0, "intensityGuideline": None}
+        
+        base = template.prescription
+        if info.deload:
+            sets = max(1, round(base.sets * 0.6))
+            intensity = base.intensity - 10
+        else:
+            # Add load every loading week and a set in the last one
+            sets = base.sets + (1 if info.weekInMesocycle == MESOCYCLE_WEEKS - 1 else 0)
+            intensity = base.intensity + 2.5 * (info.weekInMesocycle - 1)
+        
+        if template.use_load:
+            guideline = f"{intensity:g}% 1RM"
+        else:
+            # Without loadable equipment, prescribe effort instead of load
+            guideline = f"RPE {min(10, round(intensity / 10, 1)):g}"
+        return {
+            "setScheme": f"{sets}x{base.reps}",
+            "repGoal": base.reps,
+            "restPeriod": base.rest,
+            "intensityGuideline": guideline
+        }
+    
+    def expand_week(self, week_number: int) -> List[Dict[str, Any]]:
+        """
+        Build the workout days of one week.
+        
+        Args:
+            week_number: 1-based week number
+            
+        Returns:
+            List of day dicts in WorkoutPlanDay format
+        """
+        info = self.week_info(week_number)
+        templates = get_day_templates(self.goal, self.days_per_week, self.difficulty, self.equipment, info.optPhase)
+        
+        days = []
+        for i, template in enumerate(templates):
+            day_number = (week_number - 1) * self.days_per_week + i + 1
+            name = f"Week {week_number} - {template.focus.replace('_', ' ').title()} Day {i + 1}"
+            days.append({
+                "dayNumber": day_number,
+                "weekNumber": week_number,
+                "name": name + (" (Deload)" if info.deload else ""),
+                "focus": template.focus,
+                "dayType": "training",
+                "optPhase": info.optPhase,
+                "notes": "Deload week: reduced volume and load to consolidate adaptations." if info.deload else None,
+                "sortOrder": day_number,
+                "exercises": [
+                    {
+                        "exerciseId": exercise["id"],
+                        "orderInWorkout": j + 1,
+                        "tempo": template.prescription.tempo,
+                        **self._prescribe(exercise, template, info),
+                        "notes": exercise.get("description", "")[:100] if exercise.get("description") else None,
+                        "alternateExerciseId": alternate
+                    }
+                    for j, (exercise, alternate) in enumerate(self._select_exercises(info.optPhase, i, template))
+                ]
+            })
+        return days
+    
+    def iter_days(self, first_week: int = 1, last_week: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over the workout days of a range of weeks.
+        
+        Args:
+            first_week: First week to expand (1-based)
+            last_week: Last week to expand (defaults to the end of the plan)
+            
+        Yields:
+            Day dicts in WorkoutPlanDay format
+        """
+        last_week = min(last_week or self.total_weeks, self.total_weeks)
+        for week in range(first_week, last_week + 1):
+            yield from self.expand_week(week)
@@ -0,0 +1,262 @@
+"""
+Service for precomputed (materialized) recommendations.
+
+A user's recommendation inputs change at most daily, so a nightly job
+computes, for every active user, their top recommended exercises and a
+suggested next session, and stores both in a local key-value store
+(SQLite, keyed by user and request parameters). GetWorkoutRecommendations
+serves a request with the default parameters from the store in a single
+primary-key lookup and falls back to the backend on a miss. Logging a
+session drops the user's entries, so they are recomputed on next use.
+
+The job splits users into chunks and runs the chunks in a process pool;
+each worker fetches its users concurrently, and the parent process is the
+only writer to the store.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..models.input_output import GetWorkoutRecommendationsInput
+from ..utils import make_api_request, config
+from .periodization_service import PHASE_PRESCRIPTIONS, STRENGTH_ENDURANCE
+
+logger = logging.getLogger("workout_mcp_server.precompute_service")
+
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / "data" / "materialized.sqlite3"
+
+def recommendation_params(input_data: GetWorkoutRecommendationsInput) -> Dict[str, Any]:
+    """Backend query parameters for a recommendations request."""
+    return {
+        "goal": input_data.goal,
+        "difficulty": input_data.difficulty,
+        "equipment": input_data.equipment,
+        "muscleGroups": input_data.muscleGroups,
+        "excludeExercises": input_data.excludeExercises,
+        "limit": input_data.limit,
+        "rehabFocus": input_data.rehabFocus,
+        "optPhase": input_data.optPhase
+    }
+
+def recommendation_key(user_id: str, params: Dict[str, Any]) -> str:
+    """Store key for a user's recommendations with the given parameters."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"recommendations:{user_id}:{digest}"
+
+def suggest_next_session(exercises: List[Dict[str, Any]], opt_phase: Optional[str] = None,
+                         size: int = 5) -> Dict[str, Any]:
+    """
+    Suggest a next session from a user's recommended exercises.
+
+    Exercises are taken in recommendation order, one per muscle group
+    first, then topped up from the rest. Sets, reps, rest and tempo follow
+    the OPT phase prescription used for generated plans.
+
+    Args:
+        exercises: Recommended exercises, best first
+        opt_phase: OPT phase to prescribe for (default: strength endurance)
+        size: Maximum exercises in the session
+
+    Returns:
+        Dict with the phase and the prescribed exercises
+    """
+    phase = opt_phase if opt_phase in PHASE_PRESCRIPTIONS else STRENGTH_ENDURANCE
+    prescription = PHASE_PRESCRIPTIONS[phase]
+
+    chosen: List[Dict[str, Any]] = []
+    seen_groups = set()
+    rest = []
+    for exercise in exercises:
+        groups = exercise.get("muscleGroups") or []
+        group = groups[0].get("name") if groups else exercise.get("category")
+        if group in seen_groups:
+            rest.append(exercise)
+            continue
+        seen_groups.add(group)
+        chosen.append(exercise)
+    chosen = (chosen + rest)[:size]
+
+    return {
+        "optPhase": phase,
+        "exercises": [
+            {
+                "exerciseId": exercise.get("id"),
+                "name": exercise.get("name"),
+                "orderInWorkout": order,
+                "setScheme": f"{prescription.sets}x{prescription.reps}",
+                "repGoal": prescription.reps,
+                "restPeriod": prescription.rest,
+                "tempo": prescription.tempo
+            }
+            for order, exercise in enumerate(chosen, start=1)
+        ]
+    }
+
+class MaterializedStore:
+    """
+    Key-value store of precomputed results, backed by a local SQLite file.
+
+    Values are JSON documents with an expiry time; each entry also records
+    its user so all of a user's entries can be dropped at once.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 129600.0):
+        self.path = Path(path) if path else DEFAULT_STORE_PATH
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            # WAL lets the server read while the nightly job writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS materialized ("
+                "key TEXT PRIMARY KEY, user_id TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS materialized_user ON materialized (user_id)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a stored value, or None if it is missing or expired."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM materialized WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, items: Iterable[Tuple[str, str, Any]]) -> int:
+        """
+        Store values in one transaction.
+
+        Args:
+            items: (key, user ID, value) triples
+
+        Returns:
+            Number of values stored
+        """
+        expires_at = time.time() + self.ttl
+        rows = [(key, str(user_id), json.dumps(value, default=str), expires_at) for key, user_id, value in items]
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO materialized VALUES (?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def put(self, key: str, user_id: str, value: Any) -> None:
+        """Store one value."""
+        self.put_many([(key, user_id, value)])
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop all of a user's entries."""
+        with self._lock:
+            self._connection().execute("DELETE FROM materialized WHERE user_id = ?", (str(user_id),))
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._connection().execute("DELETE FROM materialized")
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were deleted."""
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM materialized WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+materialized_store = MaterializedStore(config.get('MATERIALIZED_STORE_PATH'), config.get('MATERIALIZED_TTL'))
+
+async def compute_user(user_id: str) -> Dict[str, Any]:
+    """Compute a user's default recommendations and suggested next session."""
+    input_data = GetWorkoutRecommendationsInput(userId=user_id)
+    params = recommendation_params(input_data)
+    response = await make_api_request("GET", f"/exercises/recommended/{user_id}", data=params)
+    exercises = response.get("exercises", [])
+    return {
+        "key": recommendation_key(user_id, params),
+        "exercises": exercises,
+        "suggestedSession": suggest_next_session(exercises, input_data.optPhase)
+    }
+
+async def _compute_users(user_ids: List[str]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    semaphore = asyncio.Semaphore(config.get('PRECOMPUTE_CONCURRENCY'))
+
+    async def compute(user_id: str):
+        async with semaphore:
+            try:
+                return user_id, await compute_user(user_id), None
+            except Exception as e:
+                return user_id, None, str(getattr(e, "detail", None) or e)
+
+    return await asyncio.gather(*(compute(user_id) for user_id in user_ids))
+
+def compute_chunk(user_ids: List[str]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Compute one chunk of users; runs in a worker process.
+
+    Returns:
+        (user ID, result, error) for every user
+    """
+    return asyncio.run(_compute_users(user_ids))
+
+def run_precompute(user_ids: List[str], store: MaterializedStore = None, workers: int = None,
+                   chunk_size: int = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Precompute recommendations for users and write them to the store.
+
+    Args:
+        user_ids: Users to precompute
+        store: Store to write to (default: the shared store)
+        workers: Worker processes (default: PRECOMPUTE_WORKERS)
+        chunk_size: Users per worker task (default: PRECOMPUTE_CHUNK_SIZE)
+        progress: Called with the running report after every chunk
+
+    Returns:
+        Report with user, stored and failure counts, failures (capped) and timing
+    """
+    store = store or materialized_store
+    workers = workers or config.get('PRECOMPUTE_WORKERS')
+    chunk_size = chunk_size or config.get('PRECOMPUTE_CHUNK_SIZE')
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    report = {"users": len(user_ids), "stored": 0, "failed": 0, "errors": [], "elapsedSeconds": 0.0}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(compute_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            items = []
+            for user_id, result, error in future.result():
+                if error is not None:
+                    report["failed"] += 1
+                    if len(report["errors"]) < 100:
+                        report["errors"].append({"userId": user_id, "error": error})
+                    continue
+                items.append((result["key"], user_id, {
+                    "exercises": result["exercises"],
+                    "suggestedSession": result["suggestedSession"]
+                }))
+            report["stored"] += store.put_many(items)
+            report["elapsedSeconds"] = round(time.perf_counter() - started, 2)
+            if progress:
+                progress(report)
+
+    pruned = store.prune()
+    logger.info(f"Precomputed {report['stored']}/{report['users']} users in {report['elapsedSeconds']}s "
+                f"({report['failed']} failed, {pruned} expired entries pruned)")
+    return report
@@ -0,0 +1,137 @@
+"""
+Service for trainer roster summaries.
+
+A roster summary condenses each client's progress and recent statistics
+into a few numbers a trainer scans on a dashboard: last workout, streak,
+weekly volume and adherence to a target number of sessions per week.
+
+Summaries are cached per trainer and client. A roster call only fetches
+the clients whose summary is missing or expired, and logging a session
+for a client drops that client's cached summaries for every trainer.
+"""
+
+import time
+import logging
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Optional, Set
+
+from ..utils.config import config
+
+logger = logging.getLogger("workout_mcp_server.roster_service")
+
+def _parse_date(value: Any) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+def summarize_client(
+    client_id: str,
+    progress: Dict[str, Any],
+    statistics: Dict[str, Any],
+    weeks: int,
+    target_per_week: int,
+    today: date,
+    name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a compact roster summary for one client.
+
+    Args:
+        client_id: Client user ID
+        progress: Client progress data (`/client-progress/{id}`)
+        statistics: Workout statistics for the last `weeks` weeks
+        weeks: Length of the adherence window in weeks
+        target_per_week: Sessions per week that count as full adherence
+        today: Date the summary is computed for
+        name: Client display name, if known
+
+    Returns:
+        Summary dictionary
+    """
+    last_workout = _parse_date(progress.get("lastWorkoutDate"))
+    workouts = statistics.get("totalWorkouts") or 0
+    return {
+        "userId": client_id,
+        "name": name,
+        "lastWorkoutDate": last_workout.isoformat() if last_workout else None,
+        "daysSinceLastWorkout": (today - last_workout).days if last_workout else None,
+        "currentStreak": progress.get("currentStreak") or 0,
+        "workouts": workouts,
+        "weeklyVolume": round((statistics.get("totalWeight") or 0) / weeks, 1),
+        "weeklySets": round((statistics.get("totalSets") or 0) / weeks, 1),
+        "adherence": round(workouts / (weeks * target_per_week), 2) if target_per_week > 0 else None
+    }
+
+class RosterCache:
+    """
+    Per-trainer cache of client summaries with a time-to-live.
+
+    Trainers are evicted least recently used first. An index from client to
+    trainers lets a logged session invalidate the client on every roster.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_trainers: int = 500):
+        self.ttl = ttl
+        self.max_trainers = max_trainers
+        # trainer -> (client, options) -> (expires at, summary)
+        self._rosters: "OrderedDict[str, Dict[Hashable, tuple]]" = OrderedDict()
+        self._trainers_by_client: Dict[str, Set[str]] = {}
+
+    def get(self, trainer_id: str, client_id: str, options: Hashable) -> Optional[Dict[str, Any]]:
+        """Get a client's cached summary, or None if it is missing or expired."""
+        entries = self._rosters.get(trainer_id)
+        if entries is None:
+            return None
+        self._rosters.move_to_end(trainer_id)
+        entry = entries.get((client_id, options))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, trainer_id: str, client_id: str, options: Hashable, summary: Dict[str, Any]) -> None:
+        """Cache a client's summary on a trainer's roster."""
+        entries = self._rosters.setdefault(trainer_id, {})
+        self._rosters.move_to_end(trainer_id)
+        entries[(client_id, options)] = (time.monotonic() + self.ttl, summary)
+        self._trainers_by_client.setdefault(client_id, set()).add(trainer_id)
+        while len(self._rosters) > self.max_trainers:
+            evicted, evicted_entries = self._rosters.popitem(last=False)
+            for evicted_client, _ in evicted_entries:
+                trainers = self._trainers_by_client.get(evicted_client)
+                if trainers is not None:
+                    trainers.discard(evicted)
+                    if not trainers:
+                        del self._trainers_by_client[evicted_client]
+
+    def invalidate_client(self, client_id: str) -> None:
+        """Drop a client's summaries from every roster (e.g. after a logged session)."""
+        for trainer_id in self._trainers_by_client.pop(str(client_id), set()):
+            entries = self._rosters.get(trainer_id)
+            if entries is not None:
+                for key in [key for key in entries if key[0] == str(client_id)]:
+                    del entries[key]
+
+    def invalidate_trainer(self, trainer_id: str) -> None:
+        """Drop a trainer's whole roster."""
+        entries = self._rosters.pop(trainer_id, None) or {}
+        for client_id, _ in entries:
+            trainers = self._trainers_by_client.get(client_id)
+            if trainers is not None:
+                trainers.discard(trainer_id)
+                if not trainers:
+                    del self._trainers_by_client[client_id]
+
+    def clear(self) -> None:
+        """Drop every cached summary."""
+        self._rosters.clear()
+        self._trainers_by_client.clear()
+
+roster_cache = RosterCache(config.get('ROSTER_CACHE_TTL'), config.get('ROSTER_MAX_TRAINERS'))
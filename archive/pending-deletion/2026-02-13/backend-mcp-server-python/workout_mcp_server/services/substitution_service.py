@@ -0,0 +1,498 @@
+"""
+Service for exercise substitutions.
+
+Maintains a k-nearest-neighbour graph over the exercise catalog, where
+similarity combines shared muscle groups, movement pattern, equipment and
+difficulty. Neighbour lists are precomputed, so looking up alternates for
+an exercise is a dictionary lookup plus a walk over at most k entries.
+
+The graph is built over the whole catalog at startup and rebuilt every
+`SUBSTITUTION_REBUILD_INTERVAL` seconds (`CatalogRefresh`, reading the
+`Exercises` table). Between rebuilds it is updated incrementally: adding
+or changing an exercise only rescores the exercises that share a muscle,
+pattern or equipment with it, and removing one only rebuilds the lists
+that pointed at it.
+"""
+
+import json
+import time
+import heapq
+import asyncio
+import logging
+import threading
+from array import array
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from ..utils.config import config
+
+try:
+    from ..utils import postgresql
+except ImportError:
+    # psycopg2/SQLAlchemy not installed: the graph only grows incrementally
+    postgresql = None
+
+logger = logging.getLogger("workout_mcp_server.substitution_service")
+
+# Seconds between attempts to load the catalog while it is unavailable
+_RETRY_INTERVAL = 60.0
+
+# Similarity weights; they sum to 1 so scores are in [0, 1]
+MUSCLE_WEIGHT = 0.5
+PATTERN_WEIGHT = 0.25
+EQUIPMENT_WEIGHT = 0.15
+DIFFICULTY_WEIGHT = 0.1
+
+# Movement patterns recognised from exercise names
+_PATTERN_KEYWORDS = (
+    ("squat", ("squat", "leg press", "wall sit")),
+    ("hinge", ("deadlift", "hinge", "good morning", "hip thrust", "bridge", "swing")),
+    ("lunge", ("lunge", "split squat", "step up", "step-up")),
+    ("horizontal_push", ("bench", "push-up", "push up", "pushup", "chest press", "fly", "dip")),
+    ("vertical_push", ("overhead press", "shoulder press", "military press", "handstand", "pike")),
+    ("horizontal_pull", ("row", "face pull", "reverse fly")),
+    ("vertical_pull", ("pull-up", "pull up", "pullup", "chin", "pulldown", "pull down")),
+    ("carry", ("carry", "walk")),
+    ("rotation", ("twist", "rotation", "woodchop", "chop")),
+    ("anti_movement", ("plank", "dead bug", "bird dog", "pallof", "hollow"))
+)
+
+# String difficulty levels mapped onto the backend's 0-1000 scale
+_DIFFICULTY_LEVELS = {"beginner": 200, "intermediate": 500, "advanced": 800}
+
+# Equipment names treated as "no equipment"
+_BODYWEIGHT = frozenset({"", "none", "bodyweight", "body weight"})
+
+class ExerciseFeatures(NamedTuple):
+    """Features of an exercise used for similarity scoring."""
+    id: str
+    name: str
+    primary: FrozenSet[str]
+    muscles: FrozenSet[str]  # primary and secondary
+    pattern: str
+    equipment: FrozenSet[str]
+    difficulty: Optional[int]
+
+def _names(values: Any) -> FrozenSet[str]:
+    """Normalize a list of strings or {name: ...} dicts to lower-case names."""
+    if isinstance(values, str):
+        # Database rows hold the lists as JSON text
+        try:
+            values = json.loads(values)
+        except ValueError:
+            values = [values]
+        if isinstance(values, str):
+            values = [values]
+    names = set()
+    for value in values or []:
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("shortName") or value.get("id")
+        if value is not None:
+            names.add(str(value).strip().lower())
+    return frozenset(names)
+
+def _movement_pattern(name: str, fallback: Optional[str]) -> str:
+    lowered = name.lower()
+    for pattern, keywords in _PATTERN_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return pattern
+    return (fallback or "other").lower()
+
+def extract_features(exercise: Dict[str, Any]) -> ExerciseFeatures:
+    """
+    Extract similarity features from an exercise dict.
+    
+    Accepts both the backend shape (`primaryMuscles`, `secondaryMuscles`,
+    `equipmentNeeded`, numeric `difficulty`) and the MCP schema shape
+    (`muscleGroups`, `equipment`, string `difficulty`).
+    
+    Args:
+        exercise: Exercise data
+        
+    Returns:
+        ExerciseFeatures for the exercise
+    """
+    primary = _names(exercise.get("primaryMuscles")) or _names(exercise.get("muscleGroups"))
+    secondary = _names(exercise.get("secondaryMuscles")) - primary
+    equipment = (_names(exercise.get("equipmentNeeded")) or _names(exercise.get("equipment"))) - _BODYWEIGHT
+    
+    difficulty = exercise.get("difficulty")
+    if isinstance(difficulty, str):
+        difficulty = _DIFFICULTY_LEVELS.get(difficulty.lower())
+    elif difficulty is not None:
+        difficulty = int(difficulty)
+    
+    name = exercise.get("name") or ""
+    return ExerciseFeatures(
+        id=str(exercise["id"]),
+        name=name,
+        primary=primary,
+        muscles=primary | secondary,
+        pattern=_movement_pattern(name, exercise.get("exerciseType") or exercise.get("category")),
+        equipment=frozenset(equipment),
+        difficulty=difficulty
+    )
+
+def similarity(a: ExerciseFeatures, b: ExerciseFeatures) -> float:
+    """
+    Score how well `b` substitutes for `a`.
+    
+    Args:
+        a: Exercise being replaced
+        b: Candidate substitute
+        
+    Returns:
+        Score in [0, 1]
+    """
+    # Weighted Jaccard over muscles, primary muscles counting double:
+    # sum(min(w_a, w_b)) / sum(max(w_a, w_b)) expressed with set sizes
+    union = len(a.muscles | b.muscles) + len(a.primary | b.primary)
+    if union:
+        muscle_score = (len(a.muscles & b.muscles) + len(a.primary & b.primary)) / union
+    else:
+        muscle_score = 0.0
+    
+    pattern_score = 1.0 if a.pattern == b.pattern else 0.0
+    
+    if a.equipment or b.equipment:
+        equipment_score = len(a.equipment & b.equipment) / len(a.equipment | b.equipment)
+    else:
+        equipment_score = 1.0
+    
+    if a.difficulty is not None and b.difficulty is not None:
+        difficulty_score = max(0.0, 1 - abs(a.difficulty - b.difficulty) / 500)
+    else:
+        difficulty_score = 0.5
+    
+    return (MUSCLE_WEIGHT * muscle_score + PATTERN_WEIGHT * pattern_score +
+            EQUIPMENT_WEIGHT * equipment_score + DIFFICULTY_WEIGHT * difficulty_score)
+
+class _Adjacency:
+    """
+    One version of a substitution graph's data.
+    
+    Kept in a single object so a rebuild can assemble a new version off to
+    the side and publish it with one assignment.
+    """
+    
+    def __init__(self, k: int):
+        self.k = k
+        self.index: Dict[str, int] = {}
+        self.features: List[Optional[ExerciseFeatures]] = []
+        self.neighbours: List[Tuple[array, array]] = []
+        # Reverse edges: index -> indices whose neighbour lists contain it
+        self.referrers: List[Set[int]] = []
+        # Inverted index: feature token -> indices, used to find candidates
+        self.postings: Dict[str, Set[int]] = {}
+    
+    @classmethod
+    def build(cls, k: int, features: List[ExerciseFeatures]) -> "_Adjacency":
+        """Build a graph over a full catalog, ranking every neighbour list exactly once."""
+        graph = cls(k)
+        for f in features:
+            if f.id in graph.index:
+                graph.features[graph.index[f.id]] = f
+                continue
+            graph.index[f.id] = len(graph.features)
+            graph.features.append(f)
+        graph.neighbours = [(array("i"), array("d")) for _ in graph.features]
+        graph.referrers = [set() for _ in graph.features]
+        for idx, f in enumerate(graph.features):
+            for token in graph.tokens(f):
+                graph.postings.setdefault(token, set()).add(idx)
+        for idx in range(len(graph.features)):
+            graph.set_neighbours(idx, graph.rank(idx))
+        return graph
+    
+    @staticmethod
+    def tokens(features: ExerciseFeatures) -> Iterable[str]:
+        yield f"pattern:{features.pattern}"
+        for muscle in features.muscles:
+            yield f"muscle:{muscle}"
+    
+    def candidates(self, features: ExerciseFeatures, exclude: int) -> Set[int]:
+        candidates: Set[int] = set()
+        for token in self.tokens(features):
+            candidates |= self.postings.get(token, set())
+        candidates.discard(exclude)
+        return candidates
+    
+    def set_neighbours(self, idx: int, ranked: List[Tuple[float, int]]) -> None:
+        old_indices, _ = self.neighbours[idx]
+        for other in old_indices:
+            self.referrers[other].discard(idx)
+        self.neighbours[idx] = (array("i", (i for _, i in ranked)), array("d", (s for s, _ in ranked)))
+        for _, other in ranked:
+            self.referrers[other].add(idx)
+    
+    def rank(self, idx: int) -> List[Tuple[float, int]]:
+        features = self.features[idx]
+        scored = ((similarity(features, self.features[c]), c) for c in self.candidates(features, idx))
+        return heapq.nlargest(self.k, scored)
+    
+    def offer(self, idx: int, candidate: int, score: float) -> None:
+        """Insert `candidate` into `idx`'s list if it ranks among the top k."""
+        indices, scores = self.neighbours[idx]
+        ranked = [(s, i) for s, i in zip(scores, indices) if i != candidate]
+        if len(ranked) >= self.k and score <= ranked[-1][0]:
+            return
+        ranked.append((score, candidate))
+        ranked.sort(reverse=True)
+        self.set_neighbours(idx, ranked[:self.k])
+    
+    def upsert(self, features: ExerciseFeatures) -> None:
+        idx = self.index.get(features.id)
+        if idx is not None and self.features[idx] == features:
+            return
+        if idx is None:
+            idx = self.index[features.id] = len(self.features)
+            self.features.append(features)
+            self.neighbours.append((array("i"), array("d")))
+            self.referrers.append(set())
+        else:
+            for token in self.tokens(self.features[idx]):
+                self.postings[token].discard(idx)
+            self.features[idx] = features
+        for token in self.tokens(features):
+            self.postings.setdefault(token, set()).add(idx)
+        
+        self.set_neighbours(idx, self.rank(idx))
+        # Lists that held the old version may no longer want it
+        for referrer in list(self.referrers[idx]):
+            self.set_neighbours(referrer, self.rank(referrer))
+        for candidate in self.candidates(features, idx):
+            self.offer(candidate, idx, similarity(self.features[candidate], features))
+    
+    def remove(self, exercise_id: str) -> None:
+        idx = self.index.pop(exercise_id, None)
+        if idx is None:
+            return
+        for token in self.tokens(self.features[idx]):
+            self.postings[token].discard(idx)
+        self.features[idx] = None
+        self.set_neighbours(idx, [])
+        for referrer in list(self.referrers[idx]):
+            self.set_neighbours(referrer, self.rank(referrer))
+
+class SubstitutionGraph:
+    """
+    k-nearest-neighbour graph of exercise substitutes.
+    
+    Exercises are interned to integer indices. Each exercise keeps its
+    neighbours as two parallel arrays (indices, scores) sorted best first,
+    so the whole graph costs a few bytes per edge.
+    """
+    
+    def __init__(self, k: int = 8):
+        """
+        Initialize an empty graph.
+        
+        Args:
+            k: Neighbours kept per exercise
+        """
+        self.k = k
+        self._lock = threading.Lock()
+        self._graph = _Adjacency(k)
+        # Changes made while a rebuild is ranking, replayed onto the new graph
+        self._changes: Optional[List[Tuple[str, Any]]] = None
+    
+    def __len__(self) -> int:
+        return len(self._graph.index)
+    
+    def __contains__(self, exercise_id: str) -> bool:
+        return str(exercise_id) in self._graph.index
+    
+    def _apply(self, change: str, arg: Any) -> None:
+        getattr(self._graph, change)(arg)
+        if self._changes is not None:
+            self._changes.append((change, arg))
+    
+    def upsert(self, exercise: Dict[str, Any]) -> None:
+        """
+        Add an exercise or update it in place.
+        
+        Args:
+            exercise: Exercise data (must contain `id`)
+        """
+        features = extract_features(exercise)
+        with self._lock:
+            self._apply("upsert", features)
+    
+    def upsert_many(self, exercises: Iterable[Dict[str, Any]]) -> None:
+        """Add or update several exercises (entries without an id are skipped)."""
+        for exercise in exercises:
+            if exercise.get("id") is not None:
+                self.upsert(exercise)
+    
+    def rebuild(self, exercises: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replace the graph with a full catalog.
+        
+        Cheaper than upserting one by one: every neighbour list is ranked
+        exactly once. The new graph is ranked without holding the lock, so
+        lookups and upserts carry on against the current one meanwhile;
+        upserts and removals made during the rebuild are replayed onto the
+        new graph before it replaces the current one.
+        
+        Args:
+            exercises: Full exercise catalog
+        """
+        features = [extract_features(e) for e in exercises if e.get("id") is not None]
+        with self._lock:
+            self._changes = []
+        try:
+            graph = _Adjacency.build(self.k, features)
+        except BaseException:
+            with self._lock:
+                self._changes = None
+            raise
+        with self._lock:
+            for change, arg in self._changes:
+                getattr(graph, change)(arg)
+            self._changes = None
+            self._graph = graph
+    
+    def remove(self, exercise_id: str) -> None:
+        """
+        Remove an exercise; lists that contained it are rebuilt.
+        
+        Args:
+            exercise_id: Exercise ID
+        """
+        with self._lock:
+            self._apply("remove", str(exercise_id))
+    
+    def alternates(self, exercise_id: str, equipment: Optional[Iterable[str]] = None,
+                   exclude: Iterable[str] = (), limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get ranked substitutes for an exercise.
+        
+        Args:
+            exercise_id: Exercise to replace
+            equipment: Available equipment; substitutes needing anything else
+                are skipped (None means no restriction)
+            exclude: Exercise IDs not to suggest
+            limit: Maximum results (defaults to k)
+            
+        Returns:
+            List of {exerciseId, name, score, movementPattern, equipment},
+            best first; empty if the exercise is unknown
+        """
+        graph = self._graph
+        idx = graph.index.get(str(exercise_id))
+        if idx is None:
+            return []
+        available = None if equipment is None else _names(equipment) - _BODYWEIGHT
+        excluded = {str(e) for e in exclude}
+        
+        results = []
+        indices, scores = graph.neighbours[idx]
+        for other, score in zip(indices, scores):
+            features = graph.features[other]
+            if features is None or features.id in excluded:
+                continue
+            if available is not None and not features.equipment <= available:
+                continue
+            results.append({
+                "exerciseId": features.id,
+                "name": features.name,
+                "score": round(score, 3),
+                "movementPattern": features.pattern,
+                "equipment": sorted(features.equipment)
+            })
+            if len(results) >= (limit or self.k):
+                break
+        return results
+    
+    def best_alternate(self, exercise_id: str, equipment: Optional[Iterable[str]] = None,
+                       exclude: Iterable[str] = ()) -> Optional[str]:
+        """Get the ID of the best substitute, or None."""
+        alternates = self.alternates(exercise_id, equipment, exclude, limit=1)
+        return alternates[0]["exerciseId"] if alternates else None
+
+class CatalogRefresh:
+    """Rebuilds a substitution graph from the full exercise catalog, at startup and then periodically."""
+    
+    def __init__(self, graph: SubstitutionGraph, interval: float = 86400.0):
+        """
+        Args:
+            graph: Graph to rebuild
+            interval: Seconds between rebuilds (0 rebuilds at startup only)
+        """
+        self.graph = graph
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_rebuild_at: Optional[float] = None
+        self._counts = {"rebuilds": 0, "failures": 0}
+    
+    async def load_catalog(self) -> Optional[List[Dict[str, Any]]]:
+        """Every active exercise, or None if the database isn't configured or reachable."""
+        if postgresql is None or not config.get('DATABASE_URL'):
+            return None
+        if postgresql.get_engine() is None:
+            await postgresql.connect_to_postgresql()
+            if postgresql.get_engine() is None:
+                return None
+        # The catalog read may be served from the query cache; a rebuild wants the current one
+        postgresql.invalidate_tables("Exercises")
+        exercises = await postgresql.get_exercises()
+        return [exercise for exercise in exercises if exercise.get("isActive") is not False]
+    
+    async def rebuild(self) -> bool:
+        """
+        Rebuild the graph over the current catalog.
+        
+        Returns:
+            bool: Whether the graph was rebuilt (False if the catalog couldn't be loaded)
+        """
+        try:
+            exercises = await self.load_catalog()
+            if not exercises:
+                self._counts["failures"] += 1
+                return False
+            # Ranking every exercise is CPU-bound, so it runs off the event loop
+            await asyncio.to_thread(self.graph.rebuild, exercises)
+        except Exception as e:
+            self._counts["failures"] += 1
+            logger.error(f"Failed to rebuild the substitution graph: {str(e)}")
+            return False
+        self._counts["rebuilds"] += 1
+        self._last_rebuild_at = time.time()
+        logger.info(f"Rebuilt the substitution graph over {len(self.graph)} exercises")
+        return True
+    
+    async def _run(self) -> None:
+        while True:
+            if not await self.rebuild():
+                await asyncio.sleep(_RETRY_INTERVAL)
+            elif self.interval > 0:
+                await asyncio.sleep(self.interval)
+            else:
+                return
+    
+    def start(self) -> bool:
+        """Rebuild in the background now and every `interval`; False if there is no database to read."""
+        if postgresql is None or not config.get('DATABASE_URL'):
+            logger.info("No DATABASE_URL; the substitution graph is built from exercises as they are fetched")
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+    
+    async def stop(self) -> None:
+        """Stop rebuilding."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Exercises in the graph, and rebuild counts."""
+        return {"exercises": len(self.graph), "lastRebuildAt": self._last_rebuild_at, **self._counts}
+
+# Shared graph, built over the catalog and fed by every exercise payload the server sees
+substitution_graph = SubstitutionGraph()
+
+catalog_refresh = CatalogRefresh(substitution_graph, interval=config.get('SUBSTITUTION_REBUILD_INTERVAL'))
@@ -0,0 +1,452 @@
+"""
+Service for training-load analytics.
+
+Tracks, per user, the numbers coaches look at to manage load:
+- acute (7-day) and chronic (28-day) exponentially weighted load, and their
+  ratio (ACWR)
+- weekly tonnage and working sets per muscle group
+- weekly best estimated 1RM (Epley) per exercise
+
+State is kept in memory. A user's state is built once from their full
+session history (a columnar pass, vectorized with numpy when it is
+installed) and then updated in O(1) for every set logged through the MCP
+server, so reads never have to walk the history again.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..utils.config import config
+from ..utils.downsampling import LTTB, SeriesPyramid
+
+logger = logging.getLogger("workout_mcp_server.training_load_service")
+
+# EWMA spans in days; lambda = 2 / (span + 1)
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACUTE_DECAY = 1 - 2 / (ACUTE_DAYS + 1)
+CHRONIC_DECAY = 1 - 2 / (CHRONIC_DAYS + 1)
+
+# Epley is unreliable for high-rep sets, so they don't produce an e1RM
+MAX_E1RM_REPS = 12
+
+WARMUP_SET_TYPES = frozenset({"warmup", "warm-up", "warm_up"})
+
+# ACWR bands (upper bound, zone)
+RISK_ZONES = (
+    (0.8, "undertraining"),
+    (1.3, "optimal"),
+    (1.5, "elevated"),
+    (math.inf, "high")
+)
+
+class SetRecord(NamedTuple):
+    """One working set, reduced to what the load metrics need."""
+    day: int  # date ordinal
+    exerciseId: str
+    muscles: Tuple[str, ...]
+    weight: float
+    reps: int
+
+def epley_e1rm(weight: float, reps: int) -> Optional[float]:
+    """
+    Estimate a one-rep max with the Epley formula.
+
+    Returns:
+        Estimated 1RM, or None if the set can't produce a reliable estimate
+    """
+    if weight <= 0 or reps < 1 or reps > MAX_E1RM_REPS:
+        return None
+    if reps == 1:
+        return weight
+    return weight * (1 + reps / 30)
+
+def risk_zone(ratio: Optional[float]) -> Optional[str]:
+    """Map an acute:chronic ratio onto its risk band."""
+    if ratio is None:
+        return None
+    for upper, zone in RISK_ZONES:
+        if ratio < upper:
+            return zone
+    return RISK_ZONES[-1][1]
+
+def week_start(day: int) -> int:
+    """Ordinal of the Monday of the week containing `day`."""
+    return day - date.fromordinal(day).weekday()
+
+def _day_ordinal(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+def _muscles(exercise: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    if not exercise:
+        return ()
+    names = []
+    for value in exercise.get("muscleGroups") or exercise.get("primaryMuscles") or []:
+        if isinstance(value, dict):
+            value = value.get("name") or value.get("shortName")
+        if value:
+            names.append(str(value).strip().lower())
+    return tuple(sorted(set(names)))
+
+def session_set_records(session: Dict[str, Any]) -> List[SetRecord]:
+    """
+    Extract the working sets of a completed session.
+
+    A set is dated by its own completedAt, falling back to the exercise's and
+    then the session's timestamps.
+
+    Args:
+        session: Session data as returned by the backend
+
+    Returns:
+        SetRecords for every non-warmup set with reps completed
+    """
+    session_day = _day_ordinal(session.get("completedAt") or session.get("startedAt"))
+    records = []
+    for workout_exercise in session.get("exercises") or []:
+        exercise_id = workout_exercise.get("exerciseId")
+        if not exercise_id:
+            continue
+        exercise_day = _day_ordinal(workout_exercise.get("completedAt")) or session_day
+        muscles = _muscles(workout_exercise.get("exercise"))
+        for set_data in workout_exercise.get("sets") or []:
+            reps = set_data.get("repsCompleted") or 0
+            if reps <= 0 or str(set_data.get("setType", "")).lower() in WARMUP_SET_TYPES:
+                continue
+            day = _day_ordinal(set_data.get("completedAt")) or exercise_day
+            if day is None:
+                continue
+            records.append(SetRecord(
+                day=day,
+                exerciseId=str(exercise_id),
+                muscles=muscles,
+                weight=float(set_data.get("weightUsed") or 0),
+                reps=int(reps)
+            ))
+    return records
+
+class TrainingLoadState:
+    """Running training-load metrics for one user."""
+
+    def __init__(self):
+        self.day: Optional[int] = None  # Day the EWMAs are decayed to
+        self.acute = 0.0
+        self.chronic = 0.0
+        self.total_sets = 0
+        self.weekly_tonnage: Dict[int, float] = {}
+        self.daily_load: Dict[int, float] = {}  # day -> tonnage, for loads before the last set
+        self.muscle_volume: Dict[int, Dict[str, List[float]]] = {}  # week -> muscle -> [sets, tonnage]
+        self.e1rm: Dict[str, Dict[int, float]] = {}  # exercise -> week -> best e1RM
+        self.session_ids: Set[str] = set()
+        # Chart pyramids, keyed by series; tagged with total_sets (and the
+        # last week for tonnage) at build time so writes invalidate them
+        self._pyramids: Dict[str, Tuple[Any, SeriesPyramid]] = {}
+
+    def _add_load(self, day: int, load: float) -> None:
+        # EWMA_t = lambda * load_t + decay * EWMA_{t-1}; the update is linear, so
+        # a late set is simply added with the decay it would have seen since
+        if self.day is None:
+            self.day = day
+        if day >= self.day:
+            elapsed = day - self.day
+            self.acute *= ACUTE_DECAY ** elapsed
+            self.chronic *= CHRONIC_DECAY ** elapsed
+            self.day = day
+            elapsed = 0
+        else:
+            elapsed = self.day - day
+        self.acute += (1 - ACUTE_DECAY) * load * ACUTE_DECAY ** elapsed
+        self.chronic += (1 - CHRONIC_DECAY) * load * CHRONIC_DECAY ** elapsed
+
+    def add_set(self, record: SetRecord) -> None:
+        """Fold one set into the metrics in O(1)."""
+        tonnage = record.weight * record.reps
+        week = week_start(record.day)
+        self.total_sets += 1
+        self._add_load(record.day, tonnage)
+        self.daily_load[record.day] = self.daily_load.get(record.day, 0.0) + tonnage
+        self.weekly_tonnage[week] = self.weekly_tonnage.get(week, 0.0) + tonnage
+        for muscle in record.muscles:
+            volume = self.muscle_volume.setdefault(week, {}).setdefault(muscle, [0, 0.0])
+            volume[0] += 1
+            volume[1] += tonnage
+        e1rm = epley_e1rm(record.weight, record.reps)
+        if e1rm is not None:
+            weeks = self.e1rm.setdefault(record.exerciseId, {})
+            if e1rm > weeks.get(week, 0.0):
+                weeks[week] = e1rm
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """Fold all working sets of a completed session into the metrics."""
+        if session.get("id"):
+            self.session_ids.add(str(session["id"]))
+        for record in session_set_records(session):
+            self.add_set(record)
+
+    @classmethod
+    def from_sets(cls, records: List[SetRecord], session_ids: Iterable[str] = ()) -> "TrainingLoadState":
+        """
+        Build the state for a full set history in one pass.
+
+        Produces the same state as calling add_set() for every record, but
+        aggregates columns at once instead of updating per set.
+        """
+        state = cls()
+        state.session_ids.update(str(session_id) for session_id in session_ids)
+        if not records:
+            return state
+        if np is None:
+            for record in records:
+                state.add_set(record)
+            return state
+
+        exercise_index: Dict[str, int] = {}
+        exercise_ids = np.fromiter((exercise_index.setdefault(r.exerciseId, len(exercise_index)) for r in records),
+                                   dtype=np.int64, count=len(records))
+        days = np.fromiter((r.day for r in records), dtype=np.int64, count=len(records))
+        weights = np.fromiter((r.weight for r in records), dtype=np.float64, count=len(records))
+        reps = np.fromiter((r.reps for r in records), dtype=np.int64, count=len(records))
+        tonnage = weights * reps
+        first_day = int(days.min())
+        last_day = int(days.max())
+
+        # EWMAs at the last day: lambda * sum(load_t * decay^(last - t))
+        offsets = last_day - days
+        state.day = last_day
+        state.acute = float((1 - ACUTE_DECAY) * np.dot(tonnage, ACUTE_DECAY ** offsets))
+        state.chronic = float((1 - CHRONIC_DECAY) * np.dot(tonnage, CHRONIC_DECAY ** offsets))
+        state.total_sets = len(records)
+        load_days, day_inverse = np.unique(days, return_inverse=True)
+        state.daily_load = dict(zip(load_days.tolist(), np.bincount(day_inverse, weights=tonnage).tolist()))
+
+        # Group by (week, exercise); weeks are counted from the first Monday
+        first_week = week_start(first_day)
+        week_index = (days - first_week) // 7
+        group = week_index * len(exercise_index) + exercise_ids
+        groups, inverse = np.unique(group, return_inverse=True)
+        group_sets = np.bincount(inverse)
+        group_tonnage = np.bincount(inverse, weights=tonnage)
+
+        e1rm = np.where((weights > 0) & (reps >= 1) & (reps <= MAX_E1RM_REPS),
+                        np.where(reps == 1, weights, weights * (1 + reps / 30)), 0.0)
+        group_e1rm = np.zeros(len(groups))
+        np.maximum.at(group_e1rm, inverse, e1rm)
+
+        exercise_names = list(exercise_index)
+        exercise_muscles = {}
+        for record in records:
+            exercise_muscles.setdefault(record.exerciseId, record.muscles)
+
+        for key, sets, total, best in zip(groups.tolist(), group_sets.tolist(),
+                                          group_tonnage.tolist(), group_e1rm.tolist()):
+            week = first_week + (key // len(exercise_index)) * 7
+            exercise_id = exercise_names[key % len(exercise_index)]
+            state.weekly_tonnage[week] = state.weekly_tonnage.get(week, 0.0) + total
+            for muscle in exercise_muscles[exercise_id]:
+                volume = state.muscle_volume.setdefault(week, {}).setdefault(muscle, [0, 0.0])
+                volume[0] += sets
+                volume[1] += total
+            if best > 0:
+                state.e1rm.setdefault(exercise_id, {})[week] = best
+        return state
+
+    def loads_at(self, day: int) -> Tuple[float, float]:
+        """Acute and chronic load at `day`, counting only sets done by then."""
+        if self.day is None:
+            return 0.0, 0.0
+        if day >= self.day:
+            elapsed = day - self.day
+            return self.acute * ACUTE_DECAY ** elapsed, self.chronic * CHRONIC_DECAY ** elapsed
+        # Later sets can't be backed out of the running EWMAs without the
+        # rounding error growing by 1/decay per day, so sum the days up to `day`
+        acute = chronic = 0.0
+        for load_day, load in self.daily_load.items():
+            if load_day <= day:
+                acute += load * ACUTE_DECAY ** (day - load_day)
+                chronic += load * CHRONIC_DECAY ** (day - load_day)
+        return (1 - ACUTE_DECAY) * acute, (1 - CHRONIC_DECAY) * chronic
+
+    def _pyramid(self, series: str, tag: Any, build) -> SeriesPyramid:
+        cached = self._pyramids.get(series)
+        if cached is None or cached[0] != tag:
+            cached = self._pyramids[series] = (tag, build())
+        return cached[1]
+
+    def _tonnage_pyramid(self, last_week: int) -> SeriesPyramid:
+        def build():
+            first_week = min(self.weekly_tonnage, default=last_week)
+            weeks = range(first_week, max(last_week, first_week) + 1, 7)
+            return SeriesPyramid(
+                [date.fromordinal(week).isoformat() for week in weeks],
+                weeks,
+                [self.weekly_tonnage.get(week, 0.0) for week in weeks]
+            )
+        return self._pyramid("tonnage", (self.total_sets, last_week), build)
+
+    def _e1rm_pyramid(self, exercise_id: str) -> SeriesPyramid:
+        def build():
+            weeks = sorted(self.e1rm.get(exercise_id, {}))
+            return SeriesPyramid(
+                [date.fromordinal(week).isoformat() for week in weeks],
+                weeks,
+                [self.e1rm[exercise_id][week] for week in weeks]
+            )
+        return self._pyramid(f"e1rm:{exercise_id}", self.total_sets, build)
+
+    def summary(self, as_of: int, weeks: int, exercise_ids: Optional[List[str]] = None,
+                max_points: Optional[int] = None, method: str = LTTB) -> Dict[str, Any]:
+        """
+        Summarize the metrics for the `weeks` weeks ending with `as_of`.
+
+        Args:
+            as_of: Date ordinal to report loads at
+            weeks: Number of weeks of volume and e1RM trend to return
+            exercise_ids: Limit e1RM trends to these exercises
+            max_points: Downsample the tonnage and e1RM series to at most
+                this many points each
+            method: Downsampling method (LTTB or BUCKET)
+
+        Returns:
+            Dict matching the GetTrainingLoad output fields
+        """
+        acute, chronic = self.loads_at(as_of)
+        ratio = round(acute / chronic, 2) if chronic > 0 else None
+        last_week = week_start(as_of)
+        week_range = [last_week - 7 * offset for offset in range(weeks - 1, -1, -1)]
+
+        muscle_volume = [
+            {
+                "weekStart": date.fromordinal(week).isoformat(),
+                "muscleGroup": muscle,
+                "sets": int(volume[0]),
+                "tonnage": round(volume[1], 1)
+            }
+            for week in week_range
+            for muscle, volume in sorted(self.muscle_volume.get(week, {}).items())
+        ]
+
+        downsampled = max_points is not None and weeks > max_points
+        trends = {}
+        for exercise_id in (exercise_ids if exercise_ids is not None else self.e1rm):
+            bests = self.e1rm.get(exercise_id, {})
+            if downsampled:
+                points = self._e1rm_pyramid(exercise_id).query(
+                    max_points, "weekStart", "e1rm", method, start=week_range[0], end=last_week
+                )
+                for point in points:
+                    point["e1rm"] = round(point["e1rm"], 1)
+            else:
+                points = [
+                    {"weekStart": date.fromordinal(week).isoformat(), "e1rm": round(bests[week], 1)}
+                    for week in week_range
+                    if week in bests
+                ]
+            if points:
+                trends[exercise_id] = points
+
+        if downsampled:
+            weekly_tonnage = self._tonnage_pyramid(last_week).query(
+                max_points, "weekStart", "tonnage", method, start=week_range[0], end=last_week
+            )
+            for point in weekly_tonnage:
+                point["tonnage"] = round(point["tonnage"], 1)
+        else:
+            weekly_tonnage = [
+                {"weekStart": date.fromordinal(week).isoformat(), "tonnage": round(self.weekly_tonnage.get(week, 0.0), 1)}
+                for week in week_range
+            ]
+
+        return {
+            "asOf": date.fromordinal(as_of).isoformat(),
+            "acuteLoad": round(acute, 1),
+            "chronicLoad": round(chronic, 1),
+            "acuteChronicRatio": ratio,
+            "riskZone": risk_zone(ratio),
+            "weeklyTonnage": weekly_tonnage,
+            "muscleVolume": muscle_volume,
+            "e1rmTrends": trends,
+            "totalSets": self.total_sets
+        }
+
+class TrainingLoadStore:
+    """LRU of per-user training-load states."""
+
+    def __init__(self, max_users: int = 1000):
+        self.max_users = max_users
+        self._states: "OrderedDict[str, TrainingLoadState]" = OrderedDict()
+        # Sessions logged while a user's state was being built
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+
+    def get(self, user_id: str) -> Optional[TrainingLoadState]:
+        """Get the state for a user, if it has been built."""
+        state = self._states.get(user_id)
+        if state is not None:
+            self._states.move_to_end(user_id)
+        return state
+
+    def begin_build(self, user_id: str) -> None:
+        """Start buffering sessions logged for `user_id` until finish_build()."""
+        self._pending.setdefault(user_id, [])
+
+    def finish_build(self, user_id: str, state: TrainingLoadState) -> TrainingLoadState:
+        """Store a freshly built state, applying sessions logged meanwhile."""
+        for session in self._pending.pop(user_id, []):
+            if str(session.get("id")) not in state.session_ids:
+                state.add_session(session)
+        self._states[user_id] = state
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_users:
+            self._states.popitem(last=False)
+        return state
+
+    def abort_build(self, user_id: str) -> None:
+        """Stop buffering after a failed build."""
+        self._pending.pop(user_id, None)
+
+    def record_session(self, session: Dict[str, Any]) -> None:
+        """
+        Apply a logged session to its user's state.
+
+        Only completed sessions count. A session that was already applied has
+        been edited, so the user's state is dropped and rebuilt on next read.
+        """
+        user_id = str(session.get("userId") or "")
+        if not user_id or session.get("status") != "completed":
+            return
+        if user_id in self._pending:
+            self._pending[user_id].append(session)
+            return
+        state = self._states.get(user_id)
+        if state is None:
+            return
+        if session.get("id") and str(session["id"]) in state.session_ids:
+            self.invalidate(user_id)
+            return
+        state.add_session(session)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's state."""
+        self._states.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Forget every user's state."""
+        self._states.clear()
+
+training_load_store = TrainingLoadStore(config.get('TRAINING_LOAD_MAX_USERS'))
@@ -0,0 +1,40 @@
+-- Change notifications for MCP server cache invalidation.
+--
+-- Sends a NOTIFY on the mcp_cache_invalidation channel for every row
+-- inserted, updated or deleted in the tables the Workout MCP Server caches.
+-- The payload is JSON: {"table": ..., "op": ..., "id": ..., "userId": ...}.
+--
+-- Apply once per database (safe to re-run):
+--     psql "$DATABASE_URL" -f workout_mcp_server/sql/change_notifications.sql
+
+CREATE OR REPLACE FUNCTION mcp_notify_change() RETURNS trigger AS $$
+DECLARE
+    data jsonb := to_jsonb(COALESCE(NEW, OLD));
+BEGIN
+    PERFORM pg_notify(
+        'mcp_cache_invalidation',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'id', data->>'id',
+            'userId', data->>'userId'
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS mcp_notify_change ON workout_sessions;
+CREATE TRIGGER mcp_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON workout_sessions
+    FOR EACH ROW EXECUTE FUNCTION mcp_notify_change();
+
+DROP TRIGGER IF EXISTS mcp_notify_change ON "Exercises";
+CREATE TRIGGER mcp_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON "Exercises"
+    FOR EACH ROW EXECUTE FUNCTION mcp_notify_change();
+
+DROP TRIGGER IF EXISTS mcp_notify_change ON client_progress;
+CREATE TRIGGER mcp_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON client_progress
+    FOR EACH ROW EXECUTE FUNCTION mcp_notify_change();
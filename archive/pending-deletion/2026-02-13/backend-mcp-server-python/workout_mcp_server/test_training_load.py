@@ -0,0 +1,65 @@
+"""
+Tests for the training-load metrics.
+
+Run from the backend-mcp-server-python directory:
+```
+python -m pytest workout_mcp_server/test_training_load.py
+```
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from workout_mcp_server.services import training_load_service
+from workout_mcp_server.services.training_load_service import (
+    ACUTE_DECAY,
+    CHRONIC_DECAY,
+    SetRecord,
+    TrainingLoadState
+)
+
+D0 = date(2026, 1, 5).toordinal()
+
+def _history():
+    """One 100 kg x 5 set a day from D0 through D0 + 58."""
+    return [SetRecord(day=D0 + offset, exerciseId="squat", muscles=("quads",), weight=100.0, reps=5)
+            for offset in range(59)]
+
+def _ewma(records, decay, day):
+    """Reference EWMA at `day` over the sets done by then."""
+    return sum((1 - decay) * r.weight * r.reps * decay ** (day - r.day) for r in records if r.day <= day)
+
+def _states(records):
+    """The state built set by set, and in one pass (vectorized if numpy is installed)."""
+    incremental = TrainingLoadState()
+    for record in records:
+        incremental.add_set(record)
+    return incremental, TrainingLoadState.from_sets(records)
+
+def test_loads_before_last_set_ignore_later_sets():
+    records = _history()
+    for state in _states(records):
+        acute, chronic = state.loads_at(D0 + 10)
+        assert round(acute, 1) == 478.9
+        assert abs(acute - _ewma(records, ACUTE_DECAY, D0 + 10)) < 1e-6
+        assert abs(chronic - _ewma(records, CHRONIC_DECAY, D0 + 10)) < 1e-6
+
+def test_loads_after_last_set_decay():
+    records = _history()
+    for state in _states(records):
+        acute, chronic = state.loads_at(D0 + 65)
+        assert abs(acute - _ewma(records, ACUTE_DECAY, D0 + 65)) < 1e-6
+        assert abs(chronic - _ewma(records, CHRONIC_DECAY, D0 + 65)) < 1e-6
+
+def test_loads_before_first_set_are_zero():
+    for state in _states(_history()):
+        assert state.loads_at(D0 - 1) == (0.0, 0.0)
+
+def test_pure_python_build_matches(monkeypatch):
+    monkeypatch.setattr(training_load_service, "np", None)
+    records = _history()
+    state = TrainingLoadState.from_sets(records)
+    assert abs(state.loads_at(D0 + 10)[0] - _ewma(records, ACUTE_DECAY, D0 + 10)) < 1e-6
@@ -11,13 +11,23 @@ from pathlib import Path
 current_dir = Path(__file__).parent.parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
+if str(current_dir.parent) not in sys.path:
+    sys.path.insert(0, str(current_dir.parent))
 
+# Import the tools by their package path so they (and the services they use)
+# are the same module instances main.py starts, stops and reports on
 try:
-    from tools.recommendations_tool import get_workout_recommendations
-    from tools.progress_tool import get_client_progress
-    from tools.statistics_tool import get_workout_statistics
-    from tools.session_tool import log_workout_session
-    from tools.plan_tool import generate_workout_plan
+    from workout_mcp_server.tools.recommendations_tool import get_workout_recommendations
+    from workout_mcp_server.tools.progress_tool import get_client_progress
+    from workout_mcp_server.tools.statistics_tool import get_workout_statistics
+    from workout_mcp_server.tools.session_tool import log_workout_session
+    from workout_mcp_server.tools.plan_tool import generate_workout_plan, expand_workout_plan
+    from workout_mcp_server.tools.batch_tool import run_tool_batch
+    from workout_mcp_server.tools.alternates_tool import get_exercise_alternates
+    from workout_mcp_server.tools.training_load_tool import get_training_load
+    from workout_mcp_server.tools.import_tool import import_workout_log, import_workout_log_upload
+    from workout_mcp_server.tools.export_tool import export_client_history
+    from workout_mcp_server.tools.roster_tool import get_trainer_roster_summary
 except ImportError as e:
     # If absolute imports fail, try relative imports as fallback
     try:
@@ -25,7 +35,13 @@ except ImportError as e:
         from .progress_tool import get_client_progress
         from .statistics_tool import get_workout_statistics
         from .session_tool import log_workout_session
-        from .plan_tool import generate_workout_plan
+        from .plan_tool import generate_workout_plan, expand_workout_plan
+        from .batch_tool import run_tool_batch
+        from .alternates_tool import get_exercise_alternates
+        from .training_load_tool import get_training_load
+        from .import_tool import import_workout_log, import_workout_log_upload
+        from .export_tool import export_client_history
+        from .roster_tool import get_trainer_roster_summary
     except ImportError as e2:
         print(f"Error importing workout tools: {e} / {e2}")
         # Create placeholder functions if imports fail
@@ -39,11 +55,35 @@ except ImportError as e:
             return {"error": "Workout session logging tool not available"}
         async def generate_workout_plan(input_data):
             return {"error": "Workout plan generation tool not available"}
+        async def expand_workout_plan(input_data):
+            return {"error": "Workout plan expansion tool not available"}
+        async def run_tool_batch(input_data, registry, write_tools):
+            return {"error": "Batch tool not available"}
+        async def get_exercise_alternates(input_data):
+            return {"error": "Exercise alternates tool not available"}
+        async def get_training_load(input_data):
+            return {"error": "Training load tool not available"}
+        async def import_workout_log(input_data):
+            return {"error": "Workout log import tool not available"}
+        async def import_workout_log_upload(chunks, user_id, fmt="csv", dry_run=False):
+            return {"error": "Workout log import tool not available"}
+        async def export_client_history(input_data):
+            return {"error": "Client history export tool not available"}
+        async def get_trainer_roster_summary(input_data):
+            return {"error": "Trainer roster summary tool not available"}
 
 __all__ = [
     'get_workout_recommendations',
     'get_client_progress',
     'get_workout_statistics',
     'log_workout_session',
-    'generate_workout_plan'
+    'generate_workout_plan',
+    'expand_workout_plan',
+    'run_tool_batch',
+    'get_exercise_alternates',
+    'get_training_load',
+    'import_workout_log',
+    'import_workout_log_upload',
+    'export_client_history',
+    'get_trainer_roster_summary'
 ]
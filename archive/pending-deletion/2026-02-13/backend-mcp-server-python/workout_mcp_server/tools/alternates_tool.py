@@ -0,0 +1,56 @@
+"""
+MCP tool for exercise substitutions.
+"""
+
+import logging
+from fastapi import HTTPException, status
+
+from ..models import (
+    GetExerciseAlternatesInput,
+    GetExerciseAlternatesOutput
+)
+from ..services.substitution_service import substitution_graph
+from ..utils import make_api_request
+
+logger = logging.getLogger("workout_mcp_server.tools.alternates_tool")
+
+async def get_exercise_alternates(input_data: GetExerciseAlternatesInput) -> GetExerciseAlternatesOutput:
+    """
+    Get ranked substitute exercises for an exercise.
+
+    Alternates are read from the precomputed substitution graph, so the
+    lookup does not call the backend. An exercise the graph has not seen yet
+    is fetched once and added to the graph.
+    """
+    try:
+        if input_data.exerciseId not in substitution_graph:
+            response = await make_api_request("GET", f"/exercises/{input_data.exerciseId}")
+            exercise = response.get("exercise")
+            if not exercise:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Exercise {input_data.exerciseId} not found"
+                )
+            substitution_graph.upsert(exercise)
+
+        alternates = substitution_graph.alternates(
+            input_data.exerciseId,
+            equipment=input_data.equipment,
+            exclude=input_data.excludeExercises or [],
+            limit=input_data.limit
+        )
+
+        return GetExerciseAlternatesOutput(
+            exerciseId=input_data.exerciseId,
+            alternates=alternates,
+            message=f"Found {len(alternates)} alternate exercises."
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in GetExerciseAlternates: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get exercise alternates: {str(e)}"
+        )
@@ -0,0 +1,133 @@
+"""
+MCP tool for running several tool invocations in one request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from ..models import (
+    BatchToolsInput,
+    BatchToolsOutput,
+    ToolCall,
+    ToolCallResult
+)
+from ..utils import config, request_scope, invalidate_request_scope, request_priority, BATCH
+
+logger = logging.getLogger("workout_mcp_server.tools.batch_tool")
+
+# Tool name -> (input model, tool coroutine)
+ToolRegistry = Dict[str, Tuple[Type[BaseModel], Callable[[Any], Awaitable[Any]]]]
+
+async def _run_tool_call(call: ToolCall, registry: ToolRegistry) -> ToolCallResult:
+    """
+    Run a single tool call, capturing errors instead of raising them.
+    
+    Args:
+        call: Tool invocation
+        registry: Available tools
+        
+    Returns:
+        ToolCallResult for the call
+    """
+    input_model, handler = registry[call.tool]
+    try:
+        output = await handler(input_model(**call.input))
+        if isinstance(output, BaseModel):
+            output = output.dict()
+        return ToolCallResult(
+            id=call.id,
+            tool=call.tool,
+            success=True,
+            statusCode=status.HTTP_200_OK,
+            output=output
+        )
+    except ValidationError as e:
+        return ToolCallResult(
+            id=call.id,
+            tool=call.tool,
+            success=False,
+            statusCode=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            error=str(e)
+        )
+    except HTTPException as e:
+        return ToolCallResult(
+            id=call.id,
+            tool=call.tool,
+            success=False,
+            statusCode=e.status_code,
+            error=str(e.detail)
+        )
+    except Exception as e:
+        logger.error(f"Error in batched {call.tool}: {str(e)}")
+        return ToolCallResult(
+            id=call.id,
+            tool=call.tool,
+            success=False,
+            statusCode=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error=str(e)
+        )
+
+async def run_tool_batch(
+    input_data: BatchToolsInput,
+    registry: ToolRegistry,
+    write_tools: Set[str]
+) -> BatchToolsOutput:
+    """
+    Run a batch of tool invocations.
+    
+    Consecutive read-only calls run concurrently. Calls to tools in
+    `write_tools` run on their own, in submission order, so a read placed
+    after a write sees its effect. All calls share one request-scoped cache,
+    so identical backend GETs (e.g. `/client-progress/{id}`) are fetched once;
+    the cache is dropped after every write. Calls run in the batch priority
+    class, so admission-controlled tools admit interactive callers first.
+    
+    Args:
+        input_data: Batch of tool invocations
+        registry: Available tools
+        write_tools: Names of tools that modify backend state
+        
+    Returns:
+        BatchToolsOutput with one result per call, in submission order
+    """
+    max_calls = config.get('BATCH_MAX_CALLS')
+    if len(input_data.calls) > max_calls:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch contains {len(input_data.calls)} calls; the maximum is {max_calls}"
+        )
+    
+    unknown = sorted({call.tool for call in input_data.calls if call.tool not in registry})
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown tools in batch: {', '.join(unknown)}"
+        )
+    
+    results: List[ToolCallResult] = []
+    # Batched calls yield to interactive ones under admission control
+    with request_scope(), request_priority(BATCH):
+        pending: List[ToolCall] = []
+        for call in input_data.calls + [None]:
+            if call is not None and call.tool not in write_tools:
+                pending.append(call)
+                continue
+            
+            # Flush the group of independent reads collected so far
+            if pending:
+                results.extend(await asyncio.gather(*(_run_tool_call(c, registry) for c in pending)))
+                pending = []
+            
+            if call is not None:
+                results.append(await _run_tool_call(call, registry))
+                invalidate_request_scope()
+    
+    failed = sum(1 for result in results if not result.success)
+    return BatchToolsOutput(
+        results=results,
+        message=f"Ran {len(results)} tool calls ({failed} failed)."
+    )
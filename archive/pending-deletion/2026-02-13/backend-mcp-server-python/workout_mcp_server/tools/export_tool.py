@@ -0,0 +1,157 @@
+"""
+MCP tool for exporting a client's workout history.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from ..models import ExportClientHistoryInput
+from ..services.export_service import FORMATS, HISTORY_QUERY, MEDIA_TYPES, flatten_session, get_encoder
+from ..utils import make_api_request, config, request_priority, BATCH
+
+try:
+    from ..utils import postgresql
+except ImportError:
+    # psycopg2/SQLAlchemy not installed: exports page through the backend API
+    postgresql = None
+
+logger = logging.getLogger("workout_mcp_server.tools.export_tool")
+
+# Seconds between connection attempts while the database is unreachable
+_RECONNECT_INTERVAL = 60.0
+_last_connect_attempt = None
+
+async def _database_available() -> bool:
+    """Connect to the database on first use; False if it isn't configured or reachable."""
+    global _last_connect_attempt
+    if postgresql is None or not config.get('DATABASE_URL'):
+        return False
+    if postgresql.get_engine() is not None:
+        return True
+    if _last_connect_attempt is not None and time.monotonic() - _last_connect_attempt < _RECONNECT_INTERVAL:
+        return False
+
+    _last_connect_attempt = time.monotonic()
+    try:
+        await postgresql.connect_to_postgresql()
+    except Exception as e:
+        logger.warning(f"Export database unavailable, using the backend API: {str(e)}")
+    return postgresql.get_engine() is not None
+
+async def _database_chunks(input_data: ExportClientHistoryInput) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Read export rows through a server-side cursor, one chunk at a time."""
+    chunks = postgresql.stream_query(
+        HISTORY_QUERY,
+        {"user_id": input_data.userId, "start_date": input_data.startDate, "end_date": input_data.endDate},
+        chunk_size=config.get('EXPORT_CHUNK_SIZE')
+    )
+    try:
+        while True:
+            # Fetching blocks on the database, so it runs off the event loop
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await asyncio.to_thread(chunks.close)
+
+async def _backend_chunks(input_data: ExportClientHistoryInput) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Page export rows out of the backend API, one page of sessions at a time."""
+    page_size = config.get('EXPORT_PAGE_SIZE')
+    params = {"limit": page_size, "sort": "startedAt", "order": "ASC"}
+    if input_data.startDate:
+        params["startDate"] = input_data.startDate
+    if input_data.endDate:
+        params["endDate"] = input_data.endDate
+
+    offset = 0
+    while True:
+        with request_priority(BATCH):
+            response = await make_api_request(
+                "GET",
+                f"/workout/sessions/user/{input_data.userId}",
+                data={**params, "offset": offset}
+            )
+        sessions = response.get("sessions", [])
+        rows = [row for session in sessions for row in flatten_session(session)]
+        if rows:
+            yield rows
+        if len(sessions) < page_size:
+            break
+        offset += page_size
+
+async def _encode(encoder, first: List[Dict[str, Any]], chunks: AsyncIterator[List[Dict[str, Any]]],
+                  user_id: str) -> AsyncIterator[bytes]:
+    """Encode row chunks into the response body as they are read."""
+    rows = 0
+    try:
+        if first:
+            rows += len(first)
+            yield encoder.encode(first)
+            async for chunk in chunks:
+                rows += len(chunk)
+                data = encoder.encode(chunk)
+                if data:
+                    yield data
+        yield encoder.close()
+        logger.info(f"Exported {rows} rows for user {user_id}")
+    except Exception as e:
+        # The status line has already been sent, so the body is cut short
+        logger.error(f"Error in ExportClientHistory after {rows} rows: {str(e)}")
+        raise
+    finally:
+        await chunks.aclose()
+
+async def export_client_history(input_data: ExportClientHistoryInput) -> StreamingResponse:
+    """
+    Export a client's workout history as CSV, NDJSON or Parquet.
+
+    The export has one row per set with its session and exercise columns,
+    and is streamed as a chunked response. It is read from the database
+    through a server-side cursor when `DATABASE_URL` is set, and paged
+    through the backend API otherwise, so memory use does not grow with
+    the size of the history.
+    """
+    if input_data.format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of: {', '.join(FORMATS)}"
+        )
+
+    try:
+        try:
+            encoder = get_encoder(input_data.format)
+        except RuntimeError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if await _database_available():
+            chunks = _database_chunks(input_data)
+        else:
+            chunks = _backend_chunks(input_data)
+
+        # Read the first chunk before responding, so a failing source is
+        # still reported with an error status
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = []
+
+        filename = f"workout-history-{input_data.userId}.{input_data.format}"
+        return StreamingResponse(
+            _encode(encoder, first, chunks, input_data.userId),
+            media_type=MEDIA_TYPES[input_data.format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in ExportClientHistory: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export client history: {str(e)}"
+        )
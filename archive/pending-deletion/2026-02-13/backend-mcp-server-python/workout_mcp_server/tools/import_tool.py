@@ -0,0 +1,143 @@
+"""
+MCP tool for bulk importing workout logs.
+"""
+
+import io
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from fastapi import HTTPException, status
+
+from ..models import (
+    ImportWorkoutLogInput,
+    ImportWorkoutLogOutput
+)
+from ..services.import_service import FORMATS, WorkoutLogImporter, aiter_lines, iter_lines, iter_rows
+from ..services.invalidation_service import change_feed, TABLE_SESSIONS
+from ..services.training_load_service import training_load_store
+from ..utils import make_api_request, config, admission, request_priority, BATCH
+
+logger = logging.getLogger("workout_mcp_server.tools.import_tool")
+
+# An import can write thousands of sessions, so it shares the admission
+# limits used for other expensive tools
+import_admission = admission.register(
+    "ImportWorkoutLog",
+    max_concurrent=config.get('ADMISSION_MAX_CONCURRENT'),
+    max_queue=config.get('ADMISSION_MAX_QUEUE'),
+    user_rate_per_minute=config.get('ADMISSION_USER_RATE_PER_MINUTE'),
+    user_burst=config.get('ADMISSION_USER_BURST')
+)
+
+async def _search_exercises(query: str) -> List[Dict[str, Any]]:
+    """Search the exercise catalog by name."""
+    response = await make_api_request("GET", "/exercises/search", data={"q": query, "limit": 20})
+    return response.get("exercises", [])
+
+async def _write_session(session: Dict[str, Any]) -> None:
+    """Create one imported session in the backend."""
+    response = await make_api_request("POST", "/workout/sessions", data=session)
+    written = {**session, **response.get("session", {})}
+    training_load_store.record_session(written)
+    change_feed.note_local_write(TABLE_SESSIONS, written.get("id"))
+
+async def run_import(user_id: str, lines: AsyncIterator[str], fmt: str, dry_run: bool = False,
+                     progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> ImportWorkoutLogOutput:
+    """
+    Import a stream of CSV or JSONL lines for a user.
+
+    Shared by the ImportWorkoutLog tool, the streaming upload endpoint and
+    the command-line importer.
+
+    Args:
+        user_id: User to import sessions for
+        lines: Log lines
+        fmt: "csv" or "jsonl"
+        dry_run: Validate without writing
+        progress: Called with the running report after every batch
+
+    Returns:
+        ImportWorkoutLogOutput with counts, throughput and per-row errors
+    """
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of: {', '.join(FORMATS)}"
+        )
+
+    importer = WorkoutLogImporter(
+        user_id,
+        search=_search_exercises,
+        write=_write_session,
+        batch_size=config.get('IMPORT_BATCH_SIZE'),
+        concurrency=config.get('IMPORT_WRITE_CONCURRENCY'),
+        max_errors=config.get('IMPORT_MAX_ERRORS'),
+        dry_run=dry_run,
+        progress=progress
+    )
+    try:
+        async with import_admission.admit(user_id):
+            with request_priority(BATCH):
+                report = await importer.run(iter_rows(lines, fmt))
+    except ValueError as e:
+        # Unusable file (e.g. a CSV header without the required columns)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    verb = "Validated" if dry_run else "Imported"
+    logger.info(f"{verb} {report['rowsImported']}/{report['rowsRead']} rows for user {user_id} "
+                f"at {report['rowsPerSecond']} rows/s")
+    return ImportWorkoutLogOutput(
+        userId=user_id,
+        dryRun=dry_run,
+        **report,
+        message=f"{verb} {report['rowsImported']} of {report['rowsRead']} rows "
+                f"into {report['sessionsWritten']} sessions ({report['errorCount']} errors)."
+    )
+
+async def import_workout_log(input_data: ImportWorkoutLogInput) -> ImportWorkoutLogOutput:
+    """
+    Import a CSV or JSONL workout log for a user.
+
+    Each row is one set. Rows are grouped into sessions by date and workout
+    name, exercise names are matched to the catalog, and sessions are
+    written to the backend in batches. Rows that fail are reported with
+    their row number and don't stop the import.
+
+    For large files use the streaming upload endpoint
+    (`POST /ImportWorkoutLog/upload`) or the command-line importer.
+    """
+    try:
+        return await run_import(
+            input_data.userId,
+            aiter_lines(io.StringIO(input_data.content)),
+            input_data.format,
+            input_data.dryRun
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in ImportWorkoutLog: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import workout log: {str(e)}"
+        )
+
+async def import_workout_log_upload(chunks: AsyncIterator[bytes], user_id: str, fmt: str = "csv",
+                                    dry_run: bool = False) -> ImportWorkoutLogOutput:
+    """
+    Import a workout log streamed as a raw request body.
+
+    The body is parsed as it arrives, so files of any size are imported
+    with constant memory.
+    """
+    try:
+        return await run_import(user_id, iter_lines(chunks), fmt, dry_run)
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in ImportWorkoutLog upload: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import workout log: {str(e)}"
+        )
@@ -4,28 +4,119 @@ MCP tool for workout plan generation.
 
 import logging
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 from fastapi import HTTPException, status
 
 from ..models import (
     GenerateWorkoutPlanInput,
-    GenerateWorkoutPlanOutput
+    GenerateWorkoutPlanOutput,
+    ExpandWorkoutPlanInput,
+    ExpandWorkoutPlanOutput
 )
-from ..utils import make_api_request
+from ..services.periodization_service import PeriodizedPlan
+from ..services.substitution_service import substitution_graph
+from ..utils import make_api_request, config, admission
 
 logger = logging.getLogger("workout_mcp_server.tools.plan_tool")
 
+# Plan generation makes several backend calls plus CPU work per request
+plan_admission = admission.register(
+    "GenerateWorkoutPlan",
+    max_concurrent=config.get('ADMISSION_MAX_CONCURRENT'),
+    max_queue=config.get('ADMISSION_MAX_QUEUE'),
+    user_rate_per_minute=config.get('ADMISSION_USER_RATE_PER_MINUTE'),
+    user_burst=config.get('ADMISSION_USER_BURST')
+)
+
 async def generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> GenerateWorkoutPlanOutput:
     """
     Generate a personalized workout plan for a client.
     
     This tool creates a comprehensive workout plan based on the client's goals,
-    preferences, and available equipment. It generates multiple workout days
-    with appropriate exercises, set/rep schemes, and instructions.
+    preferences, and available equipment. The plan is periodized across the
+    whole date range: OPT phases advance every mesocycle, load progresses
+    week to week and every fourth week is a deload.
     
     The generated plan can be used as a starting point for trainers or can be
     directly assigned to clients.
+    
+    Calls are subject to admission control (per-trainer rate limit and a
+    global concurrency limit) and may be rejected with a 429.
+    """
+    async with plan_admission.admit(input_data.trainerId):
+        return await _generate_workout_plan(input_data)
+
+async def expand_workout_plan(input_data: ExpandWorkoutPlanInput) -> ExpandWorkoutPlanOutput:
+    """
+    Build the workout days of more weeks of a generated plan.
+    
+    GenerateWorkoutPlan only builds days for the first `expandWeeks` weeks.
+    This adds the next `weeks` weeks after the last one built, from the
+    settings the plan was generated with and the client's current exercise
+    recommendations, and saves the plan.
+    
+    Calls share GenerateWorkoutPlan's admission control and may be rejected
+    with a 429.
     """
+    async with plan_admission.admit(input_data.trainerId):
+        return await _expand_workout_plan(input_data)
+
+def _check_weeks(name: str, weeks: Optional[int]) -> None:
+    if weeks is not None and weeks < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be at least 1, got {weeks}"
+        )
+
+async def _recommended_exercises(client_id: str, periodization: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The client's recommended exercises for the plan's settings; 400 if there are none."""
+    exercise_params = {
+        "goal": periodization["goal"],
+        "difficulty": periodization["difficulty"],
+        "equipment": periodization["equipment"],
+        "muscleGroups": periodization["focusAreas"],
+        "limit": 30,  # Get a good selection to choose from
+        "optPhase": periodization["optPhase"]
+    }
+    
+    exercises_response = await make_api_request(
+        "GET", 
+        f"/exercises/recommended/{client_id}", 
+        data=exercise_params
+    )
+    
+    recommended_exercises = exercises_response.get("exercises", [])
+    
+    if not recommended_exercises:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No suitable exercises found with the given criteria"
+        )
+    
+    substitution_graph.upsert_many(recommended_exercises)
+    return recommended_exercises
+
+def _periodized_plan(periodization: Dict[str, Any], start_date: str, end_date: str,
+                     exercises: List[Dict[str, Any]]) -> PeriodizedPlan:
+    return PeriodizedPlan(
+        goal=periodization["goal"],
+        days_per_week=periodization["daysPerWeek"],
+        difficulty=periodization["difficulty"],
+        equipment=periodization["equipment"],
+        start_date=start_date,
+        end_date=end_date,
+        exercises=exercises,
+        start_phase=periodization["optPhase"],
+        substitute=lambda exercise_id, day_ids: substitution_graph.best_alternate(
+            exercise_id, periodization["equipment"], exclude=day_ids
+        )
+    )
+
+async def _generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> GenerateWorkoutPlanOutput:
+    """Build the periodized plan and save it to the backend."""
     try:
+        _check_weeks("expandWeeks", input_data.expandWeeks)
+        
         # Convert input to API format
         current_date = datetime.now().strftime("%Y-%m-%d")
         
@@ -47,6 +138,15 @@ async def generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> Generat
             "startDate": start_date,
             "endDate": end_date,
             "status": "active",
+            # Kept with the plan so ExpandWorkoutPlan can build later weeks the same way
+            "periodization": {
+                "goal": input_data.goal,
+                "daysPerWeek": input_data.daysPerWeek,
+                "difficulty": input_data.difficulty,
+                "equipment": input_data.equipment,
+                "focusAreas": input_data.focusAreas,
+                "optPhase": input_data.optPhase
+            },
             "days": []
         }
         
@@ -58,162 +158,14 @@ async def generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> Generat
         client_progress = progress_response.get("progress", {})
         
         # Then, get exercise recommendations based on goals and equipment
-        exercise_params = {
-            "goal": input_data.goal,
-            "difficulty": input_data.difficulty,
-            "equipment": input_data.equipment,
-            "muscleGroups": input_data.focusAreas,
-            "limit": 30,  # Get a good selection to choose from
-            "optPhase": input_data.optPhase
-        }
+        recommended_exercises = await _recommended_exercises(input_data.clientId, plan_data["periodization"])
         
-        exercises_response = await make_api_request(
-            "GET", 
-            f"/exercises/recommended/{input_data.clientId}", 
-            data=exercise_params
-        )
-        
-        recommended_exercises = exercises_response.get("exercises", [])
-        
-        if not recommended_exercises:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No suitable exercises found with the given criteria"
-            )
-        
-        # Group exercises by category
-        exercise_categories = {}
-        for exercise in recommended_exercises:
-            category = exercise.get("category", "other")
-            if category not in exercise_categories:
-                exercise_categories[category] = []
-            exercise_categories[category].append(exercise)
-        
-        # Create workout days based on daysPerWeek
-        day_types = []
-        if input_data.daysPerWeek == 3:
-            # 3-day split (e.g., full body x3)
-            day_types = ["full_body", "full_body", "full_body"]
-        elif input_data.daysPerWeek == 4:
-            # 4-day split (e.g., upper/lower split)
-            day_types = ["upper_body", "lower_body", "upper_body", "lower_body"]
-        elif input_data.daysPerWeek == 5:
-            # 5-day split (e.g., push/pull/legs)
-            day_types = ["push", "pull", "legs", "push", "pull"]
-        elif input_data.daysPerWeek == 6:
-            # 6-day PPL split
-            day_types = ["push", "pull", "legs", "push", "pull", "legs"]
-        else:
-            # Default to full body workouts
-            day_types = ["full_body"] * input_data.daysPerWeek
-        
-        # Generate days
-        for i, day_type in enumerate(day_types):
-            day_number = i + 1
-            day = {
-                "dayNumber": day_number,
-                "name": f"{day_type.replace('_', ' ').title()} Day {day_number}",
-                "focus": day_type,
-                "dayType": "training",
-                "optPhase": input_data.optPhase,
-                "sortOrder": day_number,
-                "exercises": []
-            }
-            
-            # Select exercises for this day type
-            selected_exercises = []
-            
-            if day_type == "full_body":
-                # For full body, select some exercises from each major category
-                categories_to_include = ["strength", "cardio", "core"]
-                for category in categories_to_include:
-                    if category in exercise_categories:
-                        # Take 2-3 exercises from each category
-                        exercises_to_include = exercise_categories[category][:3]
-                        selected_exercises.extend(exercises_to_include)
-            elif day_type == "upper_body":
-                # For upper body, focus on upper body exercises
-                relevant_categories = ["chest", "back", "shoulders", "arms"]
-                for category in relevant_categories:
-                    if category in exercise_categories:
-                        exercises_to_include = exercise_categories[category][:2]
-                        selected_exercises.extend(exercises_to_include)
-            elif day_type == "lower_body":
-                # For lower body, focus on lower body exercises
-                relevant_categories = ["legs", "glutes", "calves"]
-                for category in relevant_categories:
-                    if category in exercise_categories:
-                        exercises_to_include = exercise_categories[category][:2]
-                        selected_exercises.extend(exercises_to_include)
-            elif day_type == "push":
-                # For push, focus on pushing movements
-                relevant_categories = ["chest", "shoulders", "triceps"]
-                for category in relevant_categories:
-                    if category in exercise_categories:
-                        exercises_to_include = exercise_categories[category][:2]
-                        selected_exercises.extend(exercises_to_include)
-            elif day_type == "pull":
-                # For pull, focus on pulling movements
-                relevant_categories = ["back", "biceps", "traps"]
-                for category in relevant_categories:
-                    if category in exercise_categories:
-                        exercises_to_include = exercise_categories[category][:2]
-                        selected_exercises.extend(exercises_to_include)
-            elif day_type == "legs":
-                # For legs, focus on leg exercises
-                relevant_categories = ["legs", "glutes", "calves"]
-                for category in relevant_categories:
-                    if category in exercise_categories:
-                        exercises_to_include = exercise_categories[category][:3]
-                        selected_exercises.extend(exercises_to_include)
-            
-            # Always include some core exercises
-            if "core" in exercise_categories:
-                core_exercises = exercise_categories["core"][:2]
-                selected_exercises.extend(core_exercises)
-            
-            # Limit to 6-8 exercises per day
-            selected_exercises = selected_exercises[:8]
-            
-            # Add exercises to the day
-            for j, exercise in enumerate(selected_exercises):
-                # Determine appropriate set/rep scheme based on exercise type and goals
-                set_scheme = "3x10"  # Default
-                rep_goal = "10"
-                rest_period = 60  # Default rest in seconds
-                
-                if input_data.goal == "strength":
-                    set_scheme = "5x5"
-                    rep_goal = "5"
-                    rest_period = 120
-                elif input_data.goal == "hypertrophy":
-                    set_scheme = "4x8-12"
-                    rep_goal = "8-12"
-                    rest_period = 90
-                elif input_data.goal == "endurance":
-                    set_scheme = "3x15-20"
-                    rep_goal = "15-20"
-                    rest_period = 45
-                
-                # Customize based on exercise category
-                category = exercise.get("category", "")
-                if category == "cardio":
-                    set_scheme = "1x15-30"
-                    rep_goal = "15-30 min"
-                    rest_period = 0
-                
-                # Add the exercise to the day
-                day["exercises"].append({
-                    "exerciseId": exercise["id"],
-                    "orderInWorkout": j + 1,
-                    "setScheme": set_scheme,
-                    "repGoal": rep_goal,
-                    "restPeriod": rest_period,
-                    "notes": exercise.get("description", "")[:100] if exercise.get("description") else None
-                })
-            
-            # Add the day to the plan
-            plan_data["days"].append(day)
+        # Expand the periodized program; long programs are only materialized
+        # up to the expansion limit, the rest is described by the schedule
+        # (and ExpandWorkoutPlan builds more weeks later)
+        periodized = _periodized_plan(plan_data["periodization"], start_date, end_date, recommended_exercises)
+        expand_weeks = input_data.expandWeeks or config.get('PLAN_MAX_EXPANDED_WEEKS')
+        plan_data["days"] = list(periodized.iter_days(last_week=expand_weeks))
         
         # Make API request to create the plan
         response = await make_api_request(
@@ -225,9 +177,14 @@ async def generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> Generat
         # Process response
         plan = response.get("plan", {})
         
+        expanded = min(expand_weeks, periodized.total_weeks)
         return GenerateWorkoutPlanOutput(
             plan=plan,
-            message=f"Generated a {input_data.daysPerWeek}-day workout plan with a focus on {input_data.goal or 'general fitness'}."
+            schedule=periodized.schedule(),
+            totalWeeks=periodized.total_weeks,
+            expandedWeeks=expanded,
+            message=f"Generated a {periodized.total_weeks}-week, {input_data.daysPerWeek}-day workout plan "
+                    f"with a focus on {input_data.goal or 'general fitness'} ({expanded} weeks expanded)."
         )
     except HTTPException as e:
         # Re-raise HTTP exceptions
@@ -238,3 +195,60 @@ async def generate_workout_plan(input_data: GenerateWorkoutPlanInput) -> Generat
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate workout plan: {str(e)}"
         )
+
+async def _expand_workout_plan(input_data: ExpandWorkoutPlanInput) -> ExpandWorkoutPlanOutput:
+    """Build the next weeks of a saved plan and save it back."""
+    try:
+        _check_weeks("weeks", input_data.weeks)
+        
+        response = await make_api_request("GET", f"/workout/plans/{input_data.planId}")
+        plan_data = response.get("plan")
+        if not plan_data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Workout plan {input_data.planId} not found"
+            )
+        periodization = plan_data.get("periodization")
+        if not periodization:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Workout plan {input_data.planId} wasn't generated by GenerateWorkoutPlan"
+            )
+        
+        # The backend may return full timestamps
+        start_date = str(plan_data["startDate"])[:10]
+        end_date = str(plan_data["endDate"])[:10]
+        days = plan_data.get("days") or []
+        built_weeks = max((day.get("weekNumber") or 0 for day in days), default=0)
+        
+        recommended_exercises = await _recommended_exercises(plan_data["clientId"], periodization)
+        periodized = _periodized_plan(periodization, start_date, end_date, recommended_exercises)
+        
+        last_week = min(built_weeks + (input_data.weeks or config.get('PLAN_MAX_EXPANDED_WEEKS')), periodized.total_weeks)
+        added = list(periodized.iter_days(first_week=built_weeks + 1, last_week=last_week))
+        if added:
+            plan_data["days"] = days + added
+            response = await make_api_request(
+                "PUT", 
+                f"/workout/plans/{input_data.planId}", 
+                data=plan_data
+            )
+            plan_data = response.get("plan", plan_data)
+        
+        expanded = max(built_weeks, last_week)
+        return ExpandWorkoutPlanOutput(
+            plan=plan_data,
+            totalWeeks=periodized.total_weeks,
+            expandedWeeks=expanded,
+            message=f"Built weeks {built_weeks + 1}-{last_week} of the plan ({expanded} of {periodized.total_weeks} weeks expanded)."
+                    if added else f"All {periodized.total_weeks} weeks of the plan are already expanded."
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in ExpandWorkoutPlan: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to expand workout plan: {str(e)}"
+        )
@@ -20,6 +20,13 @@ try:
         GetWorkoutRecommendationsOutput
     )
     from utils import make_api_request
+    from services.substitution_service import substitution_graph
+    from services.precompute_service import (
+        materialized_store,
+        recommendation_key,
+        recommendation_params,
+        suggest_next_session
+    )
 except ImportError:
     try:
         from ..models import (
@@ -27,6 +34,13 @@ except ImportError:
             GetWorkoutRecommendationsOutput
         )
         from ..utils import make_api_request
+        from ..services.substitution_service import substitution_graph
+        from ..services.precompute_service import (
+            materialized_store,
+            recommendation_key,
+            recommendation_params,
+            suggest_next_session
+        )
     except ImportError as e:
         # Create minimal placeholders if all imports fail
         from pydantic import BaseModel
@@ -48,6 +62,18 @@ except ImportError:
         
         async def make_api_request(method, url, data=None):
             return {"error": "API request utility not available"}
+        
+        substitution_graph = None
+        materialized_store = None
+        
+        def recommendation_params(input_data):
+            return input_data.dict(exclude={"userId"})
+        
+        def recommendation_key(user_id, params):
+            return ""
+        
+        def suggest_next_session(exercises, opt_phase=None):
+            return None
 
 logger = logging.getLogger("workout_mcp_server.tools.recommendations_tool")
 
@@ -57,20 +83,26 @@ async def get_workout_recommendations(input_data: GetWorkoutRecommendationsInput
     
     This tool provides exercise recommendations based on the user's goals,
     preferences, and progress. It can filter by equipment, muscle groups,
-    and difficulty level.
+    and difficulty level. It also suggests a next session built from the
+    recommendations.
+    
+    Requests with the default filters are served from the nightly
+    precomputed store when an entry exists.
     """
     try:
         # Convert input data to API params
-        params = {
-            "goal": input_data.goal,
-            "difficulty": input_data.difficulty,
-            "equipment": input_data.equipment,
-            "muscleGroups": input_data.muscleGroups,
-            "excludeExercises": input_data.excludeExercises,
-            "limit": input_data.limit,
-            "rehabFocus": input_data.rehabFocus,
-            "optPhase": input_data.optPhase
-        }
+        params = recommendation_params(input_data)
+        
+        # Requests with the default parameters are precomputed nightly
+        key = recommendation_key(input_data.userId, params)
+        materialized = materialized_store.get(key) if materialized_store is not None else None
+        if materialized is not None:
+            exercises = materialized["exercises"]
+            return GetWorkoutRecommendationsOutput(
+                exercises=exercises,
+                suggestedSession=materialized["suggestedSession"],
+                message=f"Found {len(exercises)} recommended exercises based on your criteria."
+            )
         
         # Make API request
         response = await make_api_request(
@@ -81,9 +113,24 @@ async def get_workout_recommendations(input_data: GetWorkoutRecommendationsInput
         
         # Process response
         exercises = response.get("exercises", [])
+        suggested_session = suggest_next_session(exercises, input_data.optPhase)
+        
+        # Keep the substitution graph current with what the catalog returns
+        if substitution_graph is not None:
+            substitution_graph.upsert_many(exercises)
+        
+        # Materialize default requests on demand, so a user the nightly job
+        # missed (or whose entry was invalidated) is only fetched once
+        if materialized_store is not None and params == recommendation_params(
+                GetWorkoutRecommendationsInput(userId=input_data.userId)):
+            materialized_store.put(key, input_data.userId, {
+                "exercises": exercises,
+                "suggestedSession": suggested_session
+            })
         
         return GetWorkoutRecommendationsOutput(
             exercises=exercises,
+            suggestedSession=suggested_session,
             message=f"Found {len(exercises)} recommended exercises based on your criteria."
         )
     except Exception as e:
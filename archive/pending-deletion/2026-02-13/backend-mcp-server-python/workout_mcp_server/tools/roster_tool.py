@@ -0,0 +1,136 @@
+"""
+MCP tool for trainer roster summaries.
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+
+from ..models import (
+    GetTrainerRosterSummaryInput,
+    GetTrainerRosterSummaryOutput
+)
+from ..services.roster_service import roster_cache, summarize_client
+from ..utils import make_api_request, config, request_scope
+
+logger = logging.getLogger("workout_mcp_server.tools.roster_tool")
+
+async def _fetch_roster(trainer_id: str) -> List[Tuple[str, Optional[str]]]:
+    """Get a trainer's active clients as (client ID, display name) pairs."""
+    response = await make_api_request("GET", f"/assignments/trainer/{trainer_id}")
+    roster = []
+    for assignment in response.get("assignments", []):
+        client = assignment.get("client") or {}
+        client_id = client.get("id") or assignment.get("clientId")
+        if client_id is None:
+            continue
+        name = " ".join(part for part in (client.get("firstName"), client.get("lastName")) if part) or None
+        roster.append((str(client_id), name))
+    return roster
+
+async def _summarize(client_id: str, name: Optional[str], weeks: int, target_per_week: int,
+                     today: date) -> Dict[str, Any]:
+    """Fetch one client's progress and recent statistics and summarize them."""
+    progress, statistics = await asyncio.gather(
+        make_api_request("GET", f"/client-progress/{client_id}"),
+        make_api_request(
+            "GET",
+            f"/workout/statistics/{client_id}",
+            data={
+                "startDate": (today - timedelta(weeks=weeks)).isoformat(),
+                "endDate": today.isoformat(),
+                "includeExerciseBreakdown": False,
+                "includeMuscleGroupBreakdown": False,
+                "includeWeekdayBreakdown": False,
+                "includeIntensityTrends": False
+            }
+        )
+    )
+    return summarize_client(
+        client_id,
+        progress.get("progress") or {},
+        statistics.get("statistics") or {},
+        weeks,
+        target_per_week,
+        today,
+        name=name
+    )
+
+async def get_trainer_roster_summary(input_data: GetTrainerRosterSummaryInput) -> GetTrainerRosterSummaryOutput:
+    """
+    Get a compact summary of every client on a trainer's roster.
+
+    Replaces a GetClientProgress plus GetWorkoutStatistics call per client.
+    Clients are fetched concurrently (at most `ROSTER_CONCURRENCY` clients
+    at a time) and their summaries are cached per trainer, so repeated
+    calls only fetch clients whose summary expired or who logged a session
+    since.
+    A client that can't be fetched is reported with an `error` instead of
+    failing the whole roster.
+
+    Clients are ordered least recently active first.
+    """
+    try:
+        weeks = max(1, input_data.weeks)
+        target_per_week = input_data.targetSessionsPerWeek
+        options = (weeks, target_per_week)
+        today = date.today()
+        if input_data.refresh:
+            roster_cache.invalidate_trainer(input_data.trainerId)
+
+        with request_scope():
+            if input_data.clientIds is not None:
+                roster = [(client_id, None) for client_id in dict.fromkeys(map(str, input_data.clientIds))]
+            else:
+                roster = await _fetch_roster(input_data.trainerId)
+
+            summaries: Dict[str, Dict[str, Any]] = {}
+            stale = []
+            for client_id, name in roster:
+                cached = roster_cache.get(input_data.trainerId, client_id, options)
+                if cached is not None:
+                    summaries[client_id] = cached
+                else:
+                    stale.append((client_id, name))
+
+            semaphore = asyncio.Semaphore(config.get('ROSTER_CONCURRENCY'))
+
+            async def refresh(client_id: str, name: Optional[str]) -> None:
+                async with semaphore:
+                    try:
+                        summary = await _summarize(client_id, name, weeks, target_per_week, today)
+                    except Exception as e:
+                        detail = getattr(e, "detail", None) or str(e)
+                        logger.warning(f"Roster summary failed for client {client_id}: {detail}")
+                        summaries[client_id] = {"userId": client_id, "name": name, "error": str(detail)}
+                        return
+                roster_cache.put(input_data.trainerId, client_id, options, summary)
+                summaries[client_id] = summary
+
+            await asyncio.gather(*(refresh(client_id, name) for client_id, name in stale))
+
+        clients = sorted(
+            (summaries[client_id] for client_id, _ in roster),
+            key=lambda s: (s.get("lastWorkoutDate") is not None, s.get("lastWorkoutDate") or "")
+        )
+        failed = sum(1 for summary in clients if "error" in summary)
+        return GetTrainerRosterSummaryOutput(
+            trainerId=input_data.trainerId,
+            weeks=weeks,
+            clients=clients,
+            clientCount=len(clients),
+            refreshedClients=len(stale) - failed,
+            failedClients=failed,
+            message=f"Summarized {len(clients)} clients ({len(roster) - len(stale)} from cache, {failed} failed)."
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in GetTrainerRosterSummary: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get trainer roster summary: {str(e)}"
+        )
@@ -9,7 +9,11 @@ from ..models import (
     LogWorkoutSessionInput,
     LogWorkoutSessionOutput
 )
-from ..utils import make_api_request
+from ..services.invalidation_service import change_feed, TABLE_SESSIONS
+from ..services.precompute_service import materialized_store
+from ..services.roster_service import roster_cache
+from ..services.training_load_service import training_load_store
+from ..utils import make_api_request, idempotency_store
 
 logger = logging.getLogger("workout_mcp_server.tools.session_tool")
 
@@ -25,36 +29,60 @@ async def log_workout_session(input_data: LogWorkoutSessionInput) -> LogWorkoutS
     - Update exercises and sets with performance data
     
     The tool handles progress tracking and gamification updates automatically.
+
+    Retries are safe: a retry with the same `idempotencyKey` returns the
+    first call's response without writing again. Calls without a key are
+    never deduplicated.
     """
     try:
-        # Check if we're creating or updating a session
-        if input_data.session.id:
-            # Update existing session
-            response = await make_api_request(
-                "PUT", 
-                f"/workout/sessions/{input_data.session.id}", 
-                data=input_data.session.model_dump(exclude_none=True)
-            )
-            message = "Workout session updated successfully"
-        else:
-            # Create new session
-            response = await make_api_request(
-                "POST", 
-                "/workout/sessions", 
-                data=input_data.session.model_dump(exclude_none=True)
-            )
-            message = "New workout session created successfully"
-        
-        # Process response
-        session = response.get("session", {})
-        
-        return LogWorkoutSessionOutput(
-            session=session,
-            message=message
+        return await idempotency_store.run(
+            "LogWorkoutSession",
+            input_data.dict(exclude={"idempotencyKey"}, exclude_none=True),
+            lambda: _write_session(input_data),
+            key=input_data.idempotencyKey,
+            model=LogWorkoutSessionOutput
         )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
     except Exception as e:
         logger.error(f"Error in LogWorkoutSession: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to log workout session: {str(e)}"
         )
+
+async def _write_session(input_data: LogWorkoutSessionInput) -> LogWorkoutSessionOutput:
+    """Create or update the session and refresh derived caches."""
+    # Check if we're creating or updating a session
+    if input_data.session.id:
+        # Update existing session
+        response = await make_api_request(
+            "PUT", 
+            f"/workout/sessions/{input_data.session.id}", 
+            data=input_data.session.dict(exclude_none=True)
+        )
+        message = "Workout session updated successfully"
+    else:
+        # Create new session
+        response = await make_api_request(
+            "POST", 
+            "/workout/sessions", 
+            data=input_data.session.dict(exclude_none=True)
+        )
+        message = "New workout session created successfully"
+    
+    # Process response
+    session = response.get("session", {})
+    
+    # Keep training-load metrics current; the backend may not echo sets back
+    training_load_store.record_session({**input_data.session.dict(exclude_none=True), **session})
+    change_feed.note_local_write(TABLE_SESSIONS, session.get("id") or input_data.session.id)
+    user_id = session.get("userId") or input_data.session.userId
+    roster_cache.invalidate_client(user_id)
+    materialized_store.invalidate_user(user_id)
+    
+    return LogWorkoutSessionOutput(
+        session=session,
+        message=message
+    )
@@ -11,6 +11,7 @@ from ..models import (
     WorkoutStatistics
 )
 from ..utils import make_api_request
+from ..utils.downsampling import METHODS, downsample
 
 logger = logging.getLogger("workout_mcp_server.tools.statistics_tool")
 
@@ -24,7 +25,15 @@ async def get_workout_statistics(input_data: GetWorkoutStatisticsInput) -> GetWo
     - Muscle group activation breakdown
     - Workout schedule patterns (weekday breakdown)
     - Intensity trends over time
+    
+    Set `maxPoints` to downsample the intensity trends for charting.
     """
+    if input_data.downsampleMethod not in METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"downsampleMethod must be one of: {', '.join(METHODS)}"
+        )
+    
     try:
         # Convert input data to API params
         params = {
@@ -61,6 +70,15 @@ async def get_workout_statistics(input_data: GetWorkoutStatisticsInput) -> GetWo
                 message="No workout statistics found for this user."
             )
         
+        if input_data.maxPoints and statistics.get("intensityTrends"):
+            statistics["intensityTrends"] = downsample(
+                statistics["intensityTrends"],
+                input_data.maxPoints,
+                x_key="week",
+                y_key="averageIntensity",
+                method=input_data.downsampleMethod
+            )
+        
         return GetWorkoutStatisticsOutput(
             statistics=statistics,
             message="Retrieved workout statistics successfully."
@@ -0,0 +1,111 @@
+"""
+MCP tool for training-load analytics.
+"""
+
+import logging
+from datetime import date
+from fastapi import HTTPException, status
+
+from ..models import (
+    GetTrainingLoadInput,
+    GetTrainingLoadOutput
+)
+from ..services.training_load_service import TrainingLoadState, session_set_records, training_load_store
+from ..utils import make_api_request, config
+from ..utils.downsampling import METHODS
+
+logger = logging.getLogger("workout_mcp_server.tools.training_load_tool")
+
+async def _build_state(user_id: str) -> TrainingLoadState:
+    """Build a user's training-load state from their completed session history."""
+    page_size = config.get('TRAINING_LOAD_PAGE_SIZE')
+    records = []
+    session_ids = []
+    offset = 0
+    training_load_store.begin_build(user_id)
+    try:
+        while True:
+            response = await make_api_request(
+                "GET",
+                f"/workout/sessions/user/{user_id}",
+                data={
+                    "status": "completed",
+                    "limit": page_size,
+                    "offset": offset,
+                    "sort": "startedAt",
+                    "order": "ASC"
+                }
+            )
+            sessions = response.get("sessions", [])
+            for session in sessions:
+                if session.get("id"):
+                    session_ids.append(session["id"])
+                records.extend(session_set_records(session))
+            if len(sessions) < page_size:
+                break
+            offset += page_size
+    except Exception:
+        training_load_store.abort_build(user_id)
+        raise
+
+    logger.info(f"Built training load for user {user_id} from {len(session_ids)} sessions")
+    return training_load_store.finish_build(user_id, TrainingLoadState.from_sets(records, session_ids))
+
+async def get_training_load(input_data: GetTrainingLoadInput) -> GetTrainingLoadOutput:
+    """
+    Get training-load metrics for a user.
+
+    Returns the acute:chronic workload ratio with its risk zone, weekly
+    tonnage and per-muscle volume, and weekly e1RM trends per exercise.
+
+    The first call for a user reads their full session history once; after
+    that the metrics are kept current by LogWorkoutSession and are served
+    from memory. With `maxPoints`, the trend series are downsampled from
+    per-user multi-resolution pyramids.
+    """
+    try:
+        if input_data.downsampleMethod not in METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"downsampleMethod must be one of: {', '.join(METHODS)}"
+            )
+        try:
+            as_of = date.fromisoformat(input_data.asOf).toordinal() if input_data.asOf else date.today().toordinal()
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"asOf must be an ISO date (YYYY-MM-DD), got '{input_data.asOf}'"
+            )
+        if input_data.refresh:
+            training_load_store.invalidate(input_data.userId)
+        state = training_load_store.get(input_data.userId)
+        if state is None:
+            state = await _build_state(input_data.userId)
+
+        summary = state.summary(
+            as_of,
+            max(1, input_data.weeks),
+            input_data.exerciseIds,
+            max_points=input_data.maxPoints,
+            method=input_data.downsampleMethod
+        )
+
+        if summary["acuteChronicRatio"] is None:
+            message = "Not enough training history to compute an acute:chronic ratio."
+        else:
+            message = f"Acute:chronic workload ratio is {summary['acuteChronicRatio']} ({summary['riskZone']})."
+
+        return GetTrainingLoadOutput(
+            userId=input_data.userId,
+            **summary,
+            message=message
+        )
+    except HTTPException as e:
+        # Re-raise HTTP exceptions
+        raise e
+    except Exception as e:
+        logger.error(f"Error in GetTrainingLoad: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get training load: {str(e)}"
+        )
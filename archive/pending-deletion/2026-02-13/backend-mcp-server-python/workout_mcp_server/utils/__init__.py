@@ -1 +1,24 @@
-# MCP Server utils module
+"""
+Utility modules export.
+"""
+
+from .api_client import make_api_request, request_scope, invalidate_request_scope, get_backend_health
+from .config import config
+from .admission import admission, request_priority, INTERACTIVE, BATCH
+from .database import database, Repository
+from .idempotency import idempotency_store
+
+__all__ = [
+    'make_api_request',
+    'request_scope',
+    'invalidate_request_scope',
+    'get_backend_health',
+    'config',
+    'admission',
+    'request_priority',
+    'INTERACTIVE',
+    'BATCH',
+    'database',
+    'Repository',
+    'idempotency_store'
+]
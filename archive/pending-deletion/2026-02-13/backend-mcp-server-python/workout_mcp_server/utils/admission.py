@@ -0,0 +1,222 @@
+"""
+Admission control for expensive tools.
+
+Each controlled tool gets a global concurrency limit with a bounded wait
+queue, and every user gets a token bucket. Interactive calls are admitted
+ahead of batch calls (e.g. those made through /tools/batch). When the queue
+is full or a user is out of tokens, the call is shed immediately with a 429
+and a Retry-After header instead of tying up a worker.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict
+
+from fastapi import HTTPException, status
+
+from .resilience import LatencyTracker
+
+logger = logging.getLogger("workout_mcp_server.admission")
+
+# Priority classes
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+_request_priority: ContextVar[str] = ContextVar("request_priority", default=INTERACTIVE)
+
+@contextmanager
+def request_priority(priority: str):
+    """
+    Run the enclosed tool calls under the given priority class.
+    
+    Args:
+        priority: INTERACTIVE or BATCH
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket full.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self) -> bool:
+        """Take one token if available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def retry_after(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+    
+    def is_full(self) -> bool:
+        """Whether the bucket is back at capacity (the user is idle)."""
+        self._refill()
+        return self.tokens >= self.capacity
+
+class AdmissionController:
+    """Concurrency limit, wait queue and per-user rate limit for one tool."""
+    
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 user_rate_per_minute: float, user_burst: int):
+        """
+        Initialize the controller.
+        
+        Args:
+            name: Tool name (used in errors and metrics)
+            max_concurrent: Calls allowed to run at once
+            max_queue: Calls allowed to wait for a slot; batch calls may
+                only use half of the queue so interactive calls keep room
+            user_rate_per_minute: Sustained calls per user per minute
+            user_burst: Calls a user may make back to back
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.user_rate = user_rate_per_minute / 60.0
+        self.user_burst = user_burst
+        self.queue_wait = LatencyTracker()
+        self._running = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {INTERACTIVE: deque(), BATCH: deque()}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats = {"admitted": 0, "rejectedRateLimit": 0, "rejectedQueueFull": 0}
+    
+    def _shed(self, reason: str, detail: str, retry_after: float) -> HTTPException:
+        self._stats[reason] += 1
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+    
+    def _check_user(self, user_id: str) -> None:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            # Forget idle users before tracking a new one
+            if len(self._buckets) >= 10000:
+                self._buckets = {uid: b for uid, b in self._buckets.items() if not b.is_full()}
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        if not bucket.try_acquire():
+            raise self._shed(
+                "rejectedRateLimit",
+                f"Too many {self.name} requests for user {user_id}",
+                bucket.retry_after()
+            )
+    
+    def _queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+    
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, interactive first
+        for priority in (INTERACTIVE, BATCH):
+            waiters = self._waiters[priority]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._running -= 1
+    
+    @asynccontextmanager
+    async def admit(self, user_id: str):
+        """
+        Wait for a slot to run the tool for `user_id`.
+        
+        Raises:
+            HTTPException: 429 if the user is rate limited or the queue is full
+        """
+        priority = _request_priority.get()
+        
+        started = time.monotonic()
+        if self._running >= self.max_concurrent:
+            # Checked before the user's token is taken, so a shed request doesn't use one up
+            queue_limit = self.max_queue if priority == INTERACTIVE else self.max_queue // 2
+            if self._queued() >= queue_limit:
+                # The typical queue wait is a fair hint for when a slot frees up
+                p50 = self.queue_wait.percentile(50) or 1.0
+                raise self._shed(
+                    "rejectedQueueFull",
+                    f"{self.name} is at capacity, please retry later",
+                    p50
+                )
+            
+            self._check_user(str(user_id))
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # We were handed a slot but won't use it
+                    self._release()
+                elif waiter in self._waiters[priority]:
+                    # Leave the queue so it isn't counted against later callers
+                    self._waiters[priority].remove(waiter)
+                raise
+        else:
+            self._check_user(str(user_id))
+            self._running += 1
+        
+        self.queue_wait.record(time.monotonic() - started)
+        self._stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Get admission counters and queue wait percentiles."""
+        p50 = self.queue_wait.percentile(50)
+        p95 = self.queue_wait.percentile(95)
+        return {
+            **self._stats,
+            "running": self._running,
+            "queued": self._queued(),
+            "maxConcurrent": self.max_concurrent,
+            "queueWaitP50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "queueWaitP95Ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+class AdmissionRegistry:
+    """Admission controllers for all controlled tools."""
+    
+    def __init__(self):
+        self._controllers: Dict[str, AdmissionController] = {}
+    
+    def register(self, name: str, **limits: Any) -> AdmissionController:
+        """Create the controller for a tool."""
+        controller = self._controllers[name] = AdmissionController(name, **limits)
+        return controller
+    
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get metrics for every controlled tool."""
+        return {name: controller.metrics() for name, controller in sorted(self._controllers.items())}
+
+admission = AdmissionRegistry()
@@ -35,7 +35,49 @@ class Config:
         'DB_PORT': '5432',
         'DB_NAME': 'workout',
         'DB_USER': '',
-        'DB_PASSWORD': ''
+        'DB_PASSWORD': '',
+        'DATABASE_URL': '',
+        'BATCH_MAX_CALLS': '20',
+        'BACKEND_TIMEOUT': '10',
+        'BACKEND_MIN_TIMEOUT': '1',
+        'BREAKER_FAILURE_THRESHOLD': '5',
+        'BREAKER_RESET_TIMEOUT': '30',
+        'HEDGE_GET_REQUESTS': 'false',
+        'ADMISSION_MAX_CONCURRENT': '4',
+        'ADMISSION_MAX_QUEUE': '8',
+        'ADMISSION_USER_RATE_PER_MINUTE': '6',
+        'ADMISSION_USER_BURST': '3',
+        'PLAN_MAX_EXPANDED_WEEKS': '12',
+        'TRAINING_LOAD_MAX_USERS': '1000',
+        'TRAINING_LOAD_PAGE_SIZE': '200',
+        'IMPORT_BATCH_SIZE': '50',
+        'IMPORT_WRITE_CONCURRENCY': '4',
+        'IMPORT_MAX_ERRORS': '100',
+        'EXPORT_CHUNK_SIZE': '1000',
+        'EXPORT_PAGE_SIZE': '100',
+        'ROSTER_CONCURRENCY': '8',
+        'ROSTER_CACHE_TTL': '300',
+        'ROSTER_MAX_TRAINERS': '500',
+        'MATERIALIZED_STORE_PATH': '',
+        'MATERIALIZED_TTL': '129600',
+        'PRECOMPUTE_WORKERS': '4',
+        'PRECOMPUTE_CHUNK_SIZE': '100',
+        'PRECOMPUTE_CONCURRENCY': '8',
+        'IDEMPOTENCY_STORE_PATH': '',
+        'IDEMPOTENCY_TTL': '86400',
+        'IDEMPOTENCY_MAX_ENTRIES': '10000',
+        'CHANGE_FEED': '',
+        'CHANGE_FEED_CHANNEL': 'mcp_cache_invalidation',
+        'CHANGE_FEED_FILE': '',
+        'CHANGE_FEED_POLL_INTERVAL': '1',
+        'CHANGE_FEED_CACHE_TTL': '3600',
+        'DATABASE_REPLICA_URLS': '',
+        'REPLICA_MAX_LAG': '5',
+        'REPLICA_LAG_CHECK_INTERVAL': '10',
+        'QUERY_CACHE_TTL': '30',
+        'QUERY_CACHE_MAX_ENTRIES': '1000',
+        'EXERCISE_QUERY_CACHE_TTL': '300',
+        'SUBSTITUTION_REBUILD_INTERVAL': '86400'
     }
     
     # Singleton instance
@@ -60,6 +102,41 @@ class Config:
         self._config['PORT'] = int(self._config['PORT'])
         self._config['DEBUG'] = self._config['DEBUG'].lower() == 'true'
         self._config['DB_PORT'] = int(self._config['DB_PORT'])
+        self._config['BATCH_MAX_CALLS'] = int(self._config['BATCH_MAX_CALLS'])
+        self._config['BACKEND_TIMEOUT'] = float(self._config['BACKEND_TIMEOUT'])
+        self._config['BACKEND_MIN_TIMEOUT'] = float(self._config['BACKEND_MIN_TIMEOUT'])
+        self._config['BREAKER_FAILURE_THRESHOLD'] = int(self._config['BREAKER_FAILURE_THRESHOLD'])
+        self._config['BREAKER_RESET_TIMEOUT'] = float(self._config['BREAKER_RESET_TIMEOUT'])
+        self._config['HEDGE_GET_REQUESTS'] = self._config['HEDGE_GET_REQUESTS'].lower() == 'true'
+        self._config['ADMISSION_MAX_CONCURRENT'] = int(self._config['ADMISSION_MAX_CONCURRENT'])
+        self._config['ADMISSION_MAX_QUEUE'] = int(self._config['ADMISSION_MAX_QUEUE'])
+        self._config['ADMISSION_USER_RATE_PER_MINUTE'] = float(self._config['ADMISSION_USER_RATE_PER_MINUTE'])
+        self._config['ADMISSION_USER_BURST'] = int(self._config['ADMISSION_USER_BURST'])
+        self._config['PLAN_MAX_EXPANDED_WEEKS'] = int(self._config['PLAN_MAX_EXPANDED_WEEKS'])
+        self._config['TRAINING_LOAD_MAX_USERS'] = int(self._config['TRAINING_LOAD_MAX_USERS'])
+        self._config['TRAINING_LOAD_PAGE_SIZE'] = int(self._config['TRAINING_LOAD_PAGE_SIZE'])
+        self._config['IMPORT_BATCH_SIZE'] = int(self._config['IMPORT_BATCH_SIZE'])
+        self._config['IMPORT_WRITE_CONCURRENCY'] = int(self._config['IMPORT_WRITE_CONCURRENCY'])
+        self._config['IMPORT_MAX_ERRORS'] = int(self._config['IMPORT_MAX_ERRORS'])
+        self._config['EXPORT_CHUNK_SIZE'] = int(self._config['EXPORT_CHUNK_SIZE'])
+        self._config['EXPORT_PAGE_SIZE'] = int(self._config['EXPORT_PAGE_SIZE'])
+        self._config['ROSTER_CONCURRENCY'] = int(self._config['ROSTER_CONCURRENCY'])
+        self._config['ROSTER_CACHE_TTL'] = float(self._config['ROSTER_CACHE_TTL'])
+        self._config['ROSTER_MAX_TRAINERS'] = int(self._config['ROSTER_MAX_TRAINERS'])
+        self._config['MATERIALIZED_TTL'] = float(self._config['MATERIALIZED_TTL'])
+        self._config['PRECOMPUTE_WORKERS'] = int(self._config['PRECOMPUTE_WORKERS'])
+        self._config['PRECOMPUTE_CHUNK_SIZE'] = int(self._config['PRECOMPUTE_CHUNK_SIZE'])
+        self._config['PRECOMPUTE_CONCURRENCY'] = int(self._config['PRECOMPUTE_CONCURRENCY'])
+        self._config['IDEMPOTENCY_TTL'] = float(self._config['IDEMPOTENCY_TTL'])
+        self._config['IDEMPOTENCY_MAX_ENTRIES'] = int(self._config['IDEMPOTENCY_MAX_ENTRIES'])
+        self._config['CHANGE_FEED_POLL_INTERVAL'] = float(self._config['CHANGE_FEED_POLL_INTERVAL'])
+        self._config['CHANGE_FEED_CACHE_TTL'] = float(self._config['CHANGE_FEED_CACHE_TTL'])
+        self._config['REPLICA_MAX_LAG'] = float(self._config['REPLICA_MAX_LAG'])
+        self._config['REPLICA_LAG_CHECK_INTERVAL'] = float(self._config['REPLICA_LAG_CHECK_INTERVAL'])
+        self._config['QUERY_CACHE_TTL'] = float(self._config['QUERY_CACHE_TTL'])
+        self._config['QUERY_CACHE_MAX_ENTRIES'] = int(self._config['QUERY_CACHE_MAX_ENTRIES'])
+        self._config['EXERCISE_QUERY_CACHE_TTL'] = float(self._config['EXERCISE_QUERY_CACHE_TTL'])
+        self._config['SUBSTITUTION_REBUILD_INTERVAL'] = float(self._config['SUBSTITUTION_REBUILD_INTERVAL'])
         
         # Log the configuration (excluding sensitive data)
         self._log_config()
@@ -69,7 +146,7 @@ class Config:
         log_config = self._config.copy()
         
         # Mask sensitive data
-        sensitive_keys = ['API_TOKEN', 'DB_PASSWORD']
+        sensitive_keys = ['API_TOKEN', 'DB_PASSWORD', 'DATABASE_URL', 'DATABASE_REPLICA_URLS']
         for key in sensitive_keys:
             if log_config.get(key):
                 log_config[key] = '********'
@@ -0,0 +1,230 @@
+"""
+Downsampling of chart time series.
+
+Two methods are supported:
+- "lttb": Largest-Triangle-Three-Buckets. Keeps original points, chosen so
+  the chart keeps its visual shape (peaks and dips survive).
+- "bucket": Splits the time range into equal-width buckets and returns the
+  mean of each bucket.
+
+`SeriesPyramid` precomputes successively halved copies of a series, so a
+zoomed query only has to downsample the points of one level within the
+requested range instead of the whole history.
+"""
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("workout_mcp_server.downsampling")
+
+LTTB = "lttb"
+BUCKET = "bucket"
+METHODS = (LTTB, BUCKET)
+
+# Pyramid levels stop halving below this many points
+_MIN_LEVEL_POINTS = 64
+
+def date_x(value: Any) -> float:
+    """Convert an ISO date(-time) string to a day ordinal usable as an x value."""
+    return float(date.fromisoformat(str(value)[:10]).toordinal())
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], max_points: int) -> List[int]:
+    """
+    Select point indices with Largest-Triangle-Three-Buckets.
+
+    Args:
+        xs: X values, ascending
+        ys: Y values
+        max_points: Number of points to keep (at least 3 to downsample)
+
+    Returns:
+        Ascending indices of the points to keep
+    """
+    n = len(xs)
+    if max_points >= n or max_points < 3:
+        return list(range(n))
+
+    selected = [0]
+    bucket_size = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third triangle vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        else:
+            count = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / count
+            avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+def bucket_means(xs: Sequence[float], ys: Sequence[float], max_points: int,
+                 weights: Optional[Sequence[float]] = None) -> List[Tuple[int, float, float]]:
+    """
+    Average points over equal-width time buckets.
+
+    Args:
+        xs: X values, ascending
+        ys: Y values
+        max_points: Number of buckets
+        weights: Optional per-point weights (e.g. how many raw points each
+            point already stands for)
+
+    Returns:
+        (index of the first point, mean y, total weight) for each non-empty bucket
+    """
+    n = len(xs)
+    if n == 0:
+        return []
+    if max_points >= n or max_points < 1:
+        return [(i, ys[i], weights[i] if weights else 1.0) for i in range(n)]
+
+    span = (xs[-1] - xs[0]) or 1.0
+    buckets: List[Tuple[int, float, float]] = []
+    first = 0
+    total = 0.0
+    weight_sum = 0.0
+    current = 0
+    for i in range(n):
+        bucket = min(int((xs[i] - xs[0]) * max_points / span), max_points - 1)
+        if bucket != current and weight_sum:
+            buckets.append((first, total / weight_sum, weight_sum))
+            total = weight_sum = 0.0
+        if not weight_sum:
+            first = i
+        current = bucket
+        w = weights[i] if weights else 1.0
+        total += ys[i] * w
+        weight_sum += w
+    if weight_sum:
+        buckets.append((first, total / weight_sum, weight_sum))
+    return buckets
+
+def downsample(points: List[Dict[str, Any]], max_points: Optional[int], x_key: str, y_key: str,
+               method: str = LTTB, x_value: Callable[[Any], float] = date_x) -> List[Dict[str, Any]]:
+    """
+    Downsample a list of chart points.
+
+    Points are dicts sorted by `x_key`. LTTB returns a subset of the original
+    points; the bucket method returns the first point of each bucket with
+    `y_key` replaced by the bucket mean and a `count` of merged points.
+
+    Args:
+        points: Series points
+        max_points: Target point count; None or a count >= len(points) is a no-op
+        x_key: Key of the x value (an ISO date by default)
+        y_key: Key of the numeric y value
+        method: LTTB or BUCKET
+        x_value: Converts an x value to a number
+
+    Returns:
+        Downsampled points
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(METHODS)}")
+    if not max_points or max_points >= len(points):
+        return points
+
+    xs = [x_value(point[x_key]) for point in points]
+    ys = [float(point.get(y_key) or 0) for point in points]
+    if method == LTTB:
+        return [points[i] for i in lttb_indices(xs, ys, max_points)]
+    return [
+        {**points[first], y_key: mean, "count": int(count)}
+        for first, mean, count in bucket_means(xs, ys, max_points)
+    ]
+
+class SeriesPyramid:
+    """Multi-resolution copies of one series for cheap zoomed downsampling."""
+
+    def __init__(self, labels: List[Any], xs: Sequence[float], ys: Sequence[float]):
+        """
+        Build the pyramid.
+
+        Level 0 is the series itself; each further level merges pairs of
+        adjacent points of the level below (weighted mean of y), until a
+        level has fewer than 64 points.
+
+        Args:
+            labels: Original x values (returned in query results)
+            xs: Numeric x values, ascending
+            ys: Y values
+        """
+        self.levels: List[Tuple[List[Any], array, array, array]] = [
+            (list(labels), array('d', xs), array('d', ys), array('d', [1.0] * len(xs)))
+        ]
+        while len(self.levels[-1][1]) >= 2 * _MIN_LEVEL_POINTS:
+            labels, xs, ys, ws = self.levels[-1]
+            next_labels, next_xs, next_ys, next_ws = [], array('d'), array('d'), array('d')
+            for i in range(0, len(xs), 2):
+                j = min(i + 1, len(xs) - 1)
+                w = ws[i] + (ws[j] if j != i else 0.0)
+                y = (ys[i] * ws[i] + (ys[j] * ws[j] if j != i else 0.0)) / w
+                next_labels.append(labels[i])
+                next_xs.append(xs[i])
+                next_ys.append(y)
+                next_ws.append(w)
+            self.levels.append((next_labels, next_xs, next_ys, next_ws))
+
+    def __len__(self) -> int:
+        return len(self.levels[0][1])
+
+    def query(self, max_points: int, x_key: str, y_key: str, method: str = LTTB,
+              start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get at most `max_points` points between `start` and `end` (inclusive).
+
+        Uses the coarsest level that still has at least `max_points` points
+        in the range, so the result is as detailed as a downsample of the raw
+        series while only touching a slice of that level.
+
+        Args:
+            max_points: Target point count
+            x_key: Key for x values in the result
+            y_key: Key for y values in the result
+            method: LTTB or BUCKET
+            start: Lowest x to include (None for the beginning)
+            end: Highest x to include (None for the end)
+
+        Returns:
+            Points as {x_key: label, y_key: value} dicts
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown downsampling method '{method}', expected one of {', '.join(METHODS)}")
+
+        chosen = None
+        for labels, xs, ys, ws in reversed(self.levels):
+            lo = bisect_left(xs, start) if start is not None else 0
+            hi = bisect_right(xs, end) if end is not None else len(xs)
+            chosen = (labels, xs, ys, ws, lo, hi)
+            if hi - lo >= max_points:
+                break
+        labels, xs, ys, ws, lo, hi = chosen
+
+        if method == LTTB:
+            indices = [lo + i for i in lttb_indices(xs[lo:hi], ys[lo:hi], max_points)]
+            return [{x_key: labels[i], y_key: ys[i]} for i in indices]
+        return [
+            {x_key: labels[lo + first], y_key: mean, "count": int(count)}
+            for first, mean, count in bucket_means(xs[lo:hi], ys[lo:hi], max_points, ws[lo:hi])
+        ]
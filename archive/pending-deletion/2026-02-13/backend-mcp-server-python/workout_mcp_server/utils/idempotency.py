@@ -0,0 +1,195 @@
+"""
+Idempotency keys for write tools.
+
+Agents retry writes that time out, and without protection every retry
+creates another session or reward. A write wrapped in
+`IdempotencyStore.run()` stores its response under the request's
+idempotency key; a retry with the same key gets the stored response back
+without the write running again. A retry that arrives while the first call
+is still running waits for it instead of starting a second write.
+
+Only calls with an explicit key are deduplicated. Two identical calls
+without one are both written: logging the same set, meal or vitamin twice
+is a legitimate repeated action, and the input alone can't tell it apart
+from a retry. The request fingerprint (a hash of the tool name and its
+input) is stored with each key to detect a key reused for a different
+request.
+
+Responses are kept in a local SQLite file so they survive restarts, and
+the store is bounded by a TTL and a maximum number of entries. Only
+successful responses are stored; a failed write can always be retried.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from .config import config
+
+logger = logging.getLogger("workout_mcp_server.idempotency")
+
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / "data" / "idempotency.sqlite3"
+
+# Expired entries are swept every this many stored responses
+_SWEEP_EVERY = 100
+
+def fingerprint(scope: str, payload: Any) -> str:
+    """Hash a tool name and its input into a request fingerprint."""
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{scope}\n{canonical}".encode("utf-8")).hexdigest()
+
+class IdempotencyStore:
+    """Bounded, persisted map of idempotency key -> stored response."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400.0, max_entries: int = 10000):
+        """
+        Args:
+            path: SQLite file (default: data/idempotency.sqlite3 in the server directory)
+            ttl: Seconds a response is kept for an explicit idempotency key
+            max_entries: Entries kept; the oldest are dropped first
+        """
+        self.path = Path(path) if path else DEFAULT_STORE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._puts = 0
+        self._counts = {"hits": 0, "misses": 0, "inflightJoins": 0, "conflicts": 0, "unkeyed": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idempotency_created ON idempotency (created_at)")
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT fingerprint, response FROM idempotency WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _put(self, key: str, request_fingerprint: str, response: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency VALUES (?, ?, ?, ?, ?)",
+                (key, request_fingerprint, json.dumps(response, default=str), now, now + ttl)
+            )
+            self._puts += 1
+            if self._puts % _SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM idempotency WHERE key IN ("
+                    "SELECT key FROM idempotency ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def _check_fingerprint(self, scope: str, key: Optional[str], stored: str, requested: str) -> None:
+        if stored != requested:
+            self._counts["conflicts"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Idempotency key '{key}' was already used for a different {scope} request"
+            )
+
+    async def run(self, scope: str, payload: Any, call: Callable[[], Awaitable[Any]],
+                  key: Optional[str] = None, model: Optional[Type[BaseModel]] = None) -> Any:
+        """
+        Run a write at most once per idempotency key.
+
+        Args:
+            scope: Tool name; keys are namespaced by it
+            payload: JSON-compatible request input, used for the fingerprint
+            call: Performs the write
+            key: Client-supplied idempotency key; without one the write just runs
+            model: Output model to rebuild a stored response with
+
+        Returns:
+            The write's response, or the stored response of an earlier call
+
+        Raises:
+            HTTPException: 409 if the key was already used for a different request
+        """
+        if not key:
+            self._counts["unkeyed"] += 1
+            return await call()
+
+        request_fingerprint = fingerprint(scope, payload)
+        store_key = f"{scope}:key:{key}"
+
+        stored = self._get(store_key)
+        if stored is not None:
+            stored_fingerprint, response = stored
+            self._check_fingerprint(scope, key, stored_fingerprint, request_fingerprint)
+            self._counts["hits"] += 1
+            logger.info(f"Replayed stored {scope} response for a retried request")
+            return model.parse_obj(response) if model is not None else response
+
+        # A retry of a call that is still running waits for its result
+        inflight = self._inflight.get(store_key)
+        if inflight is not None:
+            self._check_fingerprint(scope, key, inflight[0], request_fingerprint)
+            self._counts["inflightJoins"] += 1
+            return await asyncio.shield(inflight[1])
+
+        self._counts["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[store_key] = (request_fingerprint, future)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on the future; don't log it as unretrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            response = result.dict() if isinstance(result, BaseModel) else result
+            try:
+                self._put(store_key, request_fingerprint, response, self.ttl)
+            except Exception as e:
+                logger.error(f"Failed to store {scope} response for idempotency: {str(e)}")
+            return result
+        finally:
+            self._inflight.pop(store_key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit, miss, in-flight join, conflict and unkeyed call counts, and stored entries."""
+        try:
+            with self._lock:
+                entries = self._connection().execute(
+                    "SELECT COUNT(*) FROM idempotency WHERE expires_at > ?", (time.time(),)
+                ).fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {**self._counts, "inflight": len(self._inflight), "entries": entries}
+
+idempotency_store = IdempotencyStore(
+    config.get('IDEMPOTENCY_STORE_PATH'),
+    ttl=config.get('IDEMPOTENCY_TTL'),
+    max_entries=config.get('IDEMPOTENCY_MAX_ENTRIES')
+)
@@ -3,12 +3,27 @@ PostgreSQL connection utilities for the Workout MCP Server.
 
 This module provides functions for connecting to PostgreSQL and performing database operations.
 Replaces the previous MongoDB implementation with PostgreSQL using SQLAlchemy.
+
+Reads can be spread over read replicas (`DATABASE_REPLICA_URLS`). A replica
+is only used while its replication lag is below `REPLICA_MAX_LAG`, and a
+table this process just wrote to is read from the primary for that long,
+so callers see their own writes. Read results are cached, tagged with the
+tables they read; a write to a table drops the cached results that read it.
 """
 
 import os
+import re
+import json
+import time
+import random
+import select
 import logging
-from typing import Dict, List, Any, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple, Union
 import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from psycopg2.extras import RealDictCursor
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -23,6 +38,186 @@ _engine = None
 _session_factory = None
 _connection = None
 
+# Replica engines, and table -> time until which reads of it stay on the primary
+_replicas: List["Replica"] = []
+_recent_writes: Dict[str, float] = {}
+
+_TABLE_PATTERN = re.compile(r'\b(?:from|join|into|update)\s+((?:"[^"]+"|\w+)(?:\s*\.\s*(?:"[^"]+"|\w+))?)', re.IGNORECASE)
+
+_REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and drop a trailing semicolon."""
+    return " ".join(query.split()).rstrip(";").strip()
+
+def is_read_query(query: str) -> bool:
+    """True for statements that only read (SELECT, or WITH without a data-modifying part)."""
+    statement = normalize_sql(query).lower()
+    if statement.startswith("select"):
+        return True
+    return statement.startswith("with") and not re.search(r"\b(insert|update|delete)\b", statement)
+
+def query_tables(query: str) -> Set[str]:
+    """Names of the tables a statement reads or writes, lowercased and unquoted."""
+    return {
+        match.split(".")[-1].strip().strip('"').lower()
+        for match in _TABLE_PATTERN.findall(query)
+    }
+
+class QueryCache:
+    """
+    LRU cache of read results with per-entry TTLs and table tags.
+
+    Each entry is tagged with the tables its query reads, so a write to a
+    table only drops the entries that depend on it.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]], Set[str]]]" = OrderedDict()
+        self._keys_by_table: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, params: Optional[Dict[str, Any]]) -> str:
+        """Cache key for a normalized query and its parameters."""
+        return normalize_sql(query) + "\n" + json.dumps(params or {}, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Get a copy of cached rows, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(row) for row in entry[1]]
+
+    def put(self, key: str, rows: List[Dict[str, Any]], tables: Set[str], ttl: Optional[float] = None) -> None:
+        """Cache rows read from `tables`."""
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), [dict(row) for row in rows], tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[2]:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop every entry that read one of `tables`; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.get(table.strip('"').lower(), ())):
+                    self._drop(key)
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit and miss counts and cached entries."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+query_cache = QueryCache(config.get('QUERY_CACHE_TTL'), config.get('QUERY_CACHE_MAX_ENTRIES'))
+
+# Seconds the exercise catalog read is cached; the change feed raises it
+# while it is connected, since other writers' changes then reach the cache
+exercise_cache_ttl = config.get('EXERCISE_QUERY_CACHE_TTL')
+
+class Replica:
+    """A read replica engine and its last measured replication lag."""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+
+    def usable(self) -> bool:
+        """Check lag if it is due; True while the replica is reachable and caught up."""
+        if time.monotonic() - self.checked_at >= config.get('REPLICA_LAG_CHECK_INTERVAL'):
+            self.checked_at = time.monotonic()
+            try:
+                with self.engine.connect() as conn:
+                    self.lag = float(conn.execute(text(_REPLICA_LAG_QUERY)).scalar() or 0)
+                self.error = None
+            except SQLAlchemyError as e:
+                self.lag = None
+                self.error = str(e)
+                logger.warning(f"Replica {self.name} unavailable: {str(e)}")
+        return self.error is None and self.lag is not None and self.lag <= config.get('REPLICA_MAX_LAG')
+
+    def failed(self, error: Exception) -> None:
+        """Take the replica out of rotation until its next lag check."""
+        self.checked_at = time.monotonic()
+        self.error = str(error)
+
+def _note_write(tables: Iterable[str]) -> None:
+    """Drop cached reads of written tables and pin their reads to the primary."""
+    tables = {table.strip('"').lower() for table in tables}
+    query_cache.invalidate_tables(tables)
+    until = time.monotonic() + config.get('REPLICA_MAX_LAG')
+    for table in tables:
+        _recent_writes[table] = until
+
+def _read_replica(tables: Set[str]) -> Optional[Replica]:
+    """Pick a replica for a read of `tables`, or None to read from the primary."""
+    if not _replicas:
+        return None
+    now = time.monotonic()
+    if any(_recent_writes.get(table, 0) > now for table in tables):
+        return None
+    usable = [replica for replica in _replicas if replica.usable()]
+    return random.choice(usable) if usable else None
+
+def invalidate_tables(*tables: str) -> int:
+    """
+    Drop cached query results that read any of `tables`.
+
+    Used for changes made outside this process, e.g. from change notifications.
+
+    Returns:
+        Number of cached results dropped
+    """
+    return query_cache.invalidate_tables(tables)
+
+def get_database_metrics() -> Dict[str, Any]:
+    """Query cache counters and replica lag."""
+    return {
+        "connected": _engine is not None,
+        "queryCache": query_cache.metrics(),
+        "replicas": [
+            {"name": replica.name, "lagSeconds": replica.lag, "error": replica.error}
+            for replica in _replicas
+        ]
+    }
+
 def get_postgresql_uri() -> str:
     """
     Get the PostgreSQL connection URI.
@@ -80,6 +275,22 @@ async def connect_to_postgresql() -> Dict[str, Any]:
         # Create session factory
         _session_factory = sessionmaker(bind=_engine)
         
+        # Replicas are optional; one that can't be reached is skipped until its next lag check
+        _replicas.clear()
+        replica_urls = [url.strip() for url in (config.get('DATABASE_REPLICA_URLS') or '').split(',') if url.strip()]
+        for index, replica_url in enumerate(replica_urls, start=1):
+            replica_engine = create_engine(
+                replica_url,
+                pool_size=5,
+                max_overflow=10,
+                pool_timeout=30,
+                pool_recycle=3600,
+                echo=False
+            )
+            _replicas.append(Replica(f"replica{index}", replica_engine))
+        if _replicas:
+            logger.info(f"Routing reads to {len(_replicas)} read replicas")
+        
         logger.info("Successfully connected to PostgreSQL database")
         return {"engine": _engine, "session_factory": _session_factory}
     
@@ -109,13 +320,31 @@ def get_session():
         return _session_factory()
     return None
 
-async def execute_query(query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+def _run_query(engine, query: str, params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with engine.connect() as conn:
+        if params:
+            result = conn.execute(text(query), params)
+        else:
+            result = conn.execute(text(query))
+        
+        # Convert result to list of dictionaries
+        columns = result.keys()
+        rows = result.fetchall()
+        
+        return [dict(zip(columns, row)) for row in rows]
+
+async def execute_query(query: str, params: Dict[str, Any] = None, cache_ttl: Optional[float] = None) -> List[Dict[str, Any]]:
     """
     Execute a raw SQL query and return results.
     
+    SELECT queries are served from the query cache when possible and
+    otherwise read from a replica if one is usable. Other statements go to
+    the primary and drop cached reads of the tables they touch.
+    
     Args:
         query: SQL query string
         params: Query parameters
+        cache_ttl: Seconds to cache the result (default: QUERY_CACHE_TTL; 0 disables caching)
         
     Returns:
         List of result dictionaries
@@ -124,22 +353,118 @@ async def execute_query(query: str, params: Dict[str, Any] = None) -> List[Dict[
         logger.error("Database not connected")
         return []
     
-    try:
-        with _engine.connect() as conn:
-            if params:
-                result = conn.execute(text(query), params)
-            else:
-                result = conn.execute(text(query))
-            
-            # Convert result to list of dictionaries
-            columns = result.keys()
-            rows = result.fetchall()
-            
-            return [dict(zip(columns, row)) for row in rows]
+    tables = query_tables(query)
+    if not is_read_query(query):
+        try:
+            with _engine.connect() as conn:
+                result = conn.execute(text(query), params or {})
+                rows = [dict(zip(result.keys(), row)) for row in result.fetchall()] if result.returns_rows else []
+                conn.commit()
+            return rows
+        except SQLAlchemyError as e:
+            logger.error(f"Query execution failed: {str(e)}")
+            return []
+        finally:
+            _note_write(tables)
+    
+    use_cache = cache_ttl is None or cache_ttl > 0
+    cache_key = QueryCache.key(query, params)
+    if use_cache:
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
     
+    try:
+        replica = _read_replica(tables)
+        rows = None
+        if replica is not None:
+            try:
+                rows = _run_query(replica.engine, query, params)
+            except SQLAlchemyError as e:
+                logger.warning(f"Read from {replica.name} failed, using the primary: {str(e)}")
+                replica.failed(e)
+        if rows is None:
+            rows = _run_query(_engine, query, params)
     except SQLAlchemyError as e:
         logger.error(f"Query execution failed: {str(e)}")
         return []
+    
+    if use_cache:
+        query_cache.put(cache_key, rows, tables, cache_ttl)
+    return rows
+
+def stream_query(query: str, params: Dict[str, Any] = None, chunk_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Execute a raw SQL query through a server-side cursor and yield the
+    results in chunks.
+
+    Only one chunk is held in memory at a time, however many rows the query
+    returns. The connection stays checked out until the generator is
+    exhausted or closed. Results are never cached, but the query runs on a
+    replica when one is usable.
+
+    Args:
+        query: SQL query string
+        params: Query parameters
+        chunk_size: Rows fetched per round trip
+
+    Yields:
+        Lists of up to chunk_size result dictionaries
+
+    Raises:
+        RuntimeError: If the database is not connected
+    """
+    if _engine is None:
+        raise RuntimeError("Database not connected")
+
+    replica = _read_replica(query_tables(query))
+    engine = replica.engine if replica is not None else _engine
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        result = conn.execute(text(query), params or {})
+        columns = list(result.keys())
+        for partition in result.partitions(chunk_size):
+            yield [dict(zip(columns, row)) for row in partition]
+
+def open_listener(channels: List[str]):
+    """
+    Open a dedicated connection that LISTENs on notification channels.
+
+    Notifications are only delivered to the connection that issued LISTEN,
+    so the listener gets its own autocommit connection instead of one from
+    the pool. Close it with `.close()`.
+
+    Args:
+        channels: Channel names to listen on
+
+    Returns:
+        psycopg2 connection
+    """
+    conn = psycopg2.connect(get_postgresql_uri())
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cursor:
+        for channel in channels:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+    logger.info(f"Listening for PostgreSQL notifications on {', '.join(channels)}")
+    return conn
+
+def wait_for_notifications(conn, timeout: float) -> List[Tuple[str, str]]:
+    """
+    Wait up to `timeout` seconds for notifications on a listener connection.
+
+    Args:
+        conn: Connection from open_listener()
+        timeout: Seconds to wait
+
+    Returns:
+        (channel, payload) pairs, empty if none arrived
+    """
+    if select.select([conn], [], [], timeout) == ([], [], []):
+        return []
+    conn.poll()
+    notifications = [(notify.channel, notify.payload) for notify in conn.notifies]
+    conn.notifies.clear()
+    return notifications
 
 async def execute_insert(table: str, data: Dict[str, Any]) -> Optional[int]:
     """
@@ -171,6 +496,8 @@ async def execute_insert(table: str, data: Dict[str, Any]) -> Optional[int]:
     except SQLAlchemyError as e:
         logger.error(f"Insert failed: {str(e)}")
         return None
+    finally:
+        _note_write([table])
 
 async def execute_update(table: str, data: Dict[str, Any], where_clause: str, where_params: Dict[str, Any] = None) -> bool:
     """
@@ -207,6 +534,8 @@ async def execute_update(table: str, data: Dict[str, Any], where_clause: str, wh
     except SQLAlchemyError as e:
         logger.error(f"Update failed: {str(e)}")
         return False
+    finally:
+        _note_write([table])
 
 async def close_postgresql_connection() -> None:
     """
@@ -219,6 +548,10 @@ async def close_postgresql_connection() -> None:
         _engine = None
         _session_factory = None
         _connection = None
+        for replica in _replicas:
+            replica.engine.dispose()
+        _replicas.clear()
+        query_cache.clear()
         logger.info("PostgreSQL connection closed")
 
 def is_connected() -> bool:
@@ -263,11 +596,14 @@ async def get_exercises() -> List[Dict[str, Any]]:
     """
     Get all available exercises.
     
+    Served from the query cache for up to `exercise_cache_ttl` seconds.
+    
     Returns:
         List of exercises
     """
     query = 'SELECT * FROM "Exercises" ORDER BY name'
-    return await execute_query(query)
+    # Writes through this module or change notifications drop the cached copy
+    return await execute_query(query, cache_ttl=exercise_cache_ttl)
 
 async def create_workout_session(user_id: int, workout_data: Dict[str, Any]) -> Optional[int]:
     """
@@ -0,0 +1,271 @@
+"""
+Resilience primitives for backend API calls.
+
+This module provides per-endpoint circuit breakers and latency tracking so
+that a degraded backend fails fast instead of piling up waiting requests.
+Latency percentiles drive adaptive request timeouts and hedged GETs.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger("workout_mcp_server.resilience")
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Backend routes this server calls; `{id}` stands for any one path segment
+BACKEND_ROUTES = (
+    "/assignments/trainer/{id}",
+    "/client-progress/{id}",
+    "/exercises/search",
+    "/exercises/recommended/{id}",
+    "/exercises/{id}",
+    "/workout/plans",
+    "/workout/plans/{id}",
+    "/workout/sessions",
+    "/workout/sessions/user/{id}",
+    "/workout/sessions/{id}",
+    "/workout/statistics/{id}",
+)
+
+def _parse_route(template: str) -> Tuple[Optional[str], ...]:
+    return tuple(None if segment == "{id}" else segment for segment in template.strip("/").split("/"))
+
+# Routes with fewer parameters first, so a literal segment wins over `{id}`
+_ROUTES = sorted(
+    ((_parse_route(template), template) for template in BACKEND_ROUTES),
+    key=lambda route: route[0].count(None)
+)
+
+def endpoint_key(method: str, path: str) -> str:
+    """
+    Build a breaker/latency key for a backend call.
+    
+    The path is matched against `BACKEND_ROUTES`, so `/client-progress/12`
+    and `/client-progress/abc` share one breaker. A path that matches no
+    route is keyed by its first segment, so the number of breakers stays
+    bounded whatever ids callers pass.
+    
+    Args:
+        method: HTTP method
+        path: API path (without base URL)
+        
+    Returns:
+        Key such as "GET /client-progress/{id}"
+    """
+    segments = path.split("?")[0].strip("/").split("/")
+    for route, template in _ROUTES:
+        if len(route) == len(segments) and all(
+            expected is None or expected == segment for expected, segment in zip(route, segments)
+        ):
+            return f"{method.upper()} {template}"
+    if len(segments) == 1:
+        return f"{method.upper()} /{segments[0]}"
+    return f"{method.upper()} /{segments[0]}/*"
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+    
+    def __init__(self, window: int = 200):
+        """
+        Initialize the tracker.
+        
+        Args:
+            window: Number of recent samples to keep
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def count(self) -> int:
+        """Number of samples currently in the window."""
+        return len(self._samples)
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Get a latency percentile over the window.
+        
+        Args:
+            pct: Percentile in the range 0-100
+            
+        Returns:
+            Latency in seconds, or None without samples
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single backend endpoint.
+    
+    Closed: calls pass through; consecutive failures are counted.
+    Open: calls are rejected until `reset_timeout` has elapsed.
+    Half-open: a single probe call is let through; success closes the
+    breaker, failure re-opens it.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+        
+        Args:
+            name: Endpoint key
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before probing
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency = LatencyTracker()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout expires."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may be sent now.
+        
+        Returns:
+            True if the call may proceed
+        """
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            # A probe that never reported back (e.g. cancelled) is replaced
+            # after another reset_timeout
+            now = time.monotonic()
+            if state == HALF_OPEN and (not self._probe_in_flight or now - self._probe_started >= self.reset_timeout):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+    
+    def retry_after(self) -> int:
+        """Seconds until the breaker will allow a probe."""
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        return max(1, int(remaining + 0.999))
+    
+    def record_success(self, seconds: float) -> None:
+        """Record a successful call and its latency."""
+        self.latency.record(seconds)
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record a failed call (connection error, timeout or 5xx)."""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the breaker state for health reporting."""
+        p50 = self.latency.percentile(50)
+        p95 = self.latency.percentile(95)
+        return {
+            "state": self.state,
+            "consecutiveFailures": self._failures,
+            "samples": self.latency.count(),
+            "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95Ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+class BreakerRegistry:
+    """Registry of per-endpoint circuit breakers."""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the registry.
+        
+        Args:
+            failure_threshold: Consecutive failures that open a breaker
+            reset_timeout: Seconds a breaker stays open before probing
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> CircuitBreaker:
+        """Get (or create) the breaker for an endpoint key."""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(key, self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+    
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        """Get a snapshot of every known breaker."""
+        return {key: breaker.snapshot() for key, breaker in sorted(self._breakers.items())}
+
+def adaptive_timeout(breaker: CircuitBreaker, min_timeout: float, max_timeout: float,
+                     multiplier: float = 3.0, min_samples: int = 20) -> float:
+    """
+    Compute a request timeout from an endpoint's recent latencies.
+    
+    Args:
+        breaker: Breaker holding the endpoint's latency window
+        min_timeout: Lower bound in seconds
+        max_timeout: Upper bound (and value used until enough samples exist)
+        multiplier: Factor applied to the p99 latency
+        min_samples: Samples needed before adapting
+        
+    Returns:
+        Timeout in seconds
+    """
+    if breaker.latency.count() < min_samples:
+        return max_timeout
+    p99 = breaker.latency.percentile(99)
+    return min(max_timeout, max(min_timeout, p99 * multiplier))
+
+def hedge_delay(breaker: CircuitBreaker, min_samples: int = 20) -> Optional[float]:
+    """
+    Get the delay after which a hedged duplicate request should be sent.
+    
+    Args:
+        breaker: Breaker holding the endpoint's latency window
+        min_samples: Samples needed before hedging
+        
+    Returns:
+        The endpoint's p95 latency in seconds, or None if not enough data
+    """
+    if breaker.latency.count() < min_samples:
+        return None
+    return breaker.latency.percentile(95)
@@ -2,6 +2,7 @@
 import express from 'express';
 import { protect, authorize } from '../middleware/authMiddleware.mjs';
 import { getClientProgress, getUser } from '../models/index.mjs';
+import sequelize from '../database.mjs';
 import logger from '../utils/logger.mjs';
 
 const router = express.Router();
@@ -342,4 +343,133 @@ router.put('/:userId',
     }
 });
 
+const NUMERIC_TYPES = ['INTEGER', 'BIGINT', 'FLOAT', 'DOUBLE', 'REAL', 'DECIMAL'];
+const PROTECTED_FIELDS = ['id', 'userId', 'createdAt', 'updatedAt'];
+
+/**
+ * @route PATCH /api/client-progress/:userId
+ * @desc Apply a partial update to a client's progress atomically
+ * @access Private (trainers and admins only)
+ *
+ * Body (every key optional):
+ *   increment:       { field: delta }  added to the stored value (UPDATE ... SET field = field + delta)
+ *   set:             { field: value }  overwrites the stored value
+ *   merge:           { field: { key: value } }  merged into a stored JSON object
+ *   addAchievements: [id, ...]  appended to achievements unless already present
+ *
+ * Increments from concurrent writers all apply, unlike a PUT of absolute
+ * values. Fields the model doesn't have are ignored and listed in `ignored`.
+ */
+router.patch('/:userId',
+  protect,
+  authorize(['trainer', 'admin']),
+  async (req, res) => {
+    const { userId } = req.params;
+    const { increment = {}, set = {}, merge = {}, addAchievements = [] } = req.body || {};
+    
+    const invalidDelta = Object.entries(increment).find(([, delta]) => !Number.isFinite(delta));
+    if (invalidDelta || !Array.isArray(addAchievements)) {
+      return res.status(400).json({
+        success: false,
+        message: invalidDelta
+          ? `Increment for '${invalidDelta[0]}' must be a number`
+          : 'addAchievements must be an array'
+      });
+    }
+    
+    const ClientProgress = getClientProgress();
+    const User = getUser();
+    const attributes = ClientProgress.rawAttributes;
+    const writable = (field) => attributes[field] && !PROTECTED_FIELDS.includes(field);
+    const ignored = [];
+    
+    const transaction = await sequelize.transaction();
+    try {
+      const client = await User.findOne({
+        where: { id: userId, role: 'client' },
+        transaction
+      });
+      
+      if (!client) {
+        await transaction.rollback();
+        return res.status(404).json({
+          success: false,
+          message: 'Client not found'
+        });
+      }
+      
+      // Lock the row so merges and appends don't race other writers
+      const clientProgress = await ClientProgress.findOne({
+        where: { userId },
+        transaction,
+        lock: transaction.LOCK.UPDATE
+      });
+      
+      if (!clientProgress) {
+        await transaction.rollback();
+        return res.status(404).json({
+          success: false,
+          message: 'Client progress record not found'
+        });
+      }
+      
+      const deltas = {};
+      Object.entries(increment).forEach(([field, delta]) => {
+        if (writable(field) && NUMERIC_TYPES.includes(attributes[field].type.key)) {
+          deltas[field] = delta;
+        } else {
+          ignored.push(field);
+        }
+      });
+      
+      Object.entries(set).forEach(([field, value]) => {
+        if (writable(field)) {
+          clientProgress[field] = value;
+        } else {
+          ignored.push(field);
+        }
+      });
+      
+      Object.entries(merge).forEach(([field, values]) => {
+        const current = writable(field) ? clientProgress[field] : undefined;
+        if (current && typeof current === 'object' && !Array.isArray(current)) {
+          clientProgress[field] = { ...current, ...values };
+        } else {
+          ignored.push(field);
+        }
+      });
+      
+      if (addAchievements.length > 0) {
+        const achievements = clientProgress.achievements || [];
+        clientProgress.achievements = [
+          ...achievements,
+          ...addAchievements.filter(id => !achievements.includes(id))
+        ];
+      }
+      
+      await clientProgress.save({ transaction });
+      if (Object.keys(deltas).length > 0) {
+        await clientProgress.increment(deltas, { transaction });
+        await clientProgress.reload({ transaction });
+      }
+      await transaction.commit();
+      
+      return res.status(200).json({
+        success: true,
+        message: 'Progress updated successfully',
+        progress: clientProgress,
+        ignored
+      });
+      
+    } catch (error) {
+      await transaction.rollback();
+      console.error('Error patching client progress:', error);
+      return res.status(500).json({
+        success: false,
+        message: 'Server error updating progress data',
+        error: error.message
+      });
+    }
+});
+
 export default router;
\ No newline at end of file